@@ -0,0 +1,135 @@
+"""
+Compares the module data bulk loader with the awswrangler.mysql.to_sql load it replaced.
+
+Both loaders write the same synthetic module 2 upload into a scratch copy of the module 2 table
+(CREATE TABLE ... LIKE, without the history triggers or foreign keys), which is emptied before
+every run and dropped at the end.  Run it from the repository root against a dev database:
+
+    MYSQL_PASSWORD=... python devops/utils/benchmark_module_load.py --host <host> --user <user>
+"""
+import os
+import statistics
+import sys
+import time
+import uuid
+
+import awswrangler
+import numpy
+import pandas
+import pymysql
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "..", "source", "lambda_layers", "python"))
+
+# pylint: disable=wrong-import-position
+from module_validation.bulk_loader import load_module_data
+
+SCRATCH_TABLE = "module_load_benchmark"
+
+
+def get_upload_df(row_count, seed=0):
+    """
+    Returns a validated module 2 upload of row_count rows, typed like the frames the async
+    pipeline hands to the loader.
+    """
+    rng = numpy.random.default_rng(seed)
+    station_ids = [f"station-{number}" for number in range(1000)]
+    session_start = pandas.Timestamp("2024-01-01T00:00:00-05:00") + pandas.to_timedelta(
+        rng.integers(0, 365 * 24 * 60, row_count), unit="min"
+    )
+    energy_kwh = rng.uniform(0, 100, row_count).round(2)
+    return pandas.DataFrame({
+        "upload_id": str(uuid.uuid4()),
+        "station_uuid": [str(uuid.UUID(int=number)) for number in rng.integers(0, 1000, row_count)],
+        "station_id_upload": rng.choice(station_ids, row_count),
+        "network_provider_upload": "benchmark",
+        "port_id": [f"port-{number}" for number in rng.integers(0, 8, row_count)],
+        "session_id": [f"session-{number}" for number in range(row_count)],
+        "session_start": session_start,
+        "session_end": session_start + pandas.Timedelta(minutes=45),
+        "energy_kwh": numpy.where(rng.random(row_count) < 0.05, numpy.nan, energy_kwh),
+        "power_kw": rng.uniform(0, 350, row_count).round(2),
+        "payment_method": rng.choice(["credit_card", "app", "membership"], row_count),
+        "user_reports_no_data": pandas.Series([None] * row_count, dtype=object),
+    })
+
+
+def load_with_awswrangler(connection, schema, table, df):
+    awswrangler.mysql.to_sql(
+        df=df, table=table, schema=schema, con=connection, use_column_names=True
+    )
+
+
+def load_with_bulk_loader(connection, schema, table, df):
+    load_module_data(connection=connection, table=f"{schema}.{table}", df=df)
+
+
+def time_load(connection, schema, load, df):
+    """
+    Returns the seconds load takes to write df into the emptied scratch table.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f"TRUNCATE TABLE {schema}.{SCRATCH_TABLE}")
+    connection.commit()
+
+    start_time = time.perf_counter()
+    load(connection, schema, SCRATCH_TABLE, df)
+    elapsed_time = time.perf_counter() - start_time
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT COUNT(*) FROM {schema}.{SCRATCH_TABLE}")
+        (loaded_rows,) = cursor.fetchone()
+    if loaded_rows != len(df):
+        raise RuntimeError(f"{load.__name__} loaded {loaded_rows} of {len(df)} rows")
+    return elapsed_time
+
+
+def run_benchmark(connection, schema, row_count, repeat):
+    df = get_upload_df(row_count)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {schema}.{SCRATCH_TABLE}")
+        cursor.execute(f"CREATE TABLE {schema}.{SCRATCH_TABLE} LIKE {schema}.module2_data_v3")
+    try:
+        results = {}
+        for load in (load_with_awswrangler, load_with_bulk_loader):
+            results[load.__name__] = [
+                time_load(connection, schema, load, df) for _ in range(repeat)
+            ]
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {schema}.{SCRATCH_TABLE}")
+
+    print(f"{row_count} rows, best and median of {repeat} runs")
+    for name, timings in results.items():
+        best = min(timings)
+        print(
+            f"{name:24} best {best:8.2f}s  median {statistics.median(timings):8.2f}s  "
+            f"{row_count / best:10.0f} rows/sec"
+        )
+    speedup = min(results["load_with_awswrangler"]) / min(results["load_with_bulk_loader"])
+    print(f"bulk loader speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the module data loaders")
+    parser.add_argument("--host", required=True, help="database host")
+    parser.add_argument("--port", type=int, default=3306, help="database port")
+    parser.add_argument("--user", required=True, help="database user, password in MYSQL_PASSWORD")
+    parser.add_argument("--schema", default="evchart_data_v3", help="schema of the module tables")
+    parser.add_argument("--rows", type=int, default=500000, help="number of rows loaded")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs of each loader")
+    args = parser.parse_args()
+
+    run_benchmark(
+        pymysql.connect(
+            host=args.host,
+            port=args.port,
+            user=args.user,
+            password=os.environ["MYSQL_PASSWORD"],
+            database=args.schema,
+        ),
+        args.schema,
+        args.rows,
+        args.repeat,
+    )
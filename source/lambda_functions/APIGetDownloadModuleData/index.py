@@ -133,7 +133,8 @@ def handler(event, _context):
                     "user_reports_no_data",
                     "time_at_upload",
                     "updated_on",
-                    "updated_by"
+                    "updated_by",
+                    "unique_key_fingerprint"
                 ]
 
                 dataframe = dataframe.drop(columns=[col for col in columns_to_drop if col in dataframe.columns])
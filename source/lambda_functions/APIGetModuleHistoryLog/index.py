@@ -1,7 +1,8 @@
 """
 APIGetModuleHistoryLog
 
-Return the import and approval history for a particular application module submission.
+Return the import and approval history for a particular application module submission,
+including the bulk loads of its data when load history is recorded.
 """
 import json
 import logging
@@ -10,8 +11,9 @@ from evchart_helper import aurora
 from evchart_helper.api_helper import execute_query
 from evchart_helper.custom_exceptions import (
     EvChartAuthorizationTokenInvalidError, EvChartDatabaseAuroraQueryError,
-    EvChartDatabaseDynamoQueryError, EvChartJsonOutputError,
-    EvChartMissingOrMalformedHeadersError, EvChartUserNotAuthorizedError)
+    EvChartDatabaseDynamoQueryError, EvChartFeatureStoreConnectionError,
+    EvChartJsonOutputError, EvChartMissingOrMalformedHeadersError,
+    EvChartUserNotAuthorizedError)
 from evchart_helper.custom_logging import LogEvent
 from evchart_helper.database_tables import ModuleDataTables
 from evchart_helper.module_helper import (format_datetime_obj,
@@ -19,9 +21,12 @@ from evchart_helper.module_helper import (format_datetime_obj,
                                           format_org_name_from_email,
                                           is_valid_upload_id)
 from evchart_helper.session import SessionManager
+from feature_toggle import FeatureToggleService
+from feature_toggle.feature_enums import Feature
 
 import_metadata = ModuleDataTables["Metadata"].value
 import_metadata_history = ModuleDataTables["MetadataHistory"].value
+module_data_load_history = ModuleDataTables["ModuleDataLoadHistory"].value
 
 logger = logging.getLogger("APIGetModuleHistoryLog")
 logger.setLevel(logging.DEBUG)
@@ -53,7 +58,12 @@ def handler(event, _context):
                 upload_id_is_verified(cursor, upload_id) and
                 org_is_authorized(cursor, org_id, upload_id)
             ):
-                module_history = get_module_history(cursor, upload_id)
+                feature_toggle_set = FeatureToggleService().get_active_feature_toggles(
+                    log_event=log_event
+                )
+                module_history = get_module_history(
+                    cursor, upload_id, feature_toggle_set
+                )
                 formatted_data = format_module_history_data(module_history)
 
         except (
@@ -62,7 +72,8 @@ def handler(event, _context):
             EvChartUserNotAuthorizedError,
             EvChartJsonOutputError,
             EvChartDatabaseAuroraQueryError,
-            EvChartDatabaseDynamoQueryError
+            EvChartDatabaseDynamoQueryError,
+            EvChartFeatureStoreConnectionError
         )as e:
 
             log_event.log_custom_exception(
@@ -127,7 +138,7 @@ def org_is_authorized(cursor, org_id, upload_id):
 
 # helper function that queries the module history table and
 # returns a list of dict for all updates made to passed in upload id
-def get_module_history(cursor, upload_id):
+def get_module_history(cursor, upload_id, feature_toggle_set=frozenset()):
     get_history_query = f"""
         SELECT * from {import_metadata_history}
         WHERE upload_id=%s
@@ -140,9 +151,45 @@ def get_module_history(cursor, upload_id):
         cursor=cursor,
         message="Error thrown in get_module_history()"
     )
+    if Feature.BULK_LOAD_HISTORY in feature_toggle_set:
+        # records without updated_on sort first, as they do in ORDER BY updated_on
+        history_data = sorted(
+            list(history_data) + get_load_history(cursor, upload_id),
+            key=lambda history: (
+                history.get("updated_on") is not None, history.get("updated_on")
+            )
+        )
     return history_data
 
 
+# helper function that queries the load history table and returns a list
+# of dict, shaped like the module history, for the bulk loads of upload id
+def get_load_history(cursor, upload_id):
+    get_load_history_query = f"""
+        SELECT
+            'LOAD' AS action_type,
+            upload_id,
+            updated_on,
+            updated_by,
+            JSON_OBJECT(
+                'module_table', module_table,
+                'row_count', row_count,
+                'content_checksum', content_checksum
+            ) AS changed_data
+        FROM {module_data_load_history}
+        WHERE upload_id=%s
+        ORDER BY updated_on
+    """
+    query_data = (upload_id,)
+    load_history = execute_query(
+        query=get_load_history_query,
+        data=query_data,
+        cursor=cursor,
+        message="Error thrown in get_load_history()"
+    )
+    return list(load_history)
+
+
 def format_module_history_data(module_history):
     fallback_status = "Processing"
     for module_history_dict in module_history:
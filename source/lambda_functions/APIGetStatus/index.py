@@ -8,11 +8,10 @@ import json
 import logging
 import os
 # This is a random comment.
-from evchart_helper.boto3_manager import boto3_manager
+from evchart_helper import APPLICATION_STATUS_TTL_SECONDS
+from evchart_helper.parameter_provider import parameter_provider
 from evchart_helper.session import SessionManager
 
-ssm_client = boto3_manager.client("ssm")
-
 logger = logging.getLogger("APIStatus")
 logger.setLevel(logging.DEBUG)
 
@@ -22,10 +21,11 @@ def get_application_status():
     sub_environment_path = f"/{sub_environment}" if sub_environment else ""
 
     return {
-        parameter["Name"].rsplit("/", maxsplit=1)[-1]: parameter["Value"]
-        for parameter in ssm_client.get_parameters_by_path(
-            Path=f"/ev-chart/status{sub_environment_path}"
-        )["Parameters"]
+        name.rsplit("/", maxsplit=1)[-1]: value
+        for name, value in parameter_provider.get_parameters_by_path(
+            f"/ev-chart/status{sub_environment_path}",
+            ttl=APPLICATION_STATUS_TTL_SECONDS
+        ).items()
     }
 
 
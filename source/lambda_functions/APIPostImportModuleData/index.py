@@ -30,6 +30,7 @@ from evchart_helper.custom_exceptions import (
 )
 from evchart_helper.custom_logging import LogEvent
 from evchart_helper.database_tables import ModuleDataTables
+from evchart_helper.parameter_provider import parameter_provider
 from evchart_helper.presigned_url import generate_presigned_url
 from evchart_helper.session import SessionManager
 from feature_toggle import FeatureToggleService
@@ -257,12 +258,15 @@ def upload_to_s3_from_raw(raw_data, upload_id, request_headers, token):
             message=f"Error uploading {upload_id} to S3 bucket: {e}"
         ) from e
 
-def get_async_bucket():
+def get_async_bucket_parameter_name():
     sub_environment = os.environ.get("SUBENVIRONMENT")
     sub_environment_path = f"/{sub_environment}" if sub_environment else ""
-    ssm_client = boto3_manager.client("ssm")
+    return f"/ev-chart/s3{sub_environment_path}/async-artifact-bucket-name"
+
 
+def get_async_bucket():
     # return 'ev-chart-artifact-data-dev-us-east-1'
-    return ssm_client.get_parameter(
-        Name=f"/ev-chart/s3{sub_environment_path}/async-artifact-bucket-name"
-    )["Parameter"]["Value"]
+    return parameter_provider.get_parameter(get_async_bucket_parameter_name())
+
+
+parameter_provider.register_prefetch(get_async_bucket_parameter_name())
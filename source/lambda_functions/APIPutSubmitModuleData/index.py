@@ -53,7 +53,7 @@ metadata_table = ModuleDataTables["Metadata"].value
 def handler(event, _context):
     try:
         connection = aurora.get_connection()
-    except (Error, BotoCoreError):
+    except (Error, BotoCoreError, EvChartDatabaseHandlerConnectionError):
         return EvChartDatabaseHandlerConnectionError().get_error_obj()
     except Exception as e:
         logger.debug("non-database error encountered: %s", repr(e))
@@ -13,25 +13,23 @@ terminate, returning a 400/500 level error.
 
 import json
 import logging
-import hashlib
 from datetime import datetime
 from itertools import chain
 import traceback
 
-import pandas
 from pymysql.err import Error
 from botocore.exceptions import BotoCoreError
 
-from async_utility.s3_manager import get_s3_data
+from async_utility.s3_manager import get_s3_data, get_s3_object
 from async_utility.sns_manager import process_sns_message, send_sns_message
+from async_utility.typed_frame import get_typed_frame
 
-from database_central_config import DatabaseCentralConfig
-from feature_toggle import FeatureToggleService
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
 from feature_toggle.feature_enums import Feature
 
 from evchart_helper import aurora
-from evchart_helper.boto3_manager import boto3_manager
 from evchart_helper.api_helper import get_upload_metadata, get_org_info_dynamo
+from evchart_helper.call_tracer import traced_handler
 from evchart_helper.custom_logging import LogEvent
 from evchart_helper.custom_exceptions import (
     EvChartAsynchronousS3Error,
@@ -46,66 +44,28 @@ from evchart_helper.custom_exceptions import (
     EvChartUserNotAuthorizedError,
 )
 
-from module_transform import (
-    transform_m2,
-    transform_m3,
-    transform_m4,
-    transform_m5,
-    transform_m9,
-)
-
 from module_validation import (
-    validate_m2,
-    validate_m3,
-    validate_m4,
-    validate_m9,
-    _get_module_fields_by_number,
     drop_sample_rows,
     get_dataframe_from_csv,
     get_dr_and_sr_ids,
     load_module_definitions,
     set_station_uuid,
 )
+from module_validation.biz_magic import (
+    custom_transformations,
+    custom_validations,
+    get_transformed_file_name,
+    serialize_transformed_df,
+    set_datatype,
+    upload_transform_df,
+)
+from module_validation.business_rules import RuleFrame
 
 from schema_compliance.error_table import error_table_insert
 
 logger = logging.getLogger("AsyncBizMagic")
 logger.setLevel(logging.DEBUG)
 
-"""
-Custom_validations ifo:
-custom_validations - dictionary that holds the functions for business validation checks for null modules
-Module 5 - bizmagic validate file does not exist because there is no business logic to verify against. "maintenance_cost_total" is the
-only nullable field in the module, and is verified for correctness during custom_transformations
-Module 3 - "uptime" field is only flagged as an error if the field is null and the operational_date is greater than 1 year
-"""
-custom_validations = {
-    2: [validate_m2.validate_empty_session],
-    3: [validate_m3.validate_operational_one_year],
-    4: [validate_m4.validate_empty_outage],
-    5: [],
-    6: [],
-    7: [],
-    8: [],
-    9: [validate_m9.validate_empty_capital_install_costs],
-}
-
-"""
-custom_transformations - dictionary that holds the functions that transforms the dataframe into acceptable values for the database
-ex: setting empty strings to None, setting boolean values to 0 or 1
-"""
-custom_transformations = {
-    2: [transform_m2.allow_null_charging_sessions],
-    3: [transform_m3.allow_null_uptime],
-    4: [transform_m4.allow_null_outages],
-    5: [transform_m5.allow_null_federal_maintenance],
-    6: [],
-    7: [],
-    8: [],
-    9: [transform_m9.allow_null_capital_install_costs],
-}
-
-
 def insert_errors_to_table(connection, conditions, metadata, df):
     """
     Convenience function that inserts errors found during data validation into the error table
@@ -127,30 +87,19 @@ def insert_errors_to_table(connection, conditions, metadata, df):
     raise EvChartInvalidCSVError(message="Module data is not compliant")
 
 
-def upload_transform_df(
-    bucket, upload_id, recipient_type, df, new_file_name, s2s_upload
-):
+def get_upload_frame(message, feature_toggle_set):
     """
-    Convenience function that uploads the validated and transformed dataframe as a json object to the s3 bucket
+    Convenience function that returns the dataframe of the upload and the metadata of its s3 object.
+    The typed upload frame stored by data validation is used when there is one, the uploaded csv is
+    parsed otherwise
     """
-    json_payload = bytes(df.to_json(orient="table"), encoding="utf-8")
-    s3 = boto3_manager.resource("s3")
-    custom_metadata = {
-        "checksum": hashlib.sha256(json_payload).hexdigest(),
-        "recipient_type": recipient_type,
-    }
-
-    if s2s_upload == "True":
-        custom_metadata["s2s_upload"] = s2s_upload
+    if Feature.TYPED_UPLOAD_FRAME in feature_toggle_set:
+        df = get_typed_frame(message.bucket, message.upload_id)
+        if df is not None:
+            return df, get_s3_object(message.bucket, message.key)["Metadata"]
 
-    try:
-        s3.Bucket(bucket).put_object(
-            Key=f"{new_file_name}", Body=json_payload, Metadata=custom_metadata
-        )
-    except Exception as e:
-        raise EvChartAsynchronousS3Error(
-            message=f"Error uploading {upload_id} to S3 bucket: {repr(e)}"
-        ) from e
+    s3_body, s3_metadata = get_s3_data(message.bucket, message.key)
+    return drop_sample_rows(get_dataframe_from_csv(s3_body)), s3_metadata
 
 
 def get_return_object(log_event, message, my_status_code, upload_success, upload_id=""):
@@ -172,75 +121,8 @@ def get_return_object(log_event, message, my_status_code, upload_success, upload
     return return_obj
 
 
-def set_datatype(df, module_id, feature_toggle_set=frozenset()):
-    """
-    Convenience function that converts the expected boolean, numeric, and datetime datatypes for each column in the dataframe
-    """
-    adjusted_df = df.copy()
-    if Feature.DATABASE_CENTRAL_CONFIG in feature_toggle_set:
-        config = DatabaseCentralConfig()
-        boolean_fields = {
-            field
-            for field in config.validated_boolean_fields(module_id)
-            if field in adjusted_df.columns
-        }
-        numeric_fields = {
-            field
-            for field in config.validated_numeric_fields(module_id)
-            if field in adjusted_df.columns
-        }
-        datetime_fields = {
-            field
-            for field in config.validated_datetime_fields(module_id)
-            if field in adjusted_df.columns
-        }
-    else:
-        module_fields = _get_module_fields_by_number(module_id)
-        boolean_fields = [
-            m.get("field_name")
-            for m in module_fields
-            if (m.get("datatype") == "boolean" and m.get("field_name") in df.columns)
-        ]
-        numeric_fields = [
-            m.get("field_name")
-            for m in module_fields
-            if (
-                m.get("datatype") in {"decimal", "integer"}
-                and m.get("field_name") in df.columns
-            )
-        ]
-        datetime_fields = [
-            m.get("field_name")
-            for m in module_fields
-            if (m.get("datatype") == "datetime" and m.get("field_name") in df.columns)
-        ]
-
-    for field in boolean_fields:
-        try:
-            adjusted_df[field] = (
-                adjusted_df[field]
-                .str.upper()
-                .map({"TRUE": 1, "FALSE": 0})
-                .convert_dtypes()
-            )
-        except AttributeError:
-            # AttributeError is raised if value has already been converted
-            # from string to integer
-            pass
-
-    for field in numeric_fields:
-        adjusted_df[field] = pandas.to_numeric(
-            adjusted_df[field], errors="coerce"
-        ).convert_dtypes()
-
-    for field in datetime_fields:
-        adjusted_df[field] = pandas.to_datetime(
-            adjusted_df[field], format="ISO8601", errors="coerce"
-        ).convert_dtypes()
-
-    return adjusted_df
-
-
+@traced_handler
+@feature_snapshot_scope()
 def handler(event, _context):
     log_event = LogEvent(event=event, api="AsyncBizMagic", action_type="insert")
     logger.info(event)
@@ -262,7 +144,7 @@ def handler(event, _context):
 
     try:
         connection = aurora.get_connection()
-    except (Error, BotoCoreError):
+    except (Error, BotoCoreError, EvChartDatabaseHandlerConnectionError):
         return EvChartDatabaseHandlerConnectionError().get_error_obj()
     except Exception as e:
         logger.debug("non-database error encountered: %s", repr(e))
@@ -284,13 +166,11 @@ def handler(event, _context):
         )
 
         # Get S3 object/metadata
-        s3_body, s3_metadata = get_s3_data(message.bucket, message.key)
+        df, s3_metadata = get_upload_frame(message, feature_toggle_set)
         recipient_type = s3_metadata.get("recipient_type")
         sns_attributes["is-s2s"] = s3_metadata.get("s2s_upload", "False")
         sns_message["recipient_type"] = recipient_type
 
-        df = get_dataframe_from_csv(s3_body)
-        df = drop_sample_rows(df)
         with connection.cursor() as cursor:
             upload_metadata = get_upload_metadata(cursor, upload_id)
 
@@ -318,6 +198,8 @@ def handler(event, _context):
                 "feature_toggle_set": feature_toggle_set,
                 "df": df,
                 "today": datetime.now(),
+                # prepared once for the business rules of every validation function
+                "rule_frame": RuleFrame(df, cursor),
             }
 
             # get the list of errors found within the dataframe after each custom_validation
@@ -335,20 +217,17 @@ def handler(event, _context):
                     df = ct(feature_toggle_set, df)
 
                 df = set_datatype(df, module_id, feature_toggle_set)
+                payload, file_type = serialize_transformed_df(df, module_id, feature_toggle_set)
+                sns_attributes["file-type"] = file_type
                 org_name = get_org_info_dynamo(upload_metadata["org_id"])["name"]
-
-                # setting file path based on recipient type
-                if recipient_type == "direct-recipient":
-                    new_file_name = f"transformed/{org_name}/{upload_id}.json"
-                elif recipient_type == "sub-recipient":
+                parent_name = None
+                if recipient_type == "sub-recipient":
                     parent_name = get_org_info_dynamo(upload_metadata["parent_org"])[
                         "name"
                     ]
-                    new_file_name = (
-                        f"transformed/{parent_name}/{org_name}/{upload_id}.json"
-                    )
-                else:
-                    new_file_name = f"transformed/testing/{org_name}/{upload_id}.json"
+                new_file_name = get_transformed_file_name(
+                    upload_id, recipient_type, org_name, parent_name, file_type
+                )
                 sns_message["key"] = new_file_name
 
                 # uploading the transformed dataframe which has been verified and updated to meet db datatypes into s3 bucket
@@ -359,6 +238,7 @@ def handler(event, _context):
                     df=df,
                     new_file_name=new_file_name,
                     s2s_upload=sns_attributes["is-s2s"],
+                    payload=payload,
                 )
             return_obj = get_return_object(
                 log_event=log_event,
@@ -4,17 +4,24 @@ AsyncDataValidation
 Asynchronously validate the data types provided for the relevant module data against known
 constraints.
 """
-import csv
 import json
 import logging
 import traceback
 
 import pandas
 
+from async_utility.chunked_validation import (
+    ChunkStore,
+    WorkQueue,
+    fan_out_upload,
+    use_chunked_validation,
+)
 from async_utility.s3_manager import get_s3_data
 from async_utility.sns_manager import process_sns_message, send_sns_message
+from async_utility.typed_frame import put_typed_frame
 from evchart_helper import aurora
 from evchart_helper.api_helper import get_upload_metadata
+from evchart_helper.call_tracer import traced_handler
 from evchart_helper.custom_exceptions import (
     EvChartDatabaseAuroraQueryError,
     EvChartDatabaseHandlerConnectionError,
@@ -32,22 +39,25 @@ from evchart_helper.custom_exceptions import (
 from evchart_helper.custom_logging import LogEvent
 from module_validation import (
     ModuleDefinitionEnum,
-    csv_to_dataframe,
     drop_sample_rows,
+    get_dataframe_from_csv,
     get_dr_and_sr_ids,
+    get_validation_error_budget,
     load_module_definitions,
     validate_station_id,
     validated_dataframe_by_module_id,
 )
 from module_validation.unique_constraint import unique_constraint_violations_for_async
 from schema_compliance.error_table import error_table_insert
-from feature_toggle import FeatureToggleService
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
 from feature_toggle.feature_enums import Feature
 
 
 logger = logging.getLogger("AsyncDataValidation")
 logger.setLevel(logging.INFO)
 
+@traced_handler
+@feature_snapshot_scope()
 def handler(event, _context):
     log_event = LogEvent(event=event, api="AsyncDataValidation", action_type="insert")
     log_event.log_info(event)
@@ -70,6 +80,8 @@ def handler(event, _context):
     # when getting the SQS messasge it is in a list of records
 
     for record in event["Records"]:
+        # chunked uploads publish their status message once every chunk has been validated
+        is_fanned_out = False
         try:
             sns_attributes["data-validation"] = "failed"
             load_module_definitions()
@@ -88,6 +100,27 @@ def handler(event, _context):
                 df = get_dataframe_from_csv(s3_body)
                 log_event.log_debug(f"df: {df}")
                 df = drop_sample_rows(df)
+                if use_chunked_validation(len(s3_body), feature_toggle_set):
+                    chunk_count = fan_out_upload(
+                        df,
+                        {
+                            "upload_id": upload_id,
+                            "bucket": bucket,
+                            "key": key,
+                            "recipient_type": s3_metadata.get("recipient_type"),
+                            "s2s_upload": s3_metadata.get("s2s_upload", False),
+                        },
+                        ChunkStore(bucket),
+                        WorkQueue(),
+                    )
+                    log_event.log_info(f"validating upload {upload_id} in {chunk_count} chunks")
+                    return_obj = {
+                        "statusCode": 202,
+                        "headers": {"Access-Control-Allow-Origin": "*"},
+                        "body": json.dumps({"upload_id": upload_id, "chunk_count": chunk_count}),
+                    }
+                    is_fanned_out = True
+                    continue
                 # Get upload metadata from RDS
                 upload_metadata = get_upload_metadata(cursor, upload_id)
                 module_id = upload_metadata.get("module_id")
@@ -108,8 +141,11 @@ def handler(event, _context):
                     df,
                     upload_metadata["upload_id"],
                     feature_toggle_set,
+                    max_conditions=get_validation_error_budget(feature_toggle_set),
+                    stop_on_column_errors=Feature.VALIDATION_FAIL_FAST in feature_toggle_set,
+                    prior_conditions=conditions,
                 )
-                conditions.extend(validation_response.get("conditions", []))
+                conditions = validation_response.get("conditions", [])
                 updated_df = validation_response.get("df", pandas.DataFrame())
             if len(conditions) == 0:
                 connection.ping()
@@ -123,6 +159,7 @@ def handler(event, _context):
                         module_df=updated_df,
                         module_id=module_id,
                         feature_toggle_set=feature_toggle_set,
+                        upload_df=df,
                     )
                     conditions.extend(constraint_errors)
 
@@ -134,6 +171,10 @@ def handler(event, _context):
                     connection.commit()
                     raise EvChartInvalidCSVError(message="Module data is not compliant")
 
+            # biz magic starts from the typed upload frame instead of parsing the csv again
+            if Feature.TYPED_UPLOAD_FRAME in feature_toggle_set:
+                put_typed_frame(bucket, upload_id, updated_df)
+
         # Future state, split up into errors that should trigger a retry/dlq and those that shouldnt
         except (
             EvChartDatabaseHandlerConnectionError,
@@ -209,7 +250,7 @@ def handler(event, _context):
             sns_attributes["data-validation"] = "passed"
 
         finally:
-            if not send_sns_message(sns_attributes, sns_message):
+            if not is_fanned_out and not send_sns_message(sns_attributes, sns_message):
                 batch_errors.append({"itemIdentifier": record["messageId"]})
 
     aurora.close_connection()
@@ -224,21 +265,6 @@ def get_new_connection():
         raise EvChartDatabaseHandlerConnectionError(message=f"issue creating connection {repr(e)}") from e
     return connection
 
-def get_dataframe_from_csv(body):
-    try:
-        raw_data = body.splitlines()
-        logging.debug("raw data set: %s", raw_data)
-
-        if not raw_data[0][0].isascii():
-            raw_data[0] = raw_data[0][1:]
-
-        return csv_to_dataframe(csv.reader(raw_data))
-    except EvChartModuleValidationError as e:
-        raise EvChartModuleValidationError(message=f"{repr(e)}") from e
-    except Exception as e:
-        raise EvChartMissingOrMalformedBodyError(message=f"Unable to read csv: {repr(e)}") from e
-
-
 def insert_errors_to_table(cursor, conditions, metadata, df):
     error_table_insert(
         cursor=cursor,
@@ -260,6 +286,7 @@ def enforce_constraints_for_s2s(
     module_df,
     module_id,
     feature_toggle_set=frozenset(),
+    upload_df=None,
 ):
     unique_constraint_response_errors = []
     if is_s2s or Feature.CHECK_DUPLICATES_UPLOAD in feature_toggle_set:
@@ -271,6 +298,7 @@ def enforce_constraints_for_s2s(
             log_event=log_event,
             module_id=module_id,
             feature_toggle_set=feature_toggle_set,
+            upload_df=upload_df,
         )
         unique_constraint_response_errors = unique_constraint_response.get("errors", [])
 
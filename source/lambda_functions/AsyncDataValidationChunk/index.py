@@ -0,0 +1,68 @@
+"""
+AsyncDataValidationChunk
+
+Asynchronously validate one row-range chunk of a very large upload, and coordinate the data
+validation result of the upload once every chunk has been validated.
+"""
+import json
+import logging
+import traceback
+
+from async_utility.chunked_validation import (
+    COORDINATE,
+    ChunkStore,
+    WorkQueue,
+    coordinate_upload,
+    validate_chunk,
+)
+from async_utility.sns_manager import send_sns_message
+from evchart_helper import aurora
+from evchart_helper.call_tracer import traced_handler
+from evchart_helper.custom_exceptions import EvChartDatabaseHandlerConnectionError
+from evchart_helper.custom_logging import LogEvent
+from module_validation import load_module_definitions
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
+
+
+logger = logging.getLogger("AsyncDataValidationChunk")
+logger.setLevel(logging.INFO)
+
+@traced_handler
+@feature_snapshot_scope()
+def handler(event, _context):
+    log_event = LogEvent(event=event, api="AsyncDataValidationChunk", action_type="insert")
+    log_event.log_info(event)
+    try:
+        connection = aurora.get_connection()
+    except Exception:  # pylint: disable=broad-exception-caught
+        return EvChartDatabaseHandlerConnectionError().get_error_obj()
+
+    feature_toggle_set = FeatureToggleService().get_active_feature_toggles(log_event=log_event)
+    batch_errors = []
+    load_module_definitions()
+
+    for record in event["Records"]:
+        try:
+            work_item = json.loads(record["body"])
+            store = ChunkStore(work_item["bucket"])
+            if work_item["action"] == COORDINATE:
+                sns_attributes, sns_message = coordinate_upload(
+                    work_item, connection, store, log_event, feature_toggle_set
+                )
+                if not send_sns_message(sns_attributes, sns_message):
+                    batch_errors.append({"itemIdentifier": record["messageId"]})
+            else:
+                validate_chunk(
+                    work_item, connection, store, WorkQueue(), log_event, feature_toggle_set
+                )
+        # the work item is retried, a chunk that was already validated is not validated again
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            log_event.log_custom_exception(
+                message=f"uncaught error: {repr(e)} trace: {traceback.format_exc()}",
+                status_code=500,
+                log_level=3,
+            )
+            batch_errors.append({"itemIdentifier": record["messageId"]})
+
+    aurora.close_connection()
+    return {"batchItemFailures": batch_errors}
@@ -8,30 +8,50 @@ import json
 from pathlib import Path
 from urllib import parse
 
-from async_utility.s3_manager import get_s3_data
+from async_utility.fused_pipeline import (
+    FUSED_PIPELINE_ATTRIBUTE,
+    run_fused_pipeline,
+    use_fused_pipeline,
+)
+from async_utility.s3_manager import get_s3_object, get_s3_sha256
 from async_utility.sns_manager import send_sns_message
 from evchart_helper import aurora
 from evchart_helper.api_helper import get_upload_metadata
+from evchart_helper.call_tracer import traced_handler
 from evchart_helper.custom_exceptions import (
     EvChartDatabaseHandlerConnectionError,
     EvChartS3CorruptedObjectError,
     EvChartS3GetObjectError,
 )
 from evchart_helper.custom_logging import LogEvent
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
 from schema_compliance.error_table import error_table_insert
 
+# size of the chunks read from the S3 object body while hashing it
+HASH_CHUNK_SIZE = 1024 * 1024
+
 
+@traced_handler
+@feature_snapshot_scope()
 def handler(event, _context):
     log_event = LogEvent(event=event, api="AsyncFileIntegrity", action_type="insert")
     log_event.log_info(event)
     sns_message = {}
-    sns_attributes = {}
     batch_errors = []
 
+    # feature must be called in the handler in order to get the
+    # current value every time, and not a value persisted by Lambda warm start
+    # https://docs.aws.amazon.com/lambda/latest/operatorguide/global-scope.html
+    # pylint: disable=duplicate-code
+    feature_toggle_set = FeatureToggleService().get_active_feature_toggles(log_event=log_event)
+
     for record in event["Records"]:
         error_message = None
         upload_id = None
         upload_metadata = None
+        fused = False
+        body = None
+        sns_attributes = {}
 
         try:
             connection = aurora.get_connection()
@@ -47,12 +67,26 @@ def handler(event, _context):
             sns_message["key"] = key
             sns_message["bucket"] = bucket
 
-            body, metadata = get_s3_data(bucket, key)
+            s3_object = get_s3_object(bucket, key, checksum_mode=True)
+            metadata = s3_object["Metadata"]
             initial_checksum = metadata["checksum"]
 
             sns_message["recipient_type"] = metadata.get("recipient_type")
 
-            file_checksum = hash_data(body)
+            # uploads small enough for the fused pipeline are read whole, so that the pipeline
+            # validates the body read here instead of getting the upload from S3 again
+            if use_fused_pipeline(s3_object.get("ContentLength"), feature_toggle_set):
+                body = s3_object["Body"].read()
+
+            # the body only needs to be hashed when S3 has not already verified the same checksum
+            file_checksum = get_s3_sha256(s3_object)
+            if not check_hash(initial_checksum, file_checksum):
+                file_checksum = (
+                    hash_stream(s3_object["Body"])
+                    if body is None
+                    else hashlib.sha256(body).hexdigest()
+                )
+            s3_object["Body"].close()
             upload_successful = check_hash(initial_checksum, file_checksum)
 
             if upload_successful:
@@ -90,6 +124,10 @@ def handler(event, _context):
                 "headers": {"Access-Control-Allow-Origin": "*"},
                 "body": json.dumps({"integrity_check_passed": True, "upload_id": upload_id}),
             }
+            # small uploads are validated and loaded here rather than by the stage lambdas
+            fused = body is not None
+            if fused:
+                sns_attributes.update(FUSED_PIPELINE_ATTRIBUTE)
         finally:
             # An error could occur when connecting to server
             if error_message:
@@ -103,25 +141,30 @@ def handler(event, _context):
                     error = EvChartS3CorruptedObjectError(message=repr(e))
                     log_event.log_level3_error(error)
 
+            message_sent = send_sns_message(sns_attributes, sns_message)
+            if message_sent and fused:
+                message_sent = run_fused_pipeline(
+                    connection, bucket, key, metadata, body, log_event, feature_toggle_set
+                )
+
             aurora.close_connection()
 
-            if not send_sns_message(sns_attributes, sns_message):
+            if not message_sent:
                 batch_errors.append({"itemIdentifier": record["messageId"]})
 
     return_obj["batchItemFailures"] = batch_errors
     return return_obj
 
 
-def hash_data(file_content):
-    checksum = None
-    if file_content is not None:
-        sha256_hash = hashlib.sha256()
-        if type(file_content) is not bytes:
-            sha256_hash.update(bytes(file_content, encoding="utf-8"))
-        else:
-            sha256_hash.update(file_content)
-        checksum = sha256_hash.hexdigest()
-    return checksum
+def hash_stream(stream, chunk_size=HASH_CHUNK_SIZE):
+    """
+    Returns the sha256 checksum of a file-like object, such as an S3 StreamingBody, read in
+    chunks so that the whole file is never held in memory
+    """
+    sha256_hash = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
 
 
 def check_hash(metadata_hash, calculated_hash):
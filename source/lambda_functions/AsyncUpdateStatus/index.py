@@ -15,6 +15,7 @@ from evchart_helper import aurora
 from evchart_helper.api_helper import (
     execute_query_fetchone, format_users, get_org_users, get_upload_metadata, get_user_info_dynamo
 )
+from evchart_helper.call_tracer import traced_handler
 from evchart_helper.custom_exceptions import (
     EvChartDatabaseAuroraQueryError, EvChartJsonOutputError
 )
@@ -22,7 +23,7 @@ from evchart_helper.custom_logging import LogEvent
 from evchart_helper.database_tables import ModuleDataTables
 from evchart_helper.module_enums import ModuleFrequencyProper, ModuleNames
 from async_utility.sns_manager import process_sns_message
-from feature_toggle import FeatureToggleService
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
 from feature_toggle.feature_enums import Feature
 from schema_compliance.error_table import error_table_insert
 
@@ -30,6 +31,8 @@ import_metadata = ModuleDataTables["Metadata"].value
 ev_error_data = ModuleDataTables["EvErrorData"].value
 
 
+@traced_handler
+@feature_snapshot_scope()
 def handler(event, context):
     log_event = LogEvent(event, api="AsyncUpdateStatus", action_type="Put")
     log_event.log_info(event)
@@ -45,7 +48,7 @@ def handler(event, context):
             sns_attributes = list(sns_message.message_attribute.keys())
 
             for attribute in sns_attributes:
-                if attribute not in ["is-s2s", "file-type"]:
+                if attribute not in ["is-s2s", "file-type", "pipeline"]:
                     message_type = attribute
 
             match message_type:
@@ -7,16 +7,15 @@ status of the module accordingly.
 
 import json
 from datetime import datetime, timedelta
-from io import StringIO
 from dateutil import tz
 
 from numpy import nan as NaN
-import pandas
 
 from async_utility.s3_manager import get_s3_data
 from async_utility.sns_manager import process_sns_message, send_sns_message
 from evchart_helper import aurora
-from evchart_helper.api_helper import execute_query_fetchone, get_upload_metadata
+from evchart_helper.api_helper import get_upload_metadata
+from evchart_helper.call_tracer import traced_handler
 from evchart_helper.custom_exceptions import (
     EvChartDatabaseAuroraQueryError,
     EvChartDatabaseHandlerConnectionError,
@@ -30,17 +29,22 @@ from evchart_helper.custom_exceptions import (
 )
 from evchart_helper.custom_logging import LogEvent
 from evchart_helper.database_tables import ModuleDataTables
-from feature_toggle import FeatureToggleService
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
 from feature_toggle.feature_enums import Feature
 from module_validation import (
+    adjust_for_nulls,
+    data_already_exists_in_rds,
     drop_sample_rows,
     get_dataframe_from_csv,
     load_module_definitions,
     set_station_and_port_ids,
     upload_data_from_df,
 )
+from module_validation.biz_magic import TRANSFORMED_FILE_TYPES, read_transformed_df
 
 
+@traced_handler
+@feature_snapshot_scope()
 def handler(event, _context):
     log_event = LogEvent(event=event, api="AsyncValidatedUpload", action_type="insert")
     log_event.log_info(event)
@@ -73,15 +77,19 @@ def handler(event, _context):
                 sns_message["key"] = key
                 sns_message["bucket"] = bucket
 
-                # Get S3 object/metadata
-                s3_body, s3_metadata = get_s3_data(bucket, key)
+                file_type = attributes.get("file-type").get("stringValue")
+                is_transformed = (
+                    file_type in TRANSFORMED_FILE_TYPES and Feature.BIZ_MAGIC in feature_toggle_set
+                )
+
+                # Get S3 object/metadata, parquet uploads are read as bytes
+                s3_body, s3_metadata = get_s3_data(bucket, key, decode=file_type != "parquet")
                 recipient_type = s3_metadata.get("recipient_type")
                 sns_attributes["is-s2s"] = s3_metadata.get("s2s_upload", "no")
                 sns_message["recipient_type"] = recipient_type
-                file_type = attributes.get("file-type").get("stringValue")
 
-                if file_type == "json" and Feature.BIZ_MAGIC in feature_toggle_set:
-                    df = pandas.read_json(StringIO(s3_body), orient="table")
+                if is_transformed:
+                    df = read_transformed_df(s3_body, file_type)
                 else:
                     df = get_dataframe_from_csv(s3_body)
                 df = drop_sample_rows(df)
@@ -106,18 +114,23 @@ def handler(event, _context):
                 else:
                     df = set_station_and_port_ids(df, cursor)
 
-                    if file_type == "json" and Feature.BIZ_MAGIC in feature_toggle_set:
+                    if is_transformed:
                         upload_data_from_df(
                             connection=connection,
                             module_number=module_id,
                             df=df,
                             check_boolean=False,
+                            feature_toggle_set=feature_toggle_set,
                         )
                     elif ((Feature.MODULE_5_NULLS in feature_toggle_set and int(module_id) == 5)):
                         adjusted_df = adjust_for_nulls(feature_toggle_set, module_id, df)
-                        upload_data_from_df(connection, module_id, adjusted_df, feature_toggle_set)
+                        upload_data_from_df(
+                            connection, module_id, adjusted_df, feature_toggle_set=feature_toggle_set
+                        )
                     else:
-                        upload_data_from_df(connection, module_id, df, feature_toggle_set)
+                        upload_data_from_df(
+                            connection, module_id, df, feature_toggle_set=feature_toggle_set
+                        )
 
         # Errors after getting upload_id
         except (
@@ -184,31 +197,3 @@ def get_return_object(log_event, message, my_status_code, upload_success, upload
     }
 
     return return_obj
-
-
-def data_already_exists_in_rds(cursor, module_table, upload_id):
-    select_statement = f"""
-        SELECT COUNT(*)
-        FROM {module_table}
-        WHERE upload_id=%s
-        """
-    result = execute_query_fetchone(
-        query=select_statement,
-        data=upload_id,
-        cursor=cursor,
-        message="data_already_exists_in_rds AsyncValidatedUpload",
-    )
-    return result[0] > 0
-
-
-def adjust_for_nulls(feature_toggle_set, module_id, df):
-    try:
-        if int(module_id) == 5 and Feature.MODULE_5_NULLS in feature_toggle_set:
-            correct_nulls = df["maintenance_cost_total"].astype(str).str.lower() == "null"
-            df.loc[correct_nulls, ["maintenance_cost_total"]] = None
-
-        return df
-    except Exception as e:
-        raise EvChartModuleValidationError(
-            message=f"Error adjusting for nulls: {e}",
-        ) from e
@@ -11,6 +11,7 @@ import os
 from evchart_helper.boto3_manager import boto3_manager
 from evchart_helper.custom_logging import LogEvent
 from evchart_helper.custom_exceptions import EvChartDatabaseDynamoQueryError
+from evchart_helper.parameter_provider import parameter_provider
 
 
 class IdleUserReport:
@@ -21,18 +22,13 @@ class IdleUserReport:
         self.log_event = log_event
 
         self.dynamodb = boto3_manager.resource('dynamodb')
-        self.ssm = boto3_manager.client("ssm")
 
         self.max_idle_time, self.max_pending_time = \
             (timedelta(days=x) for x in self.time_parameters())
         self.table = self.dynamodb.Table(self.table_name())
 
     def get_parameters(self, path):
-        parameter_list = self.ssm.get_parameters_by_path(Path=path)
-        return {
-            p["Name"]: p
-            for p in parameter_list.get("Parameters", [])
-        }
+        return parameter_provider.get_parameters_by_path(path)
 
     def table_name(self):
         parameter_prefix = "/ev-chart/dynamodb/"
@@ -42,7 +38,7 @@ class IdleUserReport:
         try:
             return dynamodb_parameters[
                 f"{parameter_prefix}{parameter_name}"
-            ]["Value"]
+            ]
         except ValueError:
             return default
 
@@ -54,13 +50,13 @@ class IdleUserReport:
         dynamodb_parameters = self.get_parameters(prefix)
 
         try:
-            max_idle = int(dynamodb_parameters[f"{prefix}max-idle"]["Value"])
+            max_idle = int(dynamodb_parameters[f"{prefix}max-idle"])
         except (KeyError, TypeError):
             max_idle = 60
 
         try:
             max_pending = \
-                int(dynamodb_parameters[f"{prefix}max-pending"]["Value"])
+                int(dynamodb_parameters[f"{prefix}max-pending"])
         except (KeyError, TypeError):
             max_pending = 14
 
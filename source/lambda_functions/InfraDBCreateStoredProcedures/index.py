@@ -106,7 +106,8 @@ ev_chart_download_modules = [
             information_schema.columns
             WHERE
             table_name = @table_name
-            AND table_schema = 'evchart_data_v3';
+            AND table_schema = 'evchart_data_v3'
+            AND column_name <> 'unique_key_fingerprint';
             SET @getstation_to_csv_dr_or_default = CONCAT(
                 "SELECT '", modulename, "' AS module, ", column_list,
                 " FROM ", @table_name, " md ",
@@ -405,7 +406,8 @@ BEGIN
 			information_schema.columns
 			WHERE
 			table_name = @table_name
-			AND table_schema = 'evchart_data_v3';
+			AND table_schema = 'evchart_data_v3'
+			AND column_name <> 'unique_key_fingerprint';
 			SET @getstation_to_csv_dr_or_default = CONCAT(
 				"SELECT '", modulename, "' AS module, np.network_provider_value,", column_list,
 				" FROM ", @table_name, " md ",
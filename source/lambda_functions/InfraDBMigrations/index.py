@@ -260,6 +260,18 @@ def get_feature_toggle_file_list() -> list[FeatureToggledScript]:
         FeatureToggledScript(
             file_name="JE-6948-station-uuid-module-data-fk.sql",
         ),
+        FeatureToggledScript(
+            file_name="Module_Unique_Key_Fingerprint.sql",
+            feature_toggle=Feature.UNIQUE_KEY_FINGERPRINT,
+            backout_file_name="Module_Unique_Key_Fingerprint_backout.sql",
+            requires_backout=True,
+        ),
+        FeatureToggledScript(
+            file_name="Module_Data_Load_History.sql",
+            feature_toggle=Feature.BULK_LOAD_HISTORY,
+            backout_file_name="Module_Data_Load_History_backout.sql",
+            requires_backout=True,
+        ),
     ]
 
     return feature_toggled_files
@@ -0,0 +1,15 @@
+USE evchart_data_v3;
+
+-- one record per bulk load of an upload into its module data table,
+-- see module_validation.bulk_loader.insert_load_history
+CREATE TABLE IF NOT EXISTS module_data_load_history (
+  id int NOT NULL AUTO_INCREMENT,
+  upload_id varchar(36) NOT NULL,
+  module_table varchar(64) NOT NULL,
+  row_count int NOT NULL,
+  content_checksum char(64) NOT NULL,
+  updated_on datetime DEFAULT NULL,
+  updated_by varchar(72) DEFAULT NULL,
+  PRIMARY KEY (id),
+  KEY idx_upload_id (upload_id)
+);
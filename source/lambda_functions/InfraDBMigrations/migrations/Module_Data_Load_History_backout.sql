@@ -0,0 +1,3 @@
+USE evchart_data_v3;
+
+DROP TABLE IF EXISTS module_data_load_history;
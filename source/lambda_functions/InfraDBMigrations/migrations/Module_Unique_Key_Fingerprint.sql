@@ -0,0 +1,38 @@
+USE evchart_data_v3;
+
+-- sha256 of the lower cased unique key constraint values joined by the unit separator, kept
+-- up to date by MySQL whenever a key column changes. CONCAT_WS skips missing values, so
+-- duplicate checks only look up the fingerprints of complete keys, see
+-- module_validation.get_unique_key_fingerprints.
+
+ALTER TABLE module2_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid), LOWER(port_id), LOWER(session_id)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
+
+ALTER TABLE module3_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid), LOWER(port_id), LOWER(uptime_reporting_start), LOWER(uptime_reporting_end)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
+
+ALTER TABLE module4_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid), LOWER(outage_id), LOWER(port_id)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
+
+ALTER TABLE module5_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid), LOWER(maintenance_report_start)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
+
+ALTER TABLE module6_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid), LOWER(operator_name)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
+
+ALTER TABLE module7_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid), LOWER(program_report_year)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
+
+ALTER TABLE module8_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid), LOWER(der_type)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
+
+ALTER TABLE module9_data_v3
+    ADD COLUMN unique_key_fingerprint CHAR(64) AS (SHA2(CONCAT_WS(CHAR(31 USING utf8mb4), LOWER(station_uuid)), 256)) STORED,
+    ADD INDEX idx_unique_key_fingerprint (unique_key_fingerprint, upload_id);
@@ -0,0 +1,33 @@
+USE evchart_data_v3;
+
+ALTER TABLE module2_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
+
+ALTER TABLE module3_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
+
+ALTER TABLE module4_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
+
+ALTER TABLE module5_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
+
+ALTER TABLE module6_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
+
+ALTER TABLE module7_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
+
+ALTER TABLE module8_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
+
+ALTER TABLE module9_data_v3
+    DROP INDEX idx_unique_key_fingerprint,
+    DROP COLUMN unique_key_fingerprint;
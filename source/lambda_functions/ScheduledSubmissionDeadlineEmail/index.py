@@ -38,6 +38,7 @@ from evchart_helper import aurora
 from evchart_helper.database_tables import ModuleDataTables
 from evchart_helper.module_enums import ModuleNames
 from evchart_helper.custom_logging import LogEvent
+from evchart_helper.call_tracer import traced_handler
 from evchart_helper.custom_exceptions import (
     EvChartDatabaseAuroraQueryError,
     EvChartJsonOutputError,
@@ -52,7 +53,7 @@ from evchart_helper.api_helper import (
     execute_query_df
 )
 from evchart_helper.station_helper import get_fed_funded_filter
-from feature_toggle import FeatureToggleService
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
 from feature_toggle.feature_enums import Feature
 
 station_ports = ModuleDataTables["StationPorts"].value
@@ -60,6 +61,8 @@ station_registrations = ModuleDataTables['RegisteredStations'].value
 import_metadata = ModuleDataTables['Metadata'].value
 station_authorizations = ModuleDataTables['StationAuthorizations'].value
 
+@traced_handler
+@feature_snapshot_scope()
 def handler(event, _context):
     log = LogEvent(
         event, api="ScheduledSubmissionDeadlineEmail", action_type="Read"
@@ -0,0 +1,502 @@
+"""
+async_utility.chunked_validation
+
+Runs the data validation stage of the asynchronous upload process for very large uploads as a set of
+row-range chunks.  AsyncDataValidation splits the parsed upload into chunks that are stored in the
+upload bucket and queued as work items, and AsyncDataValidationChunk validates every chunk against the
+module schema and the station registrations, writing its errors to the error table.  The chunk that
+finishes last queues the coordinator work item, which merges the chunk results, runs the unique
+constraint check across the whole upload and publishes the single data validation status message.
+"""
+import io
+import json
+import os
+import traceback
+
+import pandas
+from botocore.exceptions import ClientError
+
+from async_utility.typed_frame import put_typed_frame
+from evchart_helper import boto3_manager
+from evchart_helper.api_helper import get_upload_metadata
+from evchart_helper.custom_exceptions import (
+    EvChartDatabaseAuroraDuplicateItemError,
+    EvChartDatabaseAuroraQueryError,
+    EvChartInvalidCSVError,
+    EvChartJsonOutputError,
+    EvChartMissingOrMalformedBodyError,
+    EvChartModuleValidationError,
+    EvChartS3GetObjectError,
+    EvChartSQSError,
+    EvChartUserNotAuthorizedError,
+)
+from evchart_helper.parameter_provider import parameter_provider
+from feature_toggle.feature_enums import Feature
+from module_validation import (
+    ModuleDefinitionEnum,
+    get_dr_and_sr_ids,
+    get_validation_error_budget,
+    validate_station_id,
+    validated_dataframe_by_module_id,
+)
+from module_validation.unique_constraint import unique_constraint_violations_for_async
+from schema_compliance.error_table import error_table_insert
+
+# uploads of at least this size (in bytes) are validated in chunks
+CHUNKED_VALIDATION_MIN_BYTES = 50 * 1024 * 1024
+
+# number of upload rows validated by each chunk work item
+CHUNKED_VALIDATION_CHUNK_ROWS = 100000
+
+# prefix of the upload bucket that the chunks and their results are stored under
+CHUNK_PREFIX = "chunks"
+
+# send_message_batch accepts at most 10 messages in a single call
+SEND_MESSAGE_BATCH_MAX = 10
+
+VALIDATE_CHUNK = "validate-chunk"
+COORDINATE = "coordinate"
+
+NOT_COMPLIANT_MESSAGE = "Module data is not compliant"
+
+STAGE_ERRORS = (
+    EvChartDatabaseAuroraDuplicateItemError,
+    EvChartDatabaseAuroraQueryError,
+    EvChartJsonOutputError,
+    EvChartMissingOrMalformedBodyError,
+    EvChartModuleValidationError,
+    EvChartS3GetObjectError,
+    EvChartUserNotAuthorizedError,
+)
+
+
+def get_chunked_validation_min_bytes():
+    """
+        Returns the smallest upload, in bytes, that is validated in chunks.
+        Can be overridden with the CHUNKED_VALIDATION_MIN_BYTES environment variable.
+    """
+    return int(os.environ.get("CHUNKED_VALIDATION_MIN_BYTES", CHUNKED_VALIDATION_MIN_BYTES))
+
+
+def get_chunk_rows():
+    """
+        Returns the number of upload rows validated by each chunk.
+        Can be overridden with the CHUNKED_VALIDATION_CHUNK_ROWS environment variable.
+    """
+    return int(os.environ.get("CHUNKED_VALIDATION_CHUNK_ROWS", CHUNKED_VALIDATION_CHUNK_ROWS))
+
+
+def use_chunked_validation(content_length, feature_toggle_set=frozenset()):
+    """
+        Given the size of the upload in bytes and active feature toggles,
+        Returns True if the upload should be validated in chunks.
+    """
+    return (
+        Feature.ASYNC_CHUNKED_VALIDATION in feature_toggle_set
+        and content_length is not None
+        and content_length >= get_chunked_validation_min_bytes()
+    )
+
+
+def get_chunk_ranges(row_count, chunk_rows):
+    """
+        Returns the (start, stop) row positions of each chunk of an upload with row_count rows.
+        An upload without rows is still validated as a single empty chunk.
+    """
+    return [
+        (start, min(start + chunk_rows, row_count))
+        for start in range(0, max(row_count, 1), chunk_rows)
+    ]
+
+
+def get_chunk_key(upload_id, chunk_index, kind):
+    """
+        Returns the s3 key of the data, validated data or result object of a chunk.
+    """
+    extension = "json" if kind == "result" else "parquet"
+    return f"{CHUNK_PREFIX}/{upload_id}/{chunk_index:05}.{kind}.{extension}"
+
+
+def merge_chunk_results(results):
+    """
+        Given the result of every chunk of an upload,
+        Returns the total error count and the reason of the first chunk that could not be validated.
+    """
+    reasons = [result["reason"] for result in results if result.get("reason")]
+    return {
+        "error_count": sum(result.get("error_count", 0) for result in results),
+        "reason": reasons[0] if reasons else None,
+    }
+
+
+def get_chunk_conditions(conditions, chunk_index):
+    """
+        Returns the conditions of a chunk that are written to the error table.  Every chunk has the
+        headers of the upload, so column-level conditions (missing, duplicate or unknown columns)
+        are only kept from the first chunk, the validation stopped notice is kept from every chunk.
+    """
+    if chunk_index == 0:
+        return conditions
+    return [
+        condition
+        for condition in conditions
+        if condition["error_row"] is not None or condition["header_name"] == "NOT_APPLICABLE"
+    ]
+
+
+def get_chunk_queue_url_parameter_name():
+    """
+        Returns the name of the chunk queue url parameter based on environment/sub-environment
+    """
+    sub_environment = os.environ.get("SUBENVIRONMENT")
+    sub_environment = f"/{sub_environment}" if sub_environment else ""
+    return f"/ev-chart/async{sub_environment}/validation-chunk-queue-url"
+
+
+parameter_provider.register_prefetch(get_chunk_queue_url_parameter_name())
+
+
+class ChunkStore:
+    """
+    Stores the chunks of an upload and their results in the upload bucket.  The chunk dataframes
+    are stored as parquet so that their index, the csv row numbers, and datatypes are kept.
+    """
+
+    def __init__(self, bucket):
+        self.bucket = bucket
+
+    def put_frame(self, key, df):
+        buffer = io.BytesIO()
+        df.to_parquet(buffer)
+        self.__put(key, buffer.getvalue())
+
+    def get_frame(self, key):
+        # parquet keeps the string dtype of a column but not its storage, read it back arrow backed
+        with pandas.option_context("mode.string_storage", "pyarrow"):
+            return pandas.read_parquet(io.BytesIO(self.__get(key)))
+
+    def put_result(self, key, result):
+        self.__put(key, json.dumps(result).encode("utf-8"))
+
+    def get_result(self, key):
+        """
+            Returns the result stored under key, or None if the chunk has not finished.
+        """
+        try:
+            return json.loads(self.__get(key))
+        except EvChartS3GetObjectError as e:
+            cause = e.__cause__
+            if isinstance(cause, ClientError) and cause.response["Error"]["Code"] == "NoSuchKey":
+                return None
+            raise
+
+    def count_results(self, upload_id):
+        """
+            Returns the number of chunks of upload_id that have finished.
+        """
+        paginator = boto3_manager.client("s3").get_paginator("list_objects_v2")
+        return sum(
+            1
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{CHUNK_PREFIX}/{upload_id}/")
+            for item in page.get("Contents", [])
+            if item["Key"].endswith(".result.json")
+        )
+
+    def clear(self, upload_id):
+        """
+            Deletes the chunks and results stored for upload_id, so that a new fan out of the
+            upload does not reuse the results of an earlier one.
+        """
+        s3 = boto3_manager.client("s3")
+        paginator = s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"{CHUNK_PREFIX}/{upload_id}/"):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                s3.delete_objects(Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    def __put(self, key, body):
+        boto3_manager.resource("s3").Bucket(self.bucket).put_object(Key=key, Body=body)
+
+    def __get(self, key):
+        try:
+            return boto3_manager.resource("s3").Object(self.bucket, key).get()["Body"].read()
+        except Exception as e:
+            raise EvChartS3GetObjectError(
+                message=f"Error No such key: {key} in S3 bucket: {self.bucket} : {e}"
+            ) from e
+
+
+class WorkQueue:
+    """
+    Sends chunk and coordinator work items to the FIFO chunk queue.  Every chunk has its own message
+    group so that the chunks of an upload are validated in parallel, and the coordinator work item
+    is deduplicated so that it is queued once even if two chunks see every chunk finished.
+    """
+
+    def __init__(self, queue_url=None):
+        self.queue_url = queue_url
+
+    def send(self, work_items):
+        if self.queue_url is None:
+            self.queue_url = parameter_provider.get_parameter(get_chunk_queue_url_parameter_name())
+
+        sqs = boto3_manager.client("sqs")
+        entries = [
+            {
+                "Id": str(position),
+                "MessageBody": json.dumps(work_item),
+                "MessageGroupId": get_message_group_id(work_item),
+                "MessageDeduplicationId": get_message_group_id(work_item),
+            }
+            for position, work_item in enumerate(work_items)
+        ]
+        for start in range(0, len(entries), SEND_MESSAGE_BATCH_MAX):
+            try:
+                response = sqs.send_message_batch(
+                    QueueUrl=self.queue_url, Entries=entries[start:start + SEND_MESSAGE_BATCH_MAX]
+                )
+            except Exception as e:
+                raise EvChartSQSError(message=f"Error sending chunk work items: {repr(e)}") from e
+            if response.get("Failed"):
+                raise EvChartSQSError(
+                    message=f"Error sending chunk work items: {response['Failed']}"
+                )
+
+
+def get_message_group_id(work_item):
+    """
+        Returns the FIFO message group of a work item.
+    """
+    if work_item["action"] == COORDINATE:
+        return f"{work_item['upload_id']}-{COORDINATE}"
+    return f"{work_item['upload_id']}-{work_item['chunk_index']}"
+
+
+def fan_out_upload(df, upload, store, queue, chunk_rows=None):
+    """
+        Given the parsed upload and its message fields (upload_id, bucket, key, recipient_type and
+        s2s_upload), stores the upload as row-range chunks and queues a work item for each one.
+        Chunks and results left by an earlier fan out of the upload are deleted first.
+        Returns the number of chunks.
+    """
+    store.clear(upload["upload_id"])
+    chunk_ranges = get_chunk_ranges(len(df), chunk_rows or get_chunk_rows())
+    work_items = []
+    for chunk_index, (start, stop) in enumerate(chunk_ranges):
+        store.put_frame(get_chunk_key(upload["upload_id"], chunk_index, "data"), df.iloc[start:stop])
+        work_items.append({
+            **upload,
+            "action": VALIDATE_CHUNK,
+            "chunk_index": chunk_index,
+            "chunk_count": len(chunk_ranges),
+        })
+
+    queue.send(work_items)
+    return len(chunk_ranges)
+
+
+def validate_chunk(work_item, connection, store, queue, log_event, feature_toggle_set=frozenset()):
+    """
+        Validates the chunk of a work item and stores its result, unless a previous delivery of the
+        work item already did.  Queues the coordinator work item once every chunk has finished.
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    upload_id = work_item["upload_id"]
+    result_key = get_chunk_key(upload_id, work_item["chunk_index"], "result")
+    if store.get_result(result_key) is None:
+        result = run_chunk_validation(work_item, connection, store, log_event, feature_toggle_set)
+        store.put_result(result_key, result)
+
+    if store.count_results(upload_id) >= work_item["chunk_count"]:
+        coordinator = {key: value for key, value in work_item.items() if key != "chunk_index"}
+        queue.send([{**coordinator, "action": COORDINATE}])
+
+
+def run_chunk_validation(work_item, connection, store, log_event, feature_toggle_set=frozenset()):
+    """
+        Runs the station and schema validation of one chunk and writes the errors found to the
+        error table.  The validated chunk is stored for the unique constraint check when the chunk
+        has no errors.
+        Returns the result of the chunk.
+    """
+    upload_id = work_item["upload_id"]
+    chunk_index = work_item["chunk_index"]
+    try:
+        df = store.get_frame(get_chunk_key(upload_id, chunk_index, "data"))
+        upload_metadata = get_metadata(connection, upload_id)
+
+        conditions = validate_station_id(
+            df, work_item["recipient_type"], connection, upload_metadata, feature_toggle_set
+        )
+        validation_response = validated_dataframe_by_module_id(
+            ModuleDefinitionEnum(int(upload_metadata["module_id"])),
+            df,
+            upload_metadata["upload_id"],
+            feature_toggle_set,
+            max_conditions=get_validation_error_budget(feature_toggle_set),
+            stop_on_column_errors=Feature.VALIDATION_FAIL_FAST in feature_toggle_set,
+        )
+        conditions.extend(validation_response.get("conditions", []))
+
+        if not conditions:
+            store.put_frame(
+                get_chunk_key(upload_id, chunk_index, "validated"),
+                validation_response.get("df", pandas.DataFrame()),
+            )
+        conditions = get_chunk_conditions(conditions, chunk_index)
+        if conditions:
+            insert_errors_to_table(connection, upload_metadata, conditions, df)
+        return {"error_count": len(conditions)}
+    except STAGE_ERRORS as e:
+        log_event.log_custom_exception(
+            message=e.message, status_code=e.status_code, log_level=e.log_level
+        )
+        return {"error_count": 0, "reason": e.message}
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log_event.log_custom_exception(
+            message=f"uncaught error: {repr(e)} trace: {traceback.format_exc()}",
+            status_code=500,
+            log_level=3,
+        )
+        return {"error_count": 0, "reason": "uncaught error"}
+
+
+def coordinate_upload(work_item, connection, store, log_event, feature_toggle_set=frozenset()):
+    """
+        Merges the results of every chunk of an upload and, when every chunk passed, runs the unique
+        constraint check across all of them and stores the typed upload frame.
+        Returns the sns attributes and message of the data validation stage.
+    """
+    upload_id = work_item["upload_id"]
+    sns_attributes = {"data-validation": "failed"}
+    sns_message = {
+        "key": work_item["key"],
+        "bucket": work_item["bucket"],
+        "recipient_type": work_item["recipient_type"],
+    }
+
+    try:
+        merged = merge_chunk_results([
+            store.get_result(get_chunk_key(upload_id, chunk_index, "result"))
+            for chunk_index in range(work_item["chunk_count"])
+        ])
+        if merged["reason"]:
+            sns_message["reason"] = merged["reason"]
+            return sns_attributes, sns_message
+        if merged["error_count"]:
+            raise EvChartInvalidCSVError(message=NOT_COMPLIANT_MESSAGE)
+
+        is_s2s = work_item.get("s2s_upload", False)
+        check_duplicates = is_s2s or Feature.CHECK_DUPLICATES_UPLOAD in feature_toggle_set
+        is_typed = Feature.TYPED_UPLOAD_FRAME in feature_toggle_set
+        if check_duplicates or is_typed:
+            df = get_validated_upload(work_item, store)
+        if check_duplicates:
+            check_unique_constraints(work_item, connection, df, log_event, feature_toggle_set)
+        # biz magic starts from the typed upload frame instead of parsing the csv again
+        if is_typed:
+            put_typed_frame(work_item["bucket"], upload_id, df)
+    except (EvChartInvalidCSVError, *STAGE_ERRORS) as e:
+        log_event.log_custom_exception(
+            message=e.message, status_code=e.status_code, log_level=e.log_level
+        )
+        sns_message["reason"] = e.message
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log_event.log_custom_exception(
+            message=f"uncaught error: {repr(e)} trace: {traceback.format_exc()}",
+            status_code=500,
+            log_level=3,
+        )
+        sns_message["reason"] = "uncaught error"
+    else:
+        sns_attributes["data-validation"] = "passed"
+
+    return sns_attributes, sns_message
+
+
+def concat_frames(frames):
+    """
+    Concatenates the chunk frames of an upload.  Columns that are categorical in every chunk, the
+    identifier columns of compact validated frames, are given the union of the chunk categories
+    first, as pandas.concat falls back to object for categoricals whose categories differ.
+    """
+    categorical_columns = set.intersection(
+        *(set(frame.select_dtypes("category").columns) for frame in frames)
+    )
+    for column in categorical_columns:
+        categories = frames[0][column].cat.categories
+        for frame in frames[1:]:
+            categories = categories.union(frame[column].cat.categories)
+        frames = [
+            frame.assign(**{column: frame[column].cat.set_categories(categories)})
+            for frame in frames
+        ]
+    return pandas.concat(frames)
+
+
+def get_validated_upload(work_item, store):
+    """
+        Returns the validated chunks of an upload concatenated in row order.
+    """
+    return concat_frames([
+        store.get_frame(get_chunk_key(work_item["upload_id"], chunk_index, "validated"))
+        for chunk_index in range(work_item["chunk_count"])
+    ])
+
+
+def check_unique_constraints(work_item, connection, df, log_event, feature_toggle_set):
+    """
+    Runs the unique constraint check on the validated chunks of an upload together, so that
+    duplicates in different chunks are found, and writes any violations to the error table.
+    """
+    upload_id = work_item["upload_id"]
+    upload_metadata = get_metadata(connection, upload_id)
+    dr_id, _ = get_dr_and_sr_ids(work_item["recipient_type"], upload_metadata)
+
+    connection.ping()
+    with connection.cursor() as cursor:
+        unique_constraint_response = unique_constraint_violations_for_async(
+            cursor=cursor,
+            upload_id=upload_id,
+            dr_id=dr_id,
+            df=df,
+            log_event=log_event,
+            module_id=upload_metadata["module_id"],
+            feature_toggle_set=feature_toggle_set,
+        )
+    conditions = unique_constraint_response.get("errors", [])
+    if conditions:
+        insert_errors_to_table(connection, upload_metadata, conditions, df)
+        raise EvChartInvalidCSVError(message=NOT_COMPLIANT_MESSAGE)
+
+
+def get_metadata(connection, upload_id):
+    """
+        Returns the upload metadata of upload_id.
+    """
+    with connection.cursor() as cursor:
+        upload_metadata = get_upload_metadata(cursor, upload_id)
+    if upload_metadata is None:
+        raise EvChartDatabaseAuroraQueryError(
+            message=f"Error getting upload metadata, no record found for {upload_id}"
+        )
+    return upload_metadata
+
+
+def insert_errors_to_table(connection, metadata, conditions, df):
+    """
+    Convenience function that inserts the errors found in a chunk, or across chunks, into the error
+    table
+    """
+    connection.ping()
+    with connection.cursor() as cursor:
+        error_table_insert(
+            cursor=cursor,
+            upload_id=metadata["upload_id"],
+            module_id=metadata["module_id"],
+            org_id=metadata["org_id"],
+            dr_id=metadata["parent_org"],
+            condition_list=conditions,
+            df=df,
+        )
+    connection.commit()
@@ -0,0 +1,361 @@
+"""
+async_utility.fused_pipeline
+
+Runs the data validation, biz magic and validated upload stages of the asynchronous upload process
+in the same invocation as the file integrity check for small uploads. The upload is parsed once and
+the dataframe is handed from stage to stage in memory, while every stage still writes its errors to
+the error table and publishes the same SNS status message as the individual stage lambdas.
+"""
+import os
+import traceback
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+
+import pandas
+
+from async_utility.sns_manager import send_sns_message
+from evchart_helper.api_helper import get_org_info_dynamo, get_upload_metadata
+from evchart_helper.custom_exceptions import (
+    EvChartAsynchronousS3Error,
+    EvChartDatabaseAuroraDuplicateItemError,
+    EvChartDatabaseAuroraQueryError,
+    EvChartFileNotFoundError,
+    EvChartInvalidCSVError,
+    EvChartJsonOutputError,
+    EvChartMissingOrMalformedBodyError,
+    EvChartModuleValidationError,
+    EvChartS3GetObjectError,
+    EvChartUserNotAuthorizedError,
+)
+from evchart_helper.database_tables import ModuleDataTables
+from feature_toggle.feature_enums import Feature
+from module_validation import (
+    ModuleDefinitionEnum,
+    adjust_for_nulls,
+    data_already_exists_in_rds,
+    drop_sample_rows,
+    get_dataframe_from_csv,
+    get_dr_and_sr_ids,
+    get_validation_error_budget,
+    set_station_and_port_ids,
+    upload_data_from_df,
+    validate_station_id,
+    validated_dataframe_by_module_id,
+)
+from module_validation.biz_magic import (
+    custom_transformations,
+    custom_validations,
+    get_transformed_file_name,
+    serialize_transformed_df,
+    set_datatype,
+    upload_transform_df,
+)
+from module_validation.business_rules import RuleFrame
+from module_validation.unique_constraint import unique_constraint_violations_for_async
+from schema_compliance.error_table import error_table_insert
+
+# uploads larger than this (in bytes) always go through the individual stage lambdas
+FUSED_PIPELINE_MAX_BYTES = 5 * 1024 * 1024
+
+# added to every message published by the fused pipeline so that the stage queues
+# do not pick the upload up a second time
+FUSED_PIPELINE_ATTRIBUTE = {"pipeline": "fused"}
+
+STAGE_ERRORS = (
+    EvChartAsynchronousS3Error,
+    EvChartDatabaseAuroraDuplicateItemError,
+    EvChartDatabaseAuroraQueryError,
+    EvChartFileNotFoundError,
+    EvChartJsonOutputError,
+    EvChartMissingOrMalformedBodyError,
+    EvChartModuleValidationError,
+    EvChartS3GetObjectError,
+    EvChartUserNotAuthorizedError,
+)
+
+
+def get_fused_pipeline_max_bytes():
+    """
+        Returns the largest upload, in bytes, that is run through the fused pipeline.
+        Can be overridden with the FUSED_PIPELINE_MAX_BYTES environment variable.
+    """
+    return int(os.environ.get("FUSED_PIPELINE_MAX_BYTES", FUSED_PIPELINE_MAX_BYTES))
+
+
+def use_fused_pipeline(content_length, feature_toggle_set=frozenset()):
+    """
+        Given the size of the upload in bytes and active feature toggles,
+        Returns True if the upload should be run through the fused pipeline.
+    """
+    return (
+        Feature.ASYNC_FUSED_PIPELINE in feature_toggle_set
+        and content_length is not None
+        and content_length <= get_fused_pipeline_max_bytes()
+    )
+
+
+def run_fused_pipeline(
+    connection, bucket, key, s3_metadata, body, log_event, feature_toggle_set=frozenset()
+):
+    """
+        Given an upload that has passed the file integrity check and its body as read by it,
+        Runs data validation, biz magic and validated upload in order, stopping at the first
+        stage that fails, and publishes the status message of each stage that was run.
+        Returns bool on whether every status message was published (true/false).
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    upload = {
+        "upload_id": Path(key).stem,
+        "bucket": bucket,
+        "key": key,
+        "file_type": "json",
+        "s3_metadata": s3_metadata,
+        "body": body,
+        "recipient_type": s3_metadata.get("recipient_type"),
+        "connection": connection,
+        "log_event": log_event,
+        "feature_toggle_set": feature_toggle_set,
+    }
+    # the stage attributes are read from the s3 metadata of the upload each stage starts from
+    stages = [
+        ("data-validation", lambda metadata: {}, validate_data),
+        (
+            "biz-magic",
+            lambda metadata: {"file-type": "json", "is-s2s": metadata.get("s2s_upload", "False")},
+            biz_magic,
+        ),
+        (
+            "data-uploaded",
+            lambda metadata: {"is-s2s": metadata.get("s2s_upload", "no")},
+            upload_validated_data,
+        ),
+    ]
+
+    for stage, get_attributes, run_stage in stages:
+        sns_attributes = {
+            stage: "failed", **get_attributes(upload["s3_metadata"]), **FUSED_PIPELINE_ATTRIBUTE
+        }
+        reason = None
+        try:
+            run_stage(upload)
+        except (EvChartInvalidCSVError, *STAGE_ERRORS) as e:
+            log_event.log_custom_exception(
+                message=e.message, status_code=e.status_code, log_level=e.log_level
+            )
+            reason = e.message
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            log_event.log_custom_exception(
+                message=f"uncaught error: {repr(e)} trace: {traceback.format_exc()}",
+                status_code=500,
+                log_level=3,
+            )
+            reason = "uncaught error"
+        else:
+            sns_attributes[stage] = "passed"
+
+        if "file-type" in sns_attributes:
+            sns_attributes["file-type"] = upload["file_type"]
+        # biz magic moves the upload to its transformed key for the stages after it
+        sns_message = {
+            "key": upload["key"],
+            "bucket": bucket,
+            "recipient_type": upload["recipient_type"],
+        }
+        if reason:
+            sns_message["reason"] = reason
+        if not send_sns_message(sns_attributes, sns_message):
+            return False
+        if sns_attributes[stage] != "passed":
+            break
+
+    return True
+
+
+def insert_errors_to_table(upload, conditions, df):
+    """
+    Convenience function that inserts errors found by a stage into the error table and
+    stops the pipeline
+    """
+    connection = upload["connection"]
+    metadata = upload["upload_metadata"]
+    connection.ping()
+    with connection.cursor() as cursor:
+        error_table_insert(
+            cursor=cursor,
+            upload_id=metadata["upload_id"],
+            module_id=metadata["module_id"],
+            org_id=metadata["org_id"],
+            dr_id=metadata["parent_org"],
+            condition_list=conditions,
+            df=df,
+        )
+    connection.commit()
+    raise EvChartInvalidCSVError(message="Module data is not compliant")
+
+
+def validate_data(upload):
+    """
+    Data validation stage, see AsyncDataValidation
+    """
+    connection = upload["connection"]
+    feature_toggle_set = upload["feature_toggle_set"]
+    recipient_type = upload["recipient_type"]
+
+    # the upload body was already read by the file integrity check
+    df = drop_sample_rows(get_dataframe_from_csv(upload.pop("body").decode("utf-8")))
+    is_typed = Feature.TYPED_UPLOAD_FRAME in feature_toggle_set
+    # biz magic starts from the uploaded data, not the copy that validation annotates, or from
+    # the typed upload frame that validation converts it to
+    if not is_typed:
+        upload["df"] = df.copy()
+
+    with connection.cursor() as cursor:
+        upload_metadata = get_upload_metadata(cursor, upload["upload_id"])
+    if upload_metadata is None:
+        raise EvChartDatabaseAuroraQueryError(
+            message=f"Error getting upload metadata, no record found for {upload['upload_id']}"
+        )
+    upload["upload_metadata"] = upload_metadata
+    module_id = upload_metadata.get("module_id")
+    dr_id, _ = get_dr_and_sr_ids(recipient_type, upload_metadata)
+
+    conditions = validate_station_id(
+        df, recipient_type, connection, upload_metadata, feature_toggle_set
+    )
+    upload["station_uuid"] = df["station_uuid"] if "station_uuid" in df else None
+    validation_response = validated_dataframe_by_module_id(
+        ModuleDefinitionEnum(int(module_id)),
+        df,
+        upload_metadata["upload_id"],
+        feature_toggle_set,
+        max_conditions=get_validation_error_budget(feature_toggle_set),
+        stop_on_column_errors=Feature.VALIDATION_FAIL_FAST in feature_toggle_set,
+        prior_conditions=conditions,
+    )
+    conditions = validation_response.get("conditions", [])
+    updated_df = validation_response.get("df", pandas.DataFrame())
+    if is_typed:
+        upload["df"] = updated_df
+
+    is_s2s = upload["s3_metadata"].get("s2s_upload", False)
+    if not conditions and (is_s2s or Feature.CHECK_DUPLICATES_UPLOAD in feature_toggle_set):
+        connection.ping()
+        with connection.cursor() as cursor:
+            unique_constraint_response = unique_constraint_violations_for_async(
+                cursor=cursor,
+                upload_id=upload["upload_id"],
+                dr_id=dr_id,
+                df=updated_df,
+                log_event=upload["log_event"],
+                module_id=module_id,
+                feature_toggle_set=feature_toggle_set,
+                upload_df=df,
+            )
+        conditions.extend(unique_constraint_response.get("errors", []))
+
+    if conditions:
+        insert_errors_to_table(upload, conditions, df)
+
+
+def biz_magic(upload):
+    """
+    Biz magic stage, see AsyncBizMagic
+    """
+    connection = upload["connection"]
+    feature_toggle_set = upload["feature_toggle_set"]
+    upload_metadata = upload["upload_metadata"]
+    upload_id = upload["upload_id"]
+    module_id = int(upload_metadata.get("module_id"))
+
+    df = upload["df"].copy()
+    df["upload_id"] = upload_metadata["upload_id"]
+    # station_uuid was already resolved for every row during data validation
+    df["station_uuid"] = upload["station_uuid"]
+
+    connection.ping()
+    with connection.cursor() as cursor:
+        validation_options = {
+            "cursor": cursor,
+            "feature_toggle_set": feature_toggle_set,
+            "df": df,
+            "today": datetime.now(),
+            # prepared once for the business rules of every validation function
+            "rule_frame": RuleFrame(df, cursor),
+        }
+        conditions = list(
+            chain.from_iterable(
+                cv(validation_options).get("conditions", [])
+                for cv in custom_validations[module_id]
+            )
+        )
+
+    if Feature.BIZ_MAGIC not in feature_toggle_set:
+        return
+
+    if conditions:
+        insert_errors_to_table(upload, conditions, df)
+
+    for ct in custom_transformations[module_id]:
+        df = ct(feature_toggle_set, df)
+    df = set_datatype(df, module_id, feature_toggle_set)
+    payload, file_type = serialize_transformed_df(df, module_id, feature_toggle_set)
+    upload["file_type"] = file_type
+
+    recipient_type = upload["recipient_type"]
+    org_name = get_org_info_dynamo(upload_metadata["org_id"])["name"]
+    parent_name = None
+    if recipient_type == "sub-recipient":
+        parent_name = get_org_info_dynamo(upload_metadata["parent_org"])["name"]
+    new_file_name = get_transformed_file_name(
+        upload_id, recipient_type, org_name, parent_name, file_type
+    )
+    upload["key"] = new_file_name
+
+    # the transformed upload is still stored for auditing and re-processing, and the stages
+    # after biz magic start from it
+    upload["s3_metadata"] = upload_transform_df(
+        bucket=upload["bucket"],
+        upload_id=upload_id,
+        recipient_type=recipient_type,
+        df=df,
+        new_file_name=new_file_name,
+        s2s_upload=upload["s3_metadata"].get("s2s_upload", "False"),
+        payload=payload,
+    )
+    upload["transformed_df"] = df
+
+
+def upload_validated_data(upload):
+    """
+    Validated upload stage, see AsyncValidatedUpload
+    """
+    connection = upload["connection"]
+    feature_toggle_set = upload["feature_toggle_set"]
+    upload_metadata = upload["upload_metadata"]
+    module_id = upload_metadata.get("module_id")
+
+    is_transformed = "transformed_df" in upload
+    df = upload["transformed_df"] if is_transformed else upload["df"]
+    df = drop_sample_rows(df)
+    df["upload_id"] = upload_metadata["upload_id"]
+
+    connection.ping()
+    with connection.cursor() as cursor:
+        module_table = ModuleDataTables[f"Module{module_id}"].value
+        if data_already_exists_in_rds(cursor, module_table, upload["upload_id"]):
+            return
+
+        df = set_station_and_port_ids(df, cursor)
+
+    if is_transformed:
+        upload_data_from_df(
+            connection=connection,
+            module_number=module_id,
+            df=df,
+            check_boolean=False,
+            feature_toggle_set=feature_toggle_set,
+        )
+    else:
+        df = adjust_for_nulls(feature_toggle_set, module_id, df)
+        upload_data_from_df(connection, module_id, df, feature_toggle_set=feature_toggle_set)
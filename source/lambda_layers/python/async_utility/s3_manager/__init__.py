@@ -3,6 +3,8 @@ async_utility.s3_manager
 
 Helper functions that work with the S3 bucket used with uploading module data.
 """
+import base64
+import binascii
 import logging
 from botocore.exceptions import ClientError
 from evchart_helper import boto3_manager
@@ -13,25 +15,31 @@ from evchart_helper.custom_exceptions import (
 logger = logging.getLogger()
 
 
-def get_s3_data(bucket, key):
+def get_s3_data(bucket, key, decode=True):
     """
         Given S3 bucket and object key,
         Returns decoded s3 object body (csv data) and object metadata.
+        The body is returned as bytes when decode is False.
     """
     s3_object = get_s3_object(bucket, key)
-    s3_body = s3_object["Body"].read().decode("utf-8")
+    s3_body = s3_object["Body"].read()
+    if decode:
+        s3_body = s3_body.decode("utf-8")
     s3_metadata = s3_object["Metadata"]
     return s3_body, s3_metadata
 
 
-def get_s3_object(bucket, key):
+def get_s3_object(bucket, key, checksum_mode=False):
     """
         Given S3 bucket and object key,
-        Returns S3 object returned from boto3.
+        Returns S3 object returned from boto3, including the S3 checksums of the object
+        when checksum_mode is True.
     """
     try:
         s3 = boto3_manager.resource("s3")
         response = s3.Object(bucket, key)
+        if checksum_mode:
+            return response.get(ChecksumMode="ENABLED")
         return response.get()
     except ClientError as e:
         raise EvChartS3GetObjectError(
@@ -44,3 +52,20 @@ def get_s3_object(bucket, key):
                 f"from bucket {bucket}: {e}"
             )
         ) from e
+
+
+def get_s3_sha256(s3_object):
+    """
+        Given S3 object returned from boto3 with checksum mode enabled,
+        Returns the hex encoded SHA-256 checksum that S3 stored for the object body, or None if
+        S3 does not have a SHA-256 checksum of the full object.
+    """
+    checksum = s3_object.get("ChecksumSHA256")
+    # multipart uploads have a checksum of the part checksums, e.g. "<checksum>-3"
+    if not checksum or "-" in checksum or s3_object.get("ChecksumType") == "COMPOSITE":
+        return None
+    try:
+        return base64.b64decode(checksum, validate=True).hex()
+    except (binascii.Error, ValueError):
+        logger.warning("invalid S3 checksum: %s", checksum)
+        return None
@@ -7,13 +7,19 @@ from collections import namedtuple
 import logging
 import os
 import json
+import re
 from pathlib import Path
 from time import sleep
 from evchart_helper import boto3_manager
 from evchart_helper.custom_exceptions import EvChartSQSError
+from evchart_helper.parameter_provider import parameter_provider
 
 logger = logging.getLogger()
 
+# SQS only allows alphanumeric and punctuation characters in a message group id
+INVALID_MESSAGE_GROUP_CHARACTERS = re.compile(r"[^A-Za-z0-9!\"#$%&'()*+,\-./:;<=>?@\[\\\]^_`{|}~]")
+MESSAGE_GROUP_ID_MAX_LENGTH = 128
+
 def send_sns_message(attributes, data):
     """
         Helper function to send s3 messages
@@ -26,11 +32,12 @@ def send_sns_message(attributes, data):
 
     topic_arn = get_topic_arn()
     sns_attributes = {}
-    message_group = list(attributes.keys())[0]
+    stage = list(attributes.keys())[0]
     for key, value in attributes.items():
         sns_attributes[key] = {"DataType": "String", "StringValue": value}
 
-    deduplication_id = message_group + '_' + Path(data.get("key")).stem
+    message_group = get_message_group_id(data.get("key")) or stage
+    deduplication_id = stage + '_' + Path(data.get("key")).stem
     try:
         sns.publish(
         TopicArn=topic_arn,
@@ -44,19 +51,36 @@ def send_sns_message(attributes, data):
     else:
         return True
 
-def get_topic_arn():
+def get_message_group_id(key):
     """
-        Returns async sns topic arn based on environment/sub-environment
+        Given s3 object key
+        Returns the FIFO message group for the upload so that messages for
+        one upload stay in order while different uploads are processed in
+        parallel. Setting ASYNC_MESSAGE_GROUP_BY to "org" groups messages
+        by the uploading org instead.
     """
-    ssm = boto3_manager.client("ssm")
+    if os.environ.get("ASYNC_MESSAGE_GROUP_BY", "upload").lower() == "org":
+        message_group = get_org_name_from_path(key)
+    else:
+        message_group = Path(key).stem
+    message_group = INVALID_MESSAGE_GROUP_CHARACTERS.sub("-", message_group)
+    return message_group[:MESSAGE_GROUP_ID_MAX_LENGTH]
 
+def get_topic_arn_parameter_name():
+    """
+        Returns the name of the async sns topic arn parameter based on environment/sub-environment
+    """
     sub_environment = os.environ.get("SUBENVIRONMENT")
     sub_environment = f"/{sub_environment}" if sub_environment else ""
-    topic_arn = ssm.get_parameter(
-            Name=f"/ev-chart/async{sub_environment}/async-topic-arn"
-        )["Parameter"]["Value"]
+    return f"/ev-chart/async{sub_environment}/async-topic-arn"
+
+def get_topic_arn():
+    """
+        Returns async sns topic arn based on environment/sub-environment
+    """
+    return parameter_provider.get_parameter(get_topic_arn_parameter_name())
 
-    return topic_arn
+parameter_provider.register_prefetch(get_topic_arn_parameter_name())
 
 def get_org_name_from_path(key):
     """
@@ -0,0 +1,66 @@
+"""
+async_utility.typed_frame
+
+Stores the typed upload frame, the validated dataframe whose module columns data validation has
+converted to the datatypes of the module schema in the central config, so that AsyncBizMagic starts
+from it instead of parsing and converting the uploaded csv a second time.  The frame is stored as
+parquet in the upload bucket so that its index, the csv row numbers, and datatypes are kept.
+"""
+import io
+import logging
+
+import pandas
+from botocore.exceptions import ClientError
+
+from evchart_helper import boto3_manager
+from evchart_helper.custom_exceptions import EvChartS3GetObjectError
+
+logger = logging.getLogger("async_utility.typed_frame")
+
+# prefix of the upload bucket that the typed upload frames are stored under
+TYPED_FRAME_PREFIX = "typed"
+
+
+def get_typed_frame_key(upload_id):
+    """
+        Returns the s3 key of the typed upload frame of upload_id.
+    """
+    return f"{TYPED_FRAME_PREFIX}/{upload_id}.parquet"
+
+
+def put_typed_frame(bucket, upload_id, df):
+    """
+        Stores the typed upload frame of upload_id.  A frame that cannot be stored is only logged,
+        as AsyncBizMagic reads the uploaded csv when there is no typed upload frame.
+        Returns True if the frame was stored.
+    """
+    try:
+        buffer = io.BytesIO()
+        df.to_parquet(buffer)
+        boto3_manager.resource("s3").Bucket(bucket).put_object(
+            Key=get_typed_frame_key(upload_id), Body=buffer.getvalue()
+        )
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.warning("unable to store the typed upload frame of %s: %s", upload_id, repr(e))
+        return False
+    return True
+
+
+def get_typed_frame(bucket, upload_id):
+    """
+        Returns the typed upload frame of upload_id, or None if data validation did not store one.
+    """
+    key = get_typed_frame_key(upload_id)
+    try:
+        body = boto3_manager.resource("s3").Object(bucket, key).get()["Body"].read()
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchKey":
+            return None
+        raise EvChartS3GetObjectError(
+            message=f"Error No such key: {key} in S3 bucket: {bucket} : {e}"
+        ) from e
+    except Exception as e:
+        raise EvChartS3GetObjectError(
+            message=f"an error occured while getting s3 object {key} from bucket {bucket}: {e}"
+        ) from e
+    return pandas.read_parquet(io.BytesIO(body))
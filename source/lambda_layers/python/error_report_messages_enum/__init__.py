@@ -59,6 +59,10 @@ class ErrorReportMessages(Enum):
 
     MODULE_9_INVALID_NULL_VALUES = 'If reporting no federal cost information, all required fields must contain values, but all total cost fields must be blanked. Otherwise complete all required fields.'
 
+    # error report limits
+    ERROR_LIMIT_EXCEEDED = 'More than {max_errors} errors were found in this submission and only the first {max_errors} are shown. Correct these errors and upload the file again to see any remaining errors.'
+    ERROR_BUDGET_EXHAUSTED = 'Validation stopped after {max_errors} errors were found. Correct these errors and upload the file again to see any remaining errors.'
+
     # function that formats the parameterized variables into the error description
     def format(self, **kwargs) -> str:
         return self.value.format(**kwargs)
@@ -9,16 +9,34 @@ import logging
 import os
 import time
 import pymysql
+from pymysql.constants.ER import ACCESS_DENIED_ERROR
 
 from evchart_helper.boto3_manager import boto3_manager
+from evchart_helper.custom_exceptions import EvChartDatabaseHandlerConnectionError
+from evchart_helper.parameter_provider import parameter_provider
 
 cloudwatch_client = boto3_manager.client("cloudwatch")
-secretsmanager_client = boto3_manager.client("secretsmanager")
-ssm_client = boto3_manager.client("ssm")
 
 logger = logging.getLogger("AuroraDatabase")
 logger.setLevel(logging.DEBUG)
 
+# seconds that the database parameters, credentials and connection feature toggles are
+# kept before they are read again
+AURORA_PARAMETERS_TTL_SECONDS = 300
+
+
+# seconds that the maintenance status is cached for, kept short so that maintenance mode is
+# picked up quickly
+APPLICATION_STATUS_TTL_SECONDS = 30
+
+
+def get_aurora_parameters_ttl():
+    """
+        Returns the number of seconds that the database parameters are cached for.
+        Can be overridden with the AURORA_PARAMETERS_TTL_SECONDS environment variable.
+    """
+    return int(os.environ.get("AURORA_PARAMETERS_TTL_SECONDS", AURORA_PARAMETERS_TTL_SECONDS))
+
 
 class ApplicationStatus:
 
@@ -32,9 +50,10 @@ class ApplicationStatus:
         sub_environment = os.environ.get("SUBENVIRONMENT")
         sub_environment_path = f"/{sub_environment}" if sub_environment else ""
 
-        return ssm_client.get_parameter(
-            Name=f"/ev-chart/status{sub_environment_path}/maintenance"
-        )["Parameter"]["Value"] == "True"
+        return parameter_provider.get_parameter(
+            f"/ev-chart/status{sub_environment_path}/maintenance",
+            ttl=APPLICATION_STATUS_TTL_SECONDS
+        ) == "True"
 
     def user_is_permitted(self):
         return (not self.is_maintenance()) or self._user_scope == "joet"
@@ -94,58 +113,95 @@ class AuroraDatabase:
         except Exception as e:
             raise AuroraDatabaseCloudWatchPushMetricError() from e
 
-    def __get_db_parameters(self):
+    def __get_db_parameters(self, refresh=False):
+        if (
+            not refresh and self._db_parameters
+            and time.monotonic() < self._db_parameters_expire_time
+        ):
+            return
+
         sub_environment = os.environ.get("SUBENVIRONMENT")
         sub_environment_path = \
             f"/{sub_environment}" if sub_environment else ""
 
         self._db_parameters = {
-            parameter["Name"].split("/")[-1]: parameter["Value"]
-            for parameter in ssm_client.get_parameters_by_path(
-                Path=f"/ev-chart/aurora{sub_environment_path}"
-            )["Parameters"]
+            name.split("/")[-1]: value
+            for name, value in parameter_provider.get_parameters_by_path(
+                f"/ev-chart/aurora{sub_environment_path}", refresh=refresh
+            ).items()
         }
-        self._db_credentials = json.loads(secretsmanager_client.get_secret_value(
-            SecretId=self._db_parameters["master_user_secret_arn"]
-        )["SecretString"])
+        self._db_credentials = json.loads(parameter_provider.get_secret(
+            self.__get_db_parameter("master_user_secret_arn"), refresh=refresh
+        ))
+
+        from feature_toggle import FeatureToggleService # pylint:disable=C0415
+        from feature_toggle.feature_enums import Feature # pylint:disable=C0415
+
+        feature_toggle_service = FeatureToggleService()
+        self._db_features = {
+            feature
+            for feature in (Feature.USE_RDS_PROXY, Feature.AURORA_CONNECTION_REUSE)
+            if feature_toggle_service.get_feature_toggle_by_enum(feature, logger) == "True"
+        }
+        self._db_parameters_expire_time = time.monotonic() + get_aurora_parameters_ttl()
+
+    def __get_db_parameter(self, name):
+        try:
+            return self._db_parameters[name]
+        except KeyError as e:
+            raise EvChartDatabaseHandlerConnectionError(
+                message=f"aurora parameter {name} is missing"
+            ) from e
 
     def __init__(self):
-        self._db_connection = None
+        self._db_connections = {}
         self._db_credentials = None
+        self._db_features = set()
         self._db_parameters = None
+        self._db_parameters_expire_time = 0
 
-    def close_connection(self):
-        self._db_connection.close()
-        self._db_connection = None
+    def __reuse_connections(self):
+        from feature_toggle.feature_enums import Feature # pylint:disable=C0415
 
-    def get_connection(self, use_read_only=False):
-        if self._db_connection and self._db_connection.open:
-            self.close_connection()
+        return Feature.AURORA_CONNECTION_REUSE in self._db_features
 
-        self.__get_db_parameters()
+    def __close(self, slot):
+        connection = self._db_connections.pop(slot, None)
+        if connection is not None and connection.open:
+            connection.close()
+
+    def __get_open_connection(self, slot):
+        connection = self._db_connections.get(slot)
+        if connection is None:
+            return None
+
+        try:
+            connection.ping(reconnect=False)
+        except pymysql.Error as e:
+            logger.debug("discarding %s connection that failed its ping: %s", slot, repr(e))
+            self.__close(slot)
+            return None
+        return connection
+
+    def __connect(self, use_read_only):
+        from feature_toggle.feature_enums import Feature # pylint:disable=C0415
 
         connection_params = {
-            "host": self._db_parameters["endpoint_address"],
+            "host": self.__get_db_parameter("endpoint_address"),
             "password": self._db_credentials["password"],
-            "port": int(self._db_parameters["endpoint_port"]),
+            "port": int(self.__get_db_parameter("endpoint_port")),
             "user": self._db_credentials["username"],
             "database": self._db_parameters.get("evchart-database-name")
         }
 
-        from feature_toggle import FeatureToggleService # pylint:disable=C0415
-        from feature_toggle.feature_enums import Feature # pylint:disable=C0415
-
-        feature_toggle_service = FeatureToggleService()
-        if not use_read_only and feature_toggle_service.get_feature_toggle_by_enum(
-            Feature.USE_RDS_PROXY, logger
-        ) == "True":
-            connection_params["host"] = self._db_parameters["proxy_endpoint_address"]
+        if not use_read_only and Feature.USE_RDS_PROXY in self._db_features:
+            connection_params["host"] = self.__get_db_parameter("proxy_endpoint_address")
 
         elif use_read_only:
-            connection_params["host"] = self._db_parameters["read_endpoint_address"]
+            connection_params["host"] = self.__get_db_parameter("read_endpoint_address")
 
         connect_start_time = time.time_ns()
-        self._db_connection = pymysql.connect(**connection_params)
+        connection = pymysql.connect(**connection_params)
         # Total time to connect in milliseconds.
         connect_elapsed_time = (time.time_ns() - connect_start_time) / 1e+6
 
@@ -159,7 +215,52 @@ class AuroraDatabase:
                     "base_exception": str(e.__cause__)
                 }))
 
-        self._db_connection.ping()
-        return self._db_connection
+        return connection
+
+    def close_connection(self):
+        """
+        Closes the open connections. When connections are reused, they are rolled back instead and
+        kept open for the next invocation of a warm container.
+        """
+        for slot, connection in list(self._db_connections.items()):
+            if not self.__reuse_connections():
+                self.__close(slot)
+                continue
+
+            try:
+                connection.rollback()
+            except pymysql.Error:
+                self.__close(slot)
+
+    def get_connection(self, use_read_only=False):
+        """
+        Returns a connection to the writer, or to the read replica if use_read_only is set. When
+        connections are reused, the connection kept from a previous call is returned if it still
+        answers a ping.
+        """
+        slot = "reader" if use_read_only else "writer"
+        self.__get_db_parameters()
+
+        if self.__reuse_connections():
+            connection = self.__get_open_connection(slot)
+            if connection is not None:
+                return connection
+        else:
+            for open_slot in list(self._db_connections):
+                self.__close(open_slot)
+
+        try:
+            connection = self.__connect(use_read_only)
+        except pymysql.err.OperationalError as e:
+            if e.args[0] != ACCESS_DENIED_ERROR:
+                raise
+            # the cached credentials are stale once the secret has been rotated
+            logger.debug("connection was denied, refreshing the database credentials")
+            self.__get_db_parameters(refresh=True)
+            connection = self.__connect(use_read_only)
+
+        self._db_connections[slot] = connection
+        connection.ping()
+        return connection
 
 aurora = AuroraDatabase()
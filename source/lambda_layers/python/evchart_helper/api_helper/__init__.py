@@ -8,12 +8,14 @@ into the desired api.
 """
 
 import logging
+import os
 from datetime import datetime
 from dateutil import tz
 from functools import cache
 import pandas as pd
 from boto3.dynamodb.conditions import Key
 from evchart_helper.boto3_manager import boto3_manager
+from evchart_helper.call_tracer import trace_query
 from evchart_helper.custom_exceptions import (
     EvChartDatabaseAuroraQueryError,
     EvChartDatabaseDynamoQueryError,
@@ -24,6 +26,7 @@ from evchart_helper.custom_exceptions import (
 from evchart_helper.database_tables import ModuleDataTables
 from evchart_helper.user_enums import Roles
 from evchart_helper.database_tables import ModuleDataTables
+from pymysql.cursors import SSCursor
 from pymysql.err import IntegrityError
 from pymysql.constants.ER import DUP_ENTRY
 
@@ -33,28 +36,35 @@ import_metadata = ModuleDataTables["Metadata"].value
 network_providers_table = ModuleDataTables["NetworkProviders"].value
 station_registrations = ModuleDataTables["RegisteredStations"].value
 station_ports_table = ModuleDataTables["StationPorts"].value
+# number of (station_id, network_provider) pairs resolved per query
+STATION_LOOKUP_CHUNK_SIZE = 1000
+# number of rows read from the server per batch by stream_query
+QUERY_STREAM_BATCH_SIZE = 10000
 
 logger = logging.getLogger("Layer_APIHelper")
 logger.setLevel(logging.INFO)
 
 
-def execute_query_common(query, data, cursor, message=None, mode="list"):
+def get_query_stream_batch_size():
     """
-    Queries RDS based on given query and data. Parses and
-    returns data based on mode passed in (list or dataframe)
+        Returns the number of rows read per batch by stream_query.
+        Can be overridden with the QUERY_STREAM_BATCH_SIZE environment variable.
     """
-    if mode not in {"list", "dataframe"}:
-        raise EvChartMissingOrMalformedHeadersError(
-            message=f"invalid mode {mode}, must be list or dataframe"
-        )
+    return int(os.environ.get("QUERY_STREAM_BATCH_SIZE", QUERY_STREAM_BATCH_SIZE))
+
 
+def execute_statement(query, data, cursor, message=None, function_name="execute_query_common"):
+    """
+    Executes query on cursor, raising the EvChart database errors for any failure.
+    """
     try:
-        cursor.execute(query, data)
+        with trace_query(query):
+            cursor.execute(query, data)
     except IntegrityError as e:
         exception_class = EvChartDatabaseAuroraQueryError
         error_message = (
             f"Error thrown in evchart_helper file: api_helper, "
-            f"execute_query_common(). Error querying the database: {repr(e)} "
+            f"{function_name}(). Error querying the database: {repr(e)} "
         )
 
         e_code, e_message = e.args
@@ -62,7 +72,7 @@ def execute_query_common(query, data, cursor, message=None, mode="list"):
             exception_class = EvChartDatabaseAuroraDuplicateItemError
             error_message = (
                 f"Error thrown in evchart_helper file: api_helper, "
-                f"execute_query_common(). Duplicate entry: {e_message} "
+                f"{function_name}(). Duplicate entry: {e_message} "
             )
         if message is not None:
             error_message += message
@@ -70,12 +80,25 @@ def execute_query_common(query, data, cursor, message=None, mode="list"):
     except Exception as e:
         error_message = (
             f"Error thrown in evchart_helper file: api_helper, "
-            f"execute_query_common(). Error querying the database: {repr(e)} "
+            f"{function_name}(). Error querying the database: {repr(e)} "
         )
         if message is not None:
             error_message += message
         raise EvChartDatabaseAuroraQueryError(message=error_message)
 
+
+def execute_query_common(query, data, cursor, message=None, mode="list"):
+    """
+    Queries RDS based on given query and data. Parses and
+    returns data based on mode passed in (list or dataframe)
+    """
+    if mode not in {"list", "dataframe"}:
+        raise EvChartMissingOrMalformedHeadersError(
+            message=f"invalid mode {mode}, must be list or dataframe"
+        )
+
+    execute_statement(query, data, cursor, message)
+
     row_data = cursor.fetchall()
 
     if mode == "dataframe":
@@ -89,14 +112,45 @@ def execute_query_common(query, data, cursor, message=None, mode="list"):
         return output
 
     if cursor.rowcount > 0:
-        output = [
-            dict((cursor.description[i][0], value) for i, value in enumerate(row))
-            for row in row_data
-        ]
+        column_names = [column[0] for column in cursor.description]
+        output = [dict(zip(column_names, row)) for row in row_data]
 
     return output
 
 
+def stream_query(query, data, connection, mode="list", batch_size=None, message=None):
+    """
+    Queries RDS on an unbuffered server-side cursor and yields the result in batches of at most
+    batch_size rows, so that only one batch is held in memory at a time. Based on mode, each batch
+    is a list of dicts (list), a dataframe (dataframe) or a dict of column name to a tuple of its
+    values (columns). In dataframe mode an empty result yields a single empty dataframe.
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    if mode not in {"list", "dataframe", "columns"}:
+        raise EvChartMissingOrMalformedHeadersError(
+            message=f"invalid mode {mode}, must be list, dataframe or columns"
+        )
+    if batch_size is None:
+        batch_size = get_query_stream_batch_size()
+
+    with connection.cursor(SSCursor) as cursor:
+        execute_statement(query, data, cursor, message, function_name="stream_query")
+        column_names = [column[0] for column in cursor.description]
+
+        is_empty = True
+        while rows := cursor.fetchmany(batch_size):
+            is_empty = False
+            if mode == "dataframe":
+                yield pd.DataFrame(rows, columns=column_names)
+            elif mode == "columns":
+                yield dict(zip(column_names, zip(*rows)))
+            else:
+                yield [dict(zip(column_names, row)) for row in rows]
+
+        if is_empty and mode == "dataframe":
+            yield pd.DataFrame(columns=column_names)
+
+
 def execute_query(query, data, cursor, message=None):
     """
     Returns list of data, given query and data.
@@ -119,7 +173,8 @@ def execute_query_fetchone(query, data, cursor, message=None):
     in any relevant data and cursor from parent function.
     """
     try:
-        cursor.execute(query, data)
+        with trace_query(query):
+            cursor.execute(query, data)
 
     except Exception as e:
         logger.debug(f"aurora error: {e}")
@@ -143,7 +198,8 @@ def execute_proc(procedure, data, cursor, log=None, operation=None, message=None
     found.
     """
     try:
-        cursor.callproc(procedure, data)
+        with trace_query(f"CALL {procedure}"):
+            cursor.callproc(procedure, data)
 
     except Exception as e:
         error_message = f"Error thrown in evchart_helper file: api_helper, execute_proc(). Error querying the database: {e} "
@@ -332,6 +388,160 @@ def query_builder_station_with_ports(station_id, network_provider):
     return station_uuid_query, data
 
 
+def query_builder_stations_with_ports(stations):
+    """
+    Queries station_registrations table for the station_uuid and ports of
+    every (station_id, network_provider) pair in stations.  Stations without
+    ports are returned with null port_uuid and port_id.
+    """
+    station_registrations_table = ModuleDataTables["RegisteredStations"].value
+    in_clause = ", ".join(["(%s, %s)"] * len(stations))
+
+    stations_query = (
+        f"SELECT sr.station_id, np.network_provider_value AS network_provider, "
+        f"sr.station_uuid, sr.network_provider_uuid, sp.port_uuid, sp.port_id "
+        f"FROM {station_registrations_table} sr "
+        f"INNER JOIN {network_providers_table} np ON sr.network_provider_uuid = np.network_provider_uuid "
+        f"LEFT JOIN {station_ports_table} sp ON sr.station_uuid = sp.station_uuid "
+        f"WHERE (sr.station_id, np.network_provider_value) IN ({in_clause})"
+    )
+    data = tuple(value for station in stations for value in station)
+
+    return stations_query, data
+
+
+def get_station_and_port_uuids(cursor, stations, chunk_size=STATION_LOOKUP_CHUNK_SIZE):
+    """
+    Returns a dataframe with one row per registered port (or one row with null
+    port_uuid and port_id for stations without ports) for every
+    (station_id, network_provider) pair in stations, keyed by the station_id
+    and network_provider exactly as requested.  Stations are resolved with
+    one query per chunk_size stations; a station whose stored identifiers
+    only match by database collation (e.g. different case) falls back to a
+    single-station query.  Raises EvChartDatabaseAuroraQueryError if a
+    station is not registered.
+    """
+    stations = list(dict.fromkeys(stations))
+    key_columns = ["station_id", "network_provider"]
+    result_columns = key_columns + ["station_uuid", "network_provider_uuid", "port_uuid", "port_id"]
+    frames = []
+    for start in range(0, len(stations), chunk_size):
+        stations_query, data = query_builder_stations_with_ports(stations[start:start + chunk_size])
+        frames.append(
+            execute_query_df(
+                query=stations_query,
+                data=data,
+                cursor=cursor,
+                message="Error thrown in api_helper: get_station_and_port_uuids()",
+            )
+        )
+    found = {
+        station
+        for frame in frames
+        for station in zip(frame["station_id"], frame["network_provider"])
+    }
+    for station_id, network_provider in stations:
+        if (station_id, network_provider) in found:
+            continue
+        station_and_port_query, data = query_builder_station_with_ports(station_id, network_provider)
+        station_df = execute_query_df(
+            query=station_and_port_query,
+            data=data,
+            cursor=cursor,
+            message="Error thrown in api_helper: get_station_and_port_uuids()",
+        )
+        if station_df.empty:
+            raise EvChartDatabaseAuroraQueryError(
+                message=(
+                    f"Error thrown in evchart_helper file: get_station_and_port_uuids, "
+                    f"execute_query_df() returned no data for (station_id, network provieder): ({station_id}, {network_provider})"
+                )
+            )
+        frames.append(station_df.assign(station_id=station_id, network_provider=network_provider))
+
+    if not frames:
+        return pd.DataFrame(columns=result_columns)
+    return pd.concat(frames, ignore_index=True)[result_columns]
+
+
+def query_builder_station_attributes(stations, attributes):
+    """
+    Queries station_registrations table for the given attributes of every
+    (station_id, network_provider) pair in stations.  attributes are column
+    names of station_registrations and are not escaped.
+    """
+    station_registrations_table = ModuleDataTables["RegisteredStations"].value
+    in_clause = ", ".join(["(%s, %s)"] * len(stations))
+
+    attributes_query = (
+        f"SELECT sr.station_id, np.network_provider_value AS network_provider, "
+        f"{', '.join(f'sr.{attribute}' for attribute in attributes)} "
+        f"FROM {station_registrations_table} sr "
+        f"INNER JOIN {network_providers_table} np ON sr.network_provider_uuid = np.network_provider_uuid "
+        f"WHERE (sr.station_id, np.network_provider_value) IN ({in_clause})"
+    )
+    data = tuple(value for station in stations for value in station)
+
+    return attributes_query, data
+
+
+def get_station_attributes(cursor, stations, attributes, chunk_size=STATION_LOOKUP_CHUNK_SIZE):
+    """
+    Returns a dataframe with one row for every (station_id, network_provider)
+    pair in stations, keyed by the station_id and network_provider exactly as
+    requested, holding the given station_registrations attributes.  Stations
+    are resolved with one query per chunk_size stations; a station whose
+    stored identifiers only match by database collation (e.g. different case)
+    falls back to a single-station query.  The attributes of a station that is
+    not registered are null.
+    """
+    stations = list(dict.fromkeys(stations))
+    key_columns = ["station_id", "network_provider"]
+    result_columns = key_columns + list(attributes)
+    frames = []
+    for start in range(0, len(stations), chunk_size):
+        attributes_query, data = query_builder_station_attributes(
+            stations[start:start + chunk_size], attributes
+        )
+        frames.append(
+            execute_query_df(
+                query=attributes_query,
+                data=data,
+                cursor=cursor,
+                message="Error thrown in api_helper: get_station_attributes()",
+            )
+        )
+    found = {
+        station
+        for frame in frames
+        for station in zip(frame["station_id"], frame["network_provider"])
+    }
+    for station_id, network_provider in stations:
+        if (station_id, network_provider) in found:
+            continue
+        attributes_query, data = query_builder_station_attributes(
+            [(station_id, network_provider)], attributes
+        )
+        station_df = execute_query_df(
+            query=attributes_query,
+            data=data,
+            cursor=cursor,
+            message="Error thrown in api_helper: get_station_attributes()",
+        )
+        frames.append(
+            station_df.head(1).assign(station_id=station_id, network_provider=network_provider)
+        )
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=result_columns)
+    # a station registered more than once is resolved to its first registration
+    return (
+        pd.concat(frames, ignore_index=True)[result_columns]
+        .drop_duplicates(subset=key_columns, ignore_index=True)
+    )
+
+
 def get_station_and_port_uuid(cursor, station_id, network_provider, port_id=None):
     """
     Returns single station_uuid, and port_uuid from station_registrations table
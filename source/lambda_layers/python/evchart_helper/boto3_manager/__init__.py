@@ -12,6 +12,7 @@ from botocore.config import Config
 from evchart_helper.boto3_manager.exceptions import (
     Boto3ManagerClientTypeError
 )
+from evchart_helper.call_tracer import register_call_tracer
 
 
 class Boto3Manager:
@@ -60,6 +61,8 @@ class Boto3Manager:
                     f"https://{service_id}-fips.{region_name}.amazonaws.com"
                 ) if service_id in ["sts"] else endpoint_url
             )
+            instance = collection[service_id][region_name]
+            register_call_tracer(instance if client_type == "client" else instance.meta.client)
 
         return collection[service_id][region_name]
 
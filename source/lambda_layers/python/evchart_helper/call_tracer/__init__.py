@@ -0,0 +1,195 @@
+"""
+evchart_helper.call_tracer
+
+Opt-in instrumentation that records the AWS API calls and database queries made during a handler
+invocation.  When CALL_TRACER_ENABLED is set, each traced handler logs one structured summary line
+with the call counts and latencies per AWS service/operation and per SQL statement shape, and warns
+when the invocation goes over its optional query or AWS call budget.
+"""
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+logger = logging.getLogger("CallTracer")
+logger.setLevel(logging.INFO)
+
+# holds the CallTrace of the current invocation, None when tracing is off
+call_trace = ContextVar("call_trace", default=None)
+
+# longest SQL statement shape kept in the summary
+SQL_SHAPE_MAX_LENGTH = 200
+
+SQL_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+SQL_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+SQL_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+SQL_VALUE_LIST = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+SQL_REPEATED_VALUE_LISTS = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+WHITESPACE = re.compile(r"\s+")
+
+
+def call_tracer_enabled():
+    """
+        Returns True if handlers should trace their AWS and database calls.
+        Set with the CALL_TRACER_ENABLED environment variable.
+    """
+    return os.environ.get("CALL_TRACER_ENABLED", "false").lower() == "true"
+
+
+def get_budget(name):
+    """
+        Returns the budget set in the environment variable name, or None if there is no budget.
+    """
+    budget = os.environ.get(name)
+    return int(budget) if budget else None
+
+
+def get_sql_shape(query):
+    """
+        Returns query with its literals, placeholders and value lists collapsed, so that the
+        statements that only differ in their values are counted together.
+    """
+    shape = SQL_STRING_LITERAL.sub("?", str(query))
+    shape = SQL_NUMBER_LITERAL.sub("?", shape)
+    shape = SQL_PLACEHOLDER.sub("?", shape)
+    shape = WHITESPACE.sub(" ", shape).strip()
+    shape = SQL_VALUE_LIST.sub("(?...)", shape)
+    shape = SQL_REPEATED_VALUE_LISTS.sub("(?...)...", shape)
+    return shape[:SQL_SHAPE_MAX_LENGTH]
+
+
+class CallTrace:
+
+    def __init__(self, handler_name):
+        self.handler_name = handler_name
+        self.aws_calls = {}
+        self.queries = {}
+        self.start_time = time.perf_counter()
+
+    @staticmethod
+    def __add(calls, key, elapsed_ms):
+        count, total_ms, max_ms = calls.get(key, (0, 0.0, 0.0))
+        calls[key] = (count + 1, total_ms + elapsed_ms, max(max_ms, elapsed_ms))
+
+    def add_aws_call(self, service, operation, elapsed_ms):
+        self.__add(self.aws_calls, f"{service}.{operation}", elapsed_ms)
+
+    def add_query(self, query, elapsed_ms):
+        self.__add(self.queries, get_sql_shape(query), elapsed_ms)
+
+    @staticmethod
+    def __summarize(calls):
+        return [
+            {"call": key, "count": count, "total_ms": round(total_ms, 2), "max_ms": round(max_ms, 2)}
+            for key, (count, total_ms, max_ms) in sorted(
+                calls.items(), key=lambda item: item[1][1], reverse=True
+            )
+        ]
+
+    def get_summary(self):
+        return {
+            "handler": self.handler_name,
+            "elapsed_ms": round((time.perf_counter() - self.start_time) * 1000, 2),
+            "aws_call_count": sum(count for count, _, _ in self.aws_calls.values()),
+            "query_count": sum(count for count, _, _ in self.queries.values()),
+            "aws_calls": self.__summarize(self.aws_calls),
+            "queries": self.__summarize(self.queries),
+        }
+
+
+def report(trace):
+    """
+        Logs the summary line of trace, and a warning for every budget it went over.
+    """
+    summary = trace.get_summary()
+    logger.info(json.dumps({"call_trace": summary}))
+
+    for count_name, budget_name in (
+        ("query_count", "CALL_TRACER_QUERY_BUDGET"),
+        ("aws_call_count", "CALL_TRACER_AWS_CALL_BUDGET"),
+    ):
+        budget = get_budget(budget_name)
+        if budget is not None and summary[count_name] > budget:
+            logger.warning(json.dumps({
+                "call_trace_over_budget": trace.handler_name,
+                count_name: summary[count_name],
+                "budget": budget,
+            }))
+
+
+def get_handler_name(function):
+    """
+        Returns the name the trace of a handler is reported under, the name of the Lambda function
+        running it, or outside of Lambda the module of the handler.
+    """
+    return os.environ.get("AWS_LAMBDA_FUNCTION_NAME") or function.__module__.replace(".index", "")
+
+
+def traced_handler(function):
+    """
+    Decorator
+    Description: When call tracing is enabled, traces the AWS and database calls made by the
+    handler and reports them once it returns. Nested traced handlers share the outer trace.
+    """
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        if not call_tracer_enabled() or call_trace.get() is not None:
+            return function(*args, **kwargs)
+
+        trace = CallTrace(get_handler_name(function))
+        token = call_trace.set(trace)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            call_trace.reset(token)
+            report(trace)
+
+    return wrapper
+
+
+@contextmanager
+def trace_query(query):
+    """
+    Context manager
+    Description: Records the time taken by the database query run inside it.
+    """
+    trace = call_trace.get()
+    if trace is None:
+        yield
+        return
+
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_query(query, (time.perf_counter() - start_time) * 1000)
+
+
+def start_aws_call(model, context, **_kwargs):
+    if call_trace.get() is not None:
+        context["call_tracer"] = (
+            model.service_model.service_name, model.name, time.perf_counter()
+        )
+
+
+def end_aws_call(context, **_kwargs):
+    trace = call_trace.get()
+    started_call = context.get("call_tracer")
+    if trace is None or started_call is None:
+        return
+
+    service, operation, start_time = started_call
+    trace.add_aws_call(service, operation, (time.perf_counter() - start_time) * 1000)
+
+
+def register_call_tracer(client):
+    """
+        Hooks the call tracer into the events of a boto3 client.
+    """
+    client.meta.events.register("before-call.*.*", start_aws_call)
+    client.meta.events.register("after-call.*.*", end_aws_call)
+    client.meta.events.register("after-call-error.*.*", end_aws_call)
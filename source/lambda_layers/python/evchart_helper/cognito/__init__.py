@@ -8,9 +8,9 @@ import base64
 import os
 
 from evchart_helper.boto3_manager import boto3_manager
+from evchart_helper.parameter_provider import parameter_provider
 
 cognito_client = boto3_manager.client("cognito-idp")
-ssm_client = boto3_manager.client("ssm")
 
 
 class CognitoUserPool: # pylint: disable=too-few-public-methods
@@ -30,13 +30,10 @@ class CognitoUserPool: # pylint: disable=too-few-public-methods
             Build a dict that contains the information for the deployed AWS Cognito user pool and
             client.
         """
-        parameters_response = {
-            parameter["Name"]: parameter["Value"]
-            for parameter in ssm_client.get_parameters_by_path(
-                Path="/ev-chart/cognito",
-                Recursive=True
-            )["Parameters"]
-        }
+        parameters_response = parameter_provider.get_parameters_by_path(
+            "/ev-chart/cognito",
+            recursive=True
+        )
 
         sub_environment = os.environ.get("SUBENVIRONMENT")
         sub_environment_path = f"/{sub_environment}" if sub_environment else ""
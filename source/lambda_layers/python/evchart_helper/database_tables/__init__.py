@@ -30,4 +30,5 @@ class ModuleDataTables(Enum):
     EvErrorData = "evchart_data_v3.ev_error_data"
     StationPorts = "evchart_data_v3.station_ports"
     NetworkProviders = "evchart_data_v3.network_providers"
-    MetadataHistory = "evchart_data_v3.import_metadata_history"
\ No newline at end of file
+    MetadataHistory = "evchart_data_v3.import_metadata_history"
+    ModuleDataLoadHistory = "evchart_data_v3.module_data_load_history"
\ No newline at end of file
@@ -0,0 +1,161 @@
+"""
+evchart_helper.parameter_provider
+
+Reads SSM parameters and Secrets Manager secrets through a cache that is shared by every invocation
+of a warm container.  Each value is kept for its own ttl and read again by the first request after it
+has expired.  A value that cannot be read again is still returned until it is older than the stale
+window.  The read is made before returning rather than in the background, as Lambda freezes the
+container once the handler returns and a background read might not finish.  Parameters
+registered for prefetch are read together, with batched get_parameters calls, the first time any of
+them is needed.
+"""
+import logging
+import os
+import threading
+import time
+
+from evchart_helper.boto3_manager import boto3_manager
+
+logger = logging.getLogger("ParameterProvider")
+logger.setLevel(logging.INFO)
+
+# seconds that a parameter or secret is returned from the cache without being read again
+PARAMETER_CACHE_TTL_SECONDS = 300
+
+# seconds after the ttl that an expired value is still returned when it cannot be read again
+PARAMETER_CACHE_STALE_SECONDS = 300
+
+# get_parameters accepts at most 10 names in a single call
+GET_PARAMETERS_MAX_NAMES = 10
+
+
+def get_parameter_cache_ttl():
+    """
+        Returns the default number of seconds that parameters and secrets are cached for.
+        Can be overridden with the PARAMETER_CACHE_TTL_SECONDS environment variable.
+    """
+    return int(os.environ.get("PARAMETER_CACHE_TTL_SECONDS", PARAMETER_CACHE_TTL_SECONDS))
+
+
+def get_parameter_cache_stale_window():
+    """
+        Returns the number of seconds that an expired value is served when it cannot be read again.
+        Can be overridden with the PARAMETER_CACHE_STALE_SECONDS environment variable.
+    """
+    return int(os.environ.get("PARAMETER_CACHE_STALE_SECONDS", PARAMETER_CACHE_STALE_SECONDS))
+
+
+class ParameterProvider:
+
+    def __init__(self):
+        # (kind, name) -> (expire time, stale time, value)
+        self._cache = {}
+        self._lock = threading.Lock()
+        self._prefetch_ttls = {}
+
+    def clear(self):
+        """
+            Drops every cached value, the registered prefetch names are kept.
+        """
+        with self._lock:
+            self._cache.clear()
+
+    def register_prefetch(self, name, ttl=None):
+        """
+            Registers an SSM parameter that is read, together with every other registered parameter
+            that is not cached yet, the first time one of them is requested.
+        """
+        self._prefetch_ttls[name] = ttl
+
+    def get_parameter(self, name, ttl=None, refresh=False):
+        """
+            Returns the value of the SSM parameter name.
+        """
+        key = ("parameter", name)
+        if not refresh and name in self._prefetch_ttls and key not in self._cache:
+            self.__prefetch()
+
+        def fetch():
+            return boto3_manager.client("ssm").get_parameter(Name=name)["Parameter"]["Value"]
+
+        return self.__get(key, fetch, ttl, refresh)
+
+    def get_parameters_by_path(self, path, recursive=False, ttl=None, refresh=False):
+        """
+            Returns a dict of the full names and values of the SSM parameters under path.
+        """
+        def fetch():
+            ssm_client = boto3_manager.client("ssm")
+            parameters = {}
+            request = {"Path": path, "Recursive": recursive}
+            while True:
+                response = ssm_client.get_parameters_by_path(**request)
+                parameters.update({
+                    parameter["Name"]: parameter["Value"]
+                    for parameter in response["Parameters"]
+                })
+                if not response.get("NextToken"):
+                    return parameters
+                request["NextToken"] = response["NextToken"]
+
+        return self.__get(("path", path, recursive), fetch, ttl, refresh)
+
+    def get_secret(self, secret_id, ttl=None, refresh=False):
+        """
+            Returns the secret string of the Secrets Manager secret secret_id.
+        """
+        def fetch():
+            return boto3_manager.client("secretsmanager").get_secret_value(
+                SecretId=secret_id
+            )["SecretString"]
+
+        return self.__get(("secret", secret_id), fetch, ttl, refresh)
+
+    def __get(self, key, fetch, ttl, refresh):
+        entry = self._cache.get(key)
+        if entry and not refresh:
+            expire_time, stale_time, value = entry
+            now = time.monotonic()
+            if now < expire_time:
+                return value
+            if now < stale_time:
+                try:
+                    return self.__store(key, fetch(), ttl)
+                except Exception as e: # pylint: disable=broad-exception-caught
+                    # the stale value is served until it can be read again
+                    logger.warning("could not refresh %s: %s", key, repr(e))
+                    return value
+
+        return self.__store(key, fetch(), ttl)
+
+    def __store(self, key, value, ttl):
+        ttl = get_parameter_cache_ttl() if ttl is None else ttl
+        now = time.monotonic()
+        with self._lock:
+            self._cache[key] = (now + ttl, now + ttl + get_parameter_cache_stale_window(), value)
+        return value
+
+    def __prefetch(self):
+        names = sorted(
+            name for name in self._prefetch_ttls if ("parameter", name) not in self._cache
+        )
+        ssm_client = boto3_manager.client("ssm")
+        for start in range(0, len(names), GET_PARAMETERS_MAX_NAMES):
+            try:
+                response = ssm_client.get_parameters(
+                    Names=names[start:start + GET_PARAMETERS_MAX_NAMES]
+                )
+            except Exception as e: # pylint: disable=broad-exception-caught
+                # the parameters are read one at a time instead
+                logger.warning("could not prefetch parameters: %s", repr(e))
+                return
+
+            for parameter in response["Parameters"]:
+                self.__store(
+                    ("parameter", parameter["Name"]),
+                    parameter["Value"],
+                    self._prefetch_ttls[parameter["Name"]],
+                )
+
+
+parameter_provider = ParameterProvider()
@@ -3,10 +3,13 @@ evchart_helper.session
 
 Helper module that handles validation of the user's session when requests come in to the API.
 """
+from functools import wraps
 from http.cookies import SimpleCookie
 import os
 
 from evchart_helper.boto3_manager import boto3_manager
+from evchart_helper.call_tracer import traced_handler
+from feature_toggle import feature_snapshot_scope
 
 dynamodb_resource = boto3_manager.resource("dynamodb")
 
@@ -20,6 +23,8 @@ class SessionManager: # pylint: disable=too-few-public-methods
             valid (and env not dev).
         """
         def decorator(function):
+            @traced_handler
+            @wraps(function)
             def wrapper(*args):
                 event = args[0]
                 event_cookies = (
@@ -35,7 +40,8 @@ class SessionManager: # pylint: disable=too-few-public-methods
                         "body": "Invalid session."
                     }
 
-                return function(*args)
+                with feature_snapshot_scope():
+                    return function(*args)
 
             return wrapper
 
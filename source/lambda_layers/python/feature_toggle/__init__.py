@@ -2,17 +2,61 @@
 feature_toggle
 
 A helper module that handles the definition and processing of the application feature toggles.
+
+Within a feature snapshot scope the feature toggles are read from SSM once, on first use, and every
+FeatureToggleService in the same invocation answers from that snapshot.
 """
 import json
 import logging
 import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
 
 from botocore.exceptions import ClientError, NoCredentialsError
 from evchart_helper.boto3_manager import boto3_manager
+from evchart_helper.call_tracer import traced_handler
 from evchart_helper.custom_exceptions import EvChartFeatureStoreConnectionError
 from evchart_helper.custom_logging import LogEvent
 from feature_toggle.feature_enums import Feature, PseudoFeature
 
+# holds the feature toggles of the current invocation, see feature_snapshot_scope
+feature_snapshot = ContextVar("feature_snapshot", default=None)
+
+# seconds that a feature snapshot is reused across invocations of a warm container, 0 reads
+# the feature toggles again in every invocation
+FEATURE_SNAPSHOT_TTL_SECONDS = 0
+
+# feature toggles of the last snapshot by sub environment, as (expire time, feature toggles)
+feature_snapshot_cache = {}
+
+
+def get_feature_snapshot_ttl():
+    """
+        Returns the number of seconds that a feature snapshot is reused across invocations.
+        Can be overridden with the FEATURE_SNAPSHOT_TTL_SECONDS environment variable.
+    """
+    return int(os.environ.get("FEATURE_SNAPSHOT_TTL_SECONDS", FEATURE_SNAPSHOT_TTL_SECONDS))
+
+
+@contextmanager
+def feature_snapshot_scope():
+    """
+    Context manager, also usable as a handler decorator
+    Description: Feature toggles read inside the scope come from a single snapshot that is
+    fetched on first use. Nested scopes share the snapshot of the outermost scope.
+    """
+    if feature_snapshot.get() is not None:
+        yield
+        return
+
+    token = feature_snapshot.set({})
+    try:
+        yield
+    finally:
+        feature_snapshot.reset(token)
+
 
 def feature_enablement_check(required_feature: Feature):
     """
@@ -23,6 +67,9 @@ def feature_enablement_check(required_feature: Feature):
     otherwise just runs the function
     """
     def decorator(func):
+        @traced_handler
+        @feature_snapshot_scope()
+        @wraps(func)
         def wrapper(*args, **kwargs):
             try:
                 # args[0] for the event
@@ -77,6 +124,36 @@ class FeatureToggleService:
         """
         Returns a list of feature toggles and their values
         Object is a list of {Name, Value}
+        Inside a feature snapshot scope, the list is read once and kept in the snapshot.
+        """
+        snapshot = feature_snapshot.get()
+        if snapshot is None:
+            return self.fetch_all_feature_toggles(log)
+
+        if "feature_toggles" not in snapshot:
+            snapshot["feature_toggles"] = self.get_cached_feature_toggles(log)
+        return snapshot["feature_toggles"]
+
+    def get_cached_feature_toggles(self, log: LogEvent):
+        """
+        Returns the feature toggles of the last snapshot if it is younger than the feature
+        snapshot ttl, otherwise reads them from SSM.
+        """
+        sub_environment = os.environ.get("SUBENVIRONMENT")
+        ttl = get_feature_snapshot_ttl()
+        expire_time, feature_toggles = feature_snapshot_cache.get(sub_environment, (0, None))
+        if ttl > 0 and time.monotonic() < expire_time:
+            return feature_toggles
+
+        feature_toggles = self.fetch_all_feature_toggles(log)
+        if ttl > 0:
+            feature_snapshot_cache[sub_environment] = (time.monotonic() + ttl, feature_toggles)
+        return feature_toggles
+
+    def fetch_all_feature_toggles(self, log: LogEvent):
+        """
+        Returns a list of feature toggles and their values read from SSM
+        Object is a list of {Name, Value}
         """
         sub_environment = os.environ.get("SUBENVIRONMENT")
         sub_environment_path = f"/{sub_environment}" if sub_environment else ""
@@ -128,6 +205,12 @@ class FeatureToggleService:
         Parameter : name as a string this is the name of the feature toggle
         returns the string value of the parameter should be True or False
         """
+        if feature_snapshot.get() is not None:
+            for feature_toggle in self.get_all_feature_toggles(log):
+                if feature_toggle["Name"] == name:
+                    return str(feature_toggle["Value"])
+            return None
+
         sub_environment = os.environ.get("SUBENVIRONMENT")
         sub_environment_path = f"/{sub_environment}" if sub_environment else ""
 
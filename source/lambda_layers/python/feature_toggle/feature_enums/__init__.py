@@ -53,6 +53,15 @@ class Feature(Enum):
     EXCLUDED_OUTAGES_MODULE_FOUR = "excluded-outages-module-four"
     REGISTER_NON_FED_FUNDED_STATION = "register-non-fed-funded-station"
     QUERY_DOWNLOAD_REFACTOR = "query-download-refactor"
+    ASYNC_FUSED_PIPELINE = "async-fused-pipeline"
+    ASYNC_PARQUET_TRANSFORM = "async-parquet-transform"
+    VALIDATION_FAIL_FAST = "validation-fail-fast"
+    UNIQUE_KEY_FINGERPRINT = "unique-key-fingerprint"
+    BULK_LOAD_HISTORY = "bulk-load-history"
+    AURORA_CONNECTION_REUSE = "aurora-connection-reuse"
+    ASYNC_CHUNKED_VALIDATION = "async-chunked-validation"
+    COMPACT_DTYPES = "compact-dtypes"
+    TYPED_UPLOAD_FRAME = "typed-upload-frame"
 
 
 # Use the same name as the real feature toggle and the value being the environments where the
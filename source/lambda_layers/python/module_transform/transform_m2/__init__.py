@@ -9,6 +9,7 @@ from dateutil import tz
 import pandas
 from numpy import nan as NaN
 from feature_toggle.feature_enums import Feature
+from module_validation import blank_cells, is_text_column
 
 
 def allow_null_charging_sessions(feature_toggle_set, df):
@@ -21,9 +22,7 @@ def allow_null_charging_sessions(feature_toggle_set, df):
     transform_df = df.copy()
     if Feature.ASYNC_BIZ_MAGIC_MODULE_2 in feature_toggle_set:
         start_time = datetime.now(tz.gettz("UTC"))
-        no_session = (
-            transform_df['session_id'].astype(str) == ""
-        )
+        no_session = blank_cells(transform_df['session_id'])
 
         transform_df.loc[no_session, 'session_id'] = (
             transform_df
@@ -39,8 +38,13 @@ def allow_null_charging_sessions(feature_toggle_set, df):
         transform_df.loc[no_session, ['user_reports_no_data']] = 1
 
 
-        transform_df.replace('', None, regex=True, inplace=True)
-        transform_df.replace({NaN: None}, inplace=True)
+        # the typed columns of a typed upload frame already hold their blanks as missing values
+        text_columns = [
+            column for column, data in transform_df.items() if is_text_column(data)
+        ]
+        transform_df[text_columns] = (
+            transform_df[text_columns].replace('', None, regex=True).replace({NaN: None})
+        )
     
     for bizmagic_datetime in ['session_start', 'session_end']:
         transform_df[bizmagic_datetime] = pandas.to_datetime(
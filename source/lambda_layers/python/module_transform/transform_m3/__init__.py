@@ -4,6 +4,7 @@ Transforming the dataframe to acceptable datatypes to prepare for database inser
 """
 
 from feature_toggle.feature_enums import Feature
+from module_validation import blank_cells
 import pandas
 
 
@@ -14,9 +15,7 @@ def allow_null_uptime(feature_toggle_set, df):
     """
     transform_df = df.copy()
     if Feature.ASYNC_BIZ_MAGIC_MODULE_3 in feature_toggle_set:
-        correct_nulls = (
-            transform_df['uptime'].astype(str).str.lower() == ""
-        )
+        correct_nulls = blank_cells(transform_df['uptime'])
         transform_df.loc[correct_nulls, ['uptime']] = None
         transform_df.loc[~correct_nulls, ['user_reports_no_data']] = 0
         transform_df.loc[correct_nulls, ['user_reports_no_data']] = 1
@@ -8,6 +8,7 @@ from dateutil import tz
 
 import pandas
 from feature_toggle.feature_enums import Feature
+from module_validation import blank_cells, is_text_column
 
 
 def allow_null_outages(feature_toggle_set, df):
@@ -18,19 +19,23 @@ def allow_null_outages(feature_toggle_set, df):
     transform_df = df.copy()
     if Feature.ASYNC_BIZ_MAGIC_MODULE_4 in feature_toggle_set:
         start_time = datetime.now(tz.gettz("UTC"))
-        correct_nulls = (
-            (transform_df['outage_id'] == "") &
-            (transform_df['outage_duration'] == "")
-        )
+        no_outage_id = blank_cells(transform_df['outage_id'])
+        correct_nulls = no_outage_id & blank_cells(transform_df['outage_duration'])
         transform_df.loc[transform_df["station_id"] != "", ['user_reports_no_data']] = 0
         transform_df.loc[correct_nulls, ['user_reports_no_data']] = 1
         transform_df.loc[correct_nulls, ['outage_duration']] = None
         # creating system generated outage_id for null
-        transform_df.loc[correct_nulls, 'outage_id'] = (
-            transform_df.groupby('outage_id')
+        generated_outage_ids = (
+            transform_df.groupby(no_outage_id)
             .cumcount()
             .apply(lambda x: (start_time + timedelta(milliseconds=x)).strftime("%Y-%m-%d %H:%M:%S"))
         )
+        if not is_text_column(transform_df['outage_id']):
+            # the outage_id of a typed upload frame is already a datetime column
+            generated_outage_ids = pandas.to_datetime(generated_outage_ids).dt.tz_localize(
+                transform_df['outage_id'].dt.tz
+            )
+        transform_df.loc[correct_nulls, 'outage_id'] = generated_outage_ids
 
     transform_df['outage_id'] = pandas.to_datetime(
         transform_df['outage_id'],
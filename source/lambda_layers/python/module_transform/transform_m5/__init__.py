@@ -4,6 +4,7 @@ Transforming the dataframe to acceptable datatypes to prepare for database inser
 """
 
 from feature_toggle.feature_enums import Feature
+from module_validation import blank_cells
 import pandas
 
 
@@ -14,11 +15,7 @@ def allow_null_federal_maintenance(feature_toggle_set, df):
     """
     transform_df = df.copy()
     if Feature.ASYNC_BIZ_MAGIC_MODULE_5 in feature_toggle_set:
-        correct_nulls = (
-            transform_df['maintenance_cost_total']
-            .astype(str)
-            .str.lower()
-        ) == ""
+        correct_nulls = blank_cells(transform_df['maintenance_cost_total'])
         transform_df.loc[correct_nulls, ['maintenance_cost_total']] = None
         transform_df.loc[~correct_nulls, ['user_reports_no_data']] = 0
         transform_df.loc[correct_nulls, ['user_reports_no_data']] = 1
@@ -5,6 +5,7 @@ Transforming the dataframe to acceptable datatypes to prepare for database inser
 
 from database_central_config import DatabaseCentralConfig
 from feature_toggle.feature_enums import Feature
+from module_validation import blank_cells, is_text_column
 from numpy import nan as NaN
 import pandas
 
@@ -42,7 +43,7 @@ def allow_null_capital_install_costs(feature_toggle_set, df):
             transform_df[field] = None
 
     if Feature.ASYNC_BIZ_MAGIC_MODULE_9 in feature_toggle_set:
-        correct_nulls = (transform_df[list(bizmagic_decimal_fields)] == "").all(axis=1)
+        correct_nulls = blank_cells(transform_df[list(bizmagic_decimal_fields)]).all(axis=1)
         for bizmagic_decimal in bizmagic_decimal_fields:
             transform_df.loc[correct_nulls, [bizmagic_decimal]] = None
         transform_df.loc[~correct_nulls, ['user_reports_no_data']] = 0
@@ -57,8 +58,8 @@ def allow_null_capital_install_costs(feature_toggle_set, df):
                 transform_df[bizmagic_decimal]
             ).convert_dtypes()
 
-    # converts der_acq_owned field to a boolean binary value
-    if "der_acq_owned" in transform_df:
+    # converts der_acq_owned field to a boolean binary value, unless it is already typed
+    if "der_acq_owned" in transform_df and is_text_column(transform_df["der_acq_owned"]):
         transform_df["der_acq_owned"] = (
             transform_df["der_acq_owned"]
             .str.upper()
@@ -3,7 +3,10 @@ module_validation
 
 A helper module that provides functions that aid in common validation processes for module data.
 """
+import copy
 import csv
+import hashlib
+import io
 import json
 import logging
 import os
@@ -14,12 +17,17 @@ from datetime import datetime
 from enum import Enum
 from pathlib import Path
 
-import awswrangler
+import numpy
 import pandas
 from database_central_config import DatabaseCentralConfig
 from error_report_messages_enum import ErrorReportMessages
 from evchart_helper import aurora
-from evchart_helper.api_helper import execute_query, get_station_and_port_uuid, get_station_uuid
+from evchart_helper.api_helper import (
+    execute_query,
+    execute_query_fetchone,
+    get_station_and_port_uuids,
+    get_station_uuid,
+)
 from evchart_helper.custom_exceptions import (
     EvChartDatabaseAuroraQueryError,
     EvChartDatabaseHandlerConnectionError,
@@ -30,11 +38,10 @@ from evchart_helper.custom_exceptions import (
 )
 from evchart_helper.database_tables import ModuleDataTables
 from feature_toggle.feature_enums import Feature
+from module_validation.bulk_loader import load_module_data
 from schema_compliance.authorization_registration import (
-    stations_not_active,
-    stations_not_authorized,
-    stations_not_registered,
-    unauthorized_stations_for_dr,
+    get_station_eligibility,
+    station_eligibility_conditions,
 )
 
 import_metadata = ModuleDataTables["Metadata"].value
@@ -44,6 +51,58 @@ logger.setLevel(logging.INFO)
 # create empty lists to populate with appropriate headers
 module_definitions = {}
 module_json_object = {}
+# path of the module definitions currently loaded into module_json_object
+loaded_module_path = {}
+# compiled ValidationPlan objects keyed by (module number, active feature toggles)
+validation_plans = {}
+central_config = {}
+
+# unique key constraints of each module table when the central config is not used
+UNIQUE_KEY_CONSTRAINTS = {
+    "2": ("station_uuid", "port_id", "session_id"),
+    "3": ("station_uuid", "port_id", "uptime_reporting_start", "uptime_reporting_end"),
+    "4": ("station_uuid", "outage_id", "port_id"),
+    "5": ("station_uuid", "maintenance_report_start"),
+    "6": ("station_uuid", "operator_name"),
+    "7": ("station_uuid", "program_report_year"),
+    "8": ("station_uuid", "der_type"),
+    "9": ("station_uuid",),
+}
+# values of boolean fields written to the module tables, anything else is written as NULL
+BOOLEAN_VALUES = {"TRUE": True, "FALSE": False}
+# module table column MySQL generates from the hash of each row's unique key constraints
+UNIQUE_KEY_FINGERPRINT = "unique_key_fingerprint"
+
+# Regular expressions mirroring the grammar accepted by int() and float(), used
+# to find the offending cells once a column fails the vectorized conversion.
+_DIGIT_PART = r"\d(?:_?\d)*"
+INTEGER_PATTERN = re.compile(rf"\s*[+-]?{_DIGIT_PART}\s*")
+DECIMAL_PATTERN = re.compile(
+    rf"\s*[+-]?(?:(?:(?:{_DIGIT_PART})?\.{_DIGIT_PART}|{_DIGIT_PART}\.?)"
+    rf"(?:[eE][+-]?{_DIGIT_PART})?|inf(?:inity)?|nan)\s*",
+    re.IGNORECASE,
+)
+DATETIME_PATTERN = re.compile(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z?\Z")
+# utc offset at the end of a datetime, dropped to keep the clock time the upload was written in
+UTC_OFFSET_PATTERN = r"(?:Z|[+-]\d{2}:?\d{2})$"
+DAYS_IN_MONTH = numpy.array([31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+# widest column converted to a fixed-width numpy string array for vectorized string ops
+FIXED_WIDTH_LIMIT = 64
+# conditions found before validation stops when the VALIDATION_FAIL_FAST feature is enabled
+VALIDATION_ERROR_BUDGET = 1000
+# identifier columns repeated across the rows of an upload, held as categoricals in the validated
+# dataframe when the COMPACT_DTYPES feature is enabled
+CATEGORICAL_COLUMNS = frozenset(
+    {"station_id", "station_uuid", "network_provider", "port_id", "upload_id"}
+)
+# dtypes of the validated dataframe columns when the COMPACT_DTYPES feature is enabled, keyed by
+# the module datatype.  datetime columns are always datetime64[ns, UTC]
+COMPACT_DTYPES = {
+    "decimal": "Float64",
+    "integer": "Int64",
+    "boolean": "boolean",
+    "string": "string[pyarrow]",
+}
 
 
 class ModuleDefinitionEnum(Enum):
@@ -60,7 +119,17 @@ class ModuleDefinitionEnum(Enum):
 
 def load_module_definitions(
     module_path="/opt/python/module_validation/module_definitions",
+    *,
+    reload=False,
 ):
+    """
+    Loads the module JSON definitions into module_json_object and
+    module_definitions.  The definitions are read once per warm container;
+    subsequent calls for the same path are no-ops unless reload is set.
+    """
+    if not reload and loaded_module_path.get("path") == os.path.abspath(module_path):
+        return
+
     try:
         # Path is set for the file structure when deployed as a Lambda layer.
         module_path = Path(module_path)
@@ -87,6 +156,8 @@ def load_module_definitions(
                         module_definitions[module_key]["recommended_data"].append(
                             field["field_name"]
                         )
+        loaded_module_path["path"] = os.path.abspath(module_path)
+        clear_validation_plans()
     except FileNotFoundError as e:
         raise EvChartFileNotFoundError(message="Error during load_module_definitions") from e
 
@@ -106,25 +177,21 @@ def validate_station_id(
             )
             if station_id_network_provider_errors:
                 conditions.extend(station_id_network_provider_errors)
-            df = set_station_uuid(df, dr_id, cursor, conditions)
-            # validating station status
+            # validating station registration, status and authorization
+            # with a single lookup of every distinct station in the upload
             if not conditions:
-                conditions.extend(stations_not_registered(df=df))
-
+                eligibility = get_station_eligibility(
+                    cursor,
+                    zip(df["station_id"], df["network_provider"]),
+                    dr_id,
+                    sr_id,
+                    feature_toggle_set,
+                )
                 conditions.extend(
-                    stations_not_active(
-                        cursor=cursor, dr_id=dr_id, df=df, feature_toggle_set=feature_toggle_set
+                    station_eligibility_conditions(
+                        df, eligibility, dr_id, sr_id, recipient_type, feature_toggle_set
                     )
                 )
-
-                if recipient_type == 'direct-recipient':
-                    unauthorized_stations = unauthorized_stations_for_dr(cursor, dr_id, df)
-                    conditions.extend(unauthorized_stations)
-
-                if sr_id:
-                    conditions.extend(
-                        stations_not_authorized(cursor=cursor, dr_id=dr_id, sr_id=sr_id, df=df)
-                    )
         return conditions
     except EvChartUserNotAuthorizedError as e:
         raise EvChartUserNotAuthorizedError(message="Improper recipient type") from e
@@ -204,18 +271,48 @@ def set_station_uuid(df, dr_id, cursor, conditions=None):
         raise EvChartDatabaseAuroraQueryError(message=message) from e
 
 def set_station_and_port_ids(df: pandas.DataFrame, cursor, conditions=None):
+    """
+    Sets station_uuid and network_provider_uuid, and port_id_upload and
+    port_uuid for rows with a port_id, resolving each distinct station once
+    with bulk queries and joining the results back onto df
+    """
     try:
-        if not conditions:
+        if not conditions and not df.empty:
+            station_keys = ["station_id", "network_provider"]
+            port_keys = station_keys + ["port_id"]
+            registered = get_station_and_port_uuids(
+                cursor, list(df[station_keys].drop_duplicates().itertuples(index=False, name=None))
+            )
+
+            stations = df[station_keys].merge(
+                registered.drop_duplicates(subset=station_keys)[
+                    station_keys + ["station_uuid", "network_provider_uuid"]
+                ],
+                on=station_keys,
+                how="left",
+            )
+            df["station_uuid"] = stations["station_uuid"].to_numpy()
+            df["network_provider_uuid"] = stations["network_provider_uuid"].to_numpy()
+
             # test developer calling without port_id
-            for index, row in df.iterrows():
-                port_id = row.get('port_id')
-                station_ids_dict = get_station_and_port_uuid(cursor, row['station_id'], row['network_provider'], port_id)
-                df.at[index, 'station_uuid'] = station_ids_dict.get('station_uuid')
-                df.at[index, 'network_provider_uuid'] = station_ids_dict.get('network_provider_uuid')
-
-                if port_id:
-                    df.at[index, 'port_id_upload'] = port_id
-                    df.at[index, 'port_uuid'] = station_ids_dict.get('port_uuid')
+            has_port = (
+                df["port_id"].to_numpy(dtype=object).astype(bool)
+                if "port_id" in df.columns
+                else numpy.zeros(len(df), dtype=bool)
+            )
+            if has_port.any():
+                ports = registered.dropna(subset=["port_id"]).drop_duplicates(subset=port_keys)
+                matched = (
+                    df.loc[has_port, port_keys]
+                    .astype(object)
+                    .merge(ports[port_keys + ["port_uuid"]].astype(object), on=port_keys, how="left")
+                )
+                port_uuid = numpy.full(len(df), None, dtype=object)
+                port_uuid[has_port] = matched["port_uuid"].astype(object).where(
+                    matched["port_uuid"].notna(), None
+                ).to_numpy()
+                df["port_id_upload"] = df["port_id"].where(has_port)
+                df["port_uuid"] = port_uuid
         return df
     except Exception as e:
         message = f"Error in set_station_and_port_ids: {repr(e)}"
@@ -234,15 +331,42 @@ def csv_to_dataframe(csv_data):
         raise EvChartModuleValidationError(message=f"Unable to convert to dataframe: {e}") from e
 
 
-def get_dataframe_from_csv(body):
+def read_csv_to_dataframe(body):
+    """
+    Parses the csv body with the pandas C parser, reading every value as a string.  Blank lines are
+    kept until the header is set so that each row keeps the index of its one-indexed Excel row, and
+    missing values are read as empty strings.  Files with a row wider than the header fall back to
+    csv_to_dataframe, which names the extra columns None.
+    """
     try:
-        raw_data = body.splitlines()
-        logging.debug("raw data set: %s", raw_data)
+        df = pandas.read_csv(
+            io.StringIO(body),
+            header=None,
+            dtype=str,
+            na_filter=False,
+            skip_blank_lines=False,
+            engine="c",
+        )
+    except pandas.errors.ParserError:
+        return csv_to_dataframe(csv.reader(io.StringIO(body)))
+
+    try:
+        df.columns = df.iloc[0]
+        df = df.iloc[1:]
+        # set df.index to match assumption of one-indexed Excel worksheet
+        df.index += 1
+        return drop_blank_rows(df)
+    except Exception as e:
+        raise EvChartModuleValidationError(message=f"Unable to convert to dataframe: {e}") from e
 
-        if not raw_data[0][0].isascii():
-            raw_data[0] = raw_data[0][1:]
 
-        return csv_to_dataframe(csv.reader(raw_data))
+def get_dataframe_from_csv(body):
+    try:
+        if not body[0].isascii():
+            # drop the byte order mark
+            body = body[1:]
+
+        return read_csv_to_dataframe(body)
     except EvChartModuleValidationError as e:
         raise EvChartModuleValidationError(message=f"{e}") from e
     except Exception as e:
@@ -250,37 +374,319 @@ def get_dataframe_from_csv(body):
 
 
 def drop_sample_rows(df):
-    drop_df = df.copy()
-    if 3 in drop_df.index and all(drop_df.loc[3].T.isin(["Required", "Recommended"])):
-        drop_df = drop_df.drop(3)
+    sample_rows = []
+    if 3 in df.index and all(df.loc[3].T.isin(["Required", "Recommended"])):
+        sample_rows.append(3)
 
-    if 2 in drop_df.index and all(
-        drop_df.loc[2].T.str.match(
+    if 2 in df.index and all(
+        df.loc[2].T.str.match(
             r"String\(|Categorical ?String\(|" r"DateTime|Decimal ?\(|Boolean|Integer\("
         )
     ):
-        drop_df = drop_df.drop(2)
+        sample_rows.append(2)
 
-    return drop_df
+    if not sample_rows:
+        return df
+    return df.drop(sample_rows)
 
 
 def _get_module_fields_by_number(module_number: int, feature_toggle_set=frozenset()):
-    fields = []
-
     if not isinstance(module_number, int):
         logger.error("Module number must be of type int")
         raise TypeError("Module number must be of type int")
+
+    return get_validation_plan(module_number, feature_toggle_set).module_fields
+
+
+def _get_central_config() -> DatabaseCentralConfig:
+    """
+    Returns the database central config, read from disk once per warm
+    container.  The instance is private to the validation plans; callers
+    that need the config should use get_validation_plan() instead.
+    """
+    if "config" not in central_config:
+        central_config["config"] = DatabaseCentralConfig()
+    return central_config["config"]
+
+
+class ValidationPlan:
+    """
+    Compiled validation rules for one module under one set of active feature
+    toggles, built by get_validation_plan() and shared by every upload
+    processed in the same container.  Treat as read-only.
+
+        module_number (int)
+        module_fields: field definitions in the shape historically returned
+            by _get_module_fields_by_number (dict keyed by field_name when
+            the DATABASE_CENTRAL_CONFIG feature is enabled, list otherwise)
+        fields (dict): field definitions keyed by field_name, each including
+            "field_name"
+        datatypes (dict): lower-cased validation datatype keyed by field_name
+        required_fields, recommended_fields, required_empty_allowed_fields,
+        boolean_fields, numeric_fields, datetime_fields (frozenset)
+        unique_key_constraints (tuple): unique key from the central config,
+            empty when definitions come from the module JSON files
+    """
+
+    def __init__(self, module_number: int, module_fields, unique_key_constraints=()):
+        self.module_number = module_number
+        self.module_fields = module_fields
+        if isinstance(module_fields, dict):
+            self.fields = {
+                field_name: {**definition, "field_name": field_name}
+                for field_name, definition in module_fields.items()
+            }
+        else:
+            self.fields = {field["field_name"]: field for field in module_fields}
+        self.datatypes = {
+            field_name: str(definition.get("datatype", "")).lower()
+            for field_name, definition in self.fields.items()
+        }
+        self.required_fields = frozenset(
+            field_name
+            for field_name, definition in self.fields.items()
+            if definition.get("required", False)
+        )
+        self.recommended_fields = frozenset(self.fields) - self.required_fields
+        self.required_empty_allowed_fields = frozenset(
+            field_name
+            for field_name in self.required_fields
+            if self.fields[field_name].get("required_empty_allowed", False)
+        )
+        self.boolean_fields = self._fields_of_type("boolean")
+        self.numeric_fields = self._fields_of_type("decimal", "integer")
+        self.datetime_fields = self._fields_of_type("datetime")
+        self.unique_key_constraints = tuple(unique_key_constraints)
+
+    def _fields_of_type(self, *datatypes) -> frozenset:
+        return frozenset(
+            field_name
+            for field_name, datatype in self.datatypes.items()
+            if datatype in datatypes
+        )
+
+    def present(self, field_names, df: pandas.DataFrame) -> list:
+        """
+        Returns the given fields that are columns of df, in column order
+        """
+        return [column for column in df.columns if column in field_names]
+
+
+def get_validation_plan(module_number, feature_toggle_set=frozenset()) -> ValidationPlan:
+    """
+    Returns the memoized ValidationPlan for a module and set of active
+    feature toggles, compiling it on first use.  Module definitions are read
+    from the central config when the DATABASE_CENTRAL_CONFIG feature is
+    enabled, otherwise from the module JSON files loaded by
+    load_module_definitions().
+    """
+    key = (int(module_number), frozenset(feature_toggle_set))
+    if key in validation_plans:
+        return validation_plans[key]
+
+    module_number = key[0]
+    module_fields = []
+    unique_key_constraints = ()
     if Feature.DATABASE_CENTRAL_CONFIG in feature_toggle_set:
-        config = DatabaseCentralConfig()
-        fields = config.module_validation(module_number)
-    else:
-        if module_number in module_json_object:
-            fields = module_json_object[module_number]
-    if not fields:
+        config = _get_central_config()
+        # copy the definitions so that the cached config is never mutated
+        module_fields = copy.deepcopy(config.module_validation(module_number))
+        if module_fields:
+            unique_key_constraints = config.unique_key_constraints(module_number)
+    elif module_number in module_json_object:
+        module_fields = module_json_object[module_number]
+    if not module_fields:
         logger.error("Module %s does not exist.", module_number)
         raise ValueError(f"Module {module_number} does not exist.")
 
-    return fields
+    validation_plans[key] = ValidationPlan(module_number, module_fields, unique_key_constraints)
+    return validation_plans[key]
+
+
+def clear_validation_plans():
+    """
+    Discards the compiled validation plans and cached central config so that
+    they are rebuilt on next use
+    """
+    validation_plans.clear()
+    central_config.clear()
+
+
+def _column_as_text(column: pandas.Series) -> pandas.Series:
+    # cells missing from short csv rows come through as None; treat them as blank
+    return column.fillna("").astype(str)
+
+
+def _text_lengths(text: pandas.Series) -> numpy.ndarray:
+    return numpy.fromiter(map(len, text.to_numpy(dtype=object)), dtype=numpy.int64, count=len(text))
+
+
+def _fixed_width_text(text: pandas.Series, lengths: numpy.ndarray):
+    """
+    Returns the column as a fixed-width numpy string array so numpy.char
+    ufuncs can be used, or None when the widest cell would make the array
+    too large to be worth building.
+    """
+    if lengths.size and lengths.max() > FIXED_WIDTH_LIMIT:
+        return None
+    return text.to_numpy(dtype=str)
+
+
+def _has_sign_prefix(text: pandas.Series, fixed_width) -> numpy.ndarray:
+    if fixed_width is None:
+        return text.str[:1].isin({"-", "+"}).to_numpy()
+    return numpy.char.startswith(fixed_width, "-") | numpy.char.startswith(fixed_width, "+")
+
+
+def _conditions_from_masks(column: pandas.Series, field_name, checks) -> list:
+    """
+    Builds the condition list for a column from (mask, error_description)
+    pairs. Conditions are ordered by row and then by the order of the checks,
+    matching the row-by-row evaluation of the validators.
+    """
+    positions = []
+    check_orders = []
+    for check_order, (mask, _) in enumerate(checks):
+        hits = numpy.flatnonzero(numpy.asarray(mask, dtype=bool))
+        positions.append(hits)
+        check_orders.append(numpy.full(len(hits), check_order))
+
+    if sum(len(hits) for hits in positions) == 0:
+        return []
+
+    positions = numpy.concatenate(positions)
+    check_orders = numpy.concatenate(check_orders)
+    order = numpy.lexsort((check_orders, positions))
+    error_rows = column.index.take(positions[order]).tolist()
+    descriptions = [checks[check_order][1] for check_order in check_orders[order].tolist()]
+
+    return [
+        {
+            "error_row": error_row,
+            "header_name": field_name,
+            "error_description": error_description,
+        }
+        for error_row, error_description in zip(error_rows, descriptions)
+    ]
+
+
+def _missing_value_masks(blank, required, required_empty_allowed):
+    """
+    Splits blank cells into an error mask and a notice mask depending on
+    whether the field is required and may be left empty.
+    """
+    no_rows = numpy.zeros(len(blank), dtype=bool)
+    if not required:
+        return no_rows, no_rows
+    if required_empty_allowed:
+        return no_rows, blank
+    return blank, no_rows
+
+
+def _parse_numbers(text: pandas.Series, to_check: numpy.ndarray, dtype, pattern):
+    """
+    Converts the cells in to_check with the same semantics as int()/float().
+    The whole column is converted in one call; only when that fails is the
+    pattern used to find the cells that cannot be converted.
+
+    Returns the mask of cells that could be converted and their values.
+    """
+    candidates = text.to_numpy(dtype=object)[to_check]
+    try:
+        return to_check, candidates.astype(dtype)
+    except (ValueError, OverflowError):
+        pass
+
+    is_number = to_check.copy()
+    is_number[to_check] = text[to_check].str.fullmatch(pattern).to_numpy(dtype=bool)
+    candidates = text.to_numpy(dtype=object)[is_number]
+    try:
+        return is_number, candidates.astype(dtype)
+    except OverflowError:
+        return is_number, numpy.array([int(value) for value in candidates], dtype=object)
+
+
+def _fromisoformat_is_valid(value):
+    try:
+        _ = datetime.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _valid_ocpi_timestamps(text: pandas.Series) -> numpy.ndarray:
+    """
+    Vectorized equivalent of matching DATETIME_PATTERN and then parsing the
+    value with datetime.fromisoformat(). ASCII cells are checked on their
+    code points: the layout must match and the digits in their fixed
+    positions must form a real calendar date and time of day. Cells with
+    non-ASCII characters, and columns too wide for a fixed-width array, are
+    checked one by one.
+    """
+    lengths = _text_lengths(text)
+    fixed_width = _fixed_width_text(text, lengths)
+    if fixed_width is None:
+        valid = text.str.match(DATETIME_PATTERN).to_numpy(dtype=bool)
+        valid[valid] = text[valid].map(_fromisoformat_is_valid).to_numpy(dtype=bool)
+        return valid
+    width = fixed_width.dtype.itemsize // 4
+    if width < 19:
+        return numpy.zeros(len(text), dtype=bool)
+
+    code_points = fixed_width.view(numpy.uint32).reshape(-1, width)
+    is_digit = (code_points >= ord("0")) & (code_points <= ord("9"))
+    layout = (
+        is_digit[:, [0, 1, 2, 3, 5, 6, 8, 9, 11, 12, 14, 15, 17, 18]].all(axis=1)
+        & (code_points[:, 4] == ord("-"))
+        & (code_points[:, 7] == ord("-"))
+        & (code_points[:, 10] == ord("T"))
+        & (code_points[:, 13] == ord(":"))
+        & (code_points[:, 16] == ord(":"))
+        & (lengths >= 19)
+    )
+
+    # optional fractional seconds and "Z" suffix after YYYY-MM-DDTHH:MM:SS
+    last_character = code_points[numpy.arange(len(text)), numpy.clip(lengths, 1, width) - 1]
+    fraction_end = lengths - (last_character == ord("Z"))
+    in_fraction = (numpy.arange(width) >= 20) & (numpy.arange(width) < fraction_end[:, None])
+    if width > 19:
+        has_fraction = (code_points[:, 19] == ord(".")) & (fraction_end >= 21)
+    else:
+        has_fraction = numpy.zeros(len(text), dtype=bool)
+    valid = layout & (
+        (fraction_end == 19) | (has_fraction & (is_digit | ~in_fraction).all(axis=1))
+    )
+
+    digits = code_points[valid, :19].astype(numpy.int64) - ord("0")
+
+    def component(start, digit_count):
+        value = numpy.zeros(len(digits), dtype=numpy.int64)
+        for position in range(start, start + digit_count):
+            value = value * 10 + digits[:, position]
+        return value
+
+    year, month, day = component(0, 4), component(5, 2), component(8, 2)
+    hour, minute, second = component(11, 2), component(14, 2), component(17, 2)
+    leap_year = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    days_in_month = DAYS_IN_MONTH[numpy.clip(month, 1, 12) - 1] + (leap_year & (month == 2))
+    valid[valid] = (
+        (year >= 1)
+        & (month >= 1)
+        & (month <= 12)
+        & (day >= 1)
+        & (day <= days_in_month)
+        & (hour <= 23)
+        & (minute <= 59)
+        & (second <= 59)
+    )
+
+    # \d in DATETIME_PATTERN also matches non-ASCII digits
+    non_ascii = (code_points > 127).any(axis=1)
+    if non_ascii.any():
+        valid[non_ascii] = text[non_ascii].str.match(DATETIME_PATTERN).to_numpy(
+            dtype=bool
+        ) & text[non_ascii].map(_fromisoformat_is_valid).to_numpy(dtype=bool)
+    return valid
 
 
 def _datetime_is_valid(definition, column: pandas.Series, module_number, feature_toggle_set: set):
@@ -298,60 +704,32 @@ def _datetime_is_valid(definition, column: pandas.Series, module_number, feature
         required_empty_allowed = definition.get("required_empty_allowed", False)
     elif (Feature.MODULE_5_NULLS in feature_toggle_set and int(module_number) == 5):
         is_nullable = definition.get("is_nullable")
-    conditions = []
-    notice_conditions = []
 
-    for index, value in column.items():
-
-        if value == "":
-            if required:
-                if required_empty_allowed:
-                    notice_conditions.append(
-                        {
-                            "error_row": index,
-                            "header_name": field_name,
-                            "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                                column_name=field_name
-                            ),
-                        }
-                    )
-                    continue
+    text = _column_as_text(column)
+    blank = text.eq("").to_numpy()
+    missing, notice = _missing_value_masks(blank, required, required_empty_allowed)
+    to_check = ~blank
+    if is_nullable:
+        to_check &= text.str.lower().ne("null").to_numpy()
 
-                conditions.append(
-                    {
-                        "error_row": index,
-                        "header_name": field_name,
-                        "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                            column_name=field_name
-                        ),
-                    }
-                )
-            continue
-
-        if value.lower() == "null":
-            if is_nullable:
-                continue
-        try:
-            _ = datetime.fromisoformat(value)
-        except ValueError:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.INVALID_TIMESTAMP_FORMAT.format(),
-                }
-            )
-            continue
+    # not checking for iso formatting for operational_date field in module 1: station registration
+    if int(module_number) == ModuleDefinitionEnum.MODULE_1.value:
+        valid = text.map(_fromisoformat_is_valid).to_numpy(dtype=bool)
+    else:
+        valid = _valid_ocpi_timestamps(text)
 
-        # not checking for iso formatting for operational_date field in module 1: station registration
-        if not re.match(r"^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z?$", value) and int(module_number) != ModuleDefinitionEnum.MODULE_1.value:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.INVALID_TIMESTAMP_FORMAT.format(),
-                }
-            )
+    missing_message = ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+        column_name=field_name
+    )
+    conditions = _conditions_from_masks(
+        column,
+        field_name,
+        [
+            (missing, missing_message),
+            (to_check & ~valid, ErrorReportMessages.INVALID_TIMESTAMP_FORMAT.format()),
+        ],
+    )
+    notice_conditions = _conditions_from_masks(column, field_name, [(notice, missing_message)])
 
     return (conditions, notice_conditions)
 
@@ -365,74 +743,44 @@ def _string_data_is_valid(
     max_length = definition.get("max_length", float("inf"))
     required = definition.get("required", False)
     required_empty_allowed = False
-    is_nullable = False
 
     if (Feature.ASYNC_BIZ_MAGIC_MODULE_2 in feature_toggle_set and int(module_number) == 2) or int(module_number) == 1:
         required_empty_allowed = definition.get("required_empty_allowed", False)
-    conditions = []
-    notice_conditions = []
-
-    for index, value in column.items():
-        # checking 'nan' specifically for module 1 port_uuid field
-        if value == "" or (int(module_number) == 1 and value == "nan"):
-            if required:
-                if required_empty_allowed:
-                    notice_conditions.append(
-                        {
-                            "error_row": index,
-                            "header_name": field_name,
-                            "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                                column_name=field_name
-                            ),
-                        }
-                    )
-                    continue
 
-                conditions.append(
-                    {
-                        "error_row": index,
-                        "header_name": field_name,
-                        "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                            column_name=field_name
-                        ),
-                    }
-                )
-            continue
-        if value.lower() == "null":
-            if is_nullable:
-                continue
-        if len(value) > max_length:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MAX_STRING_LENGTH_EXCEEDED.format(),
-                }
-            )
-        if len(value) < min_length:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MIN_STRING_LENGTH_NOT_MET.format(),
-                }
-            )
-        if length is not None and len(value) != length:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.EXACT_STRING_LENGTH_NOT_MATCHED.format(),
-                }
+    text = _column_as_text(column)
+    lengths = _text_lengths(text)
+    blank = lengths == 0
+    # checking 'nan' specifically for module 1 port_uuid field
+    if int(module_number) == 1:
+        blank |= text.eq("nan").to_numpy()
+    missing, notice = _missing_value_masks(blank, required, required_empty_allowed)
+    present = ~blank
+
+    missing_message = ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+        column_name=field_name
+    )
+    checks = [
+        (missing, missing_message),
+        (present & (lengths > max_length), ErrorReportMessages.MAX_STRING_LENGTH_EXCEEDED.format()),
+        (present & (lengths < min_length), ErrorReportMessages.MIN_STRING_LENGTH_NOT_MET.format()),
+    ]
+    if length is not None:
+        checks.append(
+            (
+                present & (lengths != length),
+                ErrorReportMessages.EXACT_STRING_LENGTH_NOT_MATCHED.format(),
             )
-        if required and min_length > 0 and value.isspace():
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.INVALID_WHITESPACE_VALUE.format(),
-                }
+        )
+    if required and min_length > 0:
+        checks.append(
+            (
+                present & text.str.isspace().to_numpy(dtype=bool),
+                ErrorReportMessages.INVALID_WHITESPACE_VALUE.format(),
             )
+        )
+
+    conditions = _conditions_from_masks(column, field_name, checks)
+    notice_conditions = _conditions_from_masks(column, field_name, [(notice, missing_message)])
 
     return (conditions, notice_conditions)
 
@@ -443,51 +791,29 @@ def _boolean_data_is_valid(
     field_name = definition.get("field_name")
     required = definition.get("required", False)
     required_empty_allowed = False
-    is_nullable = False
 
     if Feature.ASYNC_BIZ_MAGIC_MODULE_9 in feature_toggle_set and int(module_number) == 9:
         required_empty_allowed = definition.get("required_empty_allowed", False)
 
-    conditions = []
-    notice_conditions = []
-
-    for index, value in column.items():
-        if value == "":
-            if required:
-                if required_empty_allowed:
-                    notice_conditions.append(
-                        {
-                            "error_row": index,
-                            "header_name": field_name,
-                            "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                                column_name=field_name
-                            ),
-                        }
-                    )
-                    continue
-
-                conditions.append(
-                    {
-                        "error_row": index,
-                        "header_name": field_name,
-                        "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                            column_name=field_name
-                        ),
-                    }
-                )
-            continue
-        if value.lower() == "null":
-            if is_nullable:
-                continue
+    text = _column_as_text(column)
+    blank = text.eq("").to_numpy()
+    missing, notice = _missing_value_masks(blank, required, required_empty_allowed)
+    # boolean columns only hold a handful of distinct spellings
+    boolean_values = [value for value in text.unique() if value.upper() in {"TRUE", "FALSE"}]
+    invalid = ~blank & ~text.isin(boolean_values).to_numpy()
 
-        if value.upper() not in {"TRUE", "FALSE"}:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.INVALID_BOOLEAN_INPUT.format(),
-                }
-            )
+    missing_message = ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+        column_name=field_name
+    )
+    conditions = _conditions_from_masks(
+        column,
+        field_name,
+        [
+            (missing, missing_message),
+            (invalid, ErrorReportMessages.INVALID_BOOLEAN_INPUT.format()),
+        ],
+    )
+    notice_conditions = _conditions_from_masks(column, field_name, [(notice, missing_message)])
 
     return (conditions, notice_conditions)
 
@@ -500,72 +826,45 @@ def _integer_data_is_valid(
     max_value = definition.get("max_value", float("inf"))
     required = definition.get("required", True)
     length = definition.get("length")
+    required_empty_allowed = False
 
     # checking if module 1 is being validated and enabling nulls for ints because the num_fed_funded and num_non_fed_funded field can be null
     if (int(module_number) == ModuleDefinitionEnum.MODULE_1.value):
         required_empty_allowed = definition.get("required_empty_allowed", False)
 
-    conditions = []
-
-    for index, value in column.items():
-        if value == "":
-            if required:
-                conditions.append(
-                    {
-                        "error_row": index,
-                        "header_name": field_name,
-                        "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                            column_name=field_name
-                        ),
-                    }
-                )
-            continue
-
-        if value.lower() == "none" and required_empty_allowed:
-            continue
-        try:
-            _ = int(value)
-        except ValueError:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.INVALID_INTEGER_INPUT.format(),
-                }
-            )
-            continue
-
-        if int(value) < min_value:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MIN_INTEGER_LENGTH_NOT_MET.format(),
-                }
-            )
-
-        if int(value) > max_value:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MAX_INTEGER_LENGTH_NOT_MET.format(),
-                }
+    text = _column_as_text(column)
+    lengths = _text_lengths(text)
+    blank = lengths == 0
+    missing, _ = _missing_value_masks(blank, required, False)
+    to_check = ~blank
+    if required_empty_allowed:
+        to_check &= text.str.lower().ne("none").to_numpy()
+
+    is_integer, values = _parse_numbers(text, to_check, numpy.int64, INTEGER_PATTERN)
+    below_min = numpy.zeros(len(text), dtype=bool)
+    above_max = numpy.zeros(len(text), dtype=bool)
+    below_min[is_integer] = values < min_value
+    above_max[is_integer] = values > max_value
+
+    checks = [
+        (
+            missing,
+            ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name=field_name),
+        ),
+        (to_check & ~is_integer, ErrorReportMessages.INVALID_INTEGER_INPUT.format()),
+        (below_min, ErrorReportMessages.MIN_INTEGER_LENGTH_NOT_MET.format()),
+        (above_max, ErrorReportMessages.MAX_INTEGER_LENGTH_NOT_MET.format()),
+    ]
+    if length:
+        integer_length = lengths - _has_sign_prefix(text, _fixed_width_text(text, lengths))
+        checks.append(
+            (
+                is_integer & (integer_length != length),
+                ErrorReportMessages.EXACT_INTEGER_LENGTH_NOT_MATCHED.format(),
             )
+        )
 
-        integer_length = len(value)
-        if value[0] in {"-", "+"}:
-            integer_length -= 1
-
-        if length and integer_length != length:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.EXACT_INTEGER_LENGTH_NOT_MATCHED.format(),
-                }
-            )
-    return conditions
+    return _conditions_from_masks(column, field_name, checks)
 
 
 def get_decimal_part_lengths(value):
@@ -573,6 +872,23 @@ def get_decimal_part_lengths(value):
     return len(integer_part), len(decimal_part)
 
 
+def _decimal_part_lengths(text: pandas.Series, lengths: numpy.ndarray):
+    """
+    Vectorized get_decimal_part_lengths, not counting a leading sign
+    towards the integer part.
+    """
+    fixed_width = _fixed_width_text(text, lengths)
+    if fixed_width is None:
+        point_position = text.str.find(".").to_numpy()
+    else:
+        point_position = numpy.char.find(fixed_width, ".")
+    has_point = point_position >= 0
+    integer_length = numpy.where(has_point, point_position, lengths)
+    integer_length -= _has_sign_prefix(text, fixed_width)
+    decimal_length = numpy.where(has_point, lengths - point_position - 1, 0)
+    return integer_length, decimal_length
+
+
 def _decimal_data_is_valid(
     decimal_definition, column: pandas.Series, module_number, feature_toggle_set: set
 ):
@@ -601,91 +917,135 @@ def _decimal_data_is_valid(
         Feature.MODULE_5_NULLS in feature_toggle_set and int(module_number) == 5
     ):
         is_nullable = can_be_nullable
-    conditions = []
-    notice_conditions = []
 
-    for index, value in column.items():
-        if value == "":
-            if required:
-                if required_empty_allowed:
-                    notice_conditions.append(
-                        {
-                            "error_row": index,
-                            "header_name": field_name,
-                            "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                                column_name=field_name
-                            ),
-                        }
-                    )
-                    continue
+    text = _column_as_text(column)
+    lengths = _text_lengths(text)
+    blank = lengths == 0
+    missing, notice = _missing_value_masks(blank, required, required_empty_allowed)
+    to_check = ~blank
+    if int(module_number) == 5 and is_nullable:
+        to_check &= text.str.lower().ne("null").to_numpy()
+
+    is_decimal, values = _parse_numbers(text, to_check, numpy.float64, DECIMAL_PATTERN)
+    integer_length, decimal_length = _decimal_part_lengths(text, lengths)
+    below_min = numpy.zeros(len(text), dtype=bool)
+    above_max = numpy.zeros(len(text), dtype=bool)
+    below_min[is_decimal] = values < min_value
+    above_max[is_decimal] = values > max_value
+
+    missing_message = ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+        column_name=field_name
+    )
+    conditions = _conditions_from_masks(
+        column,
+        field_name,
+        [
+            (missing, missing_message),
+            (to_check & ~is_decimal, ErrorReportMessages.INVALID_DECIMAL_INPUT.format()),
+            (
+                is_decimal & (integer_length > max_precision - max_scale),
+                ErrorReportMessages.MAX_DECIMAL_LENGTH_EXCEEDED.format(),
+            ),
+            (
+                is_decimal & (decimal_length > max_scale),
+                ErrorReportMessages.MAX_DECIMAL_PLACES_EXCEEDED.format(),
+            ),
+            (below_min, ErrorReportMessages.MIN_DECIMAL_LENGTH_NOT_MET.format()),
+            (above_max, ErrorReportMessages.MAX_DECIMAL_LENGTH_NOT_MET.format()),
+        ],
+    )
+    notice_conditions = _conditions_from_masks(column, field_name, [(notice, missing_message)])
 
-                conditions.append(
-                    {
-                        "error_row": index,
-                        "header_name": field_name,
-                        "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                            column_name=field_name
-                        ),
-                    }
-                )
-            continue
+    return (conditions, notice_conditions)
 
-        if int(module_number) == 5:
-            if value.lower() == "null":
-                if is_nullable:
-                    continue
 
-        try:
-            _ = float(value)
-        except ValueError:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.INVALID_DECIMAL_INPUT.format(),
-                }
+def converted_column(data: pandas.Series, datatype: str) -> pandas.Series:
+    """
+    Returns the column converted to the dtype inferred for its module datatype
+    """
+    match datatype:
+        case "decimal" | "integer":
+            return pandas.to_numeric(data, errors="coerce").convert_dtypes()
+        case "boolean":
+            return data.str.upper().map({"TRUE": True, "FALSE": False}).convert_dtypes()
+        case "datetime":
+            return pandas.to_datetime(
+                data, format="ISO8601", errors="coerce", utc=True
+            ).convert_dtypes()
+        case _:
+            return data.copy().convert_dtypes()
+
+
+def compact_column(data: pandas.Series, datatype: str, field_name=None) -> pandas.Series:
+    """
+    Returns the column converted to the compact dtype of its module datatype
+    (see COMPACT_DTYPES).  Columns in CATEGORICAL_COLUMNS are categorical,
+    with blank identifiers held as missing values.  Integer columns that hold
+    values that are not integers are kept as Float64 rather than truncated.
+    """
+    if field_name in CATEGORICAL_COLUMNS:
+        column = data.astype(COMPACT_DTYPES["string"]).astype("category")
+        if "" in column.cat.categories:
+            column = column.cat.remove_categories([""])
+        return column
+
+    match datatype:
+        case "decimal" | "integer":
+            numbers = pandas.to_numeric(data, errors="coerce", dtype_backend="numpy_nullable")
+            values = numbers.dropna()
+            if datatype == "integer" and (values.mod(1).eq(0) & values.abs().lt(2**63)).all():
+                return numbers.astype(COMPACT_DTYPES["integer"])
+            return numbers.astype(COMPACT_DTYPES["decimal"])
+        case "boolean":
+            return (
+                data.str.upper()
+                .map({"TRUE": True, "FALSE": False})
+                .astype(COMPACT_DTYPES["boolean"])
             )
-            continue
+        case "datetime":
+            return pandas.to_datetime(data, format="ISO8601", errors="coerce", utc=True)
+        case _:
+            return data.astype(COMPACT_DTYPES["string"])
 
-        integer_length, decimal_length = get_decimal_part_lengths(value)
 
-        if value[0] in {"-", "+"}:
-            integer_length -= 1
+def typed_column(data: pandas.Series, datatype: str) -> pandas.Series:
+    """
+    Returns the column of the typed upload frame, converted to the dtype that
+    set_datatype gives the uploaded text: booleans as 1/0, numbers as nullable
+    integers or floats and datetimes as timestamps.  Text columns keep the
+    uploaded values, so that their blank cells stay empty strings.
+    """
+    match datatype:
+        case "decimal" | "integer":
+            return pandas.to_numeric(data, errors="coerce").convert_dtypes()
+        case "boolean":
+            return data.str.upper().map({"TRUE": 1, "FALSE": 0}).convert_dtypes()
+        case "datetime":
+            return pandas.to_datetime(data, format="ISO8601", errors="coerce").convert_dtypes()
+        case _:
+            return data
 
-        if integer_length > max_precision - max_scale:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MAX_DECIMAL_LENGTH_EXCEEDED.format(),
-                }
-            )
-        if decimal_length > max_scale:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MAX_DECIMAL_PLACES_EXCEEDED.format(),
-                }
-            )
-        if float(value) < min_value:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MIN_DECIMAL_LENGTH_NOT_MET.format(),
-                }
-            )
-        if float(value) > max_value:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": field_name,
-                    "error_description": ErrorReportMessages.MAX_DECIMAL_LENGTH_NOT_MET.format(),
-                }
-            )
 
-    return (conditions, notice_conditions)
+def is_text_column(column: pandas.Series) -> bool:
+    """
+    Returns True if the column still holds uploaded text rather than typed values
+    """
+    return column.dtype == object or isinstance(column.dtype, pandas.StringDtype)
+
+
+def blank_cells(data):
+    """
+    Returns the mask of the blank cells of a column, or of every column of a
+    dataframe.  Uploaded text is blank when it is an empty string and typed
+    values when they are missing, so that the business validations and
+    transformations find the same blanks in the uploaded csv and in its typed
+    upload frame.
+    """
+    if isinstance(data, pandas.DataFrame):
+        return data.apply(blank_cells)
+    if is_text_column(data):
+        return data.eq("")
+    return data.isna()
 
 
 def validated_field(
@@ -693,27 +1053,18 @@ def validated_field(
 ) -> pandas.Series:
     conditions = []
     notice_conditions = []
-    converted_data = None
-    match str.lower(definition["datatype"]):
+    datatype = str.lower(definition["datatype"])
+    match datatype:
         case "decimal":
             conditions, notice_conditions = _decimal_data_is_valid(definition, data, module_number, feature_toggle_set)
-            converted_data = pandas.to_numeric(data.copy(), errors="coerce").convert_dtypes()
         case "integer":
             conditions = _integer_data_is_valid(definition, data, module_number, feature_toggle_set)
-            converted_data = pandas.to_numeric(data.copy(), errors="coerce").convert_dtypes()
         case "string":
             conditions, notice_conditions = _string_data_is_valid(definition, data, module_number, feature_toggle_set)
-            converted_data = data.copy().convert_dtypes()
         case "boolean":
             conditions, notice_conditions = _boolean_data_is_valid(definition, data, module_number, feature_toggle_set)
-            converted_data = (
-                data.copy().str.upper().map({"TRUE": True, "FALSE": False}).convert_dtypes()
-            )
         case "datetime":
             conditions, notice_conditions = _datetime_is_valid(definition, data, module_number, feature_toggle_set)
-            converted_data = pandas.to_datetime(
-                data.copy(), format="ISO8601", errors="coerce", utc=True
-            ).convert_dtypes()
         case _:
             conditions = {
                 "error_row": None,
@@ -722,14 +1073,21 @@ def validated_field(
                     column_name=definition["datatype"]
                 ),
             }
-            converted_data = data.copy().convert_dtypes()
 
+    if Feature.TYPED_UPLOAD_FRAME in feature_toggle_set:
+        converted_data = typed_column(data, datatype)
+    elif Feature.COMPACT_DTYPES in feature_toggle_set:
+        converted_data = compact_column(data, datatype, definition.get("field_name"))
+    else:
+        converted_data = converted_column(data, datatype)
     return {"conditions": conditions, "converted_data": converted_data, "notice_conditions": notice_conditions}
 
 
 def drop_blank_rows(df):
-    not_blank_index = df.fillna("").apply("".join, axis=1).apply(lambda x: x != "")
-    return df[not_blank_index]
+    blank_index = (df.isna() | df.eq("")).all(axis=1)
+    if not blank_index.any():
+        return df
+    return df[~blank_index]
 
 def check_df_required_fields(df, module_fields, feature_toggle_set=frozenset()):
     conditions = []
@@ -785,19 +1143,73 @@ def check_duplicate_labels(column_label_count, module_number, feature_toggle_set
     return {"conditions": conditions, "error": error}
 
 
+def get_validation_error_budget(feature_toggle_set=frozenset()):
+    """
+    Returns the number of conditions after which module validation stops, or
+    None when the VALIDATION_FAIL_FAST feature is disabled.  Can be
+    overridden with the VALIDATION_ERROR_BUDGET environment variable.
+    """
+    if Feature.VALIDATION_FAIL_FAST not in feature_toggle_set:
+        return None
+    return int(os.environ.get("VALIDATION_ERROR_BUDGET", VALIDATION_ERROR_BUDGET))
+
+
+def _unknown_column_condition(column_label):
+    return {
+        "error_description": ErrorReportMessages.UNKNOWN_COLUMN.format(
+            column_name=column_label
+        ),
+        "header_name": column_label,
+        "error_row": None,
+    }
+
+
+def _validated_frame(df: pandas.DataFrame, converted_columns: dict) -> pandas.DataFrame:
+    """
+    Returns the validated dataframe, shaped like df with the converted
+    columns in place of its own.  Columns that were not converted (unknown,
+    duplicated or not reached) are all NaN, and considered_null is dropped.
+    """
+    columns = {
+        column_label: converted_columns.get(
+            column_label, pandas.Series(numpy.nan, index=df.index, dtype=float)
+        )
+        for column_label in df.columns
+    }
+    validated_df = pandas.DataFrame(columns, index=df.index)
+    if df.columns.has_duplicates:
+        validated_df = validated_df.reindex(columns=df.columns)
+    else:
+        validated_df.columns = df.columns
+    return validated_df.drop(["considered_null"], axis=1, errors="ignore")
+
+
 def validated_dataframe(
     module_fields: list,
     module_number: int,
     df: pandas.DataFrame,
     upload_id: str,
     feature_toggle_set=frozenset(),
+    max_conditions=None,
+    stop_on_column_errors=False,
+    prior_conditions=None,
 ) -> dict:
     """
-        module_fields: list of objects containing field_name, datatype,
-                       and additional validation information
+        module_fields: ValidationPlan for the module, or the field
+                       definitions (list of objects containing field_name,
+                       datatype, and additional validation information)
         df: payload for the module import in Pandas dataframe format
         feature_toggle_set: feature toggles that are enabled and need to be
             evaluated
+        max_conditions: error budget, once this many conditions are found
+            the remaining cells are not reported, the remaining columns are
+            not validated and a condition noting that validation stopped is
+            added (None or 0 for no budget)
+        stop_on_column_errors: skip validating the data when missing,
+            duplicate or unknown columns already make every row invalid
+        prior_conditions: conditions already found for the upload, such as
+            by station validation.  They count against the error budget and
+            are returned ahead of the validation conditions
 
     Returns an object with key/value pairs:
         is_compliant (boolean): whether or not df is compliant with
@@ -806,16 +1218,30 @@ def validated_dataframe(
         valid_records (int): count of valid records found in df
         rejected_rcords (int): count of invalid records found in df
         conditions (list of objects): all validation errors found in df
-        df: type-converted dataframe
+        df: type-converted dataframe, the typed upload frame when the
+            TYPED_UPLOAD_FRAME feature is enabled
 
     Condition object key/value pairs:
         error_description (str)
         header_name (str)
         error_row (int for cell-level error, None for column-level error)
     """
-    validated_df = pandas.DataFrame().reindex_like(df)
-    conditions = check_df_required_fields(df, module_fields, feature_toggle_set)
-    logger.info("validated_df: %s", validated_df.to_string())
+    plan = (
+        module_fields
+        if isinstance(module_fields, ValidationPlan)
+        else ValidationPlan(module_number, module_fields)
+    )
+    # converted columns keyed by label, built into the validated dataframe once every column has
+    # been validated.  Columns that are not converted are left empty
+    converted_columns = {}
+    # the typed upload frame keeps the uploaded text of the passthrough columns
+    compact = (
+        Feature.COMPACT_DTYPES in feature_toggle_set
+        and Feature.TYPED_UPLOAD_FRAME not in feature_toggle_set
+    )
+    conditions = list(prior_conditions or [])
+    prior_count = len(conditions)
+    conditions.extend(check_df_required_fields(df, plan.module_fields, feature_toggle_set))
     column_label_count = Counter(df.columns)
     duplicate_check_status = check_duplicate_labels(
         column_label_count, module_number, feature_toggle_set
@@ -827,7 +1253,7 @@ def validated_dataframe(
             "total_records": len(df.index),
             "valid_records": 0,
             "rejected_records": len(df.index),
-            "conditions": conditions,
+            "conditions": _apply_error_budget(conditions, max_conditions),
             "df": pandas.DataFrame(),
         }
     validation_not_required = {"station_id", "station_uuid"}
@@ -835,32 +1261,48 @@ def validated_dataframe(
     validation_not_required.add("network_provider")
     logger.debug("validation not required: %s", validation_not_required)
 
-    if Feature.DATABASE_CENTRAL_CONFIG in feature_toggle_set:
-        # adding "field_name" into the definitions dict so that if errors are generated,
-        # it will use field_name to get the column name
-        definition = module_fields.copy()
-        for column_label in module_fields.keys():
-            definition[column_label]["field_name"] = column_label
-    else:
-        definition = {m["field_name"]: m for m in module_fields}
+    # the plan's definitions include "field_name" so that if errors are
+    # generated, it will use field_name to get the column name
+    definition = plan.fields
+
+    if stop_on_column_errors:
+        conditions.extend(
+            _unknown_column_condition(column_label)
+            for column_label in df.columns
+            if column_label not in definition and column_label not in validation_not_required
+        )
+        # column level errors reject every row, validating the data would only add noise
+        if len(conditions) > prior_count:
+            records_status = get_validation_records_status(df, upload_id, conditions)
+            return {
+                "is_compliant": False,
+                "total_records": records_status["total"],
+                "valid_records": records_status["valid"],
+                "rejected_records": records_status["rejected"],
+                "conditions": _apply_error_budget(conditions, max_conditions),
+                "df": pandas.DataFrame(),
+            }
+
     notice_conditions = []
+    budget_exhausted = False
     for column_label, column_series in df.items():
+        if max_conditions and len(conditions) >= max_conditions:
+            logger.info("error budget of %s exhausted, skipping remaining columns", max_conditions)
+            budget_exhausted = True
+            break
+
         if column_label not in definition:
             # station_id and station_uuid are used in
             # registration/authorization validation logic
             # does not need to be separately validated for schema compliance
             if column_label in validation_not_required:
-                validated_df[column_label] = column_series
+                converted_columns[column_label] = (
+                    compact_column(column_series, "string", column_label)
+                    if compact
+                    else column_series
+                )
                 continue
-            conditions.append(
-                {
-                    "error_description": ErrorReportMessages.UNKNOWN_COLUMN.format(
-                        column_name=column_label
-                    ),
-                    "header_name": column_label,
-                    "error_row": None,
-                }
-            )
+            conditions.append(_unknown_column_condition(column_label))
             continue
 
         to_be_validated = column_series
@@ -872,17 +1314,21 @@ def validated_dataframe(
             module_number=module_number,
             feature_toggle_set=feature_toggle_set,
         )
-        conditions.extend(response.get("conditions", []))
+        column_conditions = response.get("conditions", [])
+        if max_conditions and len(conditions) + len(column_conditions) > max_conditions:
+            column_conditions = column_conditions[:max_conditions - len(conditions)]
+            budget_exhausted = True
+        conditions.extend(column_conditions)
         notice_conditions.extend(response.get("notice_conditions", []))
         if column_label_count[column_label] == 1:
-            validated_df[column_label] = response.get("converted_data")
+            converted_columns[column_label] = response.get("converted_data")
         else:
             logger.debug("skipping validated_df update of duplicate column: %s", column_label)
-        logger.debug("validated data: %s", validated_df[column_label])
-    validated_df.drop(["considered_null"], axis=1, errors="ignore", inplace=True)
+    validated_df = _validated_frame(df, converted_columns)
 
-    if conditions and notice_conditions:
+    if len(conditions) > prior_count and notice_conditions:
         conditions.extend(notice_conditions)
+    conditions = _apply_error_budget(conditions, max_conditions, budget_exhausted)
 
     records_status = get_validation_records_status(df, upload_id, conditions)
     return {
@@ -895,6 +1341,24 @@ def validated_dataframe(
     }
 
 
+def _apply_error_budget(conditions, max_conditions, budget_exhausted=False):
+    """
+    Returns the conditions cut down to the error budget, followed by a
+    condition noting that validation stopped when the budget was exceeded
+    """
+    if not max_conditions or not (budget_exhausted or len(conditions) > max_conditions):
+        return conditions
+    return conditions[:max_conditions] + [
+        {
+            "error_description": ErrorReportMessages.ERROR_BUDGET_EXHAUSTED.format(
+                max_errors=max_conditions
+            ),
+            "header_name": "NOT_APPLICABLE",
+            "error_row": None,
+        }
+    ]
+
+
 def get_validation_records_status(df, upload_id, conditions):
     total_records = len(df.index)
     errow_row_set = {c["error_row"] for c in conditions}
@@ -916,13 +1380,24 @@ def get_validation_records_status(df, upload_id, conditions):
     return {"total": total_records, "rejected": rejected_records, "valid": valid_records}
 
 
-def validated_dataframe_by_module_id(module_number, df, upload_id, feature_toggle_set=frozenset()):
+def validated_dataframe_by_module_id(
+    module_number,
+    df,
+    upload_id,
+    feature_toggle_set=frozenset(),
+    max_conditions=None,
+    stop_on_column_errors=False,
+    prior_conditions=None,
+):
     return validated_dataframe(
-        _get_module_fields_by_number(module_number.value, feature_toggle_set),
+        get_validation_plan(module_number.value, feature_toggle_set),
         upload_id=upload_id,
         df=df,
         module_number=module_number.value,
         feature_toggle_set=feature_toggle_set,
+        max_conditions=max_conditions,
+        stop_on_column_errors=stop_on_column_errors,
+        prior_conditions=prior_conditions,
     )
 
 
@@ -959,6 +1434,21 @@ def add_upload_suffixes():
     return columns_to_rename
 
 
+def data_already_exists_in_rds(cursor, module_table, upload_id):
+    select_statement = f"""
+        SELECT COUNT(*)
+        FROM {module_table}
+        WHERE upload_id=%s
+        """
+    result = execute_query_fetchone(
+        query=select_statement,
+        data=upload_id,
+        cursor=cursor,
+        message="data_already_exists_in_rds AsyncValidatedUpload",
+    )
+    return result[0] > 0
+
+
 def upload_data_from_df(
     connection, module_number, df, check_boolean=True, feature_toggle_set=frozenset()
 ):
@@ -969,13 +1459,11 @@ def upload_data_from_df(
     else:
         upload_df = df.rename(columns=add_upload_suffixes())
     try:
-        # https://aws-sdk-pandas.readthedocs.io/en/stable/stubs/awswrangler.mysql.to_sql.html#awswrangler.mysql.to_sql
-        awswrangler.mysql.to_sql(
+        load_module_data(
+            connection=connection,
+            table=ModuleDataTables[f"Module{module_number}"].value,
             df=upload_df,
-            table=f"module{module_number}_data_v3",
-            schema="evchart_data_v3",
-            con=connection,
-            use_column_names=True,
+            record_history=Feature.BULK_LOAD_HISTORY in feature_toggle_set,
         )
     except Exception as e:
         raise EvChartDatabaseAuroraQueryError(
@@ -983,17 +1471,87 @@ def upload_data_from_df(
         ) from e
 
 
+def get_unique_key_constraints(module_id, feature_toggle_set=frozenset()):
+    """
+    Returns the list of unique key constraint columns of a module
+    """
+    if Feature.DATABASE_CENTRAL_CONFIG in feature_toggle_set:
+        return list(get_validation_plan(module_id, feature_toggle_set).unique_key_constraints)
+    return list(UNIQUE_KEY_CONSTRAINTS[str(module_id)])
+
+
+def local_clock_times(values: pandas.Series) -> pandas.Series:
+    """
+    Returns the datetimes of a column as naive timestamps of their own clock time.  The module
+    loaders hand pymysql timezone aware datetimes, which it writes without their utc offset, so
+    that MySQL stores the clock time of the upload rather than the utc time.
+    """
+    if isinstance(values.dtype, pandas.DatetimeTZDtype):
+        return values.dt.tz_localize(None)
+    if pandas.api.types.is_datetime64_dtype(values):
+        return values
+    text = values.astype("string").str.strip().str.replace(UTC_OFFSET_PATTERN, "", regex=True)
+    return pandas.to_datetime(text, format="mixed", errors="coerce")
+
+
+def get_unique_key_fingerprints(df, module_id, feature_toggle_set=frozenset(), upload_df=None):
+    """
+    Returns a series with the fingerprint of each row's unique key constraints, used to look up
+    the unique_key_fingerprint column MySQL generates for the module tables: the sha256 hex
+    digest of the lower cased values joined by the unit separator, as computed by
+    Module_Unique_Key_Fingerprint.sql. Datetimes are written the way MySQL stores them, as
+    the clock time of the upload without its utc offset (see local_clock_times).
+    Only complete keys are looked up, rows with a missing key value have no fingerprint.
+    upload_df is the uploaded text of df, whose datetimes still have the clock time that a
+    validated df has converted to utc.
+    """
+    plan = get_validation_plan(module_id, feature_toggle_set)
+    keys = pandas.DataFrame(index=df.index)
+    for column in get_unique_key_constraints(module_id, feature_toggle_set):
+        values = df[column]
+        if column in plan.datetime_fields:
+            if upload_df is not None:
+                values = upload_df[column].reindex(df.index)
+            values = local_clock_times(values)
+            values = values.dt.round("s").dt.strftime("%Y-%m-%d %H:%M:%S")
+        elif pandas.api.types.is_float_dtype(values) and (values.dropna() % 1 == 0).all():
+            values = values.astype("Int64")
+        keys[column] = values.astype("string").str.lower()
+
+    fingerprints = pandas.Series(
+        [
+            hashlib.sha256("\x1f".join(key).encode("utf-8")).hexdigest()
+            for key in keys.fillna("").itertuples(index=False, name=None)
+        ],
+        index=df.index,
+        dtype=object,
+    )
+    return fingerprints.mask(keys.isna().any(axis=1), None)
+
+
 def adjust_for_booleans(df, module_id, feature_toggle_set=frozenset()):
     adjusted_df = df.copy()
-    module_fields = _get_module_fields_by_number(int(module_id), feature_toggle_set)
-    boolean_fields = [
-        m.get("field_name")
-        for m in module_fields
-        if (m.get("datatype") == "boolean" and m.get("field_name") in df.columns)
-    ]
+    plan = get_validation_plan(module_id, feature_toggle_set)
+    boolean_fields = plan.present(plan.boolean_fields, df)
 
-    adjusted_df[boolean_fields] = df[boolean_fields].map(
-        lambda bf: {"TRUE": True, "FALSE": False}.get(str(bf).upper())
-    )
+    # the boolean columns of a typed upload frame already hold 1/0
+    adjusted_df[boolean_fields] = df[boolean_fields].apply(
+        lambda column: column.astype(str).str.upper().map(BOOLEAN_VALUES)
+        if is_text_column(column)
+        else column.map({1: True, 0: False})
+    ).astype(object).where(lambda booleans: booleans.notna(), None)
 
     return adjusted_df
+
+
+def adjust_for_nulls(feature_toggle_set, module_id, df):
+    try:
+        if int(module_id) == 5 and Feature.MODULE_5_NULLS in feature_toggle_set:
+            correct_nulls = df["maintenance_cost_total"].astype(str).str.lower() == "null"
+            df.loc[correct_nulls, ["maintenance_cost_total"]] = None
+
+        return df
+    except Exception as e:
+        raise EvChartModuleValidationError(
+            message=f"Error adjusting for nulls: {e}",
+        ) from e
@@ -0,0 +1,216 @@
+"""
+module_validation.biz_magic
+
+The module specific business validations and transformations run by AsyncBizMagic, along with the
+conversion of the validated dataframe into the datatypes expected by the database.
+"""
+import hashlib
+import logging
+from io import BytesIO, StringIO
+
+import pandas
+import pyarrow
+import pyarrow.parquet
+
+from evchart_helper.boto3_manager import boto3_manager
+from evchart_helper.custom_exceptions import EvChartAsynchronousS3Error
+from feature_toggle.feature_enums import Feature
+from module_transform import (
+    transform_m2,
+    transform_m3,
+    transform_m4,
+    transform_m5,
+    transform_m9,
+)
+from module_validation import (
+    get_validation_plan,
+    is_text_column,
+    validate_m2,
+    validate_m3,
+    validate_m4,
+    validate_m9,
+)
+
+logger = logging.getLogger("module_validation.biz_magic")
+
+# file types written by serialize_transformed_df
+TRANSFORMED_FILE_TYPES = ("json", "parquet")
+
+# arrow types for the module datatypes in the central config, matching what set_datatype produces.
+# booleans are stored as 1/0 and datetime columns keep the (possibly timezone aware) type inferred
+# from the dataframe
+ARROW_DATATYPES = {
+    "boolean": pyarrow.int64(),
+    "integer": pyarrow.int64(),
+    "decimal": pyarrow.float64(),
+    "string": pyarrow.string(),
+}
+
+"""
+Custom_validations ifo:
+custom_validations - dictionary that holds the functions for business validation checks for null modules
+Module 5 - bizmagic validate file does not exist because there is no business logic to verify against. "maintenance_cost_total" is the
+only nullable field in the module, and is verified for correctness during custom_transformations
+Module 3 - "uptime" field is only flagged as an error if the field is null and the operational_date is greater than 1 year
+The validations evaluate the declarative rules of their module with module_validation.business_rules, sharing the
+RuleFrame in the validation options
+"""
+custom_validations = {
+    2: [validate_m2.validate_empty_session],
+    3: [validate_m3.validate_operational_one_year],
+    4: [validate_m4.validate_empty_outage],
+    5: [],
+    6: [],
+    7: [],
+    8: [],
+    9: [validate_m9.validate_empty_capital_install_costs],
+}
+
+"""
+custom_transformations - dictionary that holds the functions that transforms the dataframe into acceptable values for the database
+ex: setting empty strings to None, setting boolean values to 0 or 1
+"""
+custom_transformations = {
+    2: [transform_m2.allow_null_charging_sessions],
+    3: [transform_m3.allow_null_uptime],
+    4: [transform_m4.allow_null_outages],
+    5: [transform_m5.allow_null_federal_maintenance],
+    6: [],
+    7: [],
+    8: [],
+    9: [transform_m9.allow_null_capital_install_costs],
+}
+
+
+def set_datatype(df, module_id, feature_toggle_set=frozenset()):
+    """
+    Convenience function that converts the expected boolean, numeric, and datetime datatypes for each column in the dataframe.
+    Columns of the typed upload frame were already converted during data validation and are left as they are
+    """
+    adjusted_df = df.copy()
+    plan = get_validation_plan(module_id, feature_toggle_set)
+    text_fields = {field for field, column in adjusted_df.items() if is_text_column(column)}
+    boolean_fields = plan.present(plan.boolean_fields & text_fields, adjusted_df)
+    numeric_fields = plan.present(plan.numeric_fields & text_fields, adjusted_df)
+    datetime_fields = plan.present(plan.datetime_fields & text_fields, adjusted_df)
+
+    for field in boolean_fields:
+        try:
+            adjusted_df[field] = (
+                adjusted_df[field]
+                .str.upper()
+                .map({"TRUE": 1, "FALSE": 0})
+                .convert_dtypes()
+            )
+        except AttributeError:
+            # AttributeError is raised if value has already been converted
+            # from string to integer
+            pass
+
+    for field in numeric_fields:
+        adjusted_df[field] = pandas.to_numeric(
+            adjusted_df[field], errors="coerce"
+        ).convert_dtypes()
+
+    for field in datetime_fields:
+        adjusted_df[field] = pandas.to_datetime(
+            adjusted_df[field], format="ISO8601", errors="coerce"
+        ).convert_dtypes()
+
+    return adjusted_df
+
+
+def get_transformed_file_name(
+    upload_id, recipient_type, org_name, parent_name=None, file_type="json"
+):
+    """
+    Returns the s3 key that the transformed dataframe is stored under, based on recipient type
+    """
+    if recipient_type == "direct-recipient":
+        return f"transformed/{org_name}/{upload_id}.{file_type}"
+    if recipient_type == "sub-recipient":
+        return f"transformed/{parent_name}/{org_name}/{upload_id}.{file_type}"
+    return f"transformed/testing/{org_name}/{upload_id}.{file_type}"
+
+
+def get_arrow_schema(df, module_id, feature_toggle_set=frozenset()):
+    """
+    Returns the arrow schema for a transformed dataframe, using the datatypes of the module fields
+    and the inferred type for any other column.  The index is kept since it holds the csv row numbers
+    """
+    plan = get_validation_plan(module_id, feature_toggle_set)
+    inferred_schema = pyarrow.Schema.from_pandas(df, preserve_index=True)
+    fields = []
+    for field in inferred_schema:
+        datatype = plan.datatypes.get(field.name)
+        if datatype in ARROW_DATATYPES:
+            field = field.with_type(ARROW_DATATYPES[datatype])
+        elif datatype == "datetime" and not pyarrow.types.is_timestamp(field.type):
+            field = field.with_type(pyarrow.timestamp("ns"))
+        fields.append(field)
+    # the pandas metadata restores the original dtypes and index when the table is read
+    return pyarrow.schema(fields, metadata=inferred_schema.metadata)
+
+
+def serialize_transformed_df(df, module_id, feature_toggle_set=frozenset()):
+    """
+    Convenience function that serializes the transformed dataframe for AsyncValidatedUpload.
+    The dataframe is written as parquet when the ASYNC_PARQUET_TRANSFORM feature is enabled and
+    falls back to json when it is not, or the data cannot be represented with the module schema.
+    Returns a tuple of the payload (bytes) and its file type.
+    """
+    if Feature.ASYNC_PARQUET_TRANSFORM in feature_toggle_set:
+        try:
+            table = pyarrow.Table.from_pandas(
+                df,
+                schema=get_arrow_schema(df, module_id, feature_toggle_set),
+                preserve_index=True,
+            )
+            buffer = BytesIO()
+            pyarrow.parquet.write_table(table, buffer)
+            return buffer.getvalue(), "parquet"
+        except (pyarrow.ArrowException, TypeError, ValueError) as e:
+            logger.warning("unable to write transformed upload as parquet: %s", repr(e))
+
+    return bytes(df.to_json(orient="table"), encoding="utf-8"), "json"
+
+
+def read_transformed_df(body, file_type="json"):
+    """
+    Convenience function that reads a dataframe written by serialize_transformed_df
+    """
+    if file_type == "parquet":
+        return pyarrow.parquet.read_table(BytesIO(body)).to_pandas()
+    if isinstance(body, bytes):
+        body = body.decode("utf-8")
+    return pandas.read_json(StringIO(body), orient="table")
+
+
+def upload_transform_df(
+    bucket, upload_id, recipient_type, df, new_file_name, s2s_upload, payload=None
+):
+    """
+    Convenience function that uploads the validated and transformed dataframe to the s3 bucket,
+    as the payload from serialize_transformed_df when given and as a json object otherwise.
+    Returns the metadata of the transformed upload
+    """
+    if payload is None:
+        payload = bytes(df.to_json(orient="table"), encoding="utf-8")
+    s3 = boto3_manager.resource("s3")
+    custom_metadata = {
+        "checksum": hashlib.sha256(payload).hexdigest(),
+        "recipient_type": recipient_type,
+    }
+
+    if s2s_upload == "True":
+        custom_metadata["s2s_upload"] = s2s_upload
+
+    try:
+        s3.Bucket(bucket).put_object(
+            Key=f"{new_file_name}", Body=payload, Metadata=custom_metadata
+        )
+    except Exception as e:
+        raise EvChartAsynchronousS3Error(
+            message=f"Error uploading {upload_id} to S3 bucket: {repr(e)}"
+        ) from e
+    return custom_metadata
@@ -0,0 +1,131 @@
+"""
+module_validation.bulk_loader
+
+Loads validated module data into the module data tables. Rows are converted to python values a
+column at a time and inserted with chunked multi-row INSERT statements, committed once per upload.
+A bulk load can also record a single upload-level history record, in place of the per-row
+history the table triggers write for interactive edits.
+"""
+import hashlib
+import logging
+import os
+import time
+
+import pandas
+from evchart_helper.database_tables import ModuleDataTables
+
+logger = logging.getLogger("module_validation.bulk_loader")
+logger.setLevel(logging.INFO)
+
+# number of rows sent to the database in a single executemany, pymysql turns each chunk
+# into as few multi-row INSERT statements as max_allowed_packet allows
+MODULE_LOAD_CHUNK_SIZE = 5000
+
+
+def get_module_load_chunk_size():
+    """
+        Returns the number of rows inserted with each executemany.
+        Can be overridden with the MODULE_LOAD_CHUNK_SIZE environment variable.
+    """
+    return int(os.environ.get("MODULE_LOAD_CHUNK_SIZE", MODULE_LOAD_CHUNK_SIZE))
+
+
+def get_insert_rows(df):
+    """
+        Returns the rows of df as tuples of values pymysql can escape, with missing values as None
+        and timestamps as datetimes.
+    """
+    columns = []
+    for _, column in df.items():
+        values = column.astype(object)
+        # pymysql would write a Timestamp, of a datetime column or left in an object column,
+        # with its utc offset
+        if pandas.api.types.infer_dtype(values, skipna=True) in ("datetime", "mixed"):
+            values = pandas.Series(
+                [
+                    value.to_pydatetime() if isinstance(value, pandas.Timestamp) else value
+                    for value in values
+                ],
+                index=values.index,
+                dtype=object,
+            )
+        columns.append(values.where(column.notna(), None).to_numpy())
+    return list(zip(*columns))
+
+
+def get_content_checksum(rows):
+    """
+        Returns the sha256 hex digest of the loaded rows, one line per row with the values
+        joined by the unit separator and missing values written as empty strings.
+    """
+    checksum = hashlib.sha256()
+    for row in rows:
+        line = "\x1f".join("" if value is None else str(value) for value in row)
+        checksum.update(f"{line}\n".encode("utf-8"))
+    return checksum.hexdigest()
+
+
+def insert_load_history(cursor, table, upload_id, row_count, content_checksum):
+    """
+        Records the bulk load of an upload into table, attributed to the user that last updated
+        the upload's import metadata.
+    """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    insert_query = f"""
+        INSERT INTO {ModuleDataTables["ModuleDataLoadHistory"].value} (
+            upload_id, module_table, row_count, content_checksum, updated_on, updated_by
+        )
+        SELECT %s, %s, %s, %s, NOW(), (
+            SELECT updated_by FROM {ModuleDataTables["Metadata"].value} WHERE upload_id = %s
+        )
+    """
+    cursor.execute(
+        insert_query, (upload_id, table.split(".")[-1], row_count, content_checksum, upload_id)
+    )
+
+
+def load_module_data(connection, table, df, chunk_size=None, record_history=False):
+    """
+        Inserts every row of df into table, using the columns of df, and commits once at the end.
+        If record_history is set, a load history record for the upload_id of df is written in the
+        same transaction. The load is rolled back if any chunk fails.
+        Returns the number of rows loaded.
+    """
+    if df.empty:
+        raise ValueError("DataFrame cannot be empty.")
+    if chunk_size is None:
+        chunk_size = get_module_load_chunk_size()
+
+    insert_query = (
+        f"INSERT INTO {table} ({', '.join(f'`{column}`' for column in df.columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(df.columns))})"
+    )
+
+    start_time = time.perf_counter()
+    rows = get_insert_rows(df)
+    try:
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), chunk_size):
+                cursor.executemany(insert_query, rows[start:start + chunk_size])
+            if record_history:
+                insert_load_history(
+                    cursor,
+                    table,
+                    df["upload_id"].iloc[0],
+                    len(rows),
+                    get_content_checksum(rows),
+                )
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+
+    elapsed_time = time.perf_counter() - start_time
+    logger.info(
+        "loaded %s rows into %s in %.2fs (%.0f rows/sec)",
+        len(rows),
+        table,
+        elapsed_time,
+        len(rows) / elapsed_time if elapsed_time else len(rows),
+    )
+    return len(rows)
@@ -0,0 +1,293 @@
+"""
+module_validation.business_rules
+
+Declarative business rules of the AsyncBizMagic validations.  A rule is a condition expression, the
+error message and the column the error is reported under.  Conditions are compiled once into
+functions returning the mask of the rows that break the rule, and every rule of an upload is
+evaluated against one RuleFrame, which holds the blank cells of the upload and the station
+attributes used by the conditions, fetched for every station of the upload at once.
+
+A condition is a python expression of
+    names: the columns of the upload, and the station attributes in STATION_ATTRIBUTES
+    blank(column): the blank cells of a column
+    missing(column): the blank cells of a column, and the cells missing from short csv rows
+    all_blank(fields), any_blank(fields), any_missing(fields): whether every or any cell of a row
+        in a group of fields is blank or missing.  Groups are given along with the rules, and
+        all_fields is every column of the upload
+    date(column): the calendar dates of a datetime column
+    years(n): n calendar years, to add to or subtract from dates
+combined with &, |, ^, ~, and, or, not, comparisons and + or -.
+"""
+import ast
+import operator
+
+import numpy
+import pandas
+from dateutil.relativedelta import relativedelta
+
+from evchart_helper.api_helper import get_station_attributes
+from module_validation import blank_cells
+
+# station_registrations columns that conditions may use by name
+STATION_ATTRIBUTES = ("operational_date",)
+
+# field group of every column of the upload
+ALL_FIELDS = "all_fields"
+
+BINARY_OPERATORS = {
+    ast.BitAnd: operator.and_,
+    ast.BitOr: operator.or_,
+    ast.BitXor: operator.xor,
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+}
+
+COMPARISONS = {
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+}
+
+COLUMN_FUNCTIONS = {
+    "blank": lambda frame, column: frame.blank[column],
+    "missing": lambda frame, column: frame.missing[column],
+    "date": lambda frame, column: pandas.to_datetime(frame.column(column)).dt.date,
+}
+
+FIELD_GROUP_FUNCTIONS = {
+    "all_blank": lambda frame, fields: frame.blank_fields(fields).all(axis=1),
+    "any_blank": lambda frame, fields: frame.blank_fields(fields).any(axis=1),
+    "any_missing": lambda frame, fields: frame.missing_fields(fields).any(axis=1),
+}
+
+
+class RuleFrame:
+    """
+    The upload dataframe prepared for its business rules, shared by every rule of the upload.
+    The blank cells and station attributes are only computed when a rule first uses them.
+
+        df (pandas.DataFrame): the upload
+        cursor: database cursor the station attributes are read with
+    """
+
+    def __init__(self, df: pandas.DataFrame, cursor=None):
+        self.df = df
+        self.cursor = cursor
+        self.field_groups = {ALL_FIELDS: list(df.columns)}
+        self._blank = None
+        self._missing = None
+        self._station_attributes = None
+
+    @property
+    def blank(self) -> pandas.DataFrame:
+        """
+        The blank cells of the upload
+        """
+        if self._blank is None:
+            self._blank = blank_cells(self.df)
+        return self._blank
+
+    @property
+    def missing(self) -> pandas.DataFrame:
+        """
+        The blank cells of the upload and the cells missing from short csv rows
+        """
+        if self._missing is None:
+            self._missing = self.blank | self.df.isna()
+        return self._missing
+
+    def blank_fields(self, fields) -> pandas.DataFrame:
+        """
+        The blank cells of a field group, fields that are not columns of the upload are not blank
+        """
+        return self.field_cells(self.blank, fields)
+
+    def missing_fields(self, fields) -> pandas.DataFrame:
+        """
+        The missing cells of a field group, fields that are not columns of the upload are not missing
+        """
+        return self.field_cells(self.missing, fields)
+
+    def field_cells(self, cells: pandas.DataFrame, fields) -> pandas.DataFrame:
+        field_names = self.field_groups[fields]
+        absent = {field: False for field in field_names if field not in cells.columns}
+        return cells.loc[:, cells.columns.isin(field_names)].assign(**absent)
+
+    def column(self, name) -> pandas.Series:
+        """
+        Returns a column of the upload, or a station attribute of every row
+        """
+        if name in STATION_ATTRIBUTES and name not in self.df.columns:
+            return self.station_attributes()[name]
+        return self.df[name]
+
+    def station_attributes(self) -> pandas.DataFrame:
+        """
+        Returns the STATION_ATTRIBUTES of the station of every row, read in bulk on first use
+        """
+        if self._station_attributes is None:
+            key_columns = ["station_id", "network_provider"]
+            stations = self.df[key_columns].astype(object).fillna("")
+            attributes = get_station_attributes(
+                self.cursor,
+                list(dict.fromkeys(stations.itertuples(index=False, name=None))),
+                STATION_ATTRIBUTES,
+            ).drop_duplicates(subset=key_columns)
+            merged = stations.merge(attributes, how="left", on=key_columns).set_axis(self.df.index)
+            # stations that are not registered compare as null, whatever the attribute type
+            self._station_attributes = merged[list(STATION_ATTRIBUTES)].astype(object)
+        return self._station_attributes
+
+
+class BusinessRule:
+    """
+    One business rule, its condition compiled when the rule is defined.
+
+        condition (str): expression of the rows that break the rule
+        message (ErrorReportMessages): error description, formatted with the column_name
+        column (str): column the error is reported under
+        blank_fields (str): instead of column, the field group whose blank cells are each
+            reported as an error
+    """
+
+    def __init__(self, condition: str, message, column: str = None, blank_fields: str = None):
+        if (column is None) == (blank_fields is None):
+            raise ValueError("A business rule is reported under either a column or blank_fields.")
+        self.condition = condition
+        self.message = message
+        self.column = column
+        self.blank_fields = blank_fields
+        self.mask = compile_condition(condition)
+
+    def conditions(self, frame: RuleFrame) -> list:
+        """
+        Returns the conditions object entries of the rows of frame that break the rule
+        """
+        mask = pandas.Series(self.mask(frame), index=frame.df.index).fillna(False).astype(bool)
+        if self.column is not None:
+            return [
+                self.error(row, self.column) for row in frame.df.index[mask.to_numpy()]
+            ]
+
+        fields = set(frame.field_groups[self.blank_fields])
+        columns = [column for column in frame.df.columns if column in fields]
+        rows, cells = numpy.nonzero(frame.blank.loc[mask, columns].to_numpy())
+        flagged = frame.df.index[mask.to_numpy()]
+        return [self.error(flagged[row], columns[cell]) for row, cell in zip(rows, cells)]
+
+    def error(self, row, column) -> dict:
+        return {
+            "error_row": row,
+            "error_description": self.message.format(column_name=column),
+            "header_name": column,
+        }
+
+
+def compile_condition(condition: str):
+    """
+    Compiles a condition expression into a function of a RuleFrame that returns the mask of the
+    rows matching the condition.  Raises ValueError for anything that is not part of the rule
+    language.
+    """
+    return compile_node(ast.parse(condition, mode="eval").body, condition)
+
+
+def compile_node(node, condition):
+    """
+    Compiles one node of a condition expression into a function of a RuleFrame
+    """
+    # pylint: disable=too-many-return-statements
+    if isinstance(node, ast.BoolOp):
+        operands = [compile_node(value, condition) for value in node.values]
+        combine = operator.and_ if isinstance(node.op, ast.And) else operator.or_
+
+        def bool_op(frame):
+            result = operands[0](frame)
+            for operand in operands[1:]:
+                result = combine(result, operand(frame))
+            return result
+        return bool_op
+
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.Not, ast.Invert)):
+        operand = compile_node(node.operand, condition)
+        return lambda frame: ~operand(frame)
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        binary_operator = BINARY_OPERATORS[type(node.op)]
+        left = compile_node(node.left, condition)
+        right = compile_node(node.right, condition)
+        return lambda frame: binary_operator(left(frame), right(frame))
+
+    if isinstance(node, ast.Compare) and all(type(op) in COMPARISONS for op in node.ops):
+        operands = [compile_node(value, condition) for value in [node.left, *node.comparators]]
+        comparisons = [COMPARISONS[type(op)] for op in node.ops]
+
+        def compare(frame):
+            values = [operand(frame) for operand in operands]
+            result = comparisons[0](values[0], values[1])
+            for index, comparison in enumerate(comparisons[1:], start=1):
+                result = result & comparison(values[index], values[index + 1])
+            return result
+        return compare
+
+    if isinstance(node, ast.Name):
+        return lambda frame: frame.column(node.id)
+
+    if isinstance(node, ast.Constant) and isinstance(node.value, (int, float, str)):
+        return lambda frame: node.value
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        return compile_call(node, condition)
+
+    raise ValueError(f"{ast.unparse(node)} is not supported in business rule: {condition}")
+
+
+def compile_call(node, condition):
+    """
+    Compiles a function call of a condition expression into a function of a RuleFrame
+    """
+    name = node.func.id
+    if len(node.args) != 1:
+        raise ValueError(f"{name} takes one argument in business rule: {condition}")
+    argument = node.args[0]
+
+    if name == "years" and isinstance(argument, ast.Constant) and isinstance(argument.value, int):
+        return lambda frame: relativedelta(years=argument.value)
+
+    if name in COLUMN_FUNCTIONS and isinstance(argument, ast.Name):
+        function = COLUMN_FUNCTIONS[name]
+        return lambda frame: function(frame, argument.id)
+
+    if name in FIELD_GROUP_FUNCTIONS and isinstance(argument, ast.Name):
+        function = FIELD_GROUP_FUNCTIONS[name]
+        return lambda frame: function(frame, argument.id)
+
+    raise ValueError(f"{ast.unparse(node)} is not supported in business rule: {condition}")
+
+
+def get_rule_frame(validation_options) -> RuleFrame:
+    """
+    Returns the RuleFrame shared by the business validations of the upload in validation_options,
+    preparing it from the df and cursor of the options if AsyncBizMagic did not
+    """
+    if validation_options.get("rule_frame") is None:
+        validation_options["rule_frame"] = RuleFrame(
+            validation_options.get("df"), validation_options.get("cursor")
+        )
+    return validation_options["rule_frame"]
+
+
+def evaluate_rules(rules, validation_options, field_groups=None) -> dict:
+    """
+    Evaluates business rules against the upload in validation_options and returns the conditions
+    object of the rows that break them.  field_groups are the field groups the rules refer to, as
+    lists of field names keyed by group name.
+    """
+    frame = get_rule_frame(validation_options)
+    frame.field_groups.update(field_groups or {})
+    return {"conditions": [
+        condition for rule in rules for condition in rule.conditions(frame)
+    ]}
@@ -5,13 +5,18 @@ Holds functions that evaluate the unique constraints during data validatoin
 for all async or S2S module imports.
 """
 
-from database_central_config import DatabaseCentralConfig
 from evchart_helper.api_helper import execute_query_df, get_upload_metadata, execute_query
+from evchart_helper.custom_exceptions import EvChartDatabaseAuroraQueryError
 from evchart_helper.database_tables import ModuleDataTables
 from evchart_helper.module_helper import get_module_id
 from feature_toggle.feature_enums import Feature
 from error_report_messages_enum import ErrorReportMessages
-from module_validation import _get_module_fields_by_number
+from module_validation import (
+    UNIQUE_KEY_CONSTRAINTS,
+    UNIQUE_KEY_FINGERPRINT,
+    get_unique_key_fingerprints,
+    get_validation_plan,
+)
 import pandas
 
 feature_by_module_number = [
@@ -28,50 +33,68 @@ feature_by_module_number = [
 ]
 metadata_table = ModuleDataTables["Metadata"].value
 
+# session temporary table holding the unique constraint keys of the upload being validated
+upload_keys_table = "upload_constraint_keys"
+# number of upload keys sent to the database in a single executemany
+UPLOAD_KEYS_INSERT_CHUNK_SIZE = 1000
+# widest unique constraint column in the module tables, the upload keys columns are at least this
+# wide and their index covers this prefix
+UPLOAD_KEYS_MAX_LENGTH = 255
+
 
 def get_module_constraints_by_module_id(module_id):
     """
     Returns a list of constraints given a module id
     """
-    constraints = {
-        "2": ["station_uuid", "port_id", "session_id"],
-        "3": ["station_uuid", "port_id", "uptime_reporting_start", "uptime_reporting_end"],
-        "4": ["station_uuid", "outage_id", "port_id"],
-        "5": ["station_uuid", "maintenance_report_start"],
-        "6": ["station_uuid", "operator_name"],
-        "7": ["station_uuid", "program_report_year"],
-        "8": ["station_uuid", "der_type"],
-        "9": ["station_uuid"],
-    }
-    return constraints[module_id]
+    return list(UNIQUE_KEY_CONSTRAINTS[module_id])
 
 
 # this query is called in apiPutSubmitModuleData to check for duplicates upon module submission, however, i don't think
 # this query covers all circumstances, ex: will throw duplicate error for quarterly mdoules submitted in diff years
-def query_builder_module_details(source_table):
+def query_builder_module_keys(source_table, unique_constraint, feature_toggle_set=frozenset()):
     """
-    Returns the SQL query that queries for module data of an upload_id from the
-    passed in desired table or metadata_table
+    Returns the SQL query that queries for the unique constraint columns, upload_id,
+    station_id_upload and network_provider_upload of an upload_id from the passed in desired
+    table, along with the rows of metadata_table uploads that share a unique key with it.
+    Keys are matched on the unique key fingerprint when UNIQUE_KEY_FINGERPRINT is enabled,
+    only looking up the fingerprints of complete keys like a match on the columns would.
     """
-    module_query = (
-        f"SELECT * FROM {source_table} "
-        f"WHERE upload_id = %s "
-        f"OR upload_id IN ( "
-        f"  SELECT upload_id from {metadata_table} "
-        f"  WHERE module_id=%s "
-        f"  AND submission_status IN ('Pending', 'Submitted', 'Approved') "
-        f"  AND parent_org = %s "
-        f")"
-    )
+    selected_columns = unique_constraint + ["upload_id", "station_id_upload", "network_provider_upload"]
+    column_str = ", ".join(f"module_data.{column}" for column in selected_columns)
+    key_columns = unique_constraint
+    complete_key_filter = ""
+    if Feature.UNIQUE_KEY_FINGERPRINT in feature_toggle_set:
+        key_columns = [UNIQUE_KEY_FINGERPRINT]
+        complete_key_filter = "".join(
+            f" AND {column} IS NOT NULL" for column in unique_constraint
+        )
+    key_str = ", ".join(key_columns)
+    module_key_str = ", ".join(f"module_data.{column}" for column in key_columns)
 
+    module_query = f"""
+        SELECT {column_str} FROM {source_table} module_data
+        WHERE module_data.upload_id = %s
+        UNION ALL
+        SELECT {column_str} FROM {source_table} module_data
+        INNER JOIN {metadata_table} metadata ON metadata.upload_id = module_data.upload_id
+        WHERE ({module_key_str}) IN (
+            SELECT {key_str} FROM {source_table} WHERE upload_id = %s{complete_key_filter}
+        )
+        AND module_data.upload_id <> %s
+        AND metadata.module_id=%s
+        AND metadata.submission_status IN ('Pending', 'Submitted', 'Approved')
+        AND metadata.parent_org=%s
+    """
     return module_query
 
 
 def get_duplicates_query_builder(
-    module_id, constraint_columns, df_number_of_rows, is_null_data=False
+    module_id, constraint_columns, is_null_data=False, join_columns=None
 ):
     """
-    Creates query to check for duplicates for module 4 data
+    Creates query to check for duplicates of the upload's unique constraint keys, which are
+    loaded into the upload_keys_table beforehand. The keys are matched on join_columns,
+    the constraint columns themselves by default.
     """
     source_table = ModuleDataTables[f"Module{module_id}"].value
 
@@ -79,27 +102,112 @@ def get_duplicates_query_builder(
     # TODO: get modules correctly
     quarterly_and_annual_module_ids = ["2", "3", "4", "5"]
     if is_null_data and module_id in quarterly_and_annual_module_ids:
-        quarterly_and_annual_filters = " AND year=%s AND quarter=%s "
+        quarterly_and_annual_filters = " AND metadata.year=%s AND metadata.quarter=%s "
 
-    column_str = ", ".join(constraint_columns)
-    values_placeholder = ", ".join(["%s"] * len(constraint_columns))
-    in_clause = ", ".join(["(" + values_placeholder + ")"] * df_number_of_rows)
+    column_str = ", ".join(f"module_data.{column}" for column in constraint_columns)
+    join_clause = " AND ".join(
+        f"upload_keys.{column} = module_data.{column}"
+        for column in join_columns or constraint_columns
+    )
 
+    # rows of the upload itself are returned regardless of their keys, the UNION lets
+    # each half of the query use its own index
     module_query = f"""
-        SELECT DISTINCT {column_str}, upload_id, station_id_upload FROM {source_table}
-        WHERE upload_id = %s
-        OR upload_id IN (
-            SELECT upload_id FROM {metadata_table}
-            WHERE module_id=%s
-            AND submission_status IN ('Pending', 'Submitted', 'Approved')
-            AND parent_org=%s
-            {quarterly_and_annual_filters}
-        )
-        AND ({column_str}) IN({in_clause})
+        SELECT {column_str}, module_data.upload_id, module_data.station_id_upload
+        FROM {source_table} module_data
+        WHERE module_data.upload_id = %s
+        UNION
+        SELECT {column_str}, module_data.upload_id, module_data.station_id_upload
+        FROM {upload_keys_table} upload_keys
+        INNER JOIN {source_table} module_data ON {join_clause}
+        INNER JOIN {metadata_table} metadata ON metadata.upload_id = module_data.upload_id
+        WHERE metadata.module_id=%s
+        AND metadata.submission_status IN ('Pending', 'Submitted', 'Approved')
+        AND metadata.parent_org=%s
+        {quarterly_and_annual_filters}
     """
     return module_query
 
 
+def get_upload_keys_collations(cursor, source_table, constraint_columns):
+    """
+    Returns the character set and collation of each constraint column of source_table, read from
+    information_schema so that the upload keys compare like the columns they are joined with.
+    Columns without a collation, such as datetime columns, get the database defaults.
+    """
+    schema, table = source_table.split(".")
+    collation_query = f"""
+        SELECT column_name AS column_name,
+        COALESCE(character_set_name, @@character_set_database) AS character_set_name,
+        COALESCE(collation_name, @@collation_database) AS collation_name
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s
+        AND column_name IN ({", ".join(["%s"] * len(constraint_columns))})
+    """
+    columns = execute_query(
+        query=collation_query,
+        data=(schema, table, *constraint_columns),
+        cursor=cursor,
+        message="Error thrown in module_validation.unique_constraint get_upload_keys_collations()",
+    )
+    return {
+        column["column_name"]: (column["character_set_name"], column["collation_name"])
+        for column in columns
+    }
+
+
+def load_upload_keys(cursor, source_table, constraint_columns, keys_df):
+    """
+    Loads the distinct unique constraint keys of an upload into upload_keys_table, a session
+    temporary table, in chunks of UPLOAD_KEYS_INSERT_CHUNK_SIZE rows. The key columns have the
+    collation of the source_table columns and are widened to fit the longest key of the upload,
+    so that every key is compared like it would be against the module table itself.
+    """
+    keys_df = keys_df[constraint_columns].drop_duplicates()
+    key_lengths = keys_df.apply(lambda column: column.map(lambda value: len(str(value))))
+    column_length = max(UPLOAD_KEYS_MAX_LENGTH, int(key_lengths.to_numpy().max(initial=0)))
+    keys = list(keys_df.itertuples(index=False, name=None))
+
+    collations = get_upload_keys_collations(cursor, source_table, constraint_columns)
+    column_definitions = ", ".join(
+        f"{column} VARCHAR({column_length})"
+        + (
+            f" CHARACTER SET {collations[column][0]} COLLATE {collations[column][1]}"
+            if column in collations
+            else ""
+        )
+        for column in constraint_columns
+    )
+    create_query = (
+        f"CREATE TEMPORARY TABLE {upload_keys_table} "
+        f"({column_definitions}, KEY ({constraint_columns[0]}({UPLOAD_KEYS_MAX_LENGTH})))"
+    )
+    insert_query = (
+        f"INSERT INTO {upload_keys_table} ({', '.join(constraint_columns)}) "
+        f"VALUES ({', '.join(['%s'] * len(constraint_columns))})"
+    )
+
+    try:
+        drop_upload_keys(cursor)
+        cursor.execute(create_query)
+        for start in range(0, len(keys), UPLOAD_KEYS_INSERT_CHUNK_SIZE):
+            cursor.executemany(insert_query, keys[start:start + UPLOAD_KEYS_INSERT_CHUNK_SIZE])
+    except Exception as e:
+        raise EvChartDatabaseAuroraQueryError(
+            message=(
+                "Error thrown in module_validation.unique_constraint load_upload_keys(). "
+                f"Error loading the upload keys: {repr(e)}"
+            )
+        ) from e
+
+
+def drop_upload_keys(cursor):
+    """
+    Drops upload_keys_table so that the next upload on the same connection starts empty
+    """
+    cursor.execute(f"DROP TEMPORARY TABLE IF EXISTS {upload_keys_table}")
+
+
 def get_constraints_conditions(log_event, submission_upload_id, constraints):
     """
     Returns a list of error objects regarding duplicate records found within the system
@@ -155,20 +263,10 @@ def check_constraints_in_data(df, unique_constraint, feature_toggle_set=frozense
     Returns a dataframe with the upload_ids of the uploads that violate unique_constraints,
     if all upload_ids satisfy the unique_constraints, then function returns an empty response
     """
-    constraint_df = df.copy()
-
     extra_merge_fields = ["station_id_upload", "network_provider_upload"]
-    # extra_merge_fields = ["station_id_upload"]
-    size_df = constraint_df.groupby(unique_constraint).size()
-    merge_df = constraint_df.merge(
-        size_df.rename("duplicate_count"), left_on=unique_constraint, right_index=True
-    )
+    duplicates = df[df.duplicated(subset=unique_constraint, keep=False)]
 
-    return (
-        merge_df[merge_df["duplicate_count"] > 1]
-        .groupby(unique_constraint + extra_merge_fields)["upload_id"]
-        .apply(set)
-    )
+    return duplicates.groupby(unique_constraint + extra_merge_fields)["upload_id"].apply(set)
 
 
 def unique_constraint_violations(
@@ -182,18 +280,23 @@ def unique_constraint_violations(
     if feature_by_module_number[int(module_id)] not in feature_toggle_set:
         return {"errors": [], "df": None}
 
-    source_table = ModuleDataTables[f"Module{module_id}"].value
-    module_query = query_builder_module_details(source_table)
-    module_df = execute_query_df(
-        query=module_query, data=(upload_id, module_id, dr_id), cursor=cursor
-    )
-
     if Feature.DATABASE_CENTRAL_CONFIG in feature_toggle_set:
-        config = DatabaseCentralConfig()
-        unique_constraint = config.unique_key_constraints(module_id)
+        unique_constraint = list(
+            get_validation_plan(module_id, feature_toggle_set).unique_key_constraints
+        )
     else:
         unique_constraint = get_module_constraints_by_module_id(module_id)
 
+    # only the keys of the upload being submitted are fetched, so the size of the result
+    # depends on the submission rather than on the history of the org
+    source_table = ModuleDataTables[f"Module{module_id}"].value
+    module_query = query_builder_module_keys(source_table, unique_constraint, feature_toggle_set)
+    module_df = execute_query_df(
+        query=module_query,
+        data=(upload_id, upload_id, upload_id, module_id, dr_id),
+        cursor=cursor,
+    )
+
     constraints_found = check_constraints_in_data(
         df=module_df,
         unique_constraint=unique_constraint,
@@ -215,21 +318,25 @@ def unique_constraint_violations_for_async(
     df,
     module_id: str,
     feature_toggle_set: set = frozenset(),
+    upload_df=None,
 ) -> dict:
     """
     Returns a dictionary of an errors list and dataframe that holds the invalid key constraint
-    errors for async/s2s. If no errors are found, an empty dictionary is returned
+    errors for async/s2s. If no errors are found, an empty dictionary is returned.
+    upload_df is the uploaded text of a validated df, used for the unique key fingerprints.
     """
     # pylint: disable=too-many-positional-arguments
-    async_df = df.copy()
+    # the categorical identifier columns of a compact validated dataframe are grouped and compared
+    # on their values below, which categoricals only do for the categories that are observed
+    async_df = df.astype({column: "string" for column in df.select_dtypes("category").columns})
     async_df.rename({"network_provider": "network_provider_upload"}, axis="columns", inplace=True)
     if feature_by_module_number[int(module_id)] not in feature_toggle_set or async_df.empty:
         return {"errors": [], "df": None}
 
     if Feature.DATABASE_CENTRAL_CONFIG in feature_toggle_set:
-        config = DatabaseCentralConfig()
-        constraints = config.unique_key_constraints(module_id)
-        required_empty_allowed_fields = config.required_empty_allowed_fields(int(module_id))
+        plan = get_validation_plan(module_id, feature_toggle_set)
+        constraints = list(plan.unique_key_constraints)
+        required_empty_allowed_fields = set(plan.required_empty_allowed_fields)
     else:
         constraints = get_module_constraints_by_module_id(module_id)
         required_empty_allowed_fields = set(
@@ -267,7 +374,15 @@ def unique_constraint_violations_for_async(
     if not df_with_null_data.empty:
         df_with_null_data = df_with_null_data.copy()
         null_duplicates_df = get_duplicate_within_db(
-            cursor, upload_id, dr_id, module_id, constraints, df_with_null_data, is_null_data=True
+            cursor,
+            upload_id,
+            dr_id,
+            module_id,
+            constraints,
+            df_with_null_data,
+            is_null_data=True,
+            feature_toggle_set=feature_toggle_set,
+            upload_df=upload_df,
         )
 
     if not df_without_null_data.empty:
@@ -280,6 +395,8 @@ def unique_constraint_violations_for_async(
             constraints,
             df_without_null_data,
             is_null_data=False,
+            feature_toggle_set=feature_toggle_set,
+            upload_df=upload_df,
         )
 
     # combining the df to get all duplicates found in the db
@@ -332,14 +449,24 @@ def unique_constraint_violations_for_async(
 
 
 def get_duplicate_within_db(
-    cursor, upload_id, dr_id, module_id, constraints, async_df, is_null_data: bool
+    cursor,
+    upload_id,
+    dr_id,
+    module_id,
+    constraints,
+    async_df,
+    is_null_data: bool,
+    feature_toggle_set=frozenset(),
+    upload_df=None,
 ):
     """
     Returns a dataframe with the duplicates present within the databse. The constraints are updated for the query if the
     current module has key constraints that are allowed to be null due to null ack (currently only for mod 2 & 4)
     These constraints are removed for the query, and then "" are filled in to signify that a null was provided for that
     column. The query also properly checks for duplicates depending on module frequency.
+    Non-null data is matched on the unique key fingerprint when UNIQUE_KEY_FINGERPRINT is enabled.
     """
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
     # have to remove key constraints that are auto generated in the db when querying null modules
     if is_null_data and (module_id == "2" or module_id == "4"):
         system_generated_unique_key_constraints = ["outage_id", "session_id"]
@@ -358,9 +485,20 @@ def get_duplicate_within_db(
     year = upload_metadata.get("year")
     quarter = upload_metadata.get("quarter")
 
-    # calling query builder
-    df_number_of_rows = len(async_df)
-    query = get_duplicates_query_builder(module_id, constraints, df_number_of_rows, is_null_data)
+    # calling query builder, fingerprints only cover the full unique constraints
+    keys_df = async_df
+    join_columns = None
+    if not is_null_data and Feature.UNIQUE_KEY_FINGERPRINT in feature_toggle_set:
+        keys_df = pandas.DataFrame(
+            {
+                UNIQUE_KEY_FINGERPRINT: get_unique_key_fingerprints(
+                    async_df, module_id, feature_toggle_set, upload_df
+                ),
+                "network_provider_upload": async_df["network_provider_upload"],
+            }
+        )
+        join_columns = [UNIQUE_KEY_FINGERPRINT, "network_provider_upload"]
+    query = get_duplicates_query_builder(module_id, constraints, is_null_data, join_columns)
 
     # preparing query data
     query_values_list = [upload_id, module_id, dr_id]
@@ -368,11 +506,19 @@ def get_duplicate_within_db(
     if is_null_data and module_id in quarterly_and_annual_module_ids:
         query_values_list.extend([year, quarter])
 
-    # adding in query values from the df
-    df_query_values = async_df[constraints].fillna("NULL").values.flatten().tolist()
-    query_values_list.extend(df_query_values)
-    query_values_tuple = tuple(query_values_list)
-    duplicates_from_db = execute_query_df(query=query, data=query_values_tuple, cursor=cursor)
+    # loading the keys from the df, the query size no longer depends on the number of rows
+    load_upload_keys(
+        cursor,
+        ModuleDataTables[f"Module{module_id}"].value,
+        join_columns or constraints,
+        keys_df.fillna("NULL"),
+    )
+    try:
+        duplicates_from_db = execute_query_df(
+            query=query, data=tuple(query_values_list), cursor=cursor
+        )
+    finally:
+        drop_upload_keys(cursor)
 
     # updating outage_id (module 4) and session_id (module 2) values to "" for key constraints if null modules
     # and adding these keys back to constraints list so that it can be properly evaluated when creating error mesage
@@ -411,10 +557,4 @@ def get_requried_and_requried_empty_allowed_fields_from_module_definitions(
     """
     Returning the nullable required fields by module_id from module definitions
     """
-    required_empty_allowed_fields = []
-    module_field_list = _get_module_fields_by_number(int(module_id), feature_toggle_set)
-    for field_obj in module_field_list:
-        if field_obj.get("required") == True and field_obj.get("required_empty_allowed") == True:
-            required_empty_allowed_fields.append(field_obj.get("field_name"))
-
-    return required_empty_allowed_fields
+    return list(get_validation_plan(module_id, feature_toggle_set).required_empty_allowed_fields)
@@ -2,11 +2,27 @@
 Row-level validation checks for Module 2 uploads performed during AsyncBizMagic.
 Module-specific business logic is applied and verified
 """
-import pandas
-
 from database_central_config import DatabaseCentralConfig
 from feature_toggle.feature_enums import Feature
 from error_report_messages_enum import ErrorReportMessages
+from module_validation.business_rules import BusinessRule, evaluate_rules
+
+# columns that identify the station of a session rather than describe the session
+STATION_FIELDS = ["station_id", "port_id", "network_provider", "station_uuid", "upload_id"]
+
+# A valid empty row of data must have an empty session_id and must be a unique row. This is
+# because session_id is part of the unique constraints for module 2, so this check is to verify
+# there are no duplicate null data present within the csv.  Rows that are neither valid empty
+# rows nor have all required fields filled out report each of their blank required fields.
+business_rules = [
+    BusinessRule(
+        condition=(
+            "any_missing(required_fields) & ~(all_blank(session_fields) & blank(session_id))"
+        ),
+        message=ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN,
+        blank_fields="required_fields",
+    ),
+]
 
 
 def validate_empty_session(validation_options):
@@ -37,48 +53,8 @@ def validate_empty_session(validation_options):
             "payment_method"
         ]
 
-    validated_df = df.copy()
-    validated_df = validated_df.drop(columns=["station_id", "port_id", "network_provider", "station_uuid", "upload_id"], axis=1, errors='ignore')
-    valid_empty_rows = []
-
-    # adding a new column to hold boolean values to denote whether each row is a valid empty row
-    # or if the row is a valid non-empty row where all requried fields are filled out
-    for index, row in validated_df.iterrows():
-        if is_valid_empty_row(row):
-            valid_empty_rows.append(True)
-        else:
-            valid_empty_rows.append(False)
-    validated_df['valid_empty_row'] = valid_empty_rows
-
-    # checks for valid non-empty rows
-    validated_df['valid_all_required'] = validated_df.apply(
-        lambda x: all(x[rf] for rf in required_fields),
-        axis=1
-    )
-
-    # constructs conditions object based on rows with missing required fields
-    return {'conditions': [
-        {
-            'error_row': row,
-            'error_description':(
-                ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name= column)
-            ),
-            'header_name': column
-        }
-        # evaluates rows that have partially filled out requried fields ie:entire row is not empty or completely filled out
-        for row in validated_df[
-            ~validated_df[['valid_empty_row', 'valid_all_required']]
-            .any(axis=1)
-        ].index
-        # evaluates the row and creates a list of col that have empty values and is in required_fields list
-        for column in validated_df.loc[[row], (validated_df.loc[[row]] == "").any()].columns.tolist() if column in required_fields
-    ]}
-
-
-def is_valid_empty_row(row):
-    """
-    A valid empty row of data must have an empty session_id and must be a unique row. This is
-    because session_id is part of the unique constraints for module 2, so this check is to verify
-    there are no duplicate null data present within the csv
-    """
-    return len(pandas.unique(row)) == 1 and row["session_id"] == ''
\ No newline at end of file
+    # cells missing from short csv rows are not filled out either
+    return evaluate_rules(business_rules, validation_options, {
+        "required_fields": list(required_fields),
+        "session_fields": [column for column in df.columns if column not in STATION_FIELDS],
+    })
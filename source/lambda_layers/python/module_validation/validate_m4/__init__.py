@@ -9,6 +9,17 @@ blank in order for the data to be considered valid.
 
 from feature_toggle.feature_enums import Feature
 from error_report_messages_enum import ErrorReportMessages
+from module_validation.business_rules import ALL_FIELDS, BusinessRule, evaluate_rules
+
+# for non-empty rows, outage_id and outage_duration are either both blank or both filled out.
+# A row with only one of them blank reports each of its blank cells
+business_rules = [
+    BusinessRule(
+        condition="blank(outage_id) ^ blank(outage_duration)",
+        message=ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN,
+        blank_fields=ALL_FIELDS,
+    ),
+]
 
 
 def validate_empty_outage(validation_options):
@@ -20,36 +31,8 @@ def validate_empty_outage(validation_options):
     data, are stored in a list of dicts and is returned as a whole conditions object.
     """
     feature_toggle_set = validation_options.get('feature_toggle_set')
-    df = validation_options.get('df')
 
     if Feature.BIZ_MAGIC not in feature_toggle_set:
         return {'conditions': []}
 
-    # adding a new boolean column that is set to true if the outage_id field is empty but the outage_duration is not
-    validated_df = df.copy()
-    validated_df['duration_empty__id_not'] = (
-        (validated_df['outage_duration'] == '') &
-        (validated_df['outage_id'] != '')
-    )
-
-    # adding a new boolean column that is set to true if the outage_duration field is empty but the outage_id is not
-    validated_df['id_empty__duration_not'] = (
-        (validated_df['outage_id'] == '') &
-        (validated_df['outage_duration'] != '')
-    )
-
-    # constructs conditions object based on validated dataframe
-    return {'conditions': [
-        {
-            'error_row': row,
-            'error_description': (
-                ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name= column)
-            ),
-            'header_name': column
-        }
-        for row in validated_df[
-            validated_df[['id_empty__duration_not', 'duration_empty__id_not']]
-            .any(axis=1)
-        ].index
-        for column in validated_df.loc[[row], (validated_df.loc[[row]] == "").any()].columns.tolist()
-    ]}
+    return evaluate_rules(business_rules, validation_options)
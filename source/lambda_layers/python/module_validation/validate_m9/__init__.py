@@ -5,6 +5,17 @@ Module-specific business logic is applied and verified
 from database_central_config import DatabaseCentralConfig
 from feature_toggle.feature_enums import Feature
 from error_report_messages_enum import ErrorReportMessages
+from module_validation.business_rules import BusinessRule, evaluate_rules
+
+# rows may leave only the capital install cost fields empty, other rows report each of their
+# blank required fields.  Recommended fields missing from the upload are not blank
+business_rules = [
+    BusinessRule(
+        condition="~all_blank(capital_install_cost_fields) & any_blank(required_fields)",
+        message=ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN,
+        blank_fields="required_fields",
+    ),
+]
 
 
 def validate_empty_capital_install_costs(validation_options):
@@ -16,7 +27,6 @@ def validate_empty_capital_install_costs(validation_options):
     of dicts and is returned as a whole conditions object.
     """
     feature_toggle_set = validation_options.get("feature_toggle_set")
-    df = validation_options.get("df")
 
     if Feature.ASYNC_BIZ_MAGIC_MODULE_9 not in feature_toggle_set:
         return {"conditions": []}
@@ -57,36 +67,7 @@ def validate_empty_capital_install_costs(validation_options):
             "service_cost_total",
         ]
 
-    validated_df = df.copy()
-
-    # Add recommended columns to data irrespective of central config being enabled.
-    recommended_fields = [col for col in empty_capital_install_cost_fields if col not in required_fields]
-    for field in recommended_fields:
-        if field not in validated_df:
-            validated_df[field] = None
-
-    empty_capital_install_cost_df = validated_df[list(empty_capital_install_cost_fields)]
-    validated_df["valid_empty_row"] = (empty_capital_install_cost_df == "").all(axis=1)
-
-    required_fields_df = validated_df[list(required_fields)]
-    validated_df["valid_all_required"] = (required_fields_df != "").all(axis=1)
-
-    # constructs conditions object based on rows with missing required fields
-    return {
-        "conditions": [
-            {
-                "error_row": row,
-                "error_description": (
-                    ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name=column)
-                ),
-                "header_name": column,
-            }
-            for row in validated_df[
-                ~validated_df[["valid_empty_row", "valid_all_required"]].any(axis=1)
-            ].index
-            for column in validated_df.loc[
-                [row], (validated_df.loc[[row]] == "").any()
-            ].columns.tolist()
-            if column in required_fields
-        ]
-    }
+    return evaluate_rules(business_rules, validation_options, {
+        "required_fields": list(required_fields),
+        "capital_install_cost_fields": list(empty_capital_install_cost_fields),
+    })
@@ -4,249 +4,262 @@ schema_compliance.authorization_registration
 A list of helper functions to verify schema compliance.
 """
 
+import pandas
+
 from evchart_helper.api_helper import execute_query_fetchone, execute_query_df
 from evchart_helper.database_tables import ModuleDataTables
-from feature_toggle import FeatureToggleService
 from feature_toggle.feature_enums import Feature
 from error_report_messages_enum import ErrorReportMessages
 
+# number of (station_id, network_provider) pairs checked per eligibility query
+STATION_ELIGIBILITY_CHUNK_SIZE = 1000
+STATION_ELIGIBILITY_COLUMNS = [
+    "station_id",
+    "network_provider",
+    "station_uuid",
+    "status",
+    "dr_id",
+    "authorization_uuid",
+]
+
 
-def stations_not_registered(df):
+def get_station_registration_uuid(cursor, org_id, station_id):
     """
-    Returns a list of condition objects where
-    each object catches: missing station_uuid column, missing
-    station_uuid cells, and unregistered stations.
+    Returns station_uuid if a station exists in station_registrations
+    for the given station_id, otherwise returns None.
     """
-    conditions = []
-    for index, data in df[df["station_uuid"].isna()].iterrows():
-        if df["network_provider"][index] == "":
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": "network_provider",
-                    "error_description": (
-                        ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                            column_name="network_provider"
-                        )
-                    ),
-                }
-            )
-        elif df["station_id"][index] == "":
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": "station_id",
-                    "error_description": (
-                        ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
-                            column_name="station_id"
-                        )
-                    ),
-                }
-            )
-        else:
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": "station_id",
-                    "error_description": ErrorReportMessages.STATION_NOT_REGISTERED.format(
-                        station_id=data["station_id"], network_provider=data["network_provider"]
-                    ),
-                }
-            )
-    return conditions
+    registration_query = f"""
+        SELECT station_uuid FROM {ModuleDataTables["RegisteredStations"].value}
+        WHERE org_id=%s AND station_id=%s
+    """
+    result_arr = execute_query_fetchone(
+        query=registration_query,
+        data=(org_id, station_id),
+        cursor=cursor,
+        message="Error thrown in authorization_registration helper file: is_station_registered()",
+    )
 
+    # returns station_uuid or None if not found in station_registrations table
+    if result_arr is None or len(result_arr) == 0:
+        return None
+    return result_arr[0]
 
-def unauthorized_stations_for_dr(cursor, dr_id, df):
-    conditions = []
-    in_clause = ", ".join(["%s"] * len(df))
-    if not df.empty:
-        query = f"""
-            SELECT station_uuid
-            FROM {ModuleDataTables["RegisteredStations"].value}
-            WHERE station_uuid in ({in_clause})
-            AND dr_id != %s"""
-
-        # The trailing comma is important.  this is a 1 element tuple
-        query_data = tuple(df["station_uuid"]) + (dr_id,)
-
-        result = execute_query_df(cursor=cursor, query=query, data=query_data)
-
-        if not result.empty:
-            for _, row in result.iterrows():
-                station_uuid = row["station_uuid"]
-                index = df.index[df["station_uuid"] == station_uuid].item()
-                data = df.loc[index]
-                conditions.append(
-                    {
-                        "error_row": index,
-                        "header_name": "station_id",
-                        "error_description": ErrorReportMessages.DR_NOT_AUTHORIZED_TO_SUBMIT.format(
-                            station_id=data["station_id"], network_provider=data["network_provider"]
-                        ),
-                    }
-                )
-    return conditions
+
+def query_builder_station_eligibility(stations, dr_id, sr_id=None, feature_toggle_set=frozenset()):
+    """
+    Returns a query based on the given inputs for selecting the
+    station_uuid, status and owning direct recipient of every registered
+    (station_id, network_provider) pair in stations, along with the
+    authorization_uuid of the sub-recipient if sr_id is given.
+    """
+    station_registrations_table = ModuleDataTables["RegisteredStations"].value
+    station_authorizations_table = ModuleDataTables["StationAuthorizations"].value
+    network_providers_table = ModuleDataTables["NetworkProviders"].value
+    in_clause = ", ".join(["(%s, %s)"] * len(stations))
+    query_data = ()
+
+    if sr_id:
+        authorizer_column = "dr_id"
+        authorizee_column = "sr_id"
+        if Feature.N_TIER_ORGANIZATIONS in feature_toggle_set:
+            authorizer_column = "authorizer"
+            authorizee_column = "authorizee"
+        authorization_column = "sa.authorization_uuid"
+        authorization_join = (
+            f"LEFT JOIN {station_authorizations_table} sa "
+            f"ON sa.station_uuid = sr.station_uuid "
+            f"AND sa.{authorizer_column}=%s AND sa.{authorizee_column}=%s "
+        )
+        query_data += (dr_id, sr_id)
+    else:
+        authorization_column = "NULL"
+        authorization_join = ""
+
+    eligibility_query = (
+        f"SELECT sr.station_id, np.network_provider_value AS network_provider, "
+        f"sr.station_uuid, sr.status, sr.dr_id, {authorization_column} AS authorization_uuid "
+        f"FROM {station_registrations_table} sr "
+        f"INNER JOIN {network_providers_table} np ON sr.network_provider_uuid = np.network_provider_uuid "
+        f"{authorization_join}"
+        f"WHERE (sr.station_id, np.network_provider_value) IN ({in_clause})"
+    )
+    query_data += tuple(value for station in stations for value in station)
+    return eligibility_query, query_data
 
 
-def stations_not_authorized(
+def get_station_eligibility(
     cursor,
+    stations,
     dr_id,
-    sr_id,
-    df,
+    sr_id=None,
+    feature_toggle_set=frozenset(),
+    chunk_size=STATION_ELIGIBILITY_CHUNK_SIZE,
 ):
     """
-    Returns a list of conditions if s station is
-    not authorized to the given direct or sub-recipient
-    in station_authorizations table.
+    Returns a dataframe with the station_uuid, status, owning dr_id and
+    sub-recipient authorization_uuid of each registered station, keyed by
+    station_id and network_provider exactly as given in stations.  Stations
+    are looked up with one query per chunk_size stations; a station whose
+    stored identifiers only match by database collation (e.g. different
+    case) is looked up on its own.  Unregistered stations are not returned.
     """
-    conditions = []
-
-    df_copy = df.copy()
-    df_copy["authorization_uuid"] = get_auth_and_unauth_stations(cursor, dr_id, sr_id, df)
-
-    # go through list and add conditions to where stations are not auth
-    # (in the list as None)
-    for index, data in df_copy[df_copy["authorization_uuid"].isna()].iterrows():
-        if data.get("station_uuid"):
-            conditions.append(
-                {
-                    "error_row": index,
-                    "header_name": "station_id",
-                    "error_description": ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT.format(
-                        station_id=data["station_id"], network_provider=data["network_provider"]
-                    ),
-                }
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    stations = list(dict.fromkeys(stations))
+    frames = []
+    for start in range(0, len(stations), chunk_size):
+        eligibility_query, query_data = query_builder_station_eligibility(
+            stations[start:start + chunk_size], dr_id, sr_id, feature_toggle_set
+        )
+        frames.append(
+            execute_query_df(
+                query=eligibility_query,
+                data=query_data,
+                cursor=cursor,
+                message="Error thrown in authorization_registration helper file: get_station_eligibility()",
             )
-
-    return conditions
-
-
-def stations_not_active(cursor, dr_id, df, feature_toggle_set=frozenset()):
-    """
-    Returns a list of condition objects, each of which is a
-    station with status of 'Pending Approval'
-    """
-    conditions = []
-    if Feature.SR_ADDS_STATION in feature_toggle_set:
-        station_registrations_table = ModuleDataTables["RegisteredStations"].value
-        pending_stations_query = f"""
-            SELECT station_uuid from {station_registrations_table}
-            WHERE status='Pending Approval'
-            AND dr_id=%s
-        """
-
-        # get list of pending stations
-        pending_stations_df = execute_query_df(
-            query=pending_stations_query, data=(dr_id,), cursor=cursor
         )
-        pending_stations_set = set(pending_stations_df["station_uuid"])
-
-        # if station found in list of pending stations, then create and add a new error
-        for index, data in df.iterrows():
-            if data["station_uuid"] in pending_stations_set:
-                conditions.append(
-                    {
-                        "error_row": index,
-                        "header_name": "station_id",
-                        "error_description": (
-                            ErrorReportMessages.INVALID_STATION_STATUS_PENDING_APPROVAL.format()
-                        ),
-                    }
-                )
-
-    return conditions
-
 
-def _get_station_auth_uuid(lookup_table, cursor, dr_id, sr_id, station_uuid, network_provider=None):
-    # Quick lookup table implementation to reduce repeated unnecessary DB calls.
-    key_tuple = (dr_id, sr_id, station_uuid)
-    if key_tuple not in lookup_table:
-        print(f"lookup miss for {key_tuple}; hitting db")
-        lookup_table[key_tuple] = get_station_auth_uuid(
-            cursor, dr_id, sr_id, station_uuid, network_provider
+    found = {
+        station
+        for frame in frames
+        for station in zip(frame["station_id"], frame["network_provider"])
+    }
+    for station_id, network_provider in stations:
+        if (station_id, network_provider) in found:
+            continue
+        eligibility_query, query_data = query_builder_station_eligibility(
+            [(station_id, network_provider)], dr_id, sr_id, feature_toggle_set
         )
-
-    return lookup_table[key_tuple]
+        station_df = execute_query_df(
+            query=eligibility_query,
+            data=query_data,
+            cursor=cursor,
+            message="Error thrown in authorization_registration helper file: get_station_eligibility()",
+        )
+        if not station_df.empty:
+            frames.append(station_df.assign(station_id=station_id, network_provider=network_provider))
+
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pandas.DataFrame(columns=STATION_ELIGIBILITY_COLUMNS)
+    eligibility = pandas.concat(frames, ignore_index=True)[STATION_ELIGIBILITY_COLUMNS]
+    requested = set(stations)
+    is_requested = [
+        station in requested
+        for station in zip(eligibility["station_id"], eligibility["network_provider"])
+    ]
+    return eligibility[is_requested].reset_index(drop=True)
 
 
-def get_auth_and_unauth_stations(
-    cursor,
-    dr_id,
-    sr_id,
-    df,
-):
+def _station_conditions(df, mask, header_name, error_description):
     """
-    List builder function that parses through a dataframe
-    and returns a list of authorization_uuid's or None
+    Returns a condition object for each row of df selected by mask, with the
+    error_description formatted from that row's station_id and
+    network_provider.
     """
-    lookup_table = {}
     return [
-        _get_station_auth_uuid(lookup_table, cursor, dr_id, sr_id, s, np)
-        for s, np in df[["station_uuid", "network_provider"]].to_records(index=False)
+        {
+            "error_row": index,
+            "header_name": header_name,
+            "error_description": error_description.format(
+                station_id=station_id, network_provider=network_provider
+            ),
+        }
+        for index, station_id, network_provider in zip(
+            df.index[mask], df["station_id"][mask], df["network_provider"][mask]
+        )
     ]
 
 
-def query_builder_authorization_uuid(dr_id, sr_id, station_uuid):
+def _station_not_registered_condition(index, station_id, network_provider):
     """
-    Returns a query based on the given inputs for selecting
-    authorization_uuid from station_authorization table.
+    Returns the condition object for a row whose station could not be
+    found, flagging a missing network_provider or station_id first.
     """
-    station_authorizations_table = ModuleDataTables["StationAuthorizations"].value
-    authorizer_column = "dr_id"
-    authorizee_column = "sr_id"
-
-    features = FeatureToggleService().get_active_feature_toggles(log_event=None)
-    if Feature.N_TIER_ORGANIZATIONS in features:
-        authorizer_column = "authorizer"
-        authorizee_column = "authorizee"
-
-    auth_query = (
-        f"SELECT authorization_uuid FROM {station_authorizations_table} "
-        f"WHERE {authorizer_column}=%s AND {authorizee_column}=%s AND station_uuid=%s"
-    )
-    query_data = (dr_id, sr_id, station_uuid)
-    return auth_query, query_data
+    if network_provider == "":
+        header_name = "network_provider"
+        error_description = ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+            column_name="network_provider"
+        )
+    elif station_id == "":
+        header_name = "station_id"
+        error_description = ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+            column_name="station_id"
+        )
+    else:
+        header_name = "station_id"
+        error_description = ErrorReportMessages.STATION_NOT_REGISTERED.format(
+            station_id=station_id, network_provider=network_provider
+        )
+    return {"error_row": index, "header_name": header_name, "error_description": error_description}
 
 
-def get_station_auth_uuid(cursor, dr_id, sr_id, station_uuid, network_provider=None):
+def station_eligibility_conditions(
+    df, eligibility, dr_id, sr_id=None, recipient_type=None, feature_toggle_set=frozenset()
+):
     """
-    Lookup function that returns authorization_uuid if a sub-recipient
-    is authorized to submit for that station that direct recipient. Otherwise,
-    returns None.
+    Sets station_uuid on df (None for unregistered stations) from the
+    results of get_station_eligibility and returns the list of condition
+    objects for, in order: missing or unregistered stations, stations
+    pending approval, direct-recipient uploads for stations owned by
+    another direct recipient, and sub-recipient uploads for stations the
+    sub-recipient is not authorized for.
     """
-    auth_query, query_data = query_builder_authorization_uuid(dr_id, sr_id, station_uuid)
-
-    result_arr = execute_query_fetchone(
-        query=auth_query,
-        data=query_data,
-        cursor=cursor,
-        message=(
-            "Error thrown in authroization_registration helper file: " "get_station_auth_uuid()"
-        ),
+    # pylint: disable=too-many-arguments,too-many-positional-arguments
+    station_keys = ["station_id", "network_provider"]
+    authorized = (
+        eligibility.assign(authorized=eligibility["authorization_uuid"].notna())
+        .groupby(["station_uuid"] + station_keys, sort=False)["authorized"]
+        .any()
+        .reset_index()
     )
+    stations = (
+        df[station_keys]
+        .merge(eligibility.drop_duplicates(subset=station_keys), on=station_keys, how="left")
+        .merge(authorized, on=["station_uuid"] + station_keys, how="left")
+    )
+    station_uuid = stations["station_uuid"].astype(object)
+    df["station_uuid"] = station_uuid.where(station_uuid.notna(), None).to_numpy()
+
+    registered = stations["station_uuid"].notna().to_numpy()
+    conditions = [
+        _station_not_registered_condition(index, station_id, network_provider)
+        for index, station_id, network_provider in zip(
+            df.index[~registered],
+            df["station_id"][~registered],
+            df["network_provider"][~registered],
+        )
+    ]
 
-    if result_arr is None or len(result_arr) == 0:
-        return None
-    return result_arr[0]
+    if Feature.SR_ADDS_STATION in feature_toggle_set:
+        pending = (
+            (stations["status"] == "Pending Approval") & (stations["dr_id"] == dr_id)
+        ).to_numpy()
+        conditions.extend(
+            _station_conditions(
+                df,
+                pending,
+                "station_id",
+                ErrorReportMessages.INVALID_STATION_STATUS_PENDING_APPROVAL,
+            )
+        )
 
+    if recipient_type == "direct-recipient":
+        owned_by_other_dr = (
+            registered & stations["dr_id"].notna().to_numpy() & (stations["dr_id"] != dr_id).to_numpy()
+        )
+        conditions.extend(
+            _station_conditions(
+                df, owned_by_other_dr, "station_id", ErrorReportMessages.DR_NOT_AUTHORIZED_TO_SUBMIT
+            )
+        )
 
-def get_station_registration_uuid(cursor, org_id, station_id):
-    """
-    Returns station_uuid if a station exists in station_registrations
-    for the given station_id, otherwise returns None.
-    """
-    registration_query = f"""
-        SELECT station_uuid FROM {ModuleDataTables["RegisteredStations"].value}
-        WHERE org_id=%s AND station_id=%s
-    """
-    result_arr = execute_query_fetchone(
-        query=registration_query,
-        data=(org_id, station_id),
-        cursor=cursor,
-        message="Error thrown in authorization_registration helper file: is_station_registered()",
-    )
+    if sr_id:
+        not_authorized = registered & ~stations["authorized"].eq(True).to_numpy()
+        conditions.extend(
+            _station_conditions(
+                df, not_authorized, "station_id", ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT
+            )
+        )
 
-    # returns station_uuid or None if not found in station_registrations table
-    if result_arr is None or len(result_arr) == 0:
-        return None
-    return result_arr[0]
+    return conditions
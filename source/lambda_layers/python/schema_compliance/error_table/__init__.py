@@ -6,87 +6,136 @@ Holds the functions used to insert into the error table
 
 import json
 import datetime
+import os
 from dateutil import tz
-from evchart_helper.api_helper import execute_query, get_org_info_dynamo
-from evchart_helper.custom_exceptions import EvChartJsonOutputError
+from error_report_messages_enum import ErrorReportMessages
+from evchart_helper.api_helper import get_org_info_dynamo
+from evchart_helper.custom_exceptions import (
+    EvChartDatabaseAuroraQueryError,
+    EvChartJsonOutputError,
+)
 from evchart_helper.database_tables import ModuleDataTables
 
 ev_error_data = ModuleDataTables["EvErrorData"].value
 
-def error_table_insert(cursor, upload_id, module_id, org_id, dr_id, condition_list, df):
+# number of error records sent to the database in a single executemany
+ERROR_TABLE_INSERT_CHUNK_SIZE = 1000
+
+# errors found beyond this number are replaced by a single summary error
+ERROR_TABLE_MAX_ERRORS = 10000
+
+
+def get_error_table_max_errors():
+    """
+        Returns the most errors stored for a single upload, 0 for no limit.
+        Can be overridden with the ERROR_TABLE_MAX_ERRORS environment variable.
+    """
+    return int(os.environ.get("ERROR_TABLE_MAX_ERRORS", ERROR_TABLE_MAX_ERRORS))
+
+
+def error_table_insert(
+    cursor, upload_id, module_id, org_id, dr_id, condition_list, df, max_errors=None
+):
     """
         Returns True if data was successfully inserted into the ev_error_table
         NOTE: Only provide dr_id if org_id is an SR
     """
-    query_data = {}
-
-    #set upload_id, module_id, timestamp for all records going into error table
-    query_data["upload_id"] = upload_id
-    query_data["module_id"] = module_id
-    query_data["timestamp"] = datetime.datetime.now(tz.gettz("UTC"))
-
-    #setting row level errors
-    for condition in condition_list:
-        #sets general error info
-        query_data["error_row"] = condition["error_row"]
-        query_data["error_description"] = condition["error_description"]
-        query_data["header_name"] = condition["header_name"]
-        set_org_ids(query_data, org_id, dr_id)
-
-        #sets row level errors: record, station_id, friendly dr_id, friendly sr_id
-        if query_data["error_row"] is not None:
-            set_record(query_data, condition, df)
-            set_station_id(query_data, condition, df)
-
-        #sets column level errors
-        else:
-            query_data["record"] = json.dumps({})
-            query_data["station_id"] = None
-
-        insert_query = f"""
-            INSERT INTO {ev_error_data}
-            (upload_id, module_id, timestamp, error_row, error_description, header_name, dr_org_friendly_id, sr_org_friendly_id, record, station_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        execute_query(
-            query=insert_query,
-            data=tuple(query_data.values()),
-            cursor=cursor, message="Error thrown in schema_compliance.error_table error_table_insert(). "
+    if max_errors is None:
+        max_errors = get_error_table_max_errors()
+
+    conditions = list(condition_list)
+    if max_errors and len(conditions) > max_errors:
+        conditions = conditions[:max_errors]
+        conditions.append({
+            "error_row": None,
+            "error_description": ErrorReportMessages.ERROR_LIMIT_EXCEEDED.format(
+                max_errors=max_errors
+            ),
+            "header_name": "",
+        })
+
+    #set upload_id, module_id, timestamp and org friendly ids for all records going into error table
+    timestamp = datetime.datetime.now(tz.gettz("UTC"))
+    org_ids = set_org_ids({}, org_id, dr_id)
+    dr_org_friendly_id = org_ids.get("dr_org_friendly_id")
+    sr_org_friendly_id = org_ids.get("sr_org_friendly_id")
+
+    #row level errors share the record and station_id of their row, column level errors have neither
+    records, station_ids = get_error_records(
+        df, {condition["error_row"] for condition in conditions} - {None}
+    )
+    empty_record = json.dumps({})
+
+    insert_data = [
+        (
+            upload_id,
+            module_id,
+            timestamp,
+            condition["error_row"],
+            condition["error_description"],
+            condition["header_name"],
+            dr_org_friendly_id,
+            sr_org_friendly_id,
+            records.get(condition["error_row"], empty_record),
+            station_ids.get(condition["error_row"]),
         )
+        for condition in conditions
+    ]
+
+    insert_query = f"""
+        INSERT INTO {ev_error_data}
+        (upload_id, module_id, timestamp, error_row, error_description, header_name, dr_org_friendly_id, sr_org_friendly_id, record, station_id)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    for start in range(0, len(insert_data), ERROR_TABLE_INSERT_CHUNK_SIZE):
+        try:
+            cursor.executemany(
+                insert_query, insert_data[start:start + ERROR_TABLE_INSERT_CHUNK_SIZE]
+            )
+        except Exception as e:
+            raise EvChartDatabaseAuroraQueryError(
+                message=(
+                    "Error thrown in schema_compliance.error_table error_table_insert(). "
+                    f"Error inserting into the database: {repr(e)}"
+                )
+            ) from e
     return True
 
 
-def set_record(query_data, condition_obj, df):
+def get_error_records(df, error_rows):
     """
-        Convenience function that references the condition_obj to set the correct error record in
-        query_data which will be the data used to insert into error table. The updated
-        query_data dictionary is returned.
+        Convenience function that looks up each of the distinct error rows in df once.
+        Returns a tuple of dicts keyed by error row, the json encoded record and the station_id.
     """
-    try:
-        #get the error row and do a lookup on the df to get contents of record and store into a dict
-        record = df.loc[condition_obj["error_row"]].to_dict()
-        json_record = json.dumps(record, default=str)
-        query_data["record"] = json_record
-        return query_data
+    if not error_rows:
+        return {}, {}
 
-    except Exception as e:
-        raise EvChartJsonOutputError(message=f"Error thrown inserting into error_table. Helper function: set_record(): {e}" )
+    records = get_row_records(df, error_rows, "get_error_records")
+    json_records = {error_row: json_record for error_row, (json_record, _) in records.items()}
+    station_ids = {error_row: station_id for error_row, (_, station_id) in records.items()}
+    return json_records, station_ids
 
 
-
-def set_station_id(query_data, condition, df):
+def get_row_records(df, error_rows, helper):
     """
-        Convenience function that appends station_id into query_data which will be the data used to insert into error table.
-        The updated query_data dictionary is returned.
+        Convenience function that builds the records of the distinct error rows of df in one
+        lookup. Returns a dict keyed by error row of the json encoded record and the station_id
+        of the row. Any error is raised as an EvChartJsonOutputError naming the helper function.
     """
     try:
-        error_row = condition["error_row"]
-        station_id = df.loc[error_row]["station_id"]
-        query_data["station_id"] = station_id
-        return query_data
+        rows = df.loc[sorted(error_rows, key=str)]
+        rows = rows[~rows.index.duplicated()]
+        # missing values, including those of the typed columns of a typed upload frame, are null
+        rows = rows.astype(object).where(rows.notna(), None)
+        return {
+            error_row: (json.dumps(record, default=str), record.get("station_id"))
+            for error_row, record in rows.to_dict(orient="index").items()
+        }
 
     except Exception as e:
-        raise EvChartJsonOutputError(message=f"Error thrown inserting into error_table. Helper function: set_station(): {e}" )
+        raise EvChartJsonOutputError(
+            message=f"Error thrown inserting into error_table. Helper function: {helper}(): {e}"
+        )
 
 
 def set_org_ids(query_data, org_id, dr_id=None):
@@ -0,0 +1,18 @@
+import sys
+import pytest
+
+sys.path.extend(
+    [".", "source/lambda_layers/python", "source/lambda_functions"]
+)
+from evchart_helper.parameter_provider import (  # noqa: E402 # pylint: disable=wrong-import-position
+    parameter_provider
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_parameter_cache():
+    # the provider is shared by every test of a worker, parameters read from one test's
+    # mocked SSM are not served to the next test
+    parameter_provider.clear()
+    yield
+    parameter_provider.clear()
@@ -526,6 +526,7 @@ def test_correctly_outputted_fields_for_m4(
             "time_at_upload": ["2025-04-17 22:46:45", "2025-04-17 22:46:45"],
             "upload_id": ["upload_id", "upload_id"],
             "user_reports_no_data": [1, 0],
+            "unique_key_fingerprint": ["f" * 64, "e" * 64],
         }
     )
     mock_feature_toggle.return_value = {}
@@ -8,12 +8,14 @@ import pytest
 import boto3
 from evchart_helper.boto3_manager import Boto3Manager
 from evchart_helper.custom_exceptions import EvChartUserNotAuthorizedError
+from feature_toggle.feature_enums import Feature
 from moto import mock_aws
 
 
 from APIGetModuleHistoryLog.index import (
     handler as api_get_module_history,
-    format_module_history_data
+    format_module_history_data,
+    get_module_history
 )
 
 
@@ -188,6 +190,7 @@ def test_unauthorized_org_403(
 
 
 @patch.dict(os.environ, {"ENVIRONMENT": "dev"})
+@patch('APIGetModuleHistoryLog.index.FeatureToggleService')
 @patch('APIGetModuleHistoryLog.index.format_fullname_from_email')
 @patch('APIGetModuleHistoryLog.index.format_org_name_from_email')
 @patch('APIGetModuleHistoryLog.index.format_datetime_obj')
@@ -205,7 +208,8 @@ def test_formatting_error_500(
     mock_module_history,
     mock_datetime,
     mock_org_name,
-    mock_full_name
+    mock_full_name,
+    _mock_feature_toggle_service
 ):
 
     mock_upload_id_verified.return_value = True
@@ -225,6 +229,7 @@ def test_formatting_error_500(
 
 
 @patch.dict(os.environ, {"ENVIRONMENT": "dev"})
+@patch('APIGetModuleHistoryLog.index.FeatureToggleService')
 @patch('APIGetModuleHistoryLog.index.format_datetime_obj')
 @patch('APIGetModuleHistoryLog.index.get_module_history')
 @patch('APIGetModuleHistoryLog.index.org_is_authorized')
@@ -239,6 +244,7 @@ def test_valid_api_response_200(
     mock_org_auth,
     mock_module_history,
     mock_datetime,
+    _mock_feature_toggle_service,
     boto3_manager_users,
     boto3_manager_org,
     dynamodb_org,
@@ -394,3 +400,50 @@ def test_preserve_missing_submission_status(
     ]
     response = format_module_history_data(module_history=module_history)
     assert response == expected_formatted_response
+
+
+@patch('APIGetModuleHistoryLog.index.execute_query')
+def test_get_module_history_merges_load_history(mock_execute_query):
+    mock_execute_query.side_effect = [
+        [
+            {"action_type": "INSERT", "updated_on": datetime.datetime(2024, 1, 1)},
+            {"action_type": "UPDATE", "updated_on": datetime.datetime(2024, 1, 3)},
+        ],
+        [{"action_type": "LOAD", "updated_on": datetime.datetime(2024, 1, 2)}],
+    ]
+
+    history = get_module_history(MagicMock(), "1234567", {Feature.BULK_LOAD_HISTORY})
+
+    assert [h["action_type"] for h in history] == ["INSERT", "LOAD", "UPDATE"]
+    assert "module_data_load_history" in mock_execute_query.call_args.kwargs["query"]
+
+
+@patch('APIGetModuleHistoryLog.index.execute_query')
+def test_get_module_history_merges_history_without_updated_on(mock_execute_query):
+    mock_execute_query.side_effect = [
+        [
+            {"action_type": "INSERT", "updated_on": None},
+            {"action_type": "UPDATE", "updated_on": datetime.datetime(2024, 1, 3)},
+        ],
+        [
+            {"action_type": "LOAD", "updated_on": None},
+            {"action_type": "LOAD", "updated_on": datetime.datetime(2024, 1, 2)},
+        ],
+    ]
+
+    history = get_module_history(MagicMock(), "1234567", {Feature.BULK_LOAD_HISTORY})
+
+    assert [(h["action_type"], h["updated_on"]) for h in history] == [
+        ("INSERT", None),
+        ("LOAD", None),
+        ("LOAD", datetime.datetime(2024, 1, 2)),
+        ("UPDATE", datetime.datetime(2024, 1, 3)),
+    ]
+
+
+@patch('APIGetModuleHistoryLog.index.execute_query')
+def test_get_module_history_without_load_history(mock_execute_query):
+    mock_execute_query.return_value = [{"action_type": "INSERT"}]
+
+    assert get_module_history(MagicMock(), "1234567") == [{"action_type": "INSERT"}]
+    assert mock_execute_query.call_count == 1
@@ -1,5 +1,17 @@
 import sys
 
+import pytest
+
 sys.path.extend(
     [".", "source/lambda_layers/python", "source/lambda_functions"]
 )
+
+import module_validation  # noqa: E402 # pylint: disable=wrong-import-position
+
+
+@pytest.fixture(autouse=True)
+def clear_validation_plans():
+    # plans memoize the central config, which tests patch per test
+    module_validation.clear_validation_plans()
+    yield
+    module_validation.clear_validation_plans()
@@ -23,7 +23,13 @@ from evchart_helper.custom_exceptions import (
 )
 import feature_toggle
 from feature_toggle.feature_enums import Feature
-from module_validation import load_module_definitions
+from async_utility.typed_frame import put_typed_frame
+from module_validation import (
+    ModuleDefinitionEnum,
+    drop_sample_rows,
+    load_module_definitions,
+    validated_dataframe_by_module_id,
+)
 from AsyncDataValidation.index import get_dataframe_from_csv
 
 
@@ -631,7 +637,7 @@ def fixture_config():
     "get_active_feature_toggles"
 )
 @patch("module_transform.transform_m9.DatabaseCentralConfig")
-@patch("AsyncBizMagic.index.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("AsyncBizMagic.index.get_org_info_dynamo")
 @patch("AsyncBizMagic.index.send_sns_message")
 @patch("AsyncBizMagic.index.get_upload_metadata")
@@ -673,7 +679,7 @@ def test_central_config_ft_true(
     feature_toggle.FeatureToggleService,
     "get_active_feature_toggles"
 )
-@patch("AsyncBizMagic.index.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("AsyncBizMagic.index.get_org_info_dynamo")
 @patch("AsyncBizMagic.index.send_sns_message")
 @patch("AsyncBizMagic.index.get_upload_metadata")
@@ -708,10 +714,65 @@ def test_central_config_ft_false(
 # JE-6765 Ensuring that modules with no recommended fields can still go through bizmagic workflow
 @pytest.mark.parametrize("module_id", ["2","3","4","5","6","7","8","9"])
 @pytest.mark.parametrize("filename", valid_modules_with_required_fields_only)
-@patch("AsyncBizMagic.index.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 def test_set_datatype_central_config_true_modules_with_required_fields_only(mock_database_central_config, filename, module_id, cc_config):
     mock_database_central_config.return_value = cc_config
     df = get_df_from_sample_data_csv(filename)
     feature_toggle_set = {Feature.DATABASE_CENTRAL_CONFIG}
     df = set_datatype(df, module_id, feature_toggle_set)
-    assert df.equals(df)
\ No newline at end of file
+    assert df.equals(df)
+
+@patch.object(
+    feature_toggle.FeatureToggleService,
+    "get_active_feature_toggles"
+)
+@patch("AsyncBizMagic.index.get_org_info_dynamo")
+@patch("AsyncBizMagic.index.error_table_insert")
+@patch("AsyncBizMagic.index.send_sns_message")
+@patch("AsyncBizMagic.index.get_upload_metadata")
+@patch("AsyncBizMagic.index.aurora")
+@patch("module_validation.metadata_update_validation_status")
+@patch.object(
+    load_module_definitions,
+    "__defaults__",
+    ("./source/lambda_layers/python/module_validation/module_definitions",),
+)
+def test_unhappy_path_biz_magic_2_typed_upload_frame(
+    _mock_update_status,
+    mock_aurora,
+    mock_get_upload_metadata,
+    mock_send_sns_message,
+    mock_error_table_insert,
+    mock_get_org_info,
+    mock_get_active_feature_toggles,
+    mock_boto3_manager_s3
+):
+    feature_toggle_set = {Feature.BIZ_MAGIC, Feature.ASYNC_BIZ_MAGIC_MODULE_2}
+    mock_get_org_info.return_value = {"name": "Org Name"}
+    event_object = get_event_object(UPLOAD_KEY_M2)
+    metadata = get_upload_id_metadata()
+    metadata["module_id"] = "2"
+    mock_get_upload_metadata.return_value = metadata
+
+    mock_get_active_feature_toggles.return_value = feature_toggle_set
+    async_biz_magic(event_object, None)
+    expected = mock_error_table_insert.call_args.kwargs["condition_list"]
+    assert expected
+
+    # the typed upload frame that data validation stores for the upload
+    load_module_definitions()
+    df = drop_sample_rows(get_dataframe_from_csv(get_file_content(UPLOAD_FILE_PATH_M2).decode("utf-8")))
+    typed_df = validated_dataframe_by_module_id(
+        ModuleDefinitionEnum.MODULE_2, df, "852ade96-4766-4766-4766-5e9379b31ab0",
+        feature_toggle_set | {Feature.TYPED_UPLOAD_FRAME}
+    )["df"]
+    put_typed_frame(UPLOAD_BUCKET_NAME, "852ade96-4766-4766-4766-5e9379b31ab0", typed_df)
+
+    mock_get_active_feature_toggles.return_value = feature_toggle_set | {Feature.TYPED_UPLOAD_FRAME}
+    with patch("AsyncBizMagic.index.get_s3_data") as mock_get_s3_data:
+        response = async_biz_magic(event_object, None)
+
+    assert response.get('statusCode') == 406
+    assert not mock_get_s3_data.called
+    assert mock_error_table_insert.call_args.kwargs["condition_list"] == expected
+    assert mock_aurora.get_connection.called
@@ -22,6 +22,14 @@ def load_module():
     module_validation.load_module_definitions(module_path)
 
 
+@pytest.fixture(autouse=True)
+def clear_validation_plans():
+    # plans memoize the central config, which tests patch per test
+    module_validation.clear_validation_plans()
+    yield
+    module_validation.clear_validation_plans()
+
+
 
 @pytest.fixture(scope="module", autouse=True, name="config")
 def config():
@@ -46,6 +46,21 @@ ft_set = {
     Feature.DATABASE_CENTRAL_CONFIG
 }
 
+def registered_stations(_cursor, stations, dr_id, _sr_id=None, _feature_toggle_set=frozenset()):
+    """every station in the upload is registered, active and owned by dr_id"""
+    stations = list(dict.fromkeys(stations))
+    return pandas.DataFrame(
+        {
+            "station_id": [station_id for station_id, _ in stations],
+            "network_provider": [network_provider for _, network_provider in stations],
+            "station_uuid": "123",
+            "status": "Active",
+            "dr_id": dr_id,
+            "authorization_uuid": "456",
+        }
+    )
+
+
 @pytest.fixture
 def s3_client():
     with mock_aws():
@@ -173,8 +188,7 @@ def test_get_dataframe_from_csv_returns_df():
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.stations_not_active")  # called in validate_station_id
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch.object(
     load_module_definitions,
@@ -185,8 +199,7 @@ def test_get_dataframe_from_csv_returns_df():
 def test_handler_given_valid_s3_object_return_201(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
-    mock_stations_not_active,
+    mock_get_station_eligibility,
     mock_insert_errors_to_table,
     mock_send_sns_message,
     mock_get_upload_metadata,
@@ -197,7 +210,7 @@ def test_handler_given_valid_s3_object_return_201(
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = upload_id_metadata
     mock_insert_errors_to_table.return_value = upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
     event_object = get_event_object(upload_key)
     results = handler(event_object, "context")
 
@@ -210,8 +223,7 @@ def test_handler_given_valid_s3_object_return_201(
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.stations_not_active")  # called in validate_station_id
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch.object(
     load_module_definitions,
@@ -222,8 +234,7 @@ def test_handler_given_valid_s3_object_return_201(
 def test_handler_given_invalid_s3_object_return_200(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
-    mock_stations_not_active,
+    mock_get_station_eligibility,
     mock_send_sns_message,
     mock_insert_errors_to_table,
     mock_get_upload_metadata,
@@ -233,7 +244,7 @@ def test_handler_given_invalid_s3_object_return_200(
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = upload_id_metadata
     mock_insert_errors_to_table.return_value = upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
     # Set to invalid record
     event_object = get_event_object(invalid_file_upload_key)
     results = handler(event_object, "context")
@@ -249,8 +260,7 @@ def test_handler_given_invalid_s3_object_return_200(
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.stations_not_active")  # called in validate_station_id
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch("AsyncDataValidation.index.FeatureToggleService.get_active_feature_toggles")
 @patch.object(
@@ -261,8 +271,7 @@ def test_handler_given_invalid_s3_object_return_200(
 def test_handler_given_valid_s3_object_with_s2s_upload_true_return_201(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
-    mock_stations_not_active,
+    mock_get_station_eligibility,
     mock_insert_errors_to_table,
     mock_send_sns_message,
     mock_get_upload_metadata,
@@ -273,7 +282,7 @@ def test_handler_given_valid_s3_object_with_s2s_upload_true_return_201(
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = s2s_upload_id_metadata
     mock_insert_errors_to_table.return_value = s2s_upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
     mock_unique_constraint_violations_for_async.return_value = {"errors": [], "df": None}
     event_object = get_event_object(s2s_upload_key)
     results = handler(event_object, "context")
@@ -287,8 +296,7 @@ def test_handler_given_valid_s3_object_with_s2s_upload_true_return_201(
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.stations_not_active")  # called in validate_station_id
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch("AsyncDataValidation.index.FeatureToggleService.get_active_feature_toggles")
 @patch.object(
@@ -299,8 +307,7 @@ def test_handler_given_valid_s3_object_with_s2s_upload_true_return_201(
 def test_handler_given_valid_s3_object_with_s2s_upload_true_and_constraints_fail_return_200(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
-    mock_stations_not_active,
+    mock_get_station_eligibility,
     mock_insert_errors_to_table,
     mock_send_sns_message,
     mock_get_upload_metadata,
@@ -312,7 +319,7 @@ def test_handler_given_valid_s3_object_with_s2s_upload_true_and_constraints_fail
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = s2s_upload_id_metadata
     mock_insert_errors_to_table.return_value = s2s_upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
     mock_unique_constraint_violations_for_async.return_value = {"errors": ['an error'], "df": df}
     event_object = get_event_object(s2s_upload_key)
     results = handler(event_object, "context")
@@ -332,8 +339,7 @@ def test_handler_given_valid_s3_object_with_s2s_upload_true_and_constraints_fail
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.stations_not_active")  # called in validate_station_id
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch("AsyncDataValidation.index.FeatureToggleService.get_active_feature_toggles")
 @patch.object(
@@ -344,8 +350,7 @@ def test_handler_given_valid_s3_object_with_s2s_upload_true_and_constraints_fail
 def test_handler_given_invalid_s3_object_with_s2s_upload_does_not_check_constraints(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
-    mock_stations_not_active,
+    mock_get_station_eligibility,
     mock_insert_errors_to_table,
     mock_send_sns_message,
     mock_get_upload_metadata,
@@ -358,7 +363,7 @@ def test_handler_given_invalid_s3_object_with_s2s_upload_does_not_check_constrai
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = s2s_upload_id_metadata
     mock_insert_errors_to_table.return_value = s2s_upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
     mock_validated_dataframe_by_module_id.return_value = {"conditions": ['an error'], "df": df}
     event_object = get_event_object(s2s_upload_key)
     results = handler(event_object, "context")
@@ -375,7 +380,7 @@ def test_handler_given_invalid_s3_object_with_s2s_upload_does_not_check_constrai
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch.object(
     load_module_definitions,
@@ -386,7 +391,7 @@ def test_handler_given_invalid_s3_object_with_s2s_upload_does_not_check_constrai
 def test_handler_given_invalid_s3_object_send_failed_validation_message(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
+    mock_get_station_eligibility,
     mock_send_sns_message,
     mock_insert_errors_to_table,
     mock_get_upload_metadata,
@@ -396,7 +401,7 @@ def test_handler_given_invalid_s3_object_send_failed_validation_message(
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = upload_id_metadata
     mock_insert_errors_to_table.return_value = upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
     # Set to invalid record
     event_object = get_event_object(invalid_file_upload_key)
     handler(event_object, "context")
@@ -407,7 +412,7 @@ def test_handler_given_invalid_s3_object_send_failed_validation_message(
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch.object(
     load_module_definitions,
@@ -418,7 +423,7 @@ def test_handler_given_invalid_s3_object_send_failed_validation_message(
 def test_handler_failed_to_connect_to_aurora_return_500(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
+    mock_get_station_eligibility,
     mock_send_sns_message,
     mock_insert_errors_to_table,
     mock_get_upload_metadata,
@@ -427,7 +432,7 @@ def test_handler_failed_to_connect_to_aurora_return_500(
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = upload_id_metadata
     mock_insert_errors_to_table.return_value = upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
 
     # Set to invalid record
     event_object = get_event_object(invalid_file_upload_key)
@@ -529,8 +534,7 @@ def test_enforce_constraints_for_s2s_given_valid_return_empty_list():
 @patch("AsyncDataValidation.index.get_upload_metadata")
 @patch("AsyncDataValidation.index.insert_errors_to_table")
 @patch("AsyncDataValidation.index.send_sns_message")
-@patch("module_validation.stations_not_active")  # called in validate_station_id
-@patch("module_validation.get_station_uuid")  # called in validate_station_id
+@patch("module_validation.get_station_eligibility")  # called in validate_station_id
 @patch("module_validation.metadata_update_validation_status")
 @patch.object(
     load_module_definitions,
@@ -541,8 +545,7 @@ def test_enforce_constraints_for_s2s_given_valid_return_empty_list():
 def test_enforce_s2s(
     mock_feature_toggle,
     mock_module_validation,
-    mock_get_station_uuid,
-    mock_stations_not_active,
+    mock_get_station_eligibility,
     mock_insert_errors_to_table,
     mock_send_sns_message,
     mock_get_upload_metadata,
@@ -553,9 +556,40 @@ def test_enforce_s2s(
     mock_feature_toggle.return_value = ft_set
     mock_get_upload_metadata.return_value = upload_id_metadata
     mock_insert_errors_to_table.return_value = upload_id_metadata
-    mock_get_station_uuid.return_value = "123"
+    mock_get_station_eligibility.side_effect = registered_stations
     event_object = get_event_object(upload_key)
     results = handler(event_object, "context")
 
     assert results["statusCode"] == 201
     assert mock_aurora.get_connection.called
+
+
+@patch.dict(os.environ, {"CHUNKED_VALIDATION_MIN_BYTES": "1"})
+@patch("AsyncDataValidation.index.fan_out_upload", return_value=3)
+@patch("AsyncDataValidation.index.validate_station_id")
+@patch("AsyncDataValidation.index.aurora")
+@patch("AsyncDataValidation.index.send_sns_message")
+@patch.object(
+    load_module_definitions,
+    "__defaults__",
+    ("./source/lambda_layers/python/module_validation/module_definitions",),
+)
+@patch("AsyncDataValidation.index.FeatureToggleService.get_active_feature_toggles")
+def test_handler_given_large_upload_fans_out_chunks(
+    mock_feature_toggle,
+    mock_send_sns_message,
+    _mock_aurora,
+    mock_validate_station_id,
+    mock_fan_out_upload,
+    mock_boto3_manager_s3,
+):
+    # pylint: disable=unused-argument
+    mock_feature_toggle.return_value = ft_set | {Feature.ASYNC_CHUNKED_VALIDATION}
+    results = handler(get_event_object(upload_key), "context")
+
+    assert results["statusCode"] == 202
+    assert json.loads(results["body"])["chunk_count"] == 3
+    assert mock_fan_out_upload.call_args.args[1]["upload_id"] == "852ade96-4075-4766-9b97-5e9379b31ab0"
+    # the coordinator publishes the data validation status message once every chunk is validated
+    assert not mock_send_sns_message.called
+    assert not mock_validate_station_id.called
@@ -0,0 +1,66 @@
+import json
+from unittest.mock import patch
+
+import pytest
+
+# pylint: disable=import-error
+# module paths are set in conftest.py
+from AsyncDataValidationChunk.index import handler
+
+WORK_ITEM = {
+    "upload_id": "852ade96-4075-4766-9b97-5e9379b31ab0",
+    "bucket": "ev-chart-artifact-data",
+    "key": "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.csv",
+    "recipient_type": "direct-recipient",
+    "s2s_upload": False,
+    "chunk_count": 2,
+}
+
+
+def get_event_object(action, **fields):
+    return {
+        "Records": [{
+            "messageId": "message-1",
+            "body": json.dumps({**WORK_ITEM, "action": action, **fields}),
+        }]
+    }
+
+
+@pytest.fixture(name="lambda_dependencies", autouse=True)
+def fixture_lambda_dependencies():
+    with (
+        patch("AsyncDataValidationChunk.index.aurora"),
+        patch("AsyncDataValidationChunk.index.FeatureToggleService"),
+        patch("AsyncDataValidationChunk.index.load_module_definitions"),
+    ):
+        yield
+
+
+@patch("AsyncDataValidationChunk.index.coordinate_upload")
+@patch("AsyncDataValidationChunk.index.validate_chunk")
+def test_handler_validates_chunk_work_item(mock_validate_chunk, mock_coordinate_upload):
+    results = handler(get_event_object("validate-chunk", chunk_index=1), None)
+
+    assert results == {"batchItemFailures": []}
+    assert mock_validate_chunk.call_args.args[0]["chunk_index"] == 1
+    assert not mock_coordinate_upload.called
+
+
+@patch("AsyncDataValidationChunk.index.send_sns_message", return_value=True)
+@patch("AsyncDataValidationChunk.index.coordinate_upload")
+def test_handler_publishes_coordinator_result(mock_coordinate_upload, mock_send_sns_message):
+    mock_coordinate_upload.return_value = ({"data-validation": "passed"}, {"key": WORK_ITEM["key"]})
+
+    results = handler(get_event_object("coordinate"), None)
+
+    assert results == {"batchItemFailures": []}
+    mock_send_sns_message.assert_called_once_with(
+        {"data-validation": "passed"}, {"key": WORK_ITEM["key"]}
+    )
+
+
+@patch("AsyncDataValidationChunk.index.validate_chunk", side_effect=Exception("throttled"))
+def test_handler_retries_work_item_that_fails(_mock_validate_chunk):
+    results = handler(get_event_object("validate-chunk", chunk_index=0), None)
+
+    assert results == {"batchItemFailures": [{"itemIdentifier": "message-1"}]}
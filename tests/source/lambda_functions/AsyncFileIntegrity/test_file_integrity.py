@@ -1,17 +1,28 @@
+import base64
 import datetime
+import hashlib
+import io
 import json
 from unittest.mock import MagicMock, patch
 
 import boto3
 import pytest
-from AsyncFileIntegrity.index import (check_hash, handler, hash_data,
+from AsyncFileIntegrity.index import (check_hash, handler, hash_stream,
                                       insert_into_error_table)
 from evchart_helper.boto3_manager import Boto3Manager
 from evchart_helper.custom_logging import LogEvent
+from feature_toggle.feature_enums import Feature
 from moto import mock_aws
 
 #pylint: disable=redefined-outer-name
 
+@pytest.fixture(name="mock_feature_toggles", autouse=True)
+def mock_feature_toggles():
+    with patch("AsyncFileIntegrity.index.FeatureToggleService") as mock_service:
+        mock_service.return_value.get_active_feature_toggles.return_value = set()
+        yield mock_service.return_value.get_active_feature_toggles
+
+
 @pytest.fixture(name="fixture_ssm_base")
 def fixture_ssm_base():
     with mock_aws():
@@ -144,29 +155,16 @@ def get_upload_id_metadata(status="Processing"):
     return upload_id_metadata
 
 
-def test_hash_data_creates_hash_from_s3_file_body():
-    # hash file with frontend code, use hash to verify backend code
-    # load csv used for hash
-    # send to function
-    frontend_hash = "bb5733b5ff890016964c3cf3ee8ecbfb4fceb9ceb888d1554d684d9e65ba439a"
-    file_content = get_file_content("./tests/sample_data/all_columns_module_9.csv")
-
-    new_hash = hash_data(file_content)
-
-    assert frontend_hash == new_hash
-
+def test_hash_stream_matches_hash_of_whole_file():
+    file_content = get_file_content(UPLOAD_FILE_PATH)
 
-def test_hash_data_returns_empty_string_with_no_body():
-    body = None
-    results = hash_data(body)
-    assert results is None
+    assert hash_stream(io.BytesIO(file_content), chunk_size=64) == \
+        hashlib.sha256(file_content).hexdigest()
 
 
-def test_hash_data_returns_empty_string_with_empty_string_body():
-    body = b""
+def test_hash_stream_with_empty_stream():
     expected = "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855"
-    result = hash_data(body)
-    assert result == expected
+    assert hash_stream(io.BytesIO(b"")) == expected
 
 
 def test_check_hash_parameters_match_return_true():
@@ -315,6 +313,145 @@ def test_handler_sends_failed_to_sns_with_corrupted_data(
 
 
 
+@patch("AsyncFileIntegrity.index.aurora")
+@patch("AsyncFileIntegrity.index.check_hash", return_value=True)
+@patch("AsyncFileIntegrity.index.run_fused_pipeline")
+@patch("AsyncFileIntegrity.index.send_sns_message")
+def test_handler_runs_fused_pipeline_when_enabled(
+    mock_send_sns_message,
+    mock_run_fused_pipeline,
+    _mock_check_hash,
+    _mock_aurora,
+    mock_feature_toggles,
+    _mock_boto3_manager_s3,
+):
+    mock_feature_toggles.return_value = {Feature.ASYNC_FUSED_PIPELINE}
+    mock_run_fused_pipeline.return_value = True
+    result = handler(get_event_object(), "")
+
+    args, _ = mock_send_sns_message.call_args
+    assert args[0] == {"file-integrity": "passed", "pipeline": "fused"}
+    args, _ = mock_run_fused_pipeline.call_args
+    assert args[4] == get_file_content(UPLOAD_FILE_PATH)
+    assert result["batchItemFailures"] == []
+
+
+@patch("AsyncFileIntegrity.index.aurora")
+@patch("AsyncFileIntegrity.index.check_hash", return_value=True)
+@patch("AsyncFileIntegrity.index.run_fused_pipeline")
+@patch("AsyncFileIntegrity.index.send_sns_message")
+def test_handler_reports_batch_failure_when_fused_pipeline_fails(
+    _mock_send_sns_message,
+    mock_run_fused_pipeline,
+    _mock_check_hash,
+    _mock_aurora,
+    mock_feature_toggles,
+    _mock_boto3_manager_s3,
+):
+    mock_feature_toggles.return_value = {Feature.ASYNC_FUSED_PIPELINE}
+    mock_run_fused_pipeline.return_value = False
+    event_object = get_event_object()
+    event_object["Records"][0]["messageId"] = "message-1"
+    result = handler(event_object, "")
+
+    assert result["batchItemFailures"] == [{"itemIdentifier": "message-1"}]
+
+
+@patch("AsyncFileIntegrity.index.aurora")
+@patch("AsyncFileIntegrity.index.run_fused_pipeline")
+@patch("AsyncFileIntegrity.index.send_sns_message")
+def test_handler_skips_fused_pipeline_when_integrity_check_fails(
+    mock_send_sns_message,
+    mock_run_fused_pipeline,
+    _mock_aurora,
+    mock_feature_toggles,
+    _mock_boto3_manager_s3_corrupted,
+):
+    mock_feature_toggles.return_value = {Feature.ASYNC_FUSED_PIPELINE}
+    handler(get_event_object(), "")
+
+    args, _ = mock_send_sns_message.call_args
+    assert "pipeline" not in args[0]
+    assert not mock_run_fused_pipeline.called
+
+
+@patch("AsyncFileIntegrity.index.aurora")
+@patch("AsyncFileIntegrity.index.hash_stream")
+@patch("AsyncFileIntegrity.index.send_sns_message")
+@patch("AsyncFileIntegrity.index.get_s3_object")
+def test_handler_skips_hash_when_s3_checksum_matches(
+    mock_get_s3_object, mock_send_sns_message, mock_hash_stream, _mock_aurora
+):
+    digest = hashlib.sha256(b"station_id\n").digest()
+    mock_get_s3_object.return_value = {
+        "Body": io.BytesIO(b"station_id\n"),
+        "ContentLength": 11,
+        "ChecksumSHA256": base64.b64encode(digest).decode(),
+        "Metadata": {"checksum": digest.hex(), "recipient_type": "direct-recipient"},
+    }
+    result = handler(get_event_object(), "")
+
+    args, _ = mock_send_sns_message.call_args
+    assert args[0].get("file-integrity") == "passed"
+    assert json.loads(result["body"])["integrity_check_passed"] is True
+    assert not mock_hash_stream.called
+    _, kwargs = mock_get_s3_object.call_args
+    assert kwargs["checksum_mode"] is True
+
+
+@patch("AsyncFileIntegrity.index.aurora")
+@patch("AsyncFileIntegrity.index.hash_stream")
+@patch("AsyncFileIntegrity.index.run_fused_pipeline", return_value=True)
+@patch("AsyncFileIntegrity.index.send_sns_message")
+@patch("AsyncFileIntegrity.index.get_s3_object")
+def test_handler_hashes_fused_upload_from_the_body_it_passes_on(
+    mock_get_s3_object,
+    mock_send_sns_message,
+    mock_run_fused_pipeline,
+    mock_hash_stream,
+    _mock_aurora,
+    mock_feature_toggles,
+):
+    mock_feature_toggles.return_value = {Feature.ASYNC_FUSED_PIPELINE}
+    mock_get_s3_object.return_value = {
+        "Body": io.BytesIO(b"station_id\n"),
+        "ContentLength": 11,
+        "Metadata": {
+            "checksum": hashlib.sha256(b"station_id\n").hexdigest(),
+            "recipient_type": "direct-recipient",
+        },
+    }
+    handler(get_event_object(), "")
+
+    args, _ = mock_send_sns_message.call_args
+    assert args[0] == {"file-integrity": "passed", "pipeline": "fused"}
+    assert not mock_hash_stream.called
+    args, _ = mock_run_fused_pipeline.call_args
+    assert args[4] == b"station_id\n"
+
+
+@patch("AsyncFileIntegrity.index.aurora")
+@patch("AsyncFileIntegrity.index.send_sns_message")
+@patch("AsyncFileIntegrity.index.get_upload_metadata")
+@patch("AsyncFileIntegrity.index.error_table_insert")
+def test_handler_hashes_body_when_s3_checksum_does_not_match(
+    _mock_error_table_insert,
+    mock_get_upload_metadata,
+    mock_send_sns_message,
+    _mock_aurora,
+    _mock_boto3_manager_s3_corrupted,
+):
+    mock_get_upload_metadata.return_value = get_upload_id_metadata()
+    with patch(
+        "AsyncFileIntegrity.index.get_s3_sha256", return_value=UPLOAD_CHECKSUM
+    ), patch("AsyncFileIntegrity.index.hash_stream", wraps=hash_stream) as mock_hash_stream:
+        handler(get_event_object(), "")
+
+    args, _ = mock_send_sns_message.call_args
+    assert args[0].get("file-integrity") == "failed"
+    assert mock_hash_stream.called
+
+
 @patch("AsyncFileIntegrity.index.send_sns_message")
 def test_handler_failed_to_connect_to_aurora_return_500(
     mock_send_sns_message, _mock_boto3_manager_s3
@@ -13,6 +13,7 @@ from evchart_helper.custom_exceptions import (
 )
 from feature_toggle.feature_enums import Feature
 from module_validation import load_module_definitions
+from module_validation.biz_magic import read_transformed_df, serialize_transformed_df
 from moto import mock_aws
 
 UPLOAD_FILE_PATH_MOD_9 = "./tests/sample_data/all_columns_module_9.csv"
@@ -31,6 +32,7 @@ UPLOAD_KEY_MOD_4 = "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab4.csv
 
 UPLOAD_JSON_KEY = "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.JSON"
 UPLOAD_FILE_PATH_JSON = "./tests/sample_data/all_columns_module_4.json"
+UPLOAD_PARQUET_KEY = "transformed/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.parquet"
 
 INVALID_FILE_UPLOAD_ID = "all_invalid_data_type_mod_9.csv"
 INVALID_FILE_PATH = "./tests/sample_data/all_invalid_data_type_mod_9.csv"
@@ -770,3 +772,54 @@ def test_json_asyncvalidatedupload_handler_given_upload_successful_return_201(
     assert "upload_id" in kwargs.get("df")
     assert "station_uuid" in kwargs.get("df")
     assert kwargs.get("check_boolean") is False
+
+
+@patch("AsyncValidatedUpload.index.FeatureToggleService.get_active_feature_toggles")
+@patch("AsyncValidatedUpload.index.aurora")
+@patch("AsyncValidatedUpload.index.send_sns_message")
+@patch("AsyncValidatedUpload.index.get_upload_metadata")
+@patch("AsyncValidatedUpload.index.upload_data_from_df")
+@patch("AsyncValidatedUpload.index.data_already_exists_in_rds")
+@patch(
+    "AsyncValidatedUpload.index.set_station_and_port_ids",
+    side_effect=mock_set_station_and_port_ids_func,
+)
+@patch.object(
+    load_module_definitions,
+    "__defaults__",
+    ("./source/lambda_layers/python/module_validation/module_definitions",),
+)
+def test_parquet_asyncvalidatedupload_handler_given_upload_successful_return_201(
+    _mock_set_station_and_port_ids,
+    mock_data_already_exists_in_rds,
+    mock_upload_data_from_df,
+    mock_get_upload_metadata,
+    _mock_send_sns_message,
+    _mock_aurora,
+    mock_get_active_feature_toggles,
+    mock_boto3_manager_s3,
+    s3_client,
+):
+    json_df = read_transformed_df(get_file_content(UPLOAD_FILE_PATH_JSON))
+    payload, file_type = serialize_transformed_df(
+        json_df, 4, {Feature.ASYNC_PARQUET_TRANSFORM}
+    )
+    s3_client.Bucket(UPLOAD_BUCKET_NAME).put_object(
+        Key=UPLOAD_PARQUET_KEY,
+        Body=payload,
+        Metadata={"checksum": UPLOAD_CHECKSUM, "recipient_type": "direct-recipient"},
+    )
+    mock_get_active_feature_toggles.return_value = ft_set
+    event_object = get_event_object(UPLOAD_PARQUET_KEY)
+    (event_object["Records"][0]["messageAttributes"]["file-type"]["stringValue"]) = file_type
+    m4_metadata = get_upload_id_metadata()
+    m4_metadata["module_id"] = "4"
+    mock_get_upload_metadata.return_value = m4_metadata
+    mock_data_already_exists_in_rds.return_value = False
+    results = handler(event_object, "context")
+
+    _, kwargs = mock_upload_data_from_df.call_args
+    assert file_type == "parquet"
+    assert results["statusCode"] == 201
+    assert kwargs.get("df")["station_id"].tolist() == json_df["station_id"].tolist()
+    assert kwargs.get("check_boolean") is False
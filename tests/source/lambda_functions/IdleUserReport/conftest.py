@@ -6,6 +6,9 @@ sys.path.extend(
     [".", "source/lambda_layers/python", "source/lambda_functions"]
 )
 import module_validation  # noqa: E402 # pylint: disable=wrong-import-position
+from evchart_helper.parameter_provider import (  # noqa: E402 # pylint: disable=wrong-import-position
+    parameter_provider
+)
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -15,3 +18,10 @@ def load_module():
     )
 
     module_validation.load_module_definitions(module_path)
+
+
+@pytest.fixture(autouse=True)
+def clear_parameter_cache():
+    parameter_provider.clear()
+    yield
+    parameter_provider.clear()
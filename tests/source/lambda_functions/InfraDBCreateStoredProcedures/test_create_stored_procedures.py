@@ -0,0 +1,19 @@
+import re
+
+import pytest
+
+from InfraDBCreateStoredProcedures.index import (
+    ev_chart_download_modules,
+    ev_chart_download_modules2,
+)
+
+
+@pytest.mark.parametrize("procedure", [ev_chart_download_modules, ev_chart_download_modules2])
+def test_download_column_list_excludes_unique_key_fingerprint(procedure):
+    column_list_query = re.search(
+        r"GROUP_CONCAT\('md\.',column_name SEPARATOR ','\) INTO column_list(.*?);",
+        procedure[-1],
+        re.DOTALL,
+    ).group(1)
+
+    assert "AND column_name <> 'unique_key_fingerprint'" in column_list_query
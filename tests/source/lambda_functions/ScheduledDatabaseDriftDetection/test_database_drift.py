@@ -151,6 +151,56 @@ def test_table_definition_mismatch(config):
     assert migration_table_errors[0]['column_name'] == 'script_name'
 
 
+@pytest.mark.parametrize("module_id", range(2, 10))
+def test_unique_key_fingerprint_definition_match(config, module_id):
+    # generated by Module_Unique_Key_Fingerprint.sql
+    aurora_response = [{
+        'TABLE_NAME': f'module{module_id}_data_v3',
+        'COLUMN_NAME': 'unique_key_fingerprint',
+        'COLUMN_DEFAULT': None,
+        'IS_NULLABLE': 'YES',
+        'COLUMN_TYPE': 'char(64)',
+        'COLUMN_KEY': "MUL"
+    }]
+
+    response = compare_tables(aurora_response, [], config)
+    fingerprint_errors = [
+        r for r in response
+        if r.get('column_name') == "unique_key_fingerprint"
+    ]
+    assert fingerprint_errors == []
+
+
+def test_module_data_load_history_definition_match(config):
+    # created by Module_Data_Load_History.sql
+    aurora_response = [
+        {
+            'TABLE_NAME': 'module_data_load_history',
+            'COLUMN_NAME': column_name,
+            'COLUMN_DEFAULT': None,
+            'IS_NULLABLE': is_nullable,
+            'COLUMN_TYPE': column_type,
+            'COLUMN_KEY': column_key
+        }
+        for column_name, is_nullable, column_type, column_key in [
+            ('id', 'NO', 'int', 'PRI'),
+            ('upload_id', 'NO', 'varchar(36)', 'MUL'),
+            ('module_table', 'NO', 'varchar(64)', ''),
+            ('row_count', 'NO', 'int', ''),
+            ('content_checksum', 'NO', 'char(64)', ''),
+            ('updated_on', 'YES', 'datetime', ''),
+            ('updated_by', 'YES', 'varchar(72)', ''),
+        ]
+    ]
+
+    response = compare_tables(aurora_response, [], config)
+    load_history_errors = [
+        r for r in response
+        if r.get('table_name') == "module_data_load_history"
+    ]
+    assert load_history_errors == []
+
+
 # code coverage
 def test_response_500():
     response = scheduled_database_drift_detection({}, None)
@@ -14,9 +14,13 @@ from evchart_helper.api_helper import (
     get_available_years,
     get_headers,
     get_station_and_port_uuid,
+    get_station_and_port_uuids,
+    get_station_attributes,
     get_station_uuid,
     execute_query,
+    execute_query_df,
     query_builder_station_uuid,
+    stream_query,
     get_orgs_by_recipient_type_dynamo
 )
 
@@ -326,6 +330,118 @@ def test_get_station_and_port_uuid_given_no_port_id_in_parameter_return_station_
     assert response["port_uuid"] is None
     assert response["port_id"] is None
 
+@patch("evchart_helper.api_helper.execute_query_df")
+def test_get_station_and_port_uuids_queries_in_chunks(mock_query):
+    stations = [(f"station {i}", "my network") for i in range(5)]
+    mock_query.side_effect = [
+        pd.DataFrame({
+            "station_id": [s for s, _ in chunk],
+            "network_provider": [n for _, n in chunk],
+            "station_uuid": ["uuid"] * len(chunk),
+            "network_provider_uuid": ["np uuid"] * len(chunk),
+            "port_uuid": [None] * len(chunk),
+            "port_id": [None] * len(chunk),
+        })
+        for chunk in (stations[0:2], stations[2:4], stations[4:5])
+    ]
+
+    response = get_station_and_port_uuids(cursor, stations + stations[:1], chunk_size=2)
+
+    assert mock_query.call_count == 3
+    assert mock_query.call_args_list[0].kwargs["data"] == (
+        "station 0", "my network", "station 1", "my network"
+    )
+    assert response["station_id"].tolist() == [s for s, _ in stations]
+
+
+@patch("evchart_helper.api_helper.execute_query_df")
+def test_get_station_and_port_uuids_given_collation_match_uses_station_query(mock_query):
+    # database returns the stored station_id, which differs in case from the upload
+    mock_query.side_effect = [
+        pd.DataFrame({
+            "station_id": ["STATION"],
+            "network_provider": ["my network"],
+            "station_uuid": ["0"],
+            "network_provider_uuid": ["1"],
+            "port_uuid": ["3"],
+            "port_id": ["port 1"],
+        }),
+        pd.DataFrame({
+            "station_uuid": ["0"],
+            "network_provider_uuid": ["1"],
+            "port_uuid": ["3"],
+            "port_id": ["port 1"],
+        }),
+    ]
+
+    response = get_station_and_port_uuids(cursor, [("station", "my network")])
+
+    assert mock_query.call_count == 2
+    assert response["station_id"].tolist() == ["STATION", "station"]
+    assert response["port_uuid"].tolist() == ["3", "3"]
+
+
+@patch("evchart_helper.api_helper.execute_query_df")
+def test_get_station_attributes_queries_in_chunks(mock_query):
+    stations = [(f"station {i}", "my network") for i in range(3)]
+    mock_query.side_effect = [
+        pd.DataFrame({
+            "station_id": [s for s, _ in chunk],
+            "network_provider": [n for _, n in chunk],
+            "operational_date": [date(2024, 7, 4)] * len(chunk),
+        })
+        for chunk in (stations[0:2], stations[2:3])
+    ]
+
+    response = get_station_attributes(
+        cursor, stations + stations[:1], ["operational_date"], chunk_size=2
+    )
+
+    assert mock_query.call_count == 2
+    assert "sr.operational_date" in mock_query.call_args_list[0].kwargs["query"]
+    assert mock_query.call_args_list[1].kwargs["data"] == ("station 2", "my network")
+    assert response.columns.tolist() == ["station_id", "network_provider", "operational_date"]
+    assert response["station_id"].tolist() == [s for s, _ in stations]
+
+
+@patch("evchart_helper.api_helper.execute_query_df")
+def test_get_station_attributes_given_collation_match_or_no_station(mock_query):
+    # database returns the stored station_id, which differs in case from the upload
+    mock_query.side_effect = [
+        pd.DataFrame({
+            "station_id": ["STATION"],
+            "network_provider": ["my network"],
+            "operational_date": [date(2024, 7, 4)],
+        }),
+        pd.DataFrame({
+            "station_id": ["STATION"],
+            "network_provider": ["my network"],
+            "operational_date": [date(2024, 7, 4)],
+        }),
+        pd.DataFrame(columns=["station_id", "network_provider", "operational_date"]),
+    ]
+
+    response = get_station_attributes(
+        cursor, [("station", "my network"), ("unregistered", "my network")], ["operational_date"]
+    )
+
+    assert mock_query.call_count == 3
+    assert response["station_id"].tolist() == ["STATION", "station"]
+    assert response["operational_date"].tolist() == [date(2024, 7, 4)] * 2
+
+
+@patch("evchart_helper.api_helper.execute_query_df")
+def test_get_station_and_port_uuids_given_no_matching_station(mock_query):
+    port_columns = ["station_uuid", "network_provider_uuid", "port_uuid", "port_id"]
+    mock_query.side_effect = [
+        pd.DataFrame(columns=["station_id", "network_provider"] + port_columns),
+        pd.DataFrame(columns=port_columns),
+    ]
+
+    with pytest.raises(EvChartDatabaseAuroraQueryError):
+        get_station_and_port_uuids(cursor, [("friendly id", "my network")])
+
+
 def test_execute_query_duplicate():
     mock_cursor = MagicMock()
     mock_cursor.execute.side_effect = IntegrityError(DUP_ENTRY, "duplicate entry")
@@ -347,6 +463,52 @@ def test_execute_query_programming_error():
         _ = execute_query(None, (), mock_cursor)
 
 
+def streaming_connection(rows, columns=("station_id", "port_id")):
+    cursor = MagicMock()
+    cursor.description = [(column,) for column in columns]
+    cursor.fetchmany.side_effect = lambda size: [rows.pop(0) for _ in range(min(size, len(rows)))]
+    connection = MagicMock()
+    connection.cursor.return_value.__enter__.return_value = cursor
+    return connection, cursor
+
+
+def test_stream_query_yields_batches_of_rows():
+    connection, cursor = streaming_connection([("s1", "p1"), ("s1", "p2"), ("s2", "p1")])
+
+    batches = list(stream_query("SELECT", (), connection, batch_size=2))
+
+    assert batches == [
+        [{"station_id": "s1", "port_id": "p1"}, {"station_id": "s1", "port_id": "p2"}],
+        [{"station_id": "s2", "port_id": "p1"}],
+    ]
+    cursor.fetchmany.assert_called_with(2)
+
+
+def test_stream_query_columns_mode_yields_column_arrays():
+    connection, _ = streaming_connection([("s1", "p1"), ("s2", "p2")])
+
+    batches = list(stream_query("SELECT", (), connection, mode="columns"))
+
+    assert batches == [{"station_id": ("s1", "s2"), "port_id": ("p1", "p2")}]
+
+
+def test_stream_query_dataframe_mode_yields_empty_frame_without_rows():
+    connection, _ = streaming_connection([])
+
+    batches = list(stream_query("SELECT", (), connection, mode="dataframe"))
+
+    assert len(batches) == 1
+    assert batches[0].empty
+    assert list(batches[0].columns) == ["station_id", "port_id"]
+
+
+def test_stream_query_error():
+    connection, cursor = streaming_connection([])
+    cursor.execute.side_effect = ProgrammingError(PARSE_ERROR, "parse error")
+    with pytest.raises(EvChartDatabaseAuroraQueryError):
+        _ = list(stream_query(None, (), connection))
+
+
 def test_ft_network_provider_in_query_true():
     response_query, response_data = query_builder_station_uuid(
         station_id="1", network_provider="nptest"
@@ -0,0 +1,166 @@
+"""
+Local harness for chunked validation: the upload bucket and the FIFO chunk queue run on moto, and
+the harness plays the part of AsyncDataValidationChunk by draining the queue until the coordinator
+has published the data validation status message.
+"""
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pytest
+from moto import mock_aws
+
+import module_validation
+from async_utility.chunked_validation import (
+    COORDINATE,
+    ChunkStore,
+    WorkQueue,
+    coordinate_upload,
+    fan_out_upload,
+    validate_chunk,
+)
+from database_central_config import DatabaseCentralConfig
+from evchart_helper.boto3_manager import Boto3Manager
+from feature_toggle.feature_enums import Feature
+
+UPLOAD_BUCKET_NAME = "ev-chart-artifact-data"
+UPLOAD_ID = "852ade96-4075-4766-9b97-5e9379b31ab0"
+UPLOAD_KEY = f"upload/Joint Office/{UPLOAD_ID}.csv"
+UPLOAD_METADATA = {
+    "upload_id": UPLOAD_ID,
+    "module_id": "2",
+    "org_id": "1234",
+    "parent_org": "1234",
+}
+FEATURE_TOGGLE_SET = {
+    Feature.ASYNC_BIZ_MAGIC_MODULE_2,
+    Feature.DATABASE_CENTRAL_CONFIG,
+    Feature.CHECK_DUPLICATES_UPLOAD,
+}
+
+
+class LocalHarness:
+
+    def __init__(self, queue_url, feature_toggle_set):
+        self.queue_url = queue_url
+        self.feature_toggle_set = feature_toggle_set
+        self.store = ChunkStore(UPLOAD_BUCKET_NAME)
+        self.connection = MagicMock()
+        self.log_event = MagicMock()
+        self.published = []
+        self.chunk_runs = 0
+
+    def fan_out(self, df, chunk_rows):
+        upload = {
+            "upload_id": UPLOAD_ID,
+            "bucket": UPLOAD_BUCKET_NAME,
+            "key": UPLOAD_KEY,
+            "recipient_type": "direct-recipient",
+            "s2s_upload": False,
+        }
+        return fan_out_upload(df, upload, self.store, WorkQueue(self.queue_url), chunk_rows)
+
+    def drain(self, reverse=False):
+        """
+            Runs every queued work item, last received first when reverse is set, until the queue
+            is empty.  Returns the status messages published by the coordinator.
+        """
+        sqs = boto3.client("sqs", region_name="us-east-1")
+        while True:
+            messages = sqs.receive_message(
+                QueueUrl=self.queue_url, MaxNumberOfMessages=10
+            ).get("Messages", [])
+            if not messages:
+                return self.published
+            for message in reversed(messages) if reverse else messages:
+                self.run(json.loads(message["Body"]))
+                sqs.delete_message(
+                    QueueUrl=self.queue_url, ReceiptHandle=message["ReceiptHandle"]
+                )
+
+    def run(self, work_item):
+        if work_item["action"] == COORDINATE:
+            self.published.append(coordinate_upload(
+                work_item, self.connection, self.store, self.log_event, self.feature_toggle_set
+            ))
+        else:
+            self.chunk_runs += 1
+            validate_chunk(
+                work_item,
+                self.connection,
+                self.store,
+                WorkQueue(self.queue_url),
+                self.log_event,
+                self.feature_toggle_set,
+            )
+
+
+@pytest.fixture(name="aws")
+def fixture_aws():
+    with mock_aws():
+        s3 = boto3.resource("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=UPLOAD_BUCKET_NAME)
+        sqs = boto3.client("sqs", region_name="us-east-1")
+        queue_url = sqs.create_queue(
+            QueueName="ev-chart-validation-chunk.fifo",
+            Attributes={
+                "FifoQueue": "true",
+                "DeduplicationScope": "messageGroup",
+                "FifoThroughputLimit": "perMessageGroupId",
+            },
+        )["QueueUrl"]
+        with (
+            patch.object(
+                Boto3Manager,
+                "client",
+                side_effect=lambda service, **_kwargs: boto3.client(service, region_name="us-east-1"),
+            ),
+            patch.object(Boto3Manager, "resource", return_value=s3),
+        ):
+            yield queue_url
+
+
+@pytest.fixture(name="harness")
+def fixture_harness(aws):
+    return LocalHarness(aws, FEATURE_TOGGLE_SET)
+
+
+@pytest.fixture(name="validation")
+def fixture_validation():
+    """
+    Replaces the database lookups of chunk validation, the schema validation itself runs as is.
+    """
+    config = DatabaseCentralConfig(
+        path=os.path.join(
+            ".",
+            "source",
+            "lambda_layers",
+            "python",
+            "database_central_config",
+            "database_central_config.json"
+        )
+    )
+    module_validation.clear_validation_plans()
+    with (
+        patch("module_validation.DatabaseCentralConfig", return_value=config),
+        patch("async_utility.chunked_validation.get_upload_metadata", return_value=UPLOAD_METADATA),
+        # a new list for every chunk, as chunk validation extends the station conditions
+        patch(
+            "async_utility.chunked_validation.validate_station_id",
+            side_effect=lambda *_args, **_kwargs: [],
+        ) as station,
+        patch("async_utility.chunked_validation.error_table_insert") as error_table,
+        patch(
+            "async_utility.chunked_validation.unique_constraint_violations_for_async",
+            return_value={"errors": []},
+        ) as unique_constraint,
+        patch("module_validation.execute_query", return_value=[]),
+        patch("module_validation.aurora.get_connection"),
+    ):
+        yield {
+            "validate_station_id": station,
+            "error_table_insert": error_table,
+            "unique_constraint": unique_constraint,
+        }
+    module_validation.clear_validation_plans()
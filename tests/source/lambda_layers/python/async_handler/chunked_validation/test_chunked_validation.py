@@ -0,0 +1,210 @@
+import pandas
+import pytest
+
+# pylint: disable=import-error
+# module paths and the local harness fixture are set in conftest.py
+from async_utility.chunked_validation import (
+    concat_frames,
+    get_chunk_conditions,
+    get_chunk_ranges,
+    merge_chunk_results,
+    use_chunked_validation,
+)
+from async_utility.typed_frame import get_typed_frame
+from evchart_helper.custom_exceptions import EvChartUserNotAuthorizedError
+from feature_toggle.feature_enums import Feature
+from module_validation import (
+    ModuleDefinitionEnum,
+    drop_sample_rows,
+    get_dataframe_from_csv,
+    validated_dataframe_by_module_id,
+)
+
+
+def read_upload(filename):
+    with open(f"./tests/sample_data/{filename}", "r", encoding="utf-8") as fh:
+        return drop_sample_rows(get_dataframe_from_csv(fh.read()))
+
+
+def test_get_chunk_ranges():
+    assert get_chunk_ranges(250, 100) == [(0, 100), (100, 200), (200, 250)]
+    assert get_chunk_ranges(200, 100) == [(0, 100), (100, 200)]
+    assert get_chunk_ranges(0, 100) == [(0, 0)]
+
+
+def test_use_chunked_validation_respects_feature_toggle_and_size(monkeypatch):
+    monkeypatch.setenv("CHUNKED_VALIDATION_MIN_BYTES", "10")
+    feature_toggle_set = {Feature.ASYNC_CHUNKED_VALIDATION}
+
+    assert use_chunked_validation(10, feature_toggle_set) is True
+    assert use_chunked_validation(9, feature_toggle_set) is False
+    assert use_chunked_validation(10, set()) is False
+    assert use_chunked_validation(None, feature_toggle_set) is False
+
+
+def test_concat_frames_keeps_categorical_columns():
+    df = concat_frames([
+        pandas.DataFrame({"port_id": pandas.Categorical(["1", "2"]), "energy_kwh": [1.0, 2.0]}),
+        pandas.DataFrame(
+            {"port_id": pandas.Categorical(["3", None]), "energy_kwh": [3.0, 4.0]}, index=[2, 3]
+        ),
+    ])
+
+    assert df["port_id"].dtype == "category"
+    assert df["port_id"].tolist()[:3] == ["1", "2", "3"]
+    assert df["port_id"].isna().tolist() == [False, False, False, True]
+    assert list(df["port_id"].cat.categories) == ["1", "2", "3"]
+
+
+def test_get_chunk_conditions_keeps_column_conditions_from_the_first_chunk():
+    conditions = [
+        {"error_row": None, "header_name": "session_id", "error_description": "missing"},
+        {"error_row": 7, "header_name": "port_id", "error_description": "invalid"},
+        {"error_row": None, "header_name": "NOT_APPLICABLE", "error_description": "stopped"},
+    ]
+
+    assert get_chunk_conditions(conditions, 0) == conditions
+    assert get_chunk_conditions(conditions, 1) == conditions[1:]
+
+
+def test_merge_chunk_results():
+    assert merge_chunk_results([{"error_count": 2}, {"error_count": 0}, {"error_count": 3}]) == {
+        "error_count": 5, "reason": None
+    }
+    assert merge_chunk_results([
+        {"error_count": 1}, {"error_count": 0, "reason": "first"}, {"reason": "second"}
+    ])["reason"] == "first"
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_valid_upload_passes_with_one_status_message(harness, validation, reverse):
+    df = read_upload("evchart_valid_all_columns_module_2_250_records.csv")
+
+    assert harness.fan_out(df, chunk_rows=60) == 5
+    published = harness.drain(reverse=reverse)
+
+    assert harness.chunk_runs == 5
+    assert published == [(
+        {"data-validation": "passed"},
+        {
+            "key": "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.csv",
+            "bucket": "ev-chart-artifact-data",
+            "recipient_type": "direct-recipient",
+        },
+    )]
+    assert not validation["error_table_insert"].called
+
+    # the unique constraint check sees every chunk, with the csv row numbers of the upload
+    unique_df = validation["unique_constraint"].call_args.kwargs["df"]
+    assert list(unique_df.index) == list(df.index)
+
+
+def test_valid_upload_stores_the_typed_upload_frame(harness, validation):
+    harness.feature_toggle_set = harness.feature_toggle_set | {Feature.TYPED_UPLOAD_FRAME}
+    df = read_upload("evchart_valid_all_columns_module_2_250_records.csv")
+    expected = validated_dataframe_by_module_id(
+        ModuleDefinitionEnum.MODULE_2, df.copy(), "123", harness.feature_toggle_set
+    )["df"]
+
+    harness.fan_out(df, chunk_rows=60)
+    published = harness.drain()
+
+    assert published[0][0] == {"data-validation": "passed"}
+    assert validation["unique_constraint"].called
+    typed_df = get_typed_frame("ev-chart-artifact-data", "852ade96-4075-4766-9b97-5e9379b31ab0")
+    pandas.testing.assert_frame_equal(typed_df, expected)
+
+
+def test_invalid_upload_reports_the_same_errors_as_a_single_validation(harness, validation):
+    df = read_upload("all_invalid_data_type_mod_2.csv")
+    expected = validated_dataframe_by_module_id(
+        ModuleDefinitionEnum.MODULE_2, df.copy(), "123", harness.feature_toggle_set
+    )["conditions"]
+
+    harness.fan_out(df, chunk_rows=2)
+    published = harness.drain()
+
+    conditions = [
+        condition
+        for call in validation["error_table_insert"].call_args_list
+        for condition in call.kwargs["condition_list"]
+    ]
+    assert sorted(condition["error_row"] for condition in conditions if condition["error_row"]) == \
+        sorted(condition["error_row"] for condition in expected if condition["error_row"])
+    assert published[0][0] == {"data-validation": "failed"}
+    assert published[0][1]["reason"] == "EvChartInvalidCSVError raised. Module data is not compliant"
+    assert not validation["unique_constraint"].called
+
+
+def test_duplicates_across_chunks_fail_the_upload(harness, validation):
+    validation["unique_constraint"].return_value = {
+        "errors": [{"error_row": 2, "header_name": "session_id", "error_description": "duplicate"}]
+    }
+
+    harness.fan_out(read_upload("evchart_valid_all_columns_module_2_10_records.csv"), chunk_rows=4)
+    published = harness.drain()
+
+    assert published[0][0] == {"data-validation": "failed"}
+    assert validation["error_table_insert"].call_count == 1
+    assert len(validation["error_table_insert"].call_args.kwargs["df"]) == 10
+
+
+def test_chunk_that_cannot_be_validated_fails_the_upload(harness, validation):
+    validation["validate_station_id"].side_effect = [
+        [], EvChartUserNotAuthorizedError(message="not authorized"), []
+    ]
+
+    harness.fan_out(read_upload("evchart_valid_all_columns_module_2_10_records.csv"), chunk_rows=4)
+    published = harness.drain()
+
+    assert published[0][0] == {"data-validation": "failed"}
+    assert "not authorized" in published[0][1]["reason"]
+
+
+def test_redelivered_chunk_is_not_validated_again(harness, validation):
+    harness.fan_out(pandas.DataFrame({"station_id": ["s1"]}, index=[2]), chunk_rows=10)
+    work_item = {
+        "action": "validate-chunk",
+        "upload_id": "852ade96-4075-4766-9b97-5e9379b31ab0",
+        "bucket": "ev-chart-artifact-data",
+        "key": "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.csv",
+        "recipient_type": "direct-recipient",
+        "s2s_upload": False,
+        "chunk_index": 0,
+        "chunk_count": 1,
+    }
+
+    harness.run(work_item)
+    harness.run(work_item)
+
+    assert validation["validate_station_id"].call_count == 1
+
+
+def test_revalidated_upload_does_not_reuse_earlier_results(harness, validation):
+    df = read_upload("evchart_valid_all_columns_module_2_10_records.csv")
+    harness.fan_out(df, chunk_rows=4)
+    harness.drain()
+    validation["validate_station_id"].side_effect = lambda *_args, **_kwargs: [
+        {"error_row": 2, "header_name": "station_id", "error_description": "not registered"}
+    ]
+
+    harness.fan_out(df, chunk_rows=4)
+    published = harness.drain()
+
+    assert harness.chunk_runs == 6
+    assert published[1][0] == {"data-validation": "failed"}
+
+
+def test_missing_column_is_reported_once(harness, validation):
+    df = read_upload("evchart_valid_all_columns_module_2_10_records.csv").drop(columns="session_id")
+
+    harness.fan_out(df, chunk_rows=4)
+    published = harness.drain()
+
+    conditions = [
+        condition
+        for call in validation["error_table_insert"].call_args_list
+        for condition in call.kwargs["condition_list"]
+    ]
+    assert [condition["header_name"] for condition in conditions] == ["session_id"]
+    assert published[0][0] == {"data-validation": "failed"}
@@ -0,0 +1,377 @@
+import datetime
+import json
+from contextlib import ExitStack
+from unittest.mock import MagicMock, patch
+
+import boto3
+import pandas
+import pytest
+from moto import mock_aws
+
+from AsyncBizMagic.index import handler as async_biz_magic
+from AsyncDataValidation.index import handler as async_data_validation
+from AsyncValidatedUpload.index import handler as async_validated_upload
+from async_utility.fused_pipeline import run_fused_pipeline, use_fused_pipeline
+from evchart_helper.boto3_manager import Boto3Manager
+from evchart_helper.custom_exceptions import EvChartInvalidCSVError
+from feature_toggle.feature_enums import Feature
+from module_validation import load_module_definitions
+from module_validation.bulk_loader import get_insert_rows
+
+UPLOAD_KEY = "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.csv"
+UPLOAD_BUCKET_NAME = "ev-chart-artifact-data"
+S3_METADATA = {"recipient_type": "direct-recipient", "s2s_upload": "False"}
+
+
+def run_pipeline():
+    return run_fused_pipeline(
+        MagicMock(),
+        UPLOAD_BUCKET_NAME,
+        UPLOAD_KEY,
+        S3_METADATA,
+        b"",
+        MagicMock(),
+        {Feature.ASYNC_FUSED_PIPELINE},
+    )
+
+
+def test_use_fused_pipeline_requires_feature_toggle():
+    assert use_fused_pipeline(3, {Feature.ASYNC_FUSED_PIPELINE}) is True
+    assert use_fused_pipeline(3, set()) is False
+    assert use_fused_pipeline(None, {Feature.ASYNC_FUSED_PIPELINE}) is False
+
+
+def test_use_fused_pipeline_respects_size_limit(monkeypatch):
+    monkeypatch.setenv("FUSED_PIPELINE_MAX_BYTES", "4")
+
+    assert use_fused_pipeline(4, {Feature.ASYNC_FUSED_PIPELINE}) is True
+    assert use_fused_pipeline(5, {Feature.ASYNC_FUSED_PIPELINE}) is False
+
+
+@patch("async_utility.fused_pipeline.send_sns_message", return_value=True)
+@patch("async_utility.fused_pipeline.upload_validated_data")
+@patch("async_utility.fused_pipeline.biz_magic")
+@patch("async_utility.fused_pipeline.validate_data")
+def test_run_fused_pipeline_publishes_every_stage(
+    mock_validate_data, mock_biz_magic, mock_upload_validated_data, mock_send_sns_message
+):
+    def transform(upload):
+        upload["key"] = "transformed/852ade96-4075-4766-9b97-5e9379b31ab0.json"
+
+    mock_biz_magic.side_effect = transform
+
+    assert run_pipeline() is True
+    assert mock_validate_data.called
+    assert mock_upload_validated_data.called
+
+    attributes = [args[0] for args, _ in mock_send_sns_message.call_args_list]
+    assert attributes == [
+        {"data-validation": "passed", "pipeline": "fused"},
+        {"biz-magic": "passed", "file-type": "json", "is-s2s": "False", "pipeline": "fused"},
+        {"data-uploaded": "passed", "is-s2s": "False", "pipeline": "fused"},
+    ]
+    messages = [args[1] for args, _ in mock_send_sns_message.call_args_list]
+    assert messages[0]["key"] == UPLOAD_KEY
+    assert messages[2]["key"] == "transformed/852ade96-4075-4766-9b97-5e9379b31ab0.json"
+
+
+@pytest.mark.parametrize(
+    "error, reason",
+    [
+        (
+            EvChartInvalidCSVError(message="Module data is not compliant"),
+            "EvChartInvalidCSVError raised. Module data is not compliant",
+        ),
+        (TypeError(), "uncaught error"),
+    ],
+)
+@patch("async_utility.fused_pipeline.send_sns_message", return_value=True)
+@patch("async_utility.fused_pipeline.upload_validated_data")
+@patch("async_utility.fused_pipeline.biz_magic")
+@patch("async_utility.fused_pipeline.validate_data")
+def test_run_fused_pipeline_stops_at_failed_stage(
+    mock_validate_data,
+    mock_biz_magic,
+    mock_upload_validated_data,
+    mock_send_sns_message,
+    error,
+    reason,
+):
+    mock_validate_data.side_effect = error
+
+    assert run_pipeline() is True
+    assert not mock_biz_magic.called
+    assert not mock_upload_validated_data.called
+
+    args, _ = mock_send_sns_message.call_args
+    assert mock_send_sns_message.call_count == 1
+    assert args[0]["data-validation"] == "failed"
+    assert args[1]["reason"] == reason
+
+
+@patch("async_utility.fused_pipeline.send_sns_message", return_value=False)
+@patch("async_utility.fused_pipeline.upload_validated_data")
+@patch("async_utility.fused_pipeline.biz_magic")
+@patch("async_utility.fused_pipeline.validate_data")
+def test_run_fused_pipeline_returns_false_when_message_not_sent(
+    _mock_validate_data, mock_biz_magic, _mock_upload_validated_data, _mock_send_sns_message
+):
+    assert run_pipeline() is False
+    assert not mock_biz_magic.called
+
+
+
+UPLOAD_ID = "852ade96-4075-4766-9b97-5e9379b31ab0"
+STAGE_FEATURES = {
+    Feature.ASYNC_FUSED_PIPELINE,
+    Feature.BIZ_MAGIC,
+    Feature.ASYNC_BIZ_MAGIC_MODULE_2,
+    Feature.ASYNC_BIZ_MAGIC_MODULE_9,
+}
+STAGE_LAMBDAS = ("AsyncDataValidation", "AsyncBizMagic", "AsyncValidatedUpload")
+FUSED_PIPELINE = "async_utility.fused_pipeline"
+
+
+def registered_stations(_cursor, stations, dr_id, _sr_id=None, _feature_toggle_set=frozenset()):
+    """every station in the upload is registered, active and owned by dr_id"""
+    stations = list(dict.fromkeys(stations))
+    return pandas.DataFrame(
+        {
+            "station_id": [station_id for station_id, _ in stations],
+            "network_provider": [network_provider for _, network_provider in stations],
+            "station_uuid": "123",
+            "status": "Active",
+            "dr_id": dr_id,
+            "authorization_uuid": "456",
+        }
+    )
+
+
+def registered_station_ids(_cursor, stations):
+    """every station in the upload is registered, without ports"""
+    stations = list(dict.fromkeys(stations))
+    return pandas.DataFrame(
+        {
+            "station_id": [station_id for station_id, _ in stations],
+            "network_provider": [network_provider for _, network_provider in stations],
+            "station_uuid": "123",
+            "network_provider_uuid": "789",
+            "port_id": None,
+            "port_uuid": None,
+        }
+    )
+
+
+def station_attributes(_cursor, stations, attributes):
+    """none of the stations in the upload has the attributes set"""
+    return pandas.DataFrame(
+        [(*station, *[None] * len(attributes)) for station in stations],
+        columns=["station_id", "network_provider", *attributes],
+    )
+
+
+def get_upload_metadata(module_id):
+    return {
+        "comments": None,
+        "module_id": module_id,
+        "org_id": "3824c24b-f4fa-44bb-b030-09e99c3e4b6c",
+        "parent_org": "3824c24b-f4fa-44bb-b030-09e99c3e4b6c",
+        "quarter": "1",
+        "submission_status": "Processing",
+        "upload_id": UPLOAD_ID,
+        "upload_friendly_id": 44,
+        "updated_by": "unit.test@ee.doe.gov",
+        "updated_on": datetime.datetime(2024, 7, 12, 19, 25, 38),
+        "year": "2024",
+    }
+
+
+def get_stage_event(message, attributes):
+    return {
+        "Records": [
+            {
+                "messageId": "51248983-6efb-45b0-9cda-f46361fa9d72",
+                "body": json.dumps(message),
+                "messageAttributes": {
+                    name: {"stringValue": value, "dataType": "String"}
+                    for name, value in attributes.items()
+                },
+            }
+        ]
+    }
+
+
+@pytest.fixture(name="stages")
+def fixture_stages():
+    """
+    Mocks S3 and the database for both the stage lambdas and the fused pipeline, and returns
+    the mocks that record what the stages publish, insert into the error table and load
+    """
+    with mock_aws(), ExitStack() as stack:
+        s3_resource = boto3.resource("s3", region_name="us-east-1")
+        s3_resource.create_bucket(Bucket=UPLOAD_BUCKET_NAME)
+
+        def mock(target, **kwargs):
+            return stack.enter_context(patch(target, **kwargs))
+
+        stack.enter_context(patch.object(Boto3Manager, "resource", return_value=s3_resource))
+        stack.enter_context(patch.object(
+            load_module_definitions,
+            "__defaults__",
+            ("./source/lambda_layers/python/module_validation/module_definitions",),
+        ))
+        mock(
+            "feature_toggle.FeatureToggleService.get_active_feature_toggles",
+            return_value=STAGE_FEATURES,
+        )
+        mock("module_validation.get_station_eligibility", side_effect=registered_stations)
+        mock("module_validation.get_station_and_port_uuids", side_effect=registered_station_ids)
+        mock("module_validation.get_station_uuid", return_value="123")
+        mock("module_validation.metadata_update_validation_status")
+        mock("module_validation.business_rules.get_station_attributes", side_effect=station_attributes)
+        # session ids generated for module 2 rows without one are based on the time of the run
+        mock(
+            "module_transform.transform_m2.datetime",
+            **{"now.return_value": datetime.datetime(2024, 7, 12, tzinfo=datetime.timezone.utc)},
+        )
+
+        stage_modules = [f"{stage_lambda}.index" for stage_lambda in STAGE_LAMBDAS]
+        modules = stage_modules + [FUSED_PIPELINE]
+        for module in stage_modules:
+            mock(f"{module}.aurora")
+        for module in ("AsyncValidatedUpload.index", FUSED_PIPELINE):
+            mock(f"{module}.data_already_exists_in_rds", return_value=False)
+        for module in ("AsyncBizMagic.index", FUSED_PIPELINE):
+            mock(f"{module}.get_org_info_dynamo", return_value={"name": "Org Name"})
+        yield {
+            "s3": s3_resource,
+            "get_upload_metadata": [mock(f"{module}.get_upload_metadata") for module in modules],
+            "send_sns_message": {
+                module: mock(f"{module}.send_sns_message", return_value=True)
+                for module in modules
+            },
+            "error_table_insert": {
+                module: mock(f"{module}.error_table_insert")
+                for module in ("AsyncDataValidation.index", "AsyncBizMagic.index", FUSED_PIPELINE)
+            },
+            "load_module_data": mock("module_validation.load_module_data"),
+        }
+
+
+def put_upload(stages, file_path, module_id):
+    with open(file_path, "rb") as fh:
+        stages["s3"].Bucket(UPLOAD_BUCKET_NAME).put_object(
+            Key=UPLOAD_KEY, Body=fh.read(), Metadata=S3_METADATA
+        )
+    for mock_get_upload_metadata in stages["get_upload_metadata"]:
+        mock_get_upload_metadata.return_value = get_upload_metadata(module_id)
+
+
+def run_stage_lambdas(stages):
+    """
+    Runs the upload through the stage lambdas, handing the status message of each stage that
+    passed to the next one like the stage queues do.
+    Returns the published status messages, the error table conditions and the loaded frames
+    """
+    message = {"key": UPLOAD_KEY, "bucket": UPLOAD_BUCKET_NAME, "recipient_type": "test"}
+    attributes = {"file-integrity": "passed"}
+    for stage_lambda, handler in zip(
+        STAGE_LAMBDAS, (async_data_validation, async_biz_magic, async_validated_upload)
+    ):
+        handler(get_stage_event(message, attributes), None)
+        args, _ = stages["send_sns_message"][f"{stage_lambda}.index"].call_args
+        attributes, message = args
+        if "failed" in attributes.values():
+            break
+    return get_stage_results(stages, [f"{stage_lambda}.index" for stage_lambda in STAGE_LAMBDAS])
+
+
+def run_fused_stages(stages):
+    """
+    Runs the upload through the fused pipeline with the body read by the file integrity check.
+    The upload is removed from the bucket first, as the pipeline does not get it again.
+    Returns the published status messages, the error table conditions and the loaded frames
+    """
+    upload = stages["s3"].Object(UPLOAD_BUCKET_NAME, UPLOAD_KEY)
+    body = upload.get()["Body"].read()
+    upload.delete()
+    assert run_fused_pipeline(
+        MagicMock(), UPLOAD_BUCKET_NAME, UPLOAD_KEY, S3_METADATA, body, MagicMock(), STAGE_FEATURES
+    )
+    return get_stage_results(stages, [FUSED_PIPELINE])
+
+
+def get_stage_results(stages, modules):
+    published = [
+        ({name: value for name, value in args[0].items() if name != "pipeline"}, args[1])
+        for module in modules
+        for args, _ in stages["send_sns_message"][module].call_args_list
+    ]
+    conditions = [
+        call.kwargs["condition_list"]
+        for module in modules
+        if module in stages["error_table_insert"]
+        for call in stages["error_table_insert"][module].call_args_list
+    ]
+    loaded = [call.kwargs["df"] for call in stages["load_module_data"].call_args_list]
+    for mock in [*stages["send_sns_message"].values(), *stages["error_table_insert"].values()]:
+        mock.reset_mock()
+    stages["load_module_data"].reset_mock()
+    return published, conditions, loaded
+
+
+def get_transformed_upload(stages, key):
+    return stages["s3"].Object(UPLOAD_BUCKET_NAME, key).get()["Body"].read()
+
+
+@pytest.mark.parametrize(
+    "file_path, module_id",
+    [
+        ("./tests/sample_data/all_columns_module_9.csv", "9"),
+        ("./tests/sample_data/valid_mod2_biz_magic_np.csv", "2"),
+    ],
+)
+def test_fused_stages_load_the_same_data_as_the_stage_lambdas(stages, file_path, module_id):
+    put_upload(stages, file_path, module_id)
+
+    published, conditions, loaded = run_stage_lambdas(stages)
+    transformed_key = published[1][1]["key"]
+    transformed_upload = get_transformed_upload(stages, transformed_key)
+    stages["s3"].Object(UPLOAD_BUCKET_NAME, transformed_key).delete()
+    fused_published, fused_conditions, fused_loaded = run_fused_stages(stages)
+
+    assert [attributes for attributes, _ in published] == [
+        {"data-validation": "passed"},
+        {"biz-magic": "passed", "file-type": "json", "is-s2s": "False"},
+        # the transformed upload only records s2s uploads
+        {"data-uploaded": "passed", "is-s2s": "no"},
+    ]
+    assert fused_published == published
+    assert conditions == fused_conditions == []
+    assert get_transformed_upload(stages, transformed_key) == transformed_upload
+    assert len(loaded) == len(fused_loaded) == 1
+    # the rows written to the module table
+    assert list(fused_loaded[0].columns) == list(loaded[0].columns)
+    assert get_insert_rows(fused_loaded[0]) == get_insert_rows(loaded[0])
+
+
+@pytest.mark.parametrize(
+    "file_path, module_id, failed_stage",
+    [
+        ("./tests/sample_data/all_invalid_data_type_mod_9.csv", "9", "data-validation"),
+        ("./tests/sample_data/biz_magic_not_all_empty_mod_2.csv", "2", "biz-magic"),
+    ],
+)
+def test_fused_stages_report_the_same_errors_as_the_stage_lambdas(
+    stages, file_path, module_id, failed_stage
+):
+    put_upload(stages, file_path, module_id)
+
+    published, conditions, loaded = run_stage_lambdas(stages)
+    fused_published, fused_conditions, fused_loaded = run_fused_stages(stages)
+
+    assert published[-1][0][failed_stage] == "failed"
+    assert fused_published == published
+    assert conditions
+    assert fused_conditions == conditions
+    assert loaded == fused_loaded == []
@@ -1,7 +1,9 @@
+import base64
+import hashlib
 from unittest.mock import patch
 import boto3
 import pytest
-from async_utility.s3_manager import get_s3_object
+from async_utility.s3_manager import get_s3_data, get_s3_object, get_s3_sha256
 from evchart_helper.boto3_manager import Boto3Manager
 from evchart_helper.custom_exceptions import EvChartS3GetObjectError
 from moto import mock_aws
@@ -58,3 +60,28 @@ def test_get_s3_object_when_object_not_found(mock_boto3_manager_s3):
 def test_get_s3_object_when_s3_connection_failed():
     with pytest.raises(EvChartS3GetObjectError):
         get_s3_object(upload_bucket_name, upload_key)
+
+def test_get_s3_object_with_checksum_mode(mock_boto3_manager_s3):
+    response = get_s3_object(upload_bucket_name, upload_key, checksum_mode=True)
+    assert response['Metadata']['checksum'] == upload_checksum
+
+def test_get_s3_data_without_decode(mock_boto3_manager_s3):
+    body, _ = get_s3_data(upload_bucket_name, upload_key, decode=False)
+    assert body == get_file_content(upload_file_path)
+
+def test_get_s3_sha256_returns_hex_checksum():
+    digest = hashlib.sha256(b"abc").digest()
+    s3_object = {"ChecksumSHA256": base64.b64encode(digest).decode()}
+    assert get_s3_sha256(s3_object) == digest.hex()
+
+@pytest.mark.parametrize(
+    "s3_object",
+    [
+        {},
+        {"ChecksumSHA256": "ungWv48Bz+pBQUDeXa4iI7ADYaOWF3qctBD/YfIAFa0=-3"},
+        {"ChecksumSHA256": "ungWv48Bz+pBQUDeXa4iI7ADYaOWF3qctBD/YfIAFa0=", "ChecksumType": "COMPOSITE"},
+        {"ChecksumSHA256": "not base64!"},
+    ],
+)
+def test_get_s3_sha256_without_full_object_checksum(s3_object):
+    assert get_s3_sha256(s3_object) is None
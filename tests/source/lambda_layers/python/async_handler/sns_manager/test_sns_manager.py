@@ -1,6 +1,8 @@
 import json
+import os
+from unittest.mock import patch
 import pytest
-from async_utility.sns_manager import process_sns_message
+from async_utility.sns_manager import get_message_group_id, process_sns_message, send_sns_message
 from evchart_helper.custom_exceptions import EvChartSQSError
 
 upload_file_path = "./tests/sample_data/all_columns_module_9.csv"
@@ -88,3 +90,25 @@ def test_extract_message_given_no_key_in_body_raise_error():
     message_record["body"] = '{"bucket": "ev-chart-artifact-data-unit-test"}'
     with pytest.raises(EvChartSQSError):
         process_sns_message(message_record)
+
+def test_get_message_group_id_defaults_to_upload():
+    key = "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.csv"
+    assert get_message_group_id(key) == "852ade96-4075-4766-9b97-5e9379b31ab0"
+
+@patch.dict(os.environ, {"ASYNC_MESSAGE_GROUP_BY": "org"})
+def test_get_message_group_id_by_org_replaces_invalid_characters():
+    key = "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.csv"
+    assert get_message_group_id(key) == "Joint-Office"
+
+@patch("async_utility.sns_manager.get_topic_arn")
+@patch("async_utility.sns_manager.boto3_manager")
+def test_send_sns_message_groups_messages_by_upload(mock_boto3_manager, mock_get_topic_arn):
+    mock_get_topic_arn.return_value = "arn:aws:sns:us-east-1:000000000000:ev-chart-async.fifo"
+    mock_sns = mock_boto3_manager.client.return_value
+    data = {"key": "upload/Joint Office/852ade96-4075-4766-9b97-5e9379b31ab0.csv", "bucket": upload_bucket_name}
+
+    assert send_sns_message({"data-validation": "passed"}, data)
+
+    _, kwargs = mock_sns.publish.call_args
+    assert kwargs["MessageGroupId"] == "852ade96-4075-4766-9b97-5e9379b31ab0"
+    assert kwargs["MessageDeduplicationId"] == "data-validation_852ade96-4075-4766-9b97-5e9379b31ab0"
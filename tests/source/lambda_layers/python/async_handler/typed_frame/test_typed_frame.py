@@ -0,0 +1,58 @@
+from unittest.mock import patch
+
+import boto3
+import pandas
+import pytest
+from moto import mock_aws
+
+from async_utility.typed_frame import get_typed_frame, get_typed_frame_key, put_typed_frame
+from evchart_helper.boto3_manager import Boto3Manager
+from feature_toggle.feature_enums import Feature
+from module_validation import (
+    ModuleDefinitionEnum,
+    drop_sample_rows,
+    get_dataframe_from_csv,
+    validated_dataframe_by_module_id,
+)
+
+UPLOAD_BUCKET_NAME = "ev-chart-artifact-data-unit-test"
+UPLOAD_ID = "852ade96-4075-4766-9b97-5e9379b31ab0"
+
+
+@pytest.fixture(name="s3_resource")
+def fixture_s3_resource():
+    with mock_aws():
+        s3 = boto3.resource("s3", region_name="us-east-1")
+        s3.create_bucket(Bucket=UPLOAD_BUCKET_NAME)
+        with patch.object(Boto3Manager, "resource", return_value=s3):
+            yield s3
+
+
+@patch("module_validation.metadata_update_validation_status")
+def test_typed_frame_round_trip_keeps_dtypes_and_index(_mock_update_status, s3_resource):
+    with open(
+        "./tests/sample_data/evchart_valid_all_columns_module_2_10_records.csv", "r", encoding="utf-8"
+    ) as fh:
+        df = drop_sample_rows(get_dataframe_from_csv(fh.read()))
+    typed_df = validated_dataframe_by_module_id(
+        ModuleDefinitionEnum.MODULE_2, df, UPLOAD_ID, {Feature.TYPED_UPLOAD_FRAME}
+    )["df"]
+
+    assert put_typed_frame(UPLOAD_BUCKET_NAME, UPLOAD_ID, typed_df) is True
+    assert s3_resource.Object(UPLOAD_BUCKET_NAME, get_typed_frame_key(UPLOAD_ID)).get()
+
+    stored_df = get_typed_frame(UPLOAD_BUCKET_NAME, UPLOAD_ID)
+    pandas.testing.assert_frame_equal(stored_df, typed_df)
+    assert stored_df["energy_kwh"].dtype == "Float64"
+    assert stored_df["session_start"].dtype == "datetime64[ns, UTC]"
+    assert stored_df["station_id"].dtype == object
+
+
+def test_get_typed_frame_returns_none_when_not_stored(s3_resource):
+    assert get_typed_frame(UPLOAD_BUCKET_NAME, UPLOAD_ID) is None
+
+
+def test_put_typed_frame_returns_false_when_not_stored(s3_resource):
+    df = pandas.DataFrame({"station_id": ["s1"]})
+
+    assert put_typed_frame("missing-bucket", UPLOAD_ID, df) is False
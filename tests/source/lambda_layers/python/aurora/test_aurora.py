@@ -0,0 +1,163 @@
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pymysql
+import pytest
+from pymysql.constants.ER import ACCESS_DENIED_ERROR
+
+from evchart_helper import AuroraDatabase
+from evchart_helper.custom_exceptions import EvChartDatabaseHandlerConnectionError
+from evchart_helper.parameter_provider import parameter_provider
+from feature_toggle.feature_enums import Feature
+
+DB_PARAMETERS = {
+    "Parameters": [
+        {"Name": "/ev-chart/aurora/endpoint_address", "Value": "writer.example.com"},
+        {"Name": "/ev-chart/aurora/read_endpoint_address", "Value": "reader.example.com"},
+        {"Name": "/ev-chart/aurora/proxy_endpoint_address", "Value": "proxy.example.com"},
+        {"Name": "/ev-chart/aurora/endpoint_port", "Value": "3306"},
+        {"Name": "/ev-chart/aurora/master_user_secret_arn", "Value": "secret-arn"},
+    ]
+}
+
+
+def feature_toggle_service(*features):
+    service = MagicMock()
+    service.get_feature_toggle_by_enum.side_effect = lambda feature, _log: (
+        "True" if feature in features else "False"
+    )
+    return service
+
+
+@pytest.fixture(name="aws")
+def fixture_aws():
+    ssm_client, secretsmanager_client = MagicMock(), MagicMock()
+    ssm_client.get_parameters_by_path.return_value = DB_PARAMETERS
+    secretsmanager_client.get_secret_value.return_value = {
+        "SecretString": json.dumps({"username": "admin", "password": "secret"})
+    }
+    clients = {"ssm": ssm_client, "secretsmanager": secretsmanager_client}
+
+    parameter_provider.clear()
+    with (
+        patch.dict(os.environ, {"ENVIRONMENT": "test"}),
+        patch(
+            "evchart_helper.parameter_provider.boto3_manager.client",
+            side_effect=lambda service: clients[service],
+        ),
+    ):
+        yield ssm_client, secretsmanager_client
+    parameter_provider.clear()
+
+
+@patch("evchart_helper.pymysql.connect")
+@patch("feature_toggle.FeatureToggleService")
+def test_get_connection_reuses_warm_connection(mock_service, mock_connect, aws):
+    ssm_client, secretsmanager_client = aws
+    mock_service.return_value = feature_toggle_service(Feature.AURORA_CONNECTION_REUSE)
+    aurora = AuroraDatabase()
+
+    connection = aurora.get_connection()
+    aurora.close_connection()
+
+    assert aurora.get_connection() is connection
+    assert mock_connect.call_count == 1
+    assert connection.rollback.called
+    assert not connection.close.called
+    assert ssm_client.get_parameters_by_path.call_count == 1
+    assert secretsmanager_client.get_secret_value.call_count == 1
+
+
+@patch("evchart_helper.pymysql.connect")
+@patch("feature_toggle.FeatureToggleService")
+def test_get_connection_keeps_writer_and_reader_slots(mock_service, mock_connect, aws):
+    # pylint: disable=unused-argument
+    mock_service.return_value = feature_toggle_service(
+        Feature.AURORA_CONNECTION_REUSE, Feature.USE_RDS_PROXY
+    )
+    mock_connect.side_effect = lambda **_kwargs: MagicMock()
+    aurora = AuroraDatabase()
+
+    writer = aurora.get_connection()
+    reader = aurora.get_connection(use_read_only=True)
+
+    assert writer is not reader
+    assert aurora.get_connection() is writer
+    hosts = [kwargs["host"] for _, kwargs in mock_connect.call_args_list]
+    assert hosts == ["proxy.example.com", "reader.example.com"]
+
+
+@patch("evchart_helper.pymysql.connect")
+@patch("feature_toggle.FeatureToggleService")
+def test_get_connection_replaces_connection_that_fails_ping(mock_service, mock_connect, aws):
+    # pylint: disable=unused-argument
+    mock_service.return_value = feature_toggle_service(Feature.AURORA_CONNECTION_REUSE)
+    stale_connection, new_connection = MagicMock(), MagicMock()
+    mock_connect.side_effect = [stale_connection, new_connection]
+    aurora = AuroraDatabase()
+
+    aurora.get_connection()
+    stale_connection.ping.side_effect = pymysql.err.OperationalError(2013, "Lost connection")
+
+    assert aurora.get_connection() is new_connection
+
+
+@patch("evchart_helper.pymysql.connect")
+@patch("feature_toggle.FeatureToggleService")
+def test_get_connection_refreshes_rotated_credentials(mock_service, mock_connect, aws):
+    _, secretsmanager_client = aws
+    mock_service.return_value = feature_toggle_service()
+    connection = MagicMock()
+    mock_connect.side_effect = [
+        pymysql.err.OperationalError(ACCESS_DENIED_ERROR, "Access denied"),
+        connection,
+    ]
+
+    assert AuroraDatabase().get_connection() is connection
+    assert secretsmanager_client.get_secret_value.call_count == 2
+
+
+@patch("evchart_helper.pymysql.connect")
+@patch("feature_toggle.FeatureToggleService")
+def test_get_connection_without_reuse_opens_new_connection(mock_service, mock_connect, aws):
+    # pylint: disable=unused-argument
+    mock_service.return_value = feature_toggle_service()
+    first_connection, second_connection = MagicMock(), MagicMock()
+    mock_connect.side_effect = [first_connection, second_connection]
+    aurora = AuroraDatabase()
+
+    aurora.get_connection()
+    aurora.close_connection()
+
+    assert first_connection.close.called
+    assert aurora.get_connection() is second_connection
+
+
+@patch("evchart_helper.get_aurora_parameters_ttl", return_value=0)
+@patch("evchart_helper.pymysql.connect")
+@patch("feature_toggle.FeatureToggleService")
+def test_get_connection_rereads_expired_parameters(mock_service, _mock_connect, _mock_ttl, aws):
+    ssm_client, _ = aws
+    mock_service.return_value = feature_toggle_service(Feature.AURORA_CONNECTION_REUSE)
+    aurora = AuroraDatabase()
+
+    aurora.get_connection()
+    aurora.get_connection()
+
+    # the feature toggles are read again, the parameters come from the parameter provider cache
+    assert mock_service.return_value.get_feature_toggle_by_enum.call_count == 4
+    assert ssm_client.get_parameters_by_path.call_count == 1
+
+
+@patch("evchart_helper.pymysql.connect")
+@patch("feature_toggle.FeatureToggleService")
+def test_get_connection_given_missing_parameter(mock_service, mock_connect, aws):
+    ssm_client, _ = aws
+    ssm_client.get_parameters_by_path.return_value = {"Parameters": []}
+    mock_service.return_value = feature_toggle_service()
+
+    with pytest.raises(EvChartDatabaseHandlerConnectionError) as exc_info:
+        AuroraDatabase().get_connection()
+    assert "master_user_secret_arn" in exc_info.value.message
+    assert not mock_connect.called
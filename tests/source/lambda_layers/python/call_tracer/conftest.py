@@ -0,0 +1,5 @@
+import sys
+
+sys.path.extend(
+    [".", "source/lambda_layers/python", "source/lambda_functions"]
+)
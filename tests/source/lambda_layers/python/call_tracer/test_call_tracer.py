@@ -0,0 +1,135 @@
+import json
+import logging
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+from evchart_helper.api_helper import execute_query, execute_query_fetchone
+from evchart_helper.call_tracer import (
+    call_trace,
+    get_sql_shape,
+    register_call_tracer,
+    traced_handler,
+)
+
+
+def get_summary(caplog):
+    lines = [
+        json.loads(record.message)["call_trace"]
+        for record in caplog.records
+        if record.name == "CallTracer" and "call_trace" in record.message
+    ]
+    assert len(lines) == 1
+    return lines[0]
+
+
+@pytest.fixture(name="tracing")
+def fixture_tracing(monkeypatch, caplog):
+    monkeypatch.setenv("CALL_TRACER_ENABLED", "true")
+    caplog.set_level(logging.INFO, logger="CallTracer")
+    return caplog
+
+
+def test_get_sql_shape_collapses_values():
+    assert get_sql_shape(
+        "SELECT *  FROM t\n WHERE a = %s AND b IN (%s, %s, %s) AND c = 'x' AND d = 10"
+    ) == "SELECT * FROM t WHERE a = ? AND b IN (?...) AND c = ? AND d = ?"
+    assert get_sql_shape(
+        "INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s), (%s, %s)"
+    ) == "INSERT INTO t (a, b) VALUES (?...)..."
+
+
+def test_traced_handler_counts_queries_by_shape(tracing):
+    cursor = MagicMock(rowcount=0)
+    cursor.fetchall.return_value = []
+
+    @traced_handler
+    def handler(_event, _context):
+        assert call_trace.get() is not None
+        for station_id in range(3):
+            execute_query(f"SELECT * FROM stations WHERE id = {station_id}", None, cursor)
+        execute_query_fetchone("SELECT count(*) FROM uploads", None, cursor)
+        return "done"
+
+    assert handler({}, None) == "done"
+    assert call_trace.get() is None
+
+    summary = get_summary(tracing)
+    assert summary["query_count"] == 4
+    assert {query["call"]: query["count"] for query in summary["queries"]} == {
+        "SELECT * FROM stations WHERE id = ?": 3,
+        "SELECT count(*) FROM uploads": 1,
+    }
+
+
+def test_traced_handler_warns_over_query_budget(tracing, monkeypatch):
+    monkeypatch.setenv("CALL_TRACER_QUERY_BUDGET", "1")
+    cursor = MagicMock(rowcount=0)
+    cursor.fetchall.return_value = []
+
+    @traced_handler
+    def handler():
+        execute_query("SELECT 1", None, cursor)
+        execute_query("SELECT 2", None, cursor)
+
+    handler()
+
+    warnings = [record for record in tracing.records if record.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert json.loads(warnings[0].message)["query_count"] == 2
+
+
+def test_traced_handler_records_aws_calls(tracing):
+    client = boto3.session.Session().client("ssm", region_name="us-east-1")
+    register_call_tracer(client)
+
+    @traced_handler
+    def handler():
+        with Stubber(client) as stubber:
+            stubber.add_response("get_parameter", {"Parameter": {"Name": "a", "Value": "b"}})
+            client.get_parameter(Name="a")
+
+    handler()
+
+    summary = get_summary(tracing)
+    assert summary["aws_call_count"] == 1
+    assert summary["aws_calls"][0]["call"] == "ssm.GetParameter"
+
+
+def test_traced_handler_is_reported_under_the_lambda_function_name(tracing, monkeypatch):
+    monkeypatch.setenv("AWS_LAMBDA_FUNCTION_NAME", "evchart-APIGetDownloadModuleData")
+
+    @traced_handler
+    def handler(_event, _context):
+        return "done"
+
+    handler.__wrapped__.__module__ = "index"
+    assert handler({}, None) == "done"
+
+    assert get_summary(tracing)["handler"] == "evchart-APIGetDownloadModuleData"
+
+
+def test_traced_handler_is_reported_under_its_module_outside_of_lambda(tracing, monkeypatch):
+    monkeypatch.delenv("AWS_LAMBDA_FUNCTION_NAME", raising=False)
+
+    @traced_handler
+    def handler(_event, _context):
+        return "done"
+
+    assert handler({}, None) == "done"
+
+    assert get_summary(tracing)["handler"] == __name__
+
+
+def test_handler_is_not_traced_by_default(caplog, monkeypatch):
+    monkeypatch.delenv("CALL_TRACER_ENABLED", raising=False)
+    caplog.set_level(logging.INFO, logger="CallTracer")
+
+    @traced_handler
+    def handler():
+        return call_trace.get()
+
+    assert handler() is None
+    assert not [record for record in caplog.records if record.name == "CallTracer"]
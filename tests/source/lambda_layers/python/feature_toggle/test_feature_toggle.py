@@ -6,7 +6,7 @@ import pytest
 from evchart_helper.boto3_manager import Boto3Manager
 from evchart_helper.custom_exceptions import EvChartFeatureStoreConnectionError
 from evchart_helper.custom_logging import LogEvent
-from feature_toggle import FeatureToggleService
+from feature_toggle import FeatureToggleService, feature_snapshot_scope
 from feature_toggle.feature_enums import Feature
 
 @pytest.fixture
@@ -132,4 +132,37 @@ def test_get_active_feature_toggle_set_empty(mock_boto3_manager_return_12_flags)
     sut = FeatureToggleService()
     log = LogEvent({}, api="", action_type="READ")
     res = sut.get_active_feature_toggles(log)
-    assert res == {}
\ No newline at end of file
+    assert res == {}
+
+def test_feature_snapshot_reads_ssm_once_per_scope(mock_boto3_manager_extended):
+    log = LogEvent({}, api="", action_type="READ")
+    with patch.object(
+        FeatureToggleService,
+        "fetch_all_feature_toggles",
+        autospec=True,
+        side_effect=FeatureToggleService.fetch_all_feature_toggles,
+    ) as mock_fetch:
+        with feature_snapshot_scope():
+            assert FeatureToggleService().get_active_feature_toggles(log) == {Feature.ADD_USER}
+            assert FeatureToggleService().get_feature_toggle_by_enum(Feature.ADD_USER, log) == "True"
+            assert FeatureToggleService().get_feature_toggle_by_name("feature1", log) == "False"
+            assert FeatureToggleService().get_feature_toggle_by_name("Fake", log) is None
+            with feature_snapshot_scope():
+                FeatureToggleService().get_all_feature_toggles(log)
+        assert mock_fetch.call_count == 1
+
+        with feature_snapshot_scope():
+            FeatureToggleService().get_all_feature_toggles(log)
+        assert mock_fetch.call_count == 2
+
+def test_feature_snapshot_reused_across_scopes_within_ttl(mock_boto3_manager_extended, monkeypatch):
+    monkeypatch.setenv("FEATURE_SNAPSHOT_TTL_SECONDS", "60")
+    monkeypatch.setattr("feature_toggle.feature_snapshot_cache", {})
+    log = LogEvent({}, api="", action_type="READ")
+    with patch.object(
+        FeatureToggleService, "fetch_all_feature_toggles", return_value=[]
+    ) as mock_fetch:
+        for _ in range(3):
+            with feature_snapshot_scope():
+                FeatureToggleService().get_active_feature_toggles(log)
+    assert mock_fetch.call_count == 1
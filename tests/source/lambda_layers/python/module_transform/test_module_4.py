@@ -36,3 +36,24 @@ def test_mod_4_bug_overwritten_outage_ids():
     assert response['outage_id'].dtype == 'datetime64[ns]'
     assert isinstance(response.loc[0, 'outage_id'], pandas.Timestamp)
 
+
+
+def test_allow_null_outages_typed_upload_frame():
+    df = pandas.DataFrame({
+        'station_id': ["7.21", "diff", "7.17"],
+        'port_id': ["111", "222", "333"],
+        'outage_id': pandas.to_datetime(
+            ["2024-05-29T21:13:00Z", None, "2025-04-25T21:13:00Z"], format='ISO8601'
+        ),
+        'outage_duration': pandas.array([44.5, None, 78.0], dtype="Float64"),
+        'network_provider': ["abm", "autel", "7charge"]
+    })
+    response = allow_null_outages({Feature.ASYNC_BIZ_MAGIC_MODULE_4}, df)
+
+    assert response['outage_id'].dtype == 'datetime64[ns, UTC]'
+    assert response.loc[0, 'outage_id'] == pandas.Timestamp("2024-05-29T21:13:00Z")
+    assert response.loc[2, 'outage_id'] == pandas.Timestamp("2025-04-25T21:13:00Z")
+    # the system generated outage_id is whole seconds, like the one generated for uploaded text
+    assert response.loc[1, 'outage_id'].microsecond == 0
+    assert response['user_reports_no_data'].tolist() == [0, 1, 0]
+    assert response['outage_duration'].isna().tolist() == [False, True, False]
@@ -231,3 +231,29 @@ def test_allow_empty_charging_sessions():
     )
     assert response.loc[0, "user_reports_no_data"] == 1
     assert response.loc[1, "user_reports_no_data"] == 0
+
+
+def test_allow_empty_capital_install_costs_typed_upload_frame():
+    decimal_fields = [
+        "real_property_cost_total",
+        "equipment_cost_total",
+        "equipment_install_cost_total",
+        "equipment_install_cost_elec",
+        "equipment_install_cost_const",
+        "equipment_install_cost_labor",
+        "equipment_install_cost_other",
+        "der_cost_total",
+        "der_install_cost_total",
+        "dist_sys_cost_total",
+        "service_cost_total",
+    ]
+    df = pandas.DataFrame({
+        "station_id": ["s1", "s2"],
+        "der_acq_owned": pandas.array([None, 0], dtype="Int64"),
+        **{field: pandas.array([None, 5800.89], dtype="Float64") for field in decimal_fields},
+    })
+    response = allow_null_capital_install_costs({Feature.ASYNC_BIZ_MAGIC_MODULE_9}, df)
+
+    assert_series_equal(response["der_acq_owned"], df["der_acq_owned"])
+    assert_series_equal(response["service_cost_total"], df["service_cost_total"])
+    assert response["user_reports_no_data"].tolist() == [1, 0]
@@ -0,0 +1,99 @@
+import hashlib
+from io import BytesIO
+
+import pandas
+import pyarrow.parquet
+import pytest
+from feature_toggle.feature_enums import Feature
+from module_validation import get_dataframe_from_csv
+from module_validation.biz_magic import (
+    get_transformed_file_name,
+    read_transformed_df,
+    serialize_transformed_df,
+    set_datatype,
+)
+
+ft_set = {Feature.ASYNC_PARQUET_TRANSFORM}
+
+
+def get_transformed_df(filename, module_id):
+    with open(f"./tests/sample_data/{filename}", "r", encoding="utf-8") as fh:
+        df = get_dataframe_from_csv(fh.read())
+    df["upload_id"] = "852ade96-4075-4766-9b97-5e9379b31ab0"
+    df["station_uuid"] = None
+    return set_datatype(df, module_id, ft_set)
+
+
+@pytest.mark.parametrize(
+    "filename, module_id",
+    [
+        ("all_columns_module_2.csv", 2),
+        ("all_required_mod_3.csv", 3),
+        ("all_columns_module_5.csv", 5),
+        ("all_columns_module_9.csv", 9),
+    ],
+)
+def test_parquet_round_trip_keeps_dtypes_and_index(filename, module_id):
+    df = get_transformed_df(filename, module_id)
+
+    payload, file_type = serialize_transformed_df(df, module_id, ft_set)
+
+    assert file_type == "parquet"
+    pandas.testing.assert_frame_equal(
+        read_transformed_df(payload, file_type), df, check_index_type=False
+    )
+
+
+def test_serialize_transformed_df_defaults_to_json():
+    df = get_transformed_df("all_columns_module_9.csv", 9)
+
+    payload, file_type = serialize_transformed_df(df, 9)
+
+    assert file_type == "json"
+    assert payload == bytes(df.to_json(orient="table"), encoding="utf-8")
+    assert read_transformed_df(payload, file_type)["station_id"].tolist() == ["APIM91"]
+
+
+def test_serialize_transformed_df_falls_back_to_json():
+    df = get_transformed_df("all_columns_module_9.csv", 9)
+    # a value that cannot be stored in the module schema
+    df["real_property_cost_total"] = [{"not": "numeric"}]
+
+    _, file_type = serialize_transformed_df(df, 9, ft_set)
+
+    assert file_type == "json"
+
+
+def test_parquet_schema_uses_module_datatypes():
+    df = get_transformed_df("all_columns_module_9.csv", 9)
+    # decimal fields with only whole numbers are inferred as integers by set_datatype
+    df["real_property_cost_total"] = pandas.array([5800], dtype="Int64")
+
+    payload, file_type = serialize_transformed_df(df, 9, ft_set)
+    schema = pyarrow.parquet.read_schema(BytesIO(payload))
+
+    assert file_type == "parquet"
+    assert str(schema.field("real_property_cost_total").type) == "double"
+    assert str(schema.field("station_upgrade").type) == "int64"
+    assert str(schema.field("station_id").type) == "string"
+
+
+@pytest.mark.parametrize(
+    "recipient_type, expected",
+    [
+        ("direct-recipient", "transformed/Org/upload.parquet"),
+        ("sub-recipient", "transformed/Parent/Org/upload.parquet"),
+        ("testing", "transformed/testing/Org/upload.parquet"),
+    ],
+)
+def test_get_transformed_file_name_uses_file_type(recipient_type, expected):
+    assert get_transformed_file_name("upload", recipient_type, "Org", "Parent", "parquet") == expected
+
+
+def test_transformed_payload_checksum_is_stable():
+    df = get_transformed_df("all_columns_module_9.csv", 9)
+
+    first, _ = serialize_transformed_df(df, 9, ft_set)
+    second, _ = serialize_transformed_df(df.copy(), 9, ft_set)
+
+    assert hashlib.sha256(first).hexdigest() == hashlib.sha256(second).hexdigest()
@@ -0,0 +1,105 @@
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import numpy
+import pandas
+import pytest
+
+from module_validation.bulk_loader import (
+    get_content_checksum,
+    get_insert_rows,
+    load_module_data,
+)
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+def test_get_insert_rows_converts_missing_values_and_timestamps():
+    df = pandas.DataFrame(
+        data={
+            "station_id": ["s1", None, "s3"],
+            "energy_kwh": [1.5, numpy.nan, 3.0],
+            "session_start": pandas.to_datetime(["2024-01-01 10:00:00", None, "2024-01-03 00:00:00"]),
+            "session_end": [pandas.Timestamp("2024-01-01 11:00:00", tz="UTC"), pandas.NaT, ""],
+            "der_upgrade": [True, None, False],
+            "port_count": pandas.array([1, None, 3], dtype="Int64"),
+            "charging_end": pandas.to_datetime(["2024-01-01 12:00:00", None, None], utc=True),
+        }
+    )
+
+    rows = get_insert_rows(df)
+
+    assert rows[1] == (None, None, None, None, None, None, None)
+    assert rows[0][:2] == ("s1", 1.5)
+    assert type(rows[0][2]) is datetime
+    assert type(rows[0][3]) is datetime
+    assert rows[0][3].hour == 11
+    assert rows[2][3:] == ("", False, 3, None)
+    assert type(rows[0][6]) is datetime
+    assert rows[0][6].hour == 12
+
+
+def test_load_module_data_inserts_in_chunks_and_commits_once():
+    connection = MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    df = pandas.DataFrame(data={"station_id": ["s1", "s2", "s3"], "upload_id": ["u1"] * 3})
+
+    assert load_module_data(connection, "module9_data_v3", df, chunk_size=2) == 3
+
+    queries = [args[0] for args, _ in cursor.executemany.call_args_list]
+    chunks = [args[1] for args, _ in cursor.executemany.call_args_list]
+    assert queries[0] == (
+        "INSERT INTO module9_data_v3 (`station_id`, `upload_id`) VALUES (%s, %s)"
+    )
+    assert chunks == [[("s1", "u1"), ("s2", "u1")], [("s3", "u1")]]
+    assert connection.commit.call_count == 1
+    assert not connection.rollback.called
+    assert not cursor.execute.called
+
+
+def test_load_module_data_records_one_history_record():
+    connection = MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    df = pandas.DataFrame(data={"station_id": ["s1", "s2", None], "upload_id": ["u1"] * 3})
+
+    load_module_data(
+        connection, "evchart_data_v3.module9_data_v3", df, chunk_size=2, record_history=True
+    )
+
+    assert cursor.execute.call_count == 1
+    query, data = cursor.execute.call_args.args
+    assert "module_data_load_history" in query
+    assert data == (
+        "u1",
+        "module9_data_v3",
+        3,
+        get_content_checksum([("s1", "u1"), ("s2", "u1"), (None, "u1")]),
+        "u1",
+    )
+    assert connection.commit.call_count == 1
+
+
+def test_get_content_checksum_depends_on_values_and_order():
+    rows = [("s1", 1.5), ("s2", None)]
+
+    assert get_content_checksum(rows) == get_content_checksum(list(rows))
+    assert get_content_checksum(rows) != get_content_checksum(rows[::-1])
+
+
+def test_load_module_data_rolls_back_failed_load():
+    connection = MagicMock()
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.executemany.side_effect = [None, ValueError("bad row")]
+    df = pandas.DataFrame(data={"station_id": ["s1", "s2", "s3"]})
+
+    with pytest.raises(ValueError):
+        load_module_data(connection, "module9_data_v3", df, chunk_size=2)
+
+    assert connection.rollback.called
+    assert not connection.commit.called
+
+
+def test_load_module_data_rejects_empty_dataframe(monkeypatch):
+    monkeypatch.setenv("MODULE_LOAD_CHUNK_SIZE", "1")
+
+    with pytest.raises(ValueError):
+        load_module_data(MagicMock(), "module9_data_v3", pandas.DataFrame())
@@ -0,0 +1,105 @@
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+import pandas
+import pytest
+
+from error_report_messages_enum import ErrorReportMessages
+from module_validation import validate_m3, validate_m4
+from module_validation.business_rules import (
+    ALL_FIELDS,
+    BusinessRule,
+    RuleFrame,
+    compile_condition,
+    evaluate_rules,
+)
+from feature_toggle.feature_enums import Feature
+
+
+def test_compile_condition_rejects_what_is_not_a_rule():
+    with pytest.raises(ValueError):
+        compile_condition("__import__('os')")
+    with pytest.raises(ValueError):
+        compile_condition("df.apply(print)")
+    with pytest.raises(ValueError):
+        compile_condition("blank('uptime')")
+    with pytest.raises(ValueError):
+        BusinessRule(
+            condition="blank(uptime)",
+            message=ErrorReportMessages.MODULE_3_UPTIME_REQUIRED,
+        )
+
+
+def test_condition_is_a_mask_over_the_upload():
+    df = pandas.DataFrame(
+        {"a": ["", "1", "", "2"], "b": ["", "", "3", None], "c": [1.0, 2.0, None, 4.0]},
+        index=[2, 3, 4, 5],
+    )
+    frame = RuleFrame(df)
+    frame.field_groups["ab"] = ["a", "b", "not_uploaded"]
+
+    assert compile_condition("blank(a) ^ blank(b)")(frame).tolist() == [False, True, True, False]
+    assert compile_condition("missing(b) and not blank(c)")(frame).tolist() == \
+        [True, True, False, True]
+    assert compile_condition("any_missing(ab)")(frame).tolist() == [True, True, True, True]
+    # fields that are not uploaded are not blank
+    assert compile_condition("all_blank(ab)")(frame).tolist() == [False] * 4
+    assert compile_condition("1 < c <= 2")(frame).tolist() == [False, True, False, False]
+
+
+def test_blank_fields_report_every_blank_cell_of_the_group():
+    df = pandas.DataFrame(
+        {"outage_id": ["x", "", ""], "note": ["", "", "y"], "outage_duration": ["", "1", ""]},
+        index=[2, 3, 4],
+    )
+    rule = BusinessRule(
+        condition="blank(outage_id) ^ blank(outage_duration)",
+        message=ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN,
+        blank_fields=ALL_FIELDS,
+    )
+
+    conditions = evaluate_rules([rule], {"df": df})["conditions"]
+
+    assert [(c["error_row"], c["header_name"]) for c in conditions] == [
+        (2, "note"), (2, "outage_duration"), (3, "outage_id"), (3, "note")
+    ]
+    assert conditions[0]["error_description"] == \
+        ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name="note")
+
+
+@patch("module_validation.business_rules.get_station_attributes")
+def test_rules_share_one_prepared_frame(mock_get_station_attributes):
+    mock_get_station_attributes.return_value = pandas.DataFrame({
+        "station_id": ["s1", "s2"],
+        "network_provider": ["np1", "np1"],
+        "operational_date": [date(2020, 1, 1), date(2024, 1, 1)],
+    })
+    df = pandas.DataFrame({
+        "station_id": ["s1", "s2", "s1", "s3"],
+        "network_provider": ["np1", "np1", "np1", "np1"],
+        "uptime_reporting_start": ["2024-06-01T00:00:00Z"] * 4,
+        "uptime": ["", "", "7", ""],
+        "outage_id": ["", "", "", ""],
+        "outage_duration": ["", "", "", "1"],
+    })
+    cursor = MagicMock()
+    validation_options = {
+        "cursor": cursor,
+        "feature_toggle_set": {Feature.BIZ_MAGIC},
+        "df": df,
+        "rule_frame": RuleFrame(df, cursor),
+    }
+
+    m3_conditions = validate_m3.validate_operational_one_year(validation_options)["conditions"]
+    m4_conditions = validate_m4.validate_empty_outage(validation_options)["conditions"]
+    validate_m3.validate_operational_one_year(validation_options)
+
+    # one lookup for every station of the upload, unregistered stations have no operational date
+    mock_get_station_attributes.assert_called_once()
+    assert mock_get_station_attributes.call_args.args[1] == [
+        ("s1", "np1"), ("s2", "np1"), ("s3", "np1")
+    ]
+    assert [c["error_row"] for c in m3_conditions] == [0]
+    assert [(c["error_row"], c["header_name"]) for c in m4_conditions] == [
+        (3, "uptime"), (3, "outage_id")
+    ]
@@ -1,3 +1,5 @@
+import hashlib
+import re
 from collections import Counter
 from unittest.mock import MagicMock, patch
 from pandas import DataFrame
@@ -12,8 +14,12 @@ from evchart_helper.custom_exceptions import (
 from AsyncDataValidation.index import get_dataframe_from_csv
 from feature_toggle.feature_enums import Feature
 from module_validation import (
+    UNIQUE_KEY_CONSTRAINTS,
     check_duplicate_labels,
     get_dr_and_sr_ids,
+    get_unique_key_fingerprints,
+    get_validation_plan,
+    get_validation_error_budget,
     set_station_and_port_ids,
     set_station_uuid,
     upload_data_from_df,
@@ -107,9 +113,9 @@ def test_set_station_uuid_handles_error_given_get_station_uuid_raises_error(
     assert mock_get_station_uuid.called
 
 
-@patch("module_validation.get_station_and_port_uuid", side_effect=pymysql.Error)
-def test_set_station_and_port_ids_handles_error_given_get_station_and_port_uuid_raises_error(
-    mock_get_station_and_port_uuid
+@patch("module_validation.get_station_and_port_uuids", side_effect=pymysql.Error)
+def test_set_station_and_port_ids_handles_error_given_get_station_and_port_uuids_raises_error(
+    mock_get_station_and_port_uuids
 ):
     cursor = MagicMock()
     data = {
@@ -120,25 +126,30 @@ def test_set_station_and_port_ids_handles_error_given_get_station_and_port_uuid_
     df = DataFrame(data)
     with pytest.raises(EvChartDatabaseAuroraQueryError):
         set_station_and_port_ids(df, cursor)
-    assert mock_get_station_and_port_uuid.called
+    assert mock_get_station_and_port_uuids.called
 
 
-@patch("module_validation.get_station_and_port_uuid")
+def get_registered_stations_df(rows):
+    return pd.DataFrame(
+        rows,
+        columns=[
+            'station_id', 'network_provider', 'station_uuid',
+            'network_provider_uuid', 'port_uuid', 'port_id'
+        ]
+    )
+
+
+@patch("module_validation.get_station_and_port_uuids")
 def test_set_station_and_port_ids_handles_error_given_no_port_info_returned_dont_set_port_uuid(
-    mock_get_station_and_port_uuid
+    mock_get_station_and_port_uuids
 ):
     expected_station_uuid = '123'
     expected_network_provider_uuid = '111'
     port_id = 'My port'
 
-    mocked_return_dict = {
-        'station_uuid': expected_station_uuid,
-        'network_provider_uuid': expected_network_provider_uuid,
-        'port_uuid': None,
-        'port_id': None
-    }
-
-    mock_get_station_and_port_uuid.return_value = mocked_return_dict
+    mock_get_station_and_port_uuids.return_value = get_registered_stations_df([
+        ('1', '1', expected_station_uuid, expected_network_provider_uuid, None, None)
+    ])
 
     df = pd.DataFrame({
         'station_id': ['1'],
@@ -154,23 +165,19 @@ def test_set_station_and_port_ids_handles_error_given_no_port_info_returned_dont
     assert result.loc[0, 'port_id_upload'] == port_id
     assert result.loc[0, 'port_uuid'] is None
 
-@patch("module_validation.get_station_and_port_uuid")
+@patch("module_validation.get_station_and_port_uuids")
 def test_set_station_and_port_ids_handles_error_given_port_info_returned_set_port_uuid(
-    mock_get_station_and_port_uuid
+    mock_get_station_and_port_uuids
 ):
     expected_station_uuid = '123'
     expected_port_uuid = '999'
     expected_network_provider_uuid = '111'
     port_id = 'My port'
 
-    mocked_return_dict = {
-        'station_uuid': expected_station_uuid,
-        'network_provider_uuid': expected_network_provider_uuid,
-        'port_uuid': expected_port_uuid,
-        'port_id': port_id
-    }
-
-    mock_get_station_and_port_uuid.return_value = mocked_return_dict
+    mock_get_station_and_port_uuids.return_value = get_registered_stations_df([
+        ('1', '1', expected_station_uuid, expected_network_provider_uuid, 'other', 'other port'),
+        ('1', '1', expected_station_uuid, expected_network_provider_uuid, expected_port_uuid, port_id)
+    ])
 
     df = pd.DataFrame({
         'station_id': ['1'],
@@ -184,23 +191,18 @@ def test_set_station_and_port_ids_handles_error_given_port_info_returned_set_por
     assert result.loc[0,'station_uuid'] == expected_station_uuid
     assert result.loc[0, 'network_provider_uuid'] == expected_network_provider_uuid
     assert result.loc[0, 'port_id_upload'] == port_id
-    assert result.loc[0, 'port_uuid'] is expected_port_uuid
+    assert result.loc[0, 'port_uuid'] == expected_port_uuid
 
-@patch("module_validation.get_station_and_port_uuid")
+@patch("module_validation.get_station_and_port_uuids")
 def test_set_station_and_port_ids_handles_error_given_dataframe_with_no_port_id_set_no_port_values(
-    mock_get_station_and_port_uuid
+    mock_get_station_and_port_uuids
 ):
     expected_station_uuid = '123'
     expected_network_provider_uuid = '111'
 
-    mocked_return_dict = {
-        'station_uuid': expected_station_uuid,
-        'network_provider_uuid': expected_network_provider_uuid,
-        'port_uuid': None,
-        'port_id': None
-    }
-
-    mock_get_station_and_port_uuid.return_value = mocked_return_dict
+    mock_get_station_and_port_uuids.return_value = get_registered_stations_df([
+        ('1', '1', expected_station_uuid, expected_network_provider_uuid, None, None)
+    ])
 
     df = pd.DataFrame({
         'station_id': ['1'],
@@ -215,6 +217,29 @@ def test_set_station_and_port_ids_handles_error_given_dataframe_with_no_port_id_
     assert 'port_id_upload' not in result.columns
     assert 'port_uuid' not in result.columns
 
+
+@patch("module_validation.get_station_and_port_uuids")
+def test_set_station_and_port_ids_resolves_each_station_once(mock_get_station_and_port_uuids):
+    mock_get_station_and_port_uuids.return_value = get_registered_stations_df([
+        ('1', 'np', 'uuid-1', 'np-uuid', 'port-uuid-1a', 'a'),
+        ('1', 'np', 'uuid-1', 'np-uuid', 'port-uuid-1b', 'b'),
+        ('2', 'np', 'uuid-2', 'np-uuid', None, None),
+    ])
+    df = pd.DataFrame({
+        'station_id': ['1', '2', '1', '1', '2'],
+        'network_provider': ['np'] * 5,
+        'port_id': ['a', 'a', 'b', '', 'c'],
+    })
+
+    result = set_station_and_port_ids(df, MagicMock())
+
+    assert mock_get_station_and_port_uuids.call_count == 1
+    assert mock_get_station_and_port_uuids.call_args.args[1] == [('1', 'np'), ('2', 'np')]
+    assert result['station_uuid'].tolist() == ['uuid-1', 'uuid-2', 'uuid-1', 'uuid-1', 'uuid-2']
+    assert result['port_uuid'].tolist() == ['port-uuid-1a', None, 'port-uuid-1b', None, None]
+    assert result['port_id_upload'].tolist()[:3] == ['a', 'a', 'b']
+    assert pd.isna(result.loc[3, 'port_id_upload'])
+
 def test_df_network_provider_missing():
     test_df = DataFrame({'station_id': ['test_staiton_id'], 'port_id': ['port_id']})
     expected_conditions = \
@@ -228,7 +253,7 @@ def test_df_network_provider_missing():
 
 
 @patch("module_validation.adjust_for_booleans")
-@patch("awswrangler.mysql.to_sql")
+@patch("module_validation.load_module_data")
 def test_upload_data_from_df_check_boolean_default(
     mock_to_sql, mock_adjust_for_booleans
 ):
@@ -242,7 +267,7 @@ def test_upload_data_from_df_check_boolean_default(
 
 
 @patch("module_validation.adjust_for_booleans")
-@patch("awswrangler.mysql.to_sql")
+@patch("module_validation.load_module_data")
 def test_upload_data_from_df_check_boolean_false(
     mock_to_sql, mock_adjust_for_booleans
 ):
@@ -256,6 +281,121 @@ def test_upload_data_from_df_check_boolean_false(
     assert not mock_adjust_for_booleans.called
 
 
+def test_get_unique_key_fingerprints_matches_stored_format():
+    df = DataFrame(data={
+        "station_uuid": ["ABC", "abc", "abc", None],
+        "port_id": ["1", "1", "1", "1"],
+        "uptime_reporting_start": [
+            "2024-01-01T00:00:00Z",
+            "2024-01-01 00:00:00",
+            "2024-01-01T00:00:00+01:00",
+            "2024-01-01T00:00:00Z",
+        ],
+        "uptime_reporting_end": ["2024-03-31T23:59:59Z"] * 4,
+    })
+
+    fingerprints = get_unique_key_fingerprints(df, 3)
+
+    # the value Module_Unique_Key_Fingerprint.sql computes for the same row
+    expected = hashlib.sha256(
+        "abc\x1f1\x1f2024-01-01 00:00:00\x1f2024-03-31 23:59:59".encode("utf-8")
+    ).hexdigest()
+    assert fingerprints.tolist() == [expected, expected, expected, None]
+
+
+def test_get_unique_key_fingerprints_keep_the_clock_time_of_offset_datetimes():
+    uptime_reporting_start = [
+        "2024-01-01T00:00:00-05:00",
+        "2024-01-01 00:00:00-0500",
+        pd.Timestamp("2024-01-01T00:00:00-05:00"),
+    ]
+    df = DataFrame(data={
+        "station_uuid": ["abc"] * 3,
+        "port_id": ["1"] * 3,
+        "uptime_reporting_start": uptime_reporting_start,
+        "uptime_reporting_end": ["2024-03-31T23:59:59-05:00"] * 3,
+    })
+    typed_df = df.assign(
+        uptime_reporting_start=pd.to_datetime(["2024-01-01T00:00:00-05:00"] * 3),
+        uptime_reporting_end=pd.to_datetime(["2024-03-31T23:59:59-05:00"] * 3),
+    )
+
+    # pymysql writes 2024-01-01T00:00:00-05:00 as '2024-01-01 00:00:00'
+    expected = hashlib.sha256(
+        "abc\x1f1\x1f2024-01-01 00:00:00\x1f2024-03-31 23:59:59".encode("utf-8")
+    ).hexdigest()
+    assert get_unique_key_fingerprints(df, 3).tolist() == [expected] * 3
+    assert get_unique_key_fingerprints(typed_df, 3).tolist() == [expected] * 3
+    # validation converts the datetimes to utc, the uploaded text still has their clock time
+    validated_df = typed_df.assign(
+        uptime_reporting_start=typed_df["uptime_reporting_start"].dt.tz_convert("UTC"),
+        uptime_reporting_end=typed_df["uptime_reporting_end"].dt.tz_convert("UTC"),
+    )
+    assert get_unique_key_fingerprints(validated_df, 3, upload_df=df).tolist() == [expected] * 3
+
+
+def get_migration_fingerprint_keys():
+    """
+    Returns the columns of the unique_key_fingerprint expression of each module table of
+    Module_Unique_Key_Fingerprint.sql, checking that every expression has the form
+    get_unique_key_fingerprints mirrors
+    """
+    with open(
+        "./source/lambda_functions/InfraDBMigrations/migrations/Module_Unique_Key_Fingerprint.sql",
+        "r",
+        encoding="utf-8",
+    ) as fh:
+        migration = fh.read()
+
+    fingerprint_keys = {}
+    for module_id, expression in re.findall(
+        r"ALTER TABLE module(\d)_data_v3\s+ADD COLUMN unique_key_fingerprint CHAR\(64\) AS \((.*)\) STORED",
+        migration,
+    ):
+        arguments = re.fullmatch(
+            r"SHA2\(CONCAT_WS\(CHAR\(31 USING utf8mb4\), (.*)\), 256\)", expression
+        ).group(1)
+        fingerprint_keys[module_id] = tuple(
+            re.fullmatch(r"LOWER\((\w+)\)", argument).group(1)
+            for argument in arguments.split(", ")
+        )
+    return fingerprint_keys
+
+
+def test_unique_key_fingerprints_match_migration_expression():
+    fingerprint_keys = get_migration_fingerprint_keys()
+
+    assert fingerprint_keys == UNIQUE_KEY_CONSTRAINTS
+    for module_id, columns in fingerprint_keys.items():
+        datetime_fields = get_validation_plan(module_id).datetime_fields
+        df = DataFrame(data={
+            column: ["2024-01-01T00:00:00Z" if column in datetime_fields else f"Key-{column}"]
+            for column in columns
+        })
+        # SHA2(CONCAT_WS(CHAR(31), LOWER(column), ...), 256) of the row as MySQL stores it
+        stored_values = [
+            "2024-01-01 00:00:00" if column in datetime_fields else f"key-{column}"
+            for column in columns
+        ]
+        expected = hashlib.sha256("\x1f".join(stored_values).encode("utf-8")).hexdigest()
+        assert get_unique_key_fingerprints(df, module_id).tolist() == [expected]
+
+
+@patch("module_validation.load_module_data")
+def test_upload_data_from_df_leaves_unique_key_fingerprint_to_the_database(mock_to_sql):
+    df = DataFrame(data={"station_uuid": ["abc"], "station_id": ["s1"], "upload_id": ["u1"]})
+
+    upload_data_from_df(
+        connection=MagicMock(),
+        module_number=9,
+        df=df,
+        check_boolean=False,
+        feature_toggle_set={Feature.UNIQUE_KEY_FINGERPRINT},
+    )
+
+    # generated columns cannot be inserted into
+    assert "unique_key_fingerprint" not in mock_to_sql.call_args.kwargs["df"]
+
 
 @pytest.mark.parametrize("filename", missing_station_id_files)
 def test_missing_station_id_columns(filename):
@@ -363,3 +503,158 @@ def test_validated_dataframe_with_errors_when_central_config_false(mock_get_vali
     for error_obj in conditions:
         assert error_obj.get("header_name") is not None
         assert error_obj.get("header_name") in ["session_start", "energy_kwh"]
+
+
+def get_module_2_df(rows=1, **overrides):
+    data = {
+        'station_id': ['lemon'] * rows,
+        'port_id': ['123-456-7'] * rows,
+        'network_provider': ['blink'] * rows,
+        'charger_id': ['100'] * rows,
+        'session_id': ['10001'] * rows,
+        'connector_id': ['abc1'] * rows,
+        'session_start': ['abc'] * rows,
+        'session_end': ['2024-01-20T00:00:00Z'] * rows,
+        'session_error': ['ERROR1'] * rows,
+        'error_other': ['DETAILS'] * rows,
+        'energy_kwh': ['20241.0112'] * rows,
+        'power_kw': ['20241.02'] * rows,
+        'payment_method': ['VISA'] * rows,
+        'payment_other': ['PAYMENTDETAILS'] * rows,
+    }
+    data.update(overrides)
+    return pd.DataFrame(data)
+
+
+@patch("module_validation.get_validation_records_status")
+def test_validated_dataframe_stops_at_error_budget(mock_get_validation_records_status):
+    df = get_module_2_df(rows=10)
+    module_fields = _get_module_fields_by_number(2)
+
+    response = validated_dataframe(module_fields, 2, df, "123", max_conditions=5)
+
+    conditions = response["conditions"]
+    assert len(conditions) == 6
+    # validation stops after the session_start column, energy_kwh is never validated
+    assert {c["header_name"] for c in conditions[:5]} == {"session_start"}
+    assert conditions[-1] == {
+        "error_description": ErrorReportMessages.ERROR_BUDGET_EXHAUSTED.format(max_errors=5),
+        "header_name": "NOT_APPLICABLE",
+        "error_row": None,
+    }
+    assert response["is_compliant"] is False
+
+
+@patch("module_validation.get_validation_records_status")
+def test_validated_dataframe_under_error_budget(mock_get_validation_records_status):
+    df = get_module_2_df(rows=2)
+    module_fields = _get_module_fields_by_number(2)
+
+    unlimited = validated_dataframe(module_fields, 2, df, "123")
+    response = validated_dataframe(module_fields, 2, df, "123", max_conditions=100)
+
+    assert response["conditions"] == unlimited["conditions"]
+
+
+def get_station_conditions(rows):
+    return [
+        {"error_description": "station not registered", "header_name": "station_id", "error_row": row}
+        for row in range(rows)
+    ]
+
+
+@patch("module_validation.get_validation_records_status")
+def test_validated_dataframe_cuts_column_conditions_to_the_error_budget(
+    mock_get_validation_records_status
+):
+    df = get_module_2_df(rows=10, energy_kwh=["x"] * 10)
+    module_fields = _get_module_fields_by_number(2)
+
+    response = validated_dataframe(
+        module_fields, 2, df, "123", max_conditions=5, prior_conditions=get_station_conditions(3)
+    )
+
+    conditions = response["conditions"]
+    assert conditions[:3] == get_station_conditions(3)
+    # only the session_start errors that fit in the remaining budget are reported
+    assert [c["header_name"] for c in conditions[3:5]] == ["session_start"] * 2
+    assert conditions[5]["error_description"] == (
+        ErrorReportMessages.ERROR_BUDGET_EXHAUSTED.format(max_errors=5)
+    )
+    assert len(conditions) == 6
+
+
+@patch("module_validation.validated_field")
+@patch("module_validation.get_validation_records_status")
+def test_validated_dataframe_prior_conditions_spend_the_error_budget(
+    mock_get_validation_records_status, mock_validated_field
+):
+    df = get_module_2_df(rows=10)
+    module_fields = _get_module_fields_by_number(2)
+
+    response = validated_dataframe(
+        module_fields, 2, df, "123", max_conditions=5, prior_conditions=get_station_conditions(8)
+    )
+
+    assert not mock_validated_field.called
+    assert response["conditions"][:5] == get_station_conditions(5)
+    assert len(response["conditions"]) == 6
+
+
+@patch("module_validation.get_validation_records_status")
+def test_validated_dataframe_prior_conditions_do_not_stop_on_column_errors(
+    mock_get_validation_records_status
+):
+    df = get_module_2_df(rows=1)
+    module_fields = _get_module_fields_by_number(2)
+
+    response = validated_dataframe(
+        module_fields,
+        2,
+        df,
+        "123",
+        stop_on_column_errors=True,
+        prior_conditions=get_station_conditions(1),
+    )
+
+    assert {c["header_name"] for c in response["conditions"]} == {
+        "station_id", "session_start", "energy_kwh"
+    }
+
+
+@patch("module_validation.validated_field")
+@patch("module_validation.get_validation_records_status")
+def test_validated_dataframe_stops_on_column_errors(
+    mock_get_validation_records_status, mock_validated_field
+):
+    df = get_module_2_df(rows=3, unknown=['x'] * 3).drop(columns=["session_id"])
+    module_fields = _get_module_fields_by_number(2)
+
+    response = validated_dataframe(module_fields, 2, df, "123", stop_on_column_errors=True)
+
+    assert not mock_validated_field.called
+    assert response["is_compliant"] is False
+    assert {(c["header_name"], c["error_row"]) for c in response["conditions"]} == {
+        ("session_id", None),
+        ("unknown", None),
+    }
+
+
+@patch("module_validation.get_validation_records_status")
+def test_validated_dataframe_stop_on_column_errors_validates_clean_columns(
+    mock_get_validation_records_status
+):
+    df = get_module_2_df(rows=1)
+    module_fields = _get_module_fields_by_number(2)
+
+    response = validated_dataframe(module_fields, 2, df, "123", stop_on_column_errors=True)
+
+    assert {c["header_name"] for c in response["conditions"]} == {"session_start", "energy_kwh"}
+
+
+def test_get_validation_error_budget(monkeypatch):
+    assert get_validation_error_budget(set()) is None
+    assert get_validation_error_budget({Feature.VALIDATION_FAIL_FAST}) == 1000
+
+    monkeypatch.setenv("VALIDATION_ERROR_BUDGET", "50")
+    assert get_validation_error_budget({Feature.VALIDATION_FAIL_FAST}) == 50
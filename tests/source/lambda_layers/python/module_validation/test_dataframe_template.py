@@ -2,7 +2,8 @@ import pandas
 
 # module paths are set in conftest.py
 from module_validation import (
-    drop_sample_rows
+    drop_sample_rows,
+    get_dataframe_from_csv,
 )
 
 
@@ -82,3 +83,32 @@ def test_bugfix_je5411():
     pandas.testing.assert_frame_equal(drop_sample_rows(sample_df), expected_df)
 
 
+def test_get_dataframe_from_csv_keeps_excel_row_index():
+    body = "\ufeffstation_id,port_id\r\ns1,p1\r\n\r\n,\r\ns2,\r\n"
+
+    df = get_dataframe_from_csv(body)
+
+    assert list(df.columns) == ["station_id", "port_id"]
+    assert list(df.index) == [2, 5]
+    assert df.loc[5].tolist() == ["s2", ""]
+
+
+def test_get_dataframe_from_csv_keeps_quoted_values_as_strings():
+    body = 'station_id,power_kw,notes\n007,1.50,"a, ""quoted""\nnote"\n'
+
+    df = get_dataframe_from_csv(body)
+
+    assert df.loc[2].tolist() == ["007", "1.50", 'a, "quoted"\nnote']
+
+
+def test_get_dataframe_from_csv_keeps_duplicate_headers():
+    df = get_dataframe_from_csv("station_id,station_id\ns1,s2\n")
+
+    assert list(df.columns) == ["station_id", "station_id"]
+
+
+def test_get_dataframe_from_csv_row_wider_than_header():
+    df = get_dataframe_from_csv("station_id,port_id\ns1,p1,extra\n")
+
+    assert list(df.columns) == ["station_id", "port_id", None]
+    assert df.loc[2].tolist() == ["s1", "p1", "extra"]
@@ -2,7 +2,7 @@ import os
 from unittest.mock import patch
 
 from database_central_config import DatabaseCentralConfig
-from module_validation import validate_m2
+from module_validation import typed_column, validate_m2
 from error_report_messages_enum import ErrorReportMessages
 from feature_toggle.feature_enums import Feature
 
@@ -250,3 +250,35 @@ def test_central_config_false(
         ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name='session_start')
     assert response['conditions'][0]['header_name'] == 'session_start'
     assert not mock_database_central_config.called
+
+
+def test_typed_upload_frame_has_the_same_conditions():
+    df = pandas.DataFrame({
+        'station_id': ["s1", "s2", "s3", "s4"],
+        'network_provider': ["np1", "np2", "np3", "np4"],
+        'port_id': ["port1", "port2", "port3", "port4"],
+        'session_id': ["", "session_id_2", "session_id_3", ""],
+        'session_start': ["", "2023-07-03T12:51:48Z", "", ""],
+        'session_end': ["", "2023-07-07T12:53:48Z", "2023-07-03T12:53:48Z", ""],
+        'session_error': ["", "session_error_2", "session_error_3", ""],
+        'energy_kwh': ["", "1.23", "", ""],
+        'power_kw': ["", "1.56", "2.56", "3.56"],
+        'payment_method': ["", "visa", "visa", ""],
+    })
+    datatypes = {
+        'session_start': "datetime",
+        'session_end': "datetime",
+        'energy_kwh': "decimal",
+        'power_kw': "decimal",
+    }
+    typed_df = df.apply(lambda column: typed_column(column, datatypes.get(column.name, "string")))
+    feature_toggle_set = {Feature.BIZ_MAGIC}
+
+    expected = validate_m2.validate_empty_session({"feature_toggle_set": feature_toggle_set, "df": df})
+    response = validate_m2.validate_empty_session(
+        {"feature_toggle_set": feature_toggle_set, "df": typed_df}
+    )
+
+    assert typed_df['energy_kwh'].dtype == "Float64"
+    assert {r['error_row'] for r in expected['conditions']} == {2, 3}
+    assert response['conditions'] == expected['conditions']
@@ -8,13 +8,23 @@ from feature_toggle.feature_enums import Feature
 import pandas
 
 
+def operational_on(operational_date):
+    def get_station_attributes(_cursor, stations, attributes):
+        assert list(attributes) == ["operational_date"]
+        return pandas.DataFrame(
+            [(*station, operational_date) for station in stations],
+            columns=["station_id", "network_provider", "operational_date"],
+        )
+    return get_station_attributes
+
+
 # JE-5779
 # A module 3 upload containing uptime as empty string will be not be
 # accepted if the uptime_reporting_start is at least 1 year after the
 # operational date for the associated station
-@patch("module_validation.validate_m3.get_operational_date")
-def test_records_with_empty_values(mock_get_operational_date):
-    mock_get_operational_date.return_value = date(year=2024, month=7, day=4)
+@patch("module_validation.business_rules.get_station_attributes")
+def test_records_with_empty_values(mock_get_station_attributes):
+    mock_get_station_attributes.side_effect = operational_on(date(year=2024, month=7, day=4))
 
     df = pandas.DataFrame({
         'station_id': ["s1", "s2", "s3", "s4", "s5", "s6"],
@@ -57,9 +67,9 @@ def test_records_with_empty_values(mock_get_operational_date):
     assert response['conditions'][0]['header_name'] == 'uptime'
 
 
-@patch("module_validation.validate_m3.get_operational_date")
-def test_qa_feedback_1(mock_get_operational_date):
-    mock_get_operational_date.return_value = date(year=2024, month=7, day=4)
+@patch("module_validation.business_rules.get_station_attributes")
+def test_qa_feedback_1(mock_get_station_attributes):
+    mock_get_station_attributes.side_effect = operational_on(date(year=2024, month=7, day=4))
 
     df = pandas.DataFrame({
         'station_id': ["StationW1", "StationW1", "StationW1"],
@@ -96,9 +106,9 @@ def test_qa_feedback_1(mock_get_operational_date):
     assert response['conditions'][0]['header_name'] == 'uptime'
 
 
-@patch("module_validation.validate_m3.get_operational_date")
-def test_qa_feedback_2(mock_get_operational_date):
-    mock_get_operational_date.return_value = date(year=2024, month=7, day=4)
+@patch("module_validation.business_rules.get_station_attributes")
+def test_qa_feedback_2(mock_get_station_attributes):
+    mock_get_station_attributes.side_effect = operational_on(date(year=2024, month=7, day=4))
 
     df = pandas.DataFrame({
         'station_id': ["ModJE5779", "ModJE5779"],
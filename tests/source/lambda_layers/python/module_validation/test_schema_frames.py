@@ -2,11 +2,14 @@ from unittest.mock import patch
 import pandas
 import pytest
 from error_report_messages_enum import ErrorReportMessages
+from feature_toggle.feature_enums import Feature
 
 
 # module paths are set in conftest.py
 from module_validation import (
     adjust_for_booleans,
+    blank_cells,
+    compact_column,
     load_module_definitions,
     validated_dataframe
 )
@@ -201,3 +204,115 @@ def test_boolean_conversion():
 
     m8_df.drop(['der_upgrade', 'der_onsite'], inplace=True, axis=1)
     pandas.testing.assert_frame_equal(m8_df, adjust_for_booleans(m8_df, "8"))
+
+
+@pytest.fixture(name="typed_module_fields")
+def fixture_typed_module_fields():
+    return [
+        {"field_name": "port_id", "required": False, "datatype": "string"},
+        {"field_name": "session_id", "required": True, "datatype": "string"},
+        {"field_name": "energy_kwh", "required": False, "datatype": "decimal"},
+        {"field_name": "session_count", "required": False, "datatype": "integer"},
+        {"field_name": "user_reports", "required": False, "datatype": "boolean"},
+        {"field_name": "session_start", "required": False, "datatype": "datetime"},
+    ]
+
+
+@pytest.fixture(name="typed_df")
+def fixture_typed_df():
+    df = pandas.DataFrame(data={
+        "station_id": ["station-1", "station-1", "station-2"],
+        "network_provider": ["blink", "blink", "blink"],
+        "port_id": ["1", "2", ""],
+        "session_id": ["a", "b", "c"],
+        "energy_kwh": ["1", "2.5", ""],
+        "session_count": ["3", "", "4"],
+        "user_reports": ["TRUE", "false", ""],
+        "session_start": ["2024-01-01T00:00:00Z", "", "2024-01-02T00:00:00Z"],
+    })
+    df.index = df.index + 2
+    return df
+
+
+@patch("module_validation.metadata_update_validation_status")
+def test_validated_dataframe_compact_dtypes(_mock_update, typed_module_fields, typed_df):
+    response = validated_dataframe(
+        module_fields=typed_module_fields,
+        df=typed_df,
+        upload_id="123",
+        module_number=2,
+        feature_toggle_set={Feature.COMPACT_DTYPES},
+    )
+    validated_df = response["df"]
+
+    assert response["is_compliant"] is True
+    assert list(validated_df.index) == [2, 3, 4]
+    assert validated_df.dtypes.astype(str).to_dict() == {
+        "station_id": "category",
+        "network_provider": "category",
+        "port_id": "category",
+        "session_id": "string",
+        "energy_kwh": "Float64",
+        "session_count": "Int64",
+        "user_reports": "boolean",
+        "session_start": "datetime64[ns, UTC]",
+    }
+    assert validated_df["session_id"].dtype.storage == "pyarrow"
+    # blank identifiers are held as missing values
+    assert list(validated_df["port_id"].cat.categories) == ["1", "2"]
+    assert validated_df["port_id"].isna().tolist() == [False, False, True]
+    assert validated_df["energy_kwh"].tolist() == [1.0, 2.5, pandas.NA]
+    assert validated_df["session_count"].tolist() == [3, pandas.NA, 4]
+    assert validated_df["user_reports"].tolist() == [True, False, pandas.NA]
+
+
+@patch("module_validation.metadata_update_validation_status")
+def test_validated_dataframe_default_dtypes(_mock_update, typed_module_fields, typed_df):
+    validated_df = validated_dataframe(
+        module_fields=typed_module_fields,
+        df=typed_df,
+        upload_id="123",
+        module_number=2,
+    )["df"]
+
+    assert validated_df["station_id"].dtype == object
+    assert validated_df["port_id"].dtype == "string"
+    assert validated_df["session_count"].dtype == "Int64"
+
+
+@patch("module_validation.metadata_update_validation_status")
+def test_validated_dataframe_typed_upload_frame(_mock_update, typed_module_fields, typed_df):
+    response = validated_dataframe(
+        module_fields=typed_module_fields,
+        df=typed_df,
+        upload_id="123",
+        module_number=2,
+        feature_toggle_set={Feature.TYPED_UPLOAD_FRAME, Feature.COMPACT_DTYPES},
+    )
+    typed_upload_df = response["df"]
+
+    assert response["is_compliant"] is True
+    assert list(typed_upload_df.index) == [2, 3, 4]
+    assert typed_upload_df.dtypes.astype(str).to_dict() == {
+        "station_id": "object",
+        "network_provider": "object",
+        "port_id": "object",
+        "session_id": "object",
+        "energy_kwh": "Float64",
+        "session_count": "Int64",
+        "user_reports": "Int64",
+        "session_start": "datetime64[ns, UTC]",
+    }
+    # text keeps its blank cells, booleans are 1/0 as set_datatype makes them
+    assert typed_upload_df["port_id"].tolist() == ["1", "2", ""]
+    assert typed_upload_df["user_reports"].tolist() == [1, 0, pandas.NA]
+    assert typed_upload_df["session_start"].isna().tolist() == [False, True, False]
+    assert blank_cells(typed_upload_df).sum().tolist() == [0, 0, 1, 0, 1, 1, 1, 1]
+
+
+def test_compact_column_does_not_truncate_integers():
+    data = pandas.Series(["1", "1.5", "1e22", "abc"])
+
+    assert compact_column(data, "integer").tolist() == [1.0, 1.5, 1e22, pandas.NA]
+    assert compact_column(data, "integer").dtype == "Float64"
+    assert compact_column(pandas.Series(["1", ""]), "integer").dtype == "Int64"
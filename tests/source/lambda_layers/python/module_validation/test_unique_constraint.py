@@ -1,24 +1,46 @@
+import hashlib
 import os
+import re
+import sqlite3
 from unittest.mock import MagicMock, patch
 
 from database_central_config import DatabaseCentralConfig
 from feature_toggle.feature_enums import Feature
 from AsyncDataValidation.index import get_dataframe_from_csv
 from error_report_messages_enum import ErrorReportMessages
+from evchart_helper.api_helper import execute_query_df
+from evchart_helper.custom_exceptions import EvChartDatabaseAuroraQueryError
 
+from module_validation import ModuleDefinitionEnum, unique_constraint, validated_dataframe_by_module_id
 from module_validation.unique_constraint import (
+    check_constraints_in_data,
     get_constraints_conditions,
     get_module_constraints_by_module_id,
     unique_constraint_violations,
     unique_constraint_violations_for_async,
     get_module_constraints_by_module_id,
     get_duplicate_within_db,
+    get_duplicates_query_builder,
+    get_upload_keys_collations,
+    load_upload_keys,
+    query_builder_module_keys,
 )
 
 import pandas
 import pytest
 
 
+@pytest.fixture(name="_upload_keys_collations", autouse=True)
+def fixture_upload_keys_collations():
+    """
+    The mocked cursors have no information_schema, the upload keys get the database defaults
+    """
+    with patch(
+        "module_validation.unique_constraint.get_upload_keys_collations", return_value={}
+    ) as mock_get_upload_keys_collations:
+        yield mock_get_upload_keys_collations
+
+
 @pytest.fixture(name="config")
 def fixture_config():
     return DatabaseCentralConfig(
@@ -77,7 +99,7 @@ def test_empty_constraints(
 
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 def test_unique_constraint_violations_for_async_no_duplicates_in_db_and_file_happy_path(
     mock_execute_query_df, mock_database_central_config, mock_get_upload_metadata, config
@@ -115,7 +137,7 @@ def test_unique_constraint_violations_for_async_no_duplicates_in_db_and_file_hap
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
 @patch("module_validation.unique_constraint.get_duplicate_within_db")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 def test_unique_constraint_violations_for_async_no_null_duplicates_in_db_and_file_happy_path_m4(
     mock_database_central_config, mock_get_duplicate_within_db, mock_get_upload_metadata, config
 ):
@@ -167,7 +189,7 @@ def test_unique_constraint_violations_for_async_given_empty_dataframe_returns_no
 
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 def test_unique_constraints_violations_for_async_multiple(
     mock_execute_query_df, mock_database_central_config, mock_get_upload_metadata, config
@@ -212,7 +234,7 @@ def test_unique_constraints_violations_for_async_multiple(
 
 
 @patch("module_validation.unique_constraint.get_module_constraints_by_module_id")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 @patch("module_validation.unique_constraint.get_module_id")
 @patch("module_validation.unique_constraint.check_constraints_in_data")
@@ -242,7 +264,7 @@ def test_ft_central_config_false(
 
 
 @patch("module_validation.unique_constraint.get_module_constraints_by_module_id")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 @patch("module_validation.unique_constraint.get_module_id")
 @patch("module_validation.unique_constraint.check_constraints_in_data")
@@ -272,7 +294,7 @@ def test_ft_central_config_true(
 
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 def test_unique_constraint_violations_for_async_duplicate_non_null_data_in_db_found(
     mock_execute_query_df, mock_database_central_config, mock_get_upload_metadata, config
@@ -313,7 +335,7 @@ def test_unique_constraint_violations_for_async_duplicate_non_null_data_in_db_fo
 
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 def test_unique_constraint_violation_duplicate_rows_in_file(
     mock_execute_query_df, mock_database_central_config, mock_get_upload_metadata, config
@@ -350,7 +372,7 @@ def test_unique_constraint_violation_duplicate_rows_in_file(
 
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.get_duplicate_within_db")
 def test_unique_constraint_violation_duplicate_data_in_file_and_db(
     mock_get_duplicate_within_db, mock_database_central_config, mock_get_upload_metadata, config
@@ -397,7 +419,46 @@ def test_unique_constraint_violation_duplicate_data_in_file_and_db(
 
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
+@patch("module_validation.unique_constraint.get_duplicate_within_db")
+def test_unique_constraint_violations_for_async_compact_validated_df(
+    mock_get_duplicate_within_db, mock_database_central_config, mock_get_upload_metadata, config
+):
+    """
+    the categorical identifier columns of a compact validated dataframe find the same duplicates
+    """
+    input_df = get_df_from_sample_data_csv("invalid_module_2_duplicate_columns_in_file.csv")
+    feature_toggle_set = {Feature.UNIQUE_CONSTRAINT_MODULE_2, Feature.DATABASE_CENTRAL_CONFIG}
+    mock_database_central_config.return_value = config
+    mock_get_upload_metadata.return_value = {"year": "2024", "quarter": "", "module_id": "2"}
+    mock_get_duplicate_within_db.return_value = pandas.DataFrame()
+    with patch("module_validation.metadata_update_validation_status"):
+        compact_df = validated_dataframe_by_module_id(
+            ModuleDefinitionEnum.MODULE_2,
+            input_df.copy(),
+            "curr_upload_id_123",
+            feature_toggle_set | {Feature.COMPACT_DTYPES},
+        )["df"]
+    assert compact_df["port_id"].dtype == "category"
+
+    responses = [
+        unique_constraint_violations_for_async(
+            cursor=MagicMock(),
+            upload_id="curr_upload_id_123",
+            dr_id="dr_id",
+            log_event=MagicMock(),
+            df=df,
+            module_id="2",
+            feature_toggle_set=feature_toggle_set,
+        )
+        for df in (input_df, compact_df)
+    ]
+    assert responses[0]["errors"]
+    assert responses[1]["errors"] == responses[0]["errors"]
+
+
+@patch("module_validation.unique_constraint.get_upload_metadata")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 def test_unique_constraints_violations_for_async_database_constraint(
     mock_execute_query_df, mock_database_central_config, mock_get_upload_metadata, config
@@ -438,7 +499,7 @@ def test_unique_constraints_violations_for_async_database_constraint(
 
 
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 def test_unique_constraints_violations_for_async_duplicate_rows_in_csv_no_database_constraint(
     mock_execute_query_df, mock_database_central_config, mock_get_upload_metadata, config
@@ -479,7 +540,7 @@ def test_unique_constraints_violations_for_async_duplicate_rows_in_csv_no_databa
 # JE-6650 adding duplicate checks for null modules, specifically for module 2
 @patch("module_validation.unique_constraint.get_upload_metadata")
 @patch("module_validation.unique_constraint.execute_query_df")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 def test_unique_constraint_violations_for_M2_null_duplicate_in_system(
     mock_database_central_config,
     mock_execute_query_df,
@@ -525,7 +586,7 @@ def test_unique_constraint_violations_for_M2_null_duplicate_in_system(
 # JE-6837 handling non constraint nulls to not trigger null path
 @patch("module_validation.unique_constraint.get_upload_metadata")
 @patch("module_validation.unique_constraint.get_duplicate_within_db")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 def test_unique_constraint_violations_for_M2_partial_null_duplicate_in_system(
     mock_database_central_config,
     mock_get_duplicate_within_db,
@@ -589,7 +650,7 @@ def test_unique_constraint_violations_for_M2_partial_null_duplicate_in_system(
 # JE-6650 adding duplicate checks for null modules, specifically for module 9
 @patch("module_validation.unique_constraint.execute_query_df")
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 def test_unique_constraint_violations_for_M9_null_annual_duplicate_in_system(
     mock_database_central_config,
     mock_get_upload_metadata,
@@ -635,7 +696,7 @@ def test_unique_constraint_violations_for_M9_null_annual_duplicate_in_system(
 # JE-6640 ensuring that invalid module data does not go through duplicate check process, no need to check
 # there are duplicates in system if we are already working with bad data
 @patch("module_validation.unique_constraint.get_duplicate_within_db")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 def test_unique_constraint_violations_for_M4_outage_id_missing_no_duplicate_errors(
     mock_database_central_config, mock_get_duplicate_within_db, config
 ):
@@ -659,7 +720,7 @@ def test_unique_constraint_violations_for_M4_outage_id_missing_no_duplicate_erro
 # JE-6650 adding duplicate checks for null modules, specifically for module 4
 @patch("module_validation.unique_constraint.execute_query_df")
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 def test_unique_constraint_violations_for_M4_null_duplicate_in_system(
     mock_database_central_config,
     mock_get_upload_metadata,
@@ -794,7 +855,7 @@ def test_get_duplicate_within_db_M9(mock_get_upload_metadata, mock_execute_query
 
 # JE-6765 Used for debugging M5 when a recommended field is not present in df
 @patch("module_validation.unique_constraint.get_upload_metadata")
-@patch("module_validation.unique_constraint.DatabaseCentralConfig")
+@patch("module_validation.DatabaseCentralConfig")
 @patch("module_validation.unique_constraint.execute_query_df")
 def test_unique_constraint_violations_for_async_bug(
     mock_execute_query_df, mock_database_central_config, mock_get_upload_metadata, config
@@ -912,3 +973,400 @@ def test_unique_constraint_violations_for_async_bug(
 
     assert len(response.get("errors")) == 1
     assert response.get("df") is None
+
+
+def test_get_duplicates_query_builder_joins_upload_keys():
+    query = get_duplicates_query_builder("2", ["station_uuid", "port_id", "session_id"])
+
+    assert "upload_keys.port_id = module_data.port_id" in query
+    assert "upload_constraint_keys" in query
+    assert " IN(" not in query
+    assert query.count("%s") == 3
+    assert get_duplicates_query_builder("2", ["station_uuid"], is_null_data=True).count("%s") == 5
+
+
+@patch("module_validation.unique_constraint.UPLOAD_KEYS_INSERT_CHUNK_SIZE", 2)
+@patch("module_validation.unique_constraint.get_upload_metadata")
+@patch("module_validation.unique_constraint.execute_query_df")
+def test_get_duplicate_within_db_loads_upload_keys_in_chunks(
+    mock_execute_query_df, mock_get_upload_metadata
+):
+    mock_get_upload_metadata.return_value = {"year": "2024", "quarter": "", "module_id": "9"}
+    mock_execute_query_df.return_value = pandas.DataFrame()
+    async_df = pandas.DataFrame(
+        data={
+            "station_uuid": ["1", "2", "3", "3", "4", "x" * 256],
+            "network_provider_upload": ["np1", "np1", "np1", "np1", None, "np1"],
+        }
+    )
+    cursor = MagicMock()
+
+    get_duplicate_within_db(
+        cursor,
+        "upload01",
+        "dr123",
+        "9",
+        ["station_uuid", "network_provider_upload"],
+        async_df,
+        is_null_data=False,
+    )
+
+    loaded_keys = [
+        key for args, _ in cursor.executemany.call_args_list for key in args[1]
+    ]
+    assert cursor.executemany.call_count == 3
+    assert loaded_keys == [
+        ("1", "np1"), ("2", "np1"), ("3", "np1"), ("4", "NULL"), ("x" * 256, "np1")
+    ]
+    # the query data no longer grows with the size of the upload
+    _, kwargs = mock_execute_query_df.call_args
+    assert kwargs["data"] == ("upload01", "9", "dr123")
+    assert "DROP TEMPORARY TABLE" in cursor.execute.call_args.args[0]
+
+
+@patch("module_validation.unique_constraint.get_upload_metadata")
+@patch("module_validation.unique_constraint.execute_query_df")
+def test_get_duplicate_within_db_drops_upload_keys_on_error(
+    mock_execute_query_df, mock_get_upload_metadata
+):
+    mock_get_upload_metadata.return_value = {"year": "2024", "quarter": "", "module_id": "9"}
+    mock_execute_query_df.side_effect = EvChartDatabaseAuroraQueryError()
+    cursor = MagicMock()
+
+    with pytest.raises(EvChartDatabaseAuroraQueryError):
+        get_duplicate_within_db(
+            cursor,
+            "upload01",
+            "dr123",
+            "9",
+            ["station_uuid"],
+            pandas.DataFrame(data={"station_uuid": ["1"]}),
+            is_null_data=False,
+        )
+
+    assert "DROP TEMPORARY TABLE" in cursor.execute.call_args.args[0]
+
+
+@patch("module_validation.unique_constraint.get_upload_metadata")
+@patch("module_validation.unique_constraint.execute_query_df")
+def test_get_duplicate_within_db_matches_unique_key_fingerprints(
+    mock_execute_query_df, mock_get_upload_metadata
+):
+    mock_get_upload_metadata.return_value = {"year": "2024", "quarter": "", "module_id": "9"}
+    mock_execute_query_df.return_value = pandas.DataFrame()
+    cursor = MagicMock()
+
+    get_duplicate_within_db(
+        cursor,
+        "upload01",
+        "dr123",
+        "9",
+        ["station_uuid", "network_provider_upload"],
+        pandas.DataFrame(data={"station_uuid": ["ABC"], "network_provider_upload": ["np1"]}),
+        is_null_data=False,
+        feature_toggle_set={Feature.UNIQUE_KEY_FINGERPRINT},
+    )
+
+    args, _ = cursor.executemany.call_args
+    assert "(unique_key_fingerprint, network_provider_upload)" in args[0]
+    assert args[1] == [(hashlib.sha256(b"abc").hexdigest(), "np1")]
+    _, kwargs = mock_execute_query_df.call_args
+    assert "upload_keys.unique_key_fingerprint = module_data.unique_key_fingerprint" in kwargs["query"]
+    assert "SELECT module_data.station_uuid, module_data.network_provider_upload" in kwargs["query"]
+
+
+@pytest.mark.parametrize(
+    "feature_toggle_set, key_filter",
+    [
+        (
+            {Feature.UNIQUE_CONSTRAINT_MODULE_2},
+            "(module_data.station_uuid, module_data.port_id, module_data.session_id) IN",
+        ),
+        (
+            {Feature.UNIQUE_CONSTRAINT_MODULE_2, Feature.UNIQUE_KEY_FINGERPRINT},
+            "(module_data.unique_key_fingerprint) IN",
+        ),
+    ],
+)
+@patch("module_validation.unique_constraint.execute_query_df")
+@patch("module_validation.unique_constraint.get_module_id")
+def test_unique_constraint_violations_fetches_upload_keys_only(
+    mock_get_module_id, mock_execute_query_df, feature_toggle_set, key_filter
+):
+    mock_get_module_id.return_value = "2"
+    mock_execute_query_df.return_value = pandas.DataFrame(
+        data={
+            "upload_id": ["upload01", "upload02"],
+            "station_uuid": ["1", "1"],
+            "port_id": ["3", "3"],
+            "session_id": ["5", "5"],
+            "station_id_upload": ["s1", "s1"],
+            "network_provider_upload": ["np1", "np1"],
+        }
+    )
+
+    response = unique_constraint_violations(
+        cursor=MagicMock(),
+        upload_id="upload01",
+        dr_id="dr123",
+        log_event=MagicMock(),
+        feature_toggle_set=feature_toggle_set,
+    )
+
+    _, kwargs = mock_execute_query_df.call_args
+    assert kwargs["data"] == ("upload01", "upload01", "upload01", "2", "dr123")
+    assert key_filter in kwargs["query"]
+    assert "SELECT *" not in kwargs["query"]
+    assert len(response["errors"]) == 1
+
+
+def test_check_constraints_in_data_ignores_missing_keys():
+    df = pandas.DataFrame(
+        data={
+            "upload_id": ["a1_draft", "b2_submitted", "a1_draft", "b2_submitted"],
+            "station_uuid": ["1", "1", "2", "2"],
+            "port_id": ["3", "3", None, None],
+            "station_id_upload": ["s1", "s1", "s2", "s2"],
+            "network_provider_upload": ["np1", "np1", "np1", "np1"],
+        }
+    )
+
+    response = check_constraints_in_data(df=df, unique_constraint=["station_uuid", "port_id"])
+
+    assert response.to_dict() == {("1", "3", "s1", "np1"): {"a1_draft", "b2_submitted"}}
+
+
+def test_query_builder_module_keys_looks_up_complete_key_fingerprints():
+    query = query_builder_module_keys(
+        "module9_data_v3", ["station_uuid"], {Feature.UNIQUE_KEY_FINGERPRINT}
+    )
+
+    assert "(module_data.unique_key_fingerprint) IN" in query
+    assert "WHERE upload_id = %s AND station_uuid IS NOT NULL" in query
+
+
+def test_get_upload_keys_collations_reads_the_module_table_columns():
+    cursor = MagicMock()
+    cursor.description = [("column_name",), ("character_set_name",), ("collation_name",)]
+    cursor.fetchall.return_value = [
+        ("station_uuid", "utf8mb4", "utf8mb4_0900_ai_ci"),
+        ("outage_id", "utf8mb4", "utf8mb4_0900_ai_ci"),
+    ]
+    cursor.rowcount = 2
+
+    collations = get_upload_keys_collations(
+        cursor, "evchart_data_v3.module4_data_v3", ["station_uuid", "outage_id"]
+    )
+
+    assert collations == {
+        "station_uuid": ("utf8mb4", "utf8mb4_0900_ai_ci"),
+        "outage_id": ("utf8mb4", "utf8mb4_0900_ai_ci"),
+    }
+    query, data = cursor.execute.call_args.args
+    assert "information_schema.columns" in query
+    assert "@@collation_database" in query
+    assert data == ("evchart_data_v3", "module4_data_v3", "station_uuid", "outage_id")
+
+
+def test_load_upload_keys_matches_the_module_table_collation(_upload_keys_collations):
+    _upload_keys_collations.return_value = {"station_uuid": ("utf8mb4", "utf8mb4_bin")}
+    cursor = MagicMock()
+
+    load_upload_keys(
+        cursor,
+        "evchart_data_v3.module2_data_v3",
+        ["station_uuid", "port_id"],
+        pandas.DataFrame({"station_uuid": ["1"], "port_id": ["2"]}),
+    )
+
+    create_query = cursor.execute.call_args_list[1].args[0]
+    assert "station_uuid VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin," in create_query
+    # columns missing from information_schema get the defaults of the database
+    assert "port_id VARCHAR(255), KEY (station_uuid(255))" in create_query
+
+
+def test_load_upload_keys_widens_the_columns_for_long_keys():
+    cursor = MagicMock()
+
+    load_upload_keys(
+        cursor,
+        "evchart_data_v3.module6_data_v3",
+        ["station_uuid", "operator_name"],
+        pandas.DataFrame({"station_uuid": ["1", "2"], "operator_name": ["o" * 300, "short"]}),
+    )
+
+    create_query = cursor.execute.call_args_list[1].args[0]
+    assert "operator_name VARCHAR(300)" in create_query
+    assert cursor.executemany.call_args.args[1] == [("1", "o" * 300), ("2", "short")]
+
+
+class SQLiteCursor:
+    """
+    Cursor running the MySQL statements of the unique constraint queries on sqlite
+    """
+
+    def __init__(self):
+        self.connection = sqlite3.connect(":memory:")
+        self.connection.execute("ATTACH DATABASE ':memory:' AS evchart_data_v3")
+        self.cursor = self.connection.cursor()
+
+    @staticmethod
+    def to_sqlite(query):
+        query = query.replace("%s", "?").replace("DROP TEMPORARY TABLE", "DROP TABLE")
+        query = re.sub(r" CHARACTER SET \w+ COLLATE \w+|, KEY \(\w+\(\d+\)\)", "", query)
+        return re.sub(r"IN\s*\(\(", "IN (VALUES (", query)
+
+    def execute(self, query, data=()):
+        self.cursor.execute(self.to_sqlite(query), data)
+
+    def executemany(self, query, data):
+        self.cursor.executemany(self.to_sqlite(query), data)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+
+def in_list_duplicate_within_db(
+    cursor,
+    upload_id,
+    dr_id,
+    module_id,
+    constraints,
+    async_df,
+    is_null_data,
+    feature_toggle_set,
+    upload_df=None,
+):
+    """
+    The duplicate lookup as it was before the upload keys were loaded into a temporary table,
+    with every key of the upload in an IN list
+    """
+    if is_null_data and module_id == "2":
+        constraints.remove("session_id")
+    async_df.replace(["", None, "(?i)null"], pandas.NA, inplace=True, regex=True)
+    upload_metadata = unique_constraint.get_upload_metadata(cursor, upload_id)
+
+    quarterly_and_annual_filters = ""
+    data = [upload_id, module_id, dr_id]
+    if is_null_data:
+        quarterly_and_annual_filters = " AND year=%s AND quarter=%s "
+        data.extend([upload_metadata.get("year"), upload_metadata.get("quarter")])
+    data.extend(async_df[constraints].fillna("NULL").values.flatten().tolist())
+
+    column_str = ", ".join(constraints)
+    in_clause = ", ".join(["(" + ", ".join(["%s"] * len(constraints)) + ")"] * len(async_df))
+    query = f"""
+        SELECT DISTINCT {column_str}, upload_id, station_id_upload
+        FROM evchart_data_v3.module{module_id}_data_v3
+        WHERE upload_id = %s
+        OR upload_id IN (
+            SELECT upload_id FROM evchart_data_v3.import_metadata
+            WHERE module_id=%s
+            AND submission_status IN ('Pending', 'Submitted', 'Approved')
+            AND parent_org=%s
+            {quarterly_and_annual_filters}
+        )
+        AND ({column_str}) IN({in_clause})
+    """
+    duplicates_from_db = execute_query_df(query=query, data=tuple(data), cursor=cursor)
+
+    if is_null_data and module_id == "2":
+        duplicates_from_db["session_id"] = ""
+        constraints.append("session_id")
+    return duplicates_from_db
+
+
+@pytest.fixture(name="module_2_database")
+def fixture_module_2_database():
+    cursor = SQLiteCursor()
+    cursor.execute(
+        "CREATE TABLE evchart_data_v3.import_metadata "
+        "(upload_id, module_id, submission_status, parent_org, year, quarter)"
+    )
+    cursor.executemany(
+        "INSERT INTO evchart_data_v3.import_metadata VALUES (%s, %s, %s, %s, %s, %s)",
+        [
+            ("submitted01", "2", "Submitted", "dr123", "2024", "2"),
+            ("draft01", "2", "Draft", "dr123", "2024", "2"),
+            ("other_org01", "2", "Approved", "dr456", "2024", "2"),
+            ("last_quarter01", "2", "Approved", "dr123", "2024", "1"),
+        ],
+    )
+    cursor.execute(
+        "CREATE TABLE evchart_data_v3.module2_data_v3 (upload_id, station_uuid, port_id, "
+        "session_id, station_id_upload, network_provider_upload)"
+    )
+    cursor.executemany(
+        "INSERT INTO evchart_data_v3.module2_data_v3 VALUES (%s, %s, %s, %s, %s, %s)",
+        [
+            ("submitted01", "uuid1", "p1", "session1", "station1", "np1"),
+            ("submitted01", "uuid2", "p1", "generated1", "station2", "np1"),
+            ("submitted01", "uuid4", "p1", "session4", "station4", "np2"),
+            ("draft01", "uuid1", "p2", "session2", "station1", "np1"),
+            ("other_org01", "uuid1", "p3", "session3", "station1", "np1"),
+            ("last_quarter01", "uuid3", "p1", "generated2", "station3", "np1"),
+        ],
+    )
+    return cursor
+
+
+@patch("module_validation.unique_constraint.get_upload_metadata")
+@patch("module_validation.DatabaseCentralConfig")
+def test_get_constraints_conditions_match_the_in_list_query(
+    mock_database_central_config, mock_get_upload_metadata, config, module_2_database
+):
+    mock_database_central_config.return_value = config
+    mock_get_upload_metadata.return_value = {"year": "2024", "quarter": "2", "module_id": "2"}
+    async_df = pandas.DataFrame(
+        data={
+            "station_id": ["station1", "station1", "station1", "station2", "station3",
+                           "station4", "station5", "station5"],
+            "station_uuid": ["uuid1", "uuid1", "uuid1", "uuid2", "uuid3", "uuid4", "uuid5", "uuid5"],
+            "port_id": ["p1", "p2", "p3", "p1", "p1", "p1", "p1", "p1"],
+            "session_id": ["session1", "session2", "session3", "", "", "session4", "session5",
+                           "session5"],
+            "network_provider": ["np1"] * 8,
+        }
+    )
+
+    def get_errors():
+        return unique_constraint_violations_for_async(
+            cursor=module_2_database,
+            upload_id="upload01",
+            dr_id="dr123",
+            log_event=MagicMock(),
+            df=async_df,
+            module_id="2",
+            feature_toggle_set={Feature.UNIQUE_CONSTRAINT_MODULE_2},
+        )["errors"]
+
+    errors = get_errors()
+    with patch(
+        "module_validation.unique_constraint.get_duplicate_within_db",
+        in_list_duplicate_within_db,
+    ):
+        in_list_errors = get_errors()
+
+    assert errors == in_list_errors
+    assert [error["error_description"] for error in errors] == [
+        ErrorReportMessages.DUPLICATE_RECORD_IN_SYSTEM.format(
+            upload_id={"submitted01"},
+            fields=["port_id=p1", "network_provider=np1", "session_id=session1", "station_id=station1"],
+        ),
+        ErrorReportMessages.DUPLICATE_RECORD_IN_SYSTEM.format(
+            upload_id={"submitted01"},
+            fields=["port_id=p1", "network_provider=np1", "session_id=", "station_id=station2"],
+        ),
+        ErrorReportMessages.DUPLICATE_RECORD_IN_SAME_UPLOAD.format(
+            fields=["port_id=p1", "network_provider=np1", "session_id=session5",
+                    "station_id=station5"],
+        ),
+    ]
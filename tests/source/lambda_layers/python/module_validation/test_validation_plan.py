@@ -0,0 +1,73 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from feature_toggle.feature_enums import Feature
+from module_validation import (
+    _get_module_fields_by_number,
+    get_validation_plan,
+    load_module_definitions,
+)
+
+module_path = Path("./source/lambda_layers/python/module_validation/module_definitions")
+
+
+def test_validation_plan_is_memoized_per_module_and_feature_toggles():
+    plan = get_validation_plan(2, {Feature.BIZ_MAGIC})
+
+    assert get_validation_plan("2", frozenset({Feature.BIZ_MAGIC})) is plan
+    assert get_validation_plan(2, frozenset()) is not plan
+    assert get_validation_plan(3, {Feature.BIZ_MAGIC}) is not plan
+
+
+def test_validation_plan_reads_central_config_once(mock_config):
+    with patch("module_validation.DatabaseCentralConfig", return_value=mock_config) as mock_dbcc:
+        for module_id in range(2, 10):
+            get_validation_plan(module_id, {Feature.DATABASE_CENTRAL_CONFIG})
+            _get_module_fields_by_number(module_id, {Feature.DATABASE_CENTRAL_CONFIG})
+
+    assert mock_dbcc.call_count == 1
+
+
+@pytest.mark.parametrize("module_id", range(2, 10))
+def test_validation_plan_matches_central_config(module_id, mock_config):
+    plan = get_validation_plan(module_id, {Feature.DATABASE_CENTRAL_CONFIG})
+
+    assert plan.boolean_fields == mock_config.validated_boolean_fields(module_id)
+    assert plan.numeric_fields == mock_config.validated_numeric_fields(module_id)
+    assert plan.datetime_fields == mock_config.validated_datetime_fields(module_id)
+    assert plan.required_empty_allowed_fields == mock_config.required_empty_allowed_fields(module_id)
+    assert list(plan.unique_key_constraints) == mock_config.unique_key_constraints(module_id)
+    assert all(
+        definition["field_name"] == field_name for field_name, definition in plan.fields.items()
+    )
+    # the cached config must not be modified by the plan
+    assert all(
+        "field_name" not in definition
+        for definition in mock_config.module_validation(module_id).values()
+    )
+
+
+def test_validation_plan_from_module_definitions():
+    plan = get_validation_plan(8)
+
+    assert "der_upgrade" in plan.boolean_fields
+    assert plan.unique_key_constraints == ()
+    assert plan.required_fields.isdisjoint(plan.recommended_fields)
+    assert set(plan.fields) == plan.required_fields | plan.recommended_fields
+
+
+def test_validation_plan_unknown_module():
+    with pytest.raises(ValueError):
+        get_validation_plan(42)
+
+
+def test_load_module_definitions_only_reloads_when_requested():
+    plan = get_validation_plan(2)
+
+    load_module_definitions(module_path)
+    assert get_validation_plan(2) is plan
+
+    load_module_definitions(module_path, reload=True)
+    assert get_validation_plan(2) is not plan
@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from evchart_helper.parameter_provider import ParameterProvider
+
+
+def parameter(name, value):
+    return {"Name": name, "Value": value}
+
+
+@pytest.fixture(name="ssm_client")
+def fixture_ssm_client():
+    ssm_client = MagicMock()
+    ssm_client.get_parameter.side_effect = lambda Name: {
+        "Parameter": parameter(Name, f"{Name}-value")
+    }
+    with patch(
+        "evchart_helper.parameter_provider.boto3_manager.client", return_value=ssm_client
+    ):
+        yield ssm_client
+
+
+@pytest.fixture(name="clock")
+def fixture_clock():
+    clock = SimpleNamespace(now=100.0)
+    with patch(
+        "evchart_helper.parameter_provider.time.monotonic", side_effect=lambda: clock.now
+    ):
+        yield clock
+
+
+def test_get_parameter_is_cached_for_its_ttl(ssm_client, clock):
+    provider = ParameterProvider()
+
+    assert provider.get_parameter("/ev-chart/a", ttl=10) == "/ev-chart/a-value"
+    clock.now += 9
+    provider.get_parameter("/ev-chart/a", ttl=10)
+
+    assert ssm_client.get_parameter.call_count == 1
+
+
+def test_get_parameter_refresh_reads_parameter_again(ssm_client):
+    provider = ParameterProvider()
+
+    provider.get_parameter("/ev-chart/a")
+    provider.get_parameter("/ev-chart/a", refresh=True)
+
+    assert ssm_client.get_parameter.call_count == 2
+
+
+def test_expired_parameter_is_read_again_before_returning(ssm_client, clock, monkeypatch):
+    monkeypatch.setenv("PARAMETER_CACHE_STALE_SECONDS", "60")
+    provider = ParameterProvider()
+    provider.get_parameter("/ev-chart/a", ttl=10)
+    ssm_client.get_parameter.side_effect = lambda Name: {"Parameter": parameter(Name, "new")}
+
+    # nothing is left to finish in the background once the handler returns
+    with patch("evchart_helper.parameter_provider.threading.Thread") as mock_thread:
+        clock.now += 30
+        assert provider.get_parameter("/ev-chart/a", ttl=10) == "new"
+        clock.now += 100
+        assert provider.get_parameter("/ev-chart/a", ttl=10) == "new"
+    assert not mock_thread.called
+    assert ssm_client.get_parameter.call_count == 3
+
+
+def test_failed_refresh_keeps_stale_value_until_the_stale_window_ends(
+    ssm_client, clock, monkeypatch
+):
+    monkeypatch.setenv("PARAMETER_CACHE_STALE_SECONDS", "60")
+    provider = ParameterProvider()
+    provider.get_parameter("/ev-chart/a", ttl=10)
+    ssm_client.get_parameter.side_effect = Exception("ThrottlingException")
+
+    clock.now += 30
+    assert provider.get_parameter("/ev-chart/a", ttl=10) == "/ev-chart/a-value"
+    clock.now += 100
+    with pytest.raises(Exception, match="ThrottlingException"):
+        provider.get_parameter("/ev-chart/a", ttl=10)
+
+
+def test_registered_parameters_are_prefetched_in_batches(ssm_client):
+    names = [f"/ev-chart/p{i:02}" for i in range(12)]
+    ssm_client.get_parameters.side_effect = lambda Names: {
+        "Parameters": [parameter(name, f"{name}-batched") for name in Names]
+    }
+    provider = ParameterProvider()
+    for name in names:
+        provider.register_prefetch(name)
+
+    assert provider.get_parameter(names[0]) == f"{names[0]}-batched"
+    assert provider.get_parameter(names[11]) == f"{names[11]}-batched"
+
+    batches = [kwargs["Names"] for _, kwargs in ssm_client.get_parameters.call_args_list]
+    assert batches == [names[:10], names[10:]]
+    assert not ssm_client.get_parameter.called
+
+
+def test_failed_prefetch_falls_back_to_get_parameter(ssm_client):
+    ssm_client.get_parameters.side_effect = Exception("AccessDenied")
+    provider = ParameterProvider()
+    provider.register_prefetch("/ev-chart/a")
+
+    assert provider.get_parameter("/ev-chart/a") == "/ev-chart/a-value"
+
+
+def test_get_parameters_by_path_reads_every_page(ssm_client):
+    ssm_client.get_parameters_by_path.side_effect = [
+        {"Parameters": [parameter("/ev-chart/status/a", "1")], "NextToken": "next"},
+        {"Parameters": [parameter("/ev-chart/status/b", "2")]},
+    ]
+    provider = ParameterProvider()
+
+    assert provider.get_parameters_by_path("/ev-chart/status") == {
+        "/ev-chart/status/a": "1",
+        "/ev-chart/status/b": "2",
+    }
+    assert provider.get_parameters_by_path("/ev-chart/status")
+    assert ssm_client.get_parameters_by_path.call_args.kwargs == {
+        "Path": "/ev-chart/status", "Recursive": False, "NextToken": "next"
+    }
+    assert ssm_client.get_parameters_by_path.call_count == 2
+
+
+def test_get_secret_is_cached(ssm_client):
+    ssm_client.get_secret_value.return_value = {"SecretString": "{}"}
+    provider = ParameterProvider()
+
+    assert provider.get_secret("secret-arn") == "{}"
+    assert provider.get_secret("secret-arn") == "{}"
+    assert ssm_client.get_secret_value.call_count == 1
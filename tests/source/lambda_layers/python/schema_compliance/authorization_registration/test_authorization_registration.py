@@ -1,17 +1,12 @@
 from unittest.mock import patch, MagicMock
 import pandas
-import pytest
-import feature_toggle
 from feature_toggle.feature_enums import Feature
 from error_report_messages_enum import ErrorReportMessages
-from AsyncDataValidation.index import get_dataframe_from_csv
 from schema_compliance.authorization_registration import (
-    get_station_auth_uuid,
-    get_auth_and_unauth_stations,
-    stations_not_authorized,
-    stations_not_registered,
-    stations_not_active,
-    unauthorized_stations_for_dr
+    STATION_ELIGIBILITY_COLUMNS,
+    get_station_eligibility,
+    query_builder_station_eligibility,
+    station_eligibility_conditions,
 )
 
 # global variables used throughout test cases
@@ -20,412 +15,166 @@ mock_cursor = MagicMock()
 dr_id = "111"
 sr_id = "222"
 
-invalid_files_with_missing_network_provider_value = [
-    "network_provider_empty_value_mod_3.csv",
-    "network_provider_empty_value_mod_4.csv",
-    "network_provider_empty_value_mod_5.csv",
-    "network_provider_empty_value_mod_6.csv",
-    "network_provider_empty_value_mod_7.csv",
-    "network_provider_empty_value_mod_8.csv",
-    "network_provider_empty_value_mod_9.csv"
-]
 
-invalid_files_with_missing_station_id_value = [
-    "station_id_empty_value_mod_9.csv",
-    "station_id_empty_value_mod_8.csv",
-    "station_id_empty_value_mod_7.csv",
-    "station_id_empty_value_mod_6.csv",
-    "station_id_empty_value_mod_5.csv",
-    "station_id_empty_value_mod_4.csv",
-    "station_id_empty_value_mod_3.csv"
-]
+def get_eligibility_df(rows):
+    return pandas.DataFrame(rows, columns=STATION_ELIGIBILITY_COLUMNS)
 
 
-@patch.object(feature_toggle.FeatureToggleService, "get_active_feature_toggles")
-def test_single_station_authorized_valid_sr(mock_feature_toggle):
-    # set parameters
-    station_id = "1010"
-    expected_uuid = "1234"
-
-    # create mock cursor oject and set return value of cursor
-    mock_cursor.fetchone.return_value = [expected_uuid]
-
-    response = get_station_auth_uuid(
-        cursor=mock_cursor,
-        dr_id=dr_id,
-        sr_id=sr_id,
-        station_uuid=station_id
+def get_upload_df(stations):
+    return pandas.DataFrame(
+        {
+            "station_id": [station_id for station_id, _ in stations],
+            "network_provider": [network_provider for _, network_provider in stations],
+        }
     )
-    assert response == expected_uuid
-
 
-@patch.object(feature_toggle.FeatureToggleService, "get_active_feature_toggles")
-def test_single_station_not_auth_not_a_valid_sr(mock_feature_toggle):
-    station_uuid = "1010"
-    expected_result = None
-    mock_cursor.fetchone.return_value = None
 
-    response = get_station_auth_uuid(
-        cursor=mock_cursor,
-        dr_id=dr_id,
-        sr_id=sr_id,
-        station_uuid=station_uuid
+def test_query_builder_station_eligibility_checks_authorization_for_sr():
+    query, data = query_builder_station_eligibility(
+        [("s1", "np1"), ("s2", "np1")], dr_id, sr_id, {Feature.N_TIER_ORGANIZATIONS}
     )
-    assert response == expected_result
 
+    assert "IN ((%s, %s), (%s, %s))" in query
+    assert "sa.authorizer=%s AND sa.authorizee=%s" in query
+    assert data == (dr_id, sr_id, "s1", "np1", "s2", "np1")
 
-@patch('schema_compliance.authorization_registration.get_station_auth_uuid')
-def test_single_station_is_authorized_valid_sr(
-    mock_check_station_authorization
-):
-    df = pandas.DataFrame(data={
-        "station_uuid": ["123123"],
-        "station_id": ["friendly station id"],
-        "network_provider": ["test_np"]
-    })
-
-    mock_check_station_authorization.return_value = "0001"
-    mock_cursor.fetchone.return_value = "0001"
-    response = get_auth_and_unauth_stations(
-        cursor=mock_cursor, dr_id=dr_id, sr_id=sr_id, df=df
-    )
-    assert response == ["0001"]
 
+def test_query_builder_station_eligibility_skips_authorization_for_dr():
+    query, data = query_builder_station_eligibility([("s1", "np1")], dr_id)
 
-@patch('schema_compliance.authorization_registration.get_station_auth_uuid')
-def test_single_station_not_authorized_invalid_sr(
-    mock_check_station_authorization
-):
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly station id"],
-        "station_uuid": ["123123"],
-        "network_provider": ["test_np"]
-    })
+    assert "NULL AS authorization_uuid" in query
+    assert "station_authorizations" not in query
+    assert data == ("s1", "np1")
 
-    mock_check_station_authorization.return_value = None
 
-    response = get_auth_and_unauth_stations(
-        cursor=mock_cursor, dr_id=dr_id, sr_id=sr_id, df=df
+@patch("schema_compliance.authorization_registration.execute_query_df")
+def test_get_station_eligibility_queries_each_chunk_once(mock_execute_query_df):
+    stations = [(f"s{i}", "np1") for i in range(5)] * 2
+    mock_execute_query_df.side_effect = lambda query, data, cursor, message: get_eligibility_df(
+        [
+            [station_id, network_provider, f"uuid-{station_id}", "Active", dr_id, None]
+            for station_id, network_provider in zip(data[0::2], data[1::2])
+        ]
     )
-    assert response == [None]
 
+    eligibility = get_station_eligibility(mock_cursor, stations, dr_id, chunk_size=2)
 
-@patch(
-    'schema_compliance.authorization_registration.get_auth_and_unauth_stations'
-)
-def test_get_conditions_list_with_3_unauth_stations(mock_station_auth):
-    mock_station_auth.return_value = [None, None, None]
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly 1", "friendly 2", "friendly 3"],
-        "name": ["Sophia", "Sarah", "Ken"],
-        "station_uuid": ["333", "111", "222"],
-        "network_provider": ["test_np", "test_np", "test_np"]
-    })
-
-    expected_res = [
-        {
-            "error_row": 0,
-            "header_name": "station_id",
-            "error_description":
-                ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT.format(station_id="friendly 1", network_provider="test_np")
-        },
-        {
-            "error_row": 1,
-            "header_name": "station_id",
-            "error_description":
-                ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT.format(station_id="friendly 2", network_provider="test_np")
-        },
-        {
-            "error_row": 2,
-            "header_name": "station_id",
-            "error_description":
-                ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT.format(station_id="friendly 3", network_provider="test_np")
-        }
-    ]
+    assert mock_execute_query_df.call_count == 3
+    assert list(eligibility["station_uuid"]) == [f"uuid-s{i}" for i in range(5)]
 
-    response = stations_not_authorized(
-        cursor=mock_cursor,
-        dr_id="123",
-        sr_id="222",
-        df=df
-    )
-    assert response == expected_res
 
+@patch("schema_compliance.authorization_registration.execute_query_df")
+def test_get_station_eligibility_looks_up_collation_matches_individually(mock_execute_query_df):
+    mock_execute_query_df.side_effect = [
+        get_eligibility_df([["S1", "NP1", "uuid-1", "Active", dr_id, None]]),
+        get_eligibility_df([["S1", "NP1", "uuid-1", "Active", dr_id, None]]),
+        get_eligibility_df([]),
+    ]
 
-@patch(
-    'schema_compliance.authorization_registration.get_auth_and_unauth_stations'
-)
-def test_get_conditions_list_with_unauth_stations_nps(mock_station_auth):
-    mock_station_auth.return_value = [None]
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly 1"],
-        "network_provider": ["test_np"],
-        "name": ["Ken"],
-        "station_uuid": ["abc123"]
-    })
+    eligibility = get_station_eligibility(mock_cursor, [("s1", "np1"), ("s2", "np1")], dr_id)
 
-    expected_response = [
+    assert mock_execute_query_df.call_count == 3
+    assert eligibility.to_dict("records") == [
         {
-            "error_row": 0,
-            "header_name": "station_id",
-            "error_description":
-                ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT.format(station_id="friendly 1", network_provider="test_np")
+            "station_id": "s1",
+            "network_provider": "np1",
+            "station_uuid": "uuid-1",
+            "status": "Active",
+            "dr_id": dr_id,
+            "authorization_uuid": None,
         }
     ]
 
-    response = stations_not_authorized(
-        cursor=mock_cursor,
-        dr_id="123",
-        sr_id="222",
-        df=df,
-    )
-    assert response == expected_response
-
-
-@patch(
-    'schema_compliance.authorization_registration.get_auth_and_unauth_stations'
-)
-def test_no_unauth_stations(mock_station_auth):
-    mock_station_auth.return_value = ["123", "346", "234"]
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly 1", "friendly 2", "friendly 3"],
-        "name": ["Sophia", "Sarah", "Ken"],
-        "station_uuid": ["333", "111", "222"]
-    })
-
-    expected_res = []
-    response = stations_not_authorized(
-        cursor=mock_cursor,
-        dr_id="123",
-        sr_id="222",
-        df=df
-    )
-    assert response == expected_res
-
-
-@patch(
-    'schema_compliance.authorization_registration.get_auth_and_unauth_stations'
-)
-def test_appending_to_conditions_with_list_of_unauthorized_stations(
-    mock_stations_list
-):
-    mock_stations_list.return_value = [None, "123", None]
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly 1", "friendly 2", "friendly 3"],
-        "name": ["Sophia", "Sarah", "Ken"],
-        "station_uuid": ['', "111", "222"],
-        "network_provider": ["test_np", "test_np", "test_np"]
-    })
-    expected_res = [{
-        'error_row': 2,
-        'header_name': 'station_id',
-        'error_description':
-            ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT.format(station_id="friendly 3", network_provider="test_np")
-    }]
-    response = stations_not_authorized(mock_cursor, dr_id, sr_id, df)
-    assert response == expected_res
-
-
-def test_all_stations_registered():
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly 1", "friendly 2", "friendly 3"],
-        "name": ["Sophia", "Sarah", "Ken"],
-        "station_uuid": ['123', "111", "222"],
-        "network_provider": ["test_np", "test_np", "test_np"]
-    })
-    response = stations_not_registered(df)
-    assert not response
 
+def test_station_eligibility_conditions_registration_errors_in_row_order():
+    df = get_upload_df([("s1", "np1"), ("", "np1"), ("s3", ""), ("s4", "np1")])
+    eligibility = get_eligibility_df([["s1", "np1", "uuid-1", "Active", dr_id, None]])
 
-def test_all_stations_unregistered():
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly 1", "friendly 2", "friendly 3"],
-        "name": ["Sophia", "Sarah", "Ken"],
-        "station_uuid": [None, None, None],
-        "network_provider": ["test_np", "test_np", "test_np"]
+    conditions = station_eligibility_conditions(df, eligibility, dr_id)
 
-    })
-    response = stations_not_registered(df)
-    assert response == [
+    assert list(df["station_uuid"]) == ["uuid-1", None, None, None]
+    assert conditions == [
         {
-            'error_row': 0,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.STATION_NOT_REGISTERED.format(station_id="friendly 1", network_provider="test_np")
+            "error_row": 1,
+            "header_name": "station_id",
+            "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+                column_name="station_id"
+            ),
         },
         {
-            'error_row': 1,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.STATION_NOT_REGISTERED.format(station_id="friendly 2", network_provider="test_np")
+            "error_row": 2,
+            "header_name": "network_provider",
+            "error_description": ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(
+                column_name="network_provider"
+            ),
         },
         {
-            'error_row': 2,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.STATION_NOT_REGISTERED.format(station_id="friendly 3", network_provider="test_np")
-        }
-    ]
-
-
-def test_all_stations_with_np_unregistered():
-    df = pandas.DataFrame(data={
-        "station_id": ["friendly 1"],
-        "network_provider": ["test_np"],
-        "name": ["Ken"],
-        "station_uuid": [None]
-    })
-    response = stations_not_registered(df)
-    assert response == [
-        {
-            'error_row': 0,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.STATION_NOT_REGISTERED.format(station_id="friendly 1", network_provider="test_np")
-        }
+            "error_row": 3,
+            "header_name": "station_id",
+            "error_description": ErrorReportMessages.STATION_NOT_REGISTERED.format(
+                station_id="s4", network_provider="np1"
+            ),
+        },
     ]
 
 
-@pytest.mark.parametrize("filename", invalid_files_with_missing_station_id_value)
-def test_missing_station_id_value_in_csv(filename):
-    with open(f"./tests/sample_data/{filename}", "r", encoding="utf-8") as fh:
-        body = fh.read()
-        df = get_dataframe_from_csv(body)
-        df["station_uuid"] = None
-        conditions = \
-            stations_not_registered(
-                df=df,
-            )
-    expected_conditions = \
-        [{
-            'error_row': 2,
-            'header_name': 'station_id',
-            'error_description': ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name='station_id')
-        }]
-    assert len(conditions) > 0
-    assert conditions == expected_conditions
-
-
-@pytest.mark.parametrize("filename", invalid_files_with_missing_network_provider_value)
-def test_missing_network_provider_value_in_csv(filename):
-    with open(f"./tests/sample_data/{filename}", "r", encoding="utf-8") as fh:
-        body = fh.read()
-        df = get_dataframe_from_csv(body)
-        df["station_uuid"] = None
-        conditions = \
-            stations_not_registered(
-                df=df,
-            )
-    expected_conditions = \
-        [{
-            'error_row': 2,
-            'header_name': 'network_provider',
-            'error_description': ErrorReportMessages.MISSING_VALUE_FOR_REQUIRED_COLUMN.format(column_name='network_provider')
-        }]
-    assert len(conditions) > 0
-    assert conditions == expected_conditions
-
-
-@patch("schema_compliance.authorization_registration.execute_query_df")
-def test_stations_not_active_error_present(mock_execute_query_df):
-    df = pandas.DataFrame({
-        'station_uuid': ['unit_test', 'unit_test3'],
-        "network_provider": ['np_test', 'np_test'],
-        "station_id": ["friendly 1", "friendly 2"],
-    })
-
-    pending_stations_df = pandas.DataFrame({
-        'station_uuid': ['unit_test', 'unit_test2', 'unit_test3'],
-    })
+def test_station_eligibility_conditions_pending_and_other_dr_stations():
+    df = get_upload_df([("s1", "np1"), ("s2", "np1"), ("s2", "np1"), ("s3", "np1")])
+    eligibility = get_eligibility_df(
+        [
+            ["s1", "np1", "uuid-1", "Pending Approval", dr_id, None],
+            ["s2", "np1", "uuid-2", "Active", "999", None],
+            ["s3", "np1", "uuid-3", "Active", None, None],
+        ]
+    )
 
-    mock_execute_query_df.return_value = pending_stations_df
-    ft_set = {Feature.SR_ADDS_STATION}
-    response = stations_not_active(
-        cursor=MagicMock(),
-        dr_id="mock_id",
-        df=df,
-        feature_toggle_set=ft_set
+    conditions = station_eligibility_conditions(
+        df, eligibility, dr_id, None, "direct-recipient", {Feature.SR_ADDS_STATION}
     )
-    assert response == [
+
+    assert conditions == [
         {
-            'error_row': 0,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.INVALID_STATION_STATUS_PENDING_APPROVAL.format()
+            "error_row": 0,
+            "header_name": "station_id",
+            "error_description": ErrorReportMessages.INVALID_STATION_STATUS_PENDING_APPROVAL.format(),
         },
-        {
-            'error_row': 1,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.INVALID_STATION_STATUS_PENDING_APPROVAL.format()
-        }
+        *[
+            {
+                "error_row": index,
+                "header_name": "station_id",
+                "error_description": ErrorReportMessages.DR_NOT_AUTHORIZED_TO_SUBMIT.format(
+                    station_id="s2", network_provider="np1"
+                ),
+            }
+            for index in (1, 2)
+        ],
     ]
 
 
-def test_unauthorized_stations_for_dr_given_empyt_df_returns_empty_array():
-    df = pandas.DataFrame({
-        'station_uuid': [],
-        "network_provider": [],
-        "station_id": [],
-    })
-
-    result = unauthorized_stations_for_dr(
-        cursor=MagicMock(),
-        dr_id=dr_id,
-        df= df)
-
-    assert not result
-
-@patch("schema_compliance.authorization_registration.execute_query_df")
-def test_unauthorized_stations_for_dr_given_valid_import_returns_empty_array(mock_execute_query_df):
-    df = pandas.DataFrame({
-        'station_uuid': ['unit_test', 'unit_test3'],
-        "network_provider": ['np_test', 'np_test'],
-        "station_id": ["friendly 1", "friendly 2"],
-    })
-
-    pending_stations_df = pandas.DataFrame({
-        'station_uuid': [],
-    })
-
-    mock_execute_query_df.return_value = pending_stations_df
-    response = unauthorized_stations_for_dr(
-        cursor=MagicMock(),
-        dr_id=dr_id,
-        df=df
+def test_station_eligibility_conditions_unauthorized_sr_stations():
+    df = get_upload_df([("s1", "np1"), ("s2", "np1"), ("s3", "np1")])
+    eligibility = get_eligibility_df(
+        [
+            ["s1", "np1", "uuid-1", "Active", dr_id, "auth-1"],
+            ["s2", "np1", "uuid-2", "Active", dr_id, None],
+        ]
     )
-    assert not response
 
-@patch("schema_compliance.authorization_registration.execute_query_df")
-def test_unauthorized_stations_for_dr_given_unauthorized_stations_in_df_returns_error_array(mock_execute_query_df):
-    df = pandas.DataFrame({
-        'station_uuid': ['unit_test', 'unit_test3', 'two', 'three'],
-        "network_provider": ['np_test', 'np_test', 'np_test_2', 'np_test'],
-        "station_id": ["friendly 1", "friendly 2", "friendly 3", "friendly 4"],
-    })
+    conditions = station_eligibility_conditions(df, eligibility, dr_id, sr_id, "sub-recipient")
 
-    pending_stations_df = pandas.DataFrame({
-        'station_uuid': ["two", "three"],
-    })
-
-    mock_execute_query_df.return_value = pending_stations_df
-    response = unauthorized_stations_for_dr(
-        cursor=MagicMock(),
-        dr_id=dr_id,
-        df=df
-    )
-    assert response == [
+    assert conditions == [
         {
-            'error_row': 2,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.DR_NOT_AUTHORIZED_TO_SUBMIT.format(station_id=df.iloc[2]["station_id"], network_provider=df.iloc[2]["network_provider"])
+            "error_row": 2,
+            "header_name": "station_id",
+            "error_description": ErrorReportMessages.STATION_NOT_REGISTERED.format(
+                station_id="s3", network_provider="np1"
+            ),
         },
         {
-            'error_row': 3,
-            'header_name': 'station_id',
-            'error_description':
-                ErrorReportMessages.DR_NOT_AUTHORIZED_TO_SUBMIT.format(station_id=df.iloc[3]["station_id"], network_provider=df.iloc[3]["network_provider"])
-        }
+            "error_row": 1,
+            "header_name": "station_id",
+            "error_description": ErrorReportMessages.SR_NOT_AUTHORIZED_TO_SUBMIT.format(
+                station_id="s2", network_provider="np1"
+            ),
+        },
     ]
-
@@ -6,12 +6,16 @@ import pytest
 import pandas
 from schema_compliance.error_table import (
     error_table_insert,
-    set_record,
-    set_station_id,
+    get_row_records,
     set_org_ids
 )
+from error_report_messages_enum import ErrorReportMessages
 from evchart_helper.boto3_manager import Boto3Manager
-from evchart_helper.custom_exceptions import EvChartDatabaseDynamoQueryError, EvChartJsonOutputError
+from evchart_helper.custom_exceptions import (
+    EvChartDatabaseAuroraQueryError,
+    EvChartDatabaseDynamoQueryError,
+    EvChartJsonOutputError,
+)
 
 
 # creating users table fixture
@@ -73,27 +77,19 @@ log = MagicMock()
 cursor = MagicMock()
 
 
-def test_set_record_valid():
-    condition_obj = {"error_row": 0}
-    expected_res = {
+def test_get_row_records_writes_missing_typed_values_as_null():
+    typed_df = pandas.DataFrame({
+        "station_id": ["friendly station id 1"],
+        "energy_kwh": pandas.array([None], dtype="Float64"),
+        "power_kw": pandas.array([1.5], dtype="Float64"),
+    })
+    record, station_id = get_row_records(typed_df, [0], "error_table_insert")[0]
+    assert json.loads(record) == {
         "station_id": "friendly station id 1",
-        "name": "Sophia"
+        "energy_kwh": None,
+        "power_kw": 1.5,
     }
-    response = set_record(
-        query_data={}, condition_obj=condition_obj, df=df
-    )
-    assert json.loads(response.get('record')) == expected_res
-
-
-def test_set_station_id():
-    condition_obj = {"error_row": 1}
-    expected_res = {
-        "station_id": "friendly station id 2"
-    }
-    response = set_station_id(
-        query_data={}, condition=condition_obj, df=df
-    )
-    assert response == expected_res
+    assert station_id == "friendly station id 1"
 
 
 def test_set_org_ids_for_dr(
@@ -186,8 +182,8 @@ def test_valid_error_table_insert_col_level(
 
 
 @patch('evchart_helper.api_helper.execute_query')
-@patch('schema_compliance.error_table.set_record')
-def test_error_table_insert_error_400(mock_set_record, mock_insert_query):
+@patch('schema_compliance.error_table.get_row_records')
+def test_error_table_insert_error_400(mock_get_row_records, mock_insert_query):
     # setting params
     condition_list = [{
         "error_row": 0,
@@ -196,7 +192,7 @@ def test_error_table_insert_error_400(mock_set_record, mock_insert_query):
     }]
     # setting mocked return values
     cursor.rowcount = 1
-    mock_set_record.side_effect = EvChartJsonOutputError(log)
+    mock_get_row_records.side_effect = EvChartJsonOutputError(log)
     mock_insert_query.return_value = None
 
     # TODO: kenmacf's local testing raises EvChartDatabaseDynamoQueryError,
@@ -214,3 +210,115 @@ def test_error_table_insert_error_400(mock_set_record, mock_insert_query):
             condition_list=condition_list,
             df=df
         )
+
+
+@patch("schema_compliance.error_table.get_org_info_dynamo")
+def test_error_table_insert_bulk_inserts_in_chunks(mock_get_org_info_dynamo):
+    mock_get_org_info_dynamo.return_value = {
+        "recipient_type": "direct-recipient", "org_friendly_id": "2"
+    }
+    bulk_cursor = MagicMock()
+    condition_list = [
+        {"error_row": i % 2, "error_description": "invalid datatype", "header_name": "name"}
+        for i in range(1500)
+    ] + [{"error_row": None, "error_description": "missing column", "header_name": "time"}]
+
+    response = error_table_insert(
+        cursor=bulk_cursor,
+        upload_id="123",
+        module_id="6",
+        org_id="1212",
+        dr_id="1212",
+        condition_list=condition_list,
+        df=df,
+        max_errors=0,
+    )
+
+    assert response is True
+    assert mock_get_org_info_dynamo.call_count == 1
+    assert [len(args[1]) for args, _ in bulk_cursor.executemany.call_args_list] == [1000, 501]
+    first_row = bulk_cursor.executemany.call_args_list[0][0][1][0]
+    assert first_row[0:2] == ("123", "6")
+    assert first_row[3:] == (
+        0,
+        "invalid datatype",
+        "name",
+        "2",
+        None,
+        json.dumps({"station_id": "friendly station id 1", "name": "Sophia"}),
+        "friendly station id 1",
+    )
+    last_row = bulk_cursor.executemany.call_args_list[1][0][1][-1]
+    assert last_row[3:] == (None, "missing column", "time", "2", None, "{}", None)
+
+
+@patch("schema_compliance.error_table.get_org_info_dynamo")
+def test_error_table_insert_caps_errors_with_summary(mock_get_org_info_dynamo, monkeypatch):
+    monkeypatch.setenv("ERROR_TABLE_MAX_ERRORS", "3")
+    mock_get_org_info_dynamo.return_value = {
+        "recipient_type": "direct-recipient", "org_friendly_id": "2"
+    }
+    bulk_cursor = MagicMock()
+    condition_list = [
+        {"error_row": 1, "error_description": "invalid datatype", "header_name": "name"}
+    ] * 5
+
+    error_table_insert(
+        cursor=bulk_cursor,
+        upload_id="123",
+        module_id="6",
+        org_id="1212",
+        dr_id="1212",
+        condition_list=condition_list,
+        df=df,
+    )
+
+    args, _ = bulk_cursor.executemany.call_args
+    inserted = args[1]
+    assert len(inserted) == 4
+    assert inserted[-1][3] is None
+    assert inserted[-1][4] == ErrorReportMessages.ERROR_LIMIT_EXCEEDED.format(max_errors=3)
+
+
+@patch("schema_compliance.error_table.get_org_info_dynamo")
+def test_error_table_insert_unknown_error_row(mock_get_org_info_dynamo):
+    mock_get_org_info_dynamo.return_value = {
+        "recipient_type": "direct-recipient", "org_friendly_id": "2"
+    }
+    condition_list = [
+        {"error_row": 42, "error_description": "invalid datatype", "header_name": "name"}
+    ]
+
+    with pytest.raises(EvChartJsonOutputError):
+        error_table_insert(
+            cursor=MagicMock(),
+            upload_id="123",
+            module_id="6",
+            org_id="1212",
+            dr_id="1212",
+            condition_list=condition_list,
+            df=df,
+        )
+
+
+@patch("schema_compliance.error_table.get_org_info_dynamo")
+def test_error_table_insert_database_error(mock_get_org_info_dynamo):
+    mock_get_org_info_dynamo.return_value = {
+        "recipient_type": "direct-recipient", "org_friendly_id": "2"
+    }
+    failing_cursor = MagicMock()
+    failing_cursor.executemany.side_effect = Exception("connection lost")
+    condition_list = [
+        {"error_row": None, "error_description": "missing column", "header_name": "name"}
+    ]
+
+    with pytest.raises(EvChartDatabaseAuroraQueryError):
+        error_table_insert(
+            cursor=failing_cursor,
+            upload_id="123",
+            module_id="6",
+            org_id="1212",
+            dr_id="1212",
+            condition_list=condition_list,
+            df=None,
+        )